@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de los managers de calificaciones, asistencia y biblioteca
+GESJ - Plataforma de Gestión Educativa
+
+Para cada escala genera el conjunto de datos sintético (generar_datos.py) y
+mide cada método público de CalificacionesManager, AsistenciaManager y
+BibliotecaManager. El resultado es un JSON pensado para guardar y comparar
+entre versiones: tiempo de la primera llamada (caché fría), mediana, p95,
+mínimo y máximo en milisegundos, y cantidad de filas devueltas.
+
+Los métodos que escriben en la base solo se miden con --incluir-escritura.
+
+Uso:
+    python benchmarks/ejecutar_benchmarks.py --base gestion_escolar_bench \\
+        --escalas chica,mediana --repeticiones 5 --salida resultados.json
+"""
+
+import argparse
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mysql.connector import Error
+from server import database
+from server.sentencias import obtener_registro_sentencias
+from generar_datos import ESCALAS, GeneradorDatos, configuracion_escala, usar_base
+
+# Argumentos de cada método a partir del contexto de muestra (ver obtener_contexto).
+# Los métodos sin entrada se llaman sin argumentos si no los requieren.
+ARGUMENTOS: Dict[str, Dict[str, Callable[[Dict], tuple]]] = {
+    'CalificacionesManager': {
+        'obtener_alumnos_por_curso': lambda c: (c['curso'], c['division']),
+        'obtener_alumno_por_id': lambda c: (c['alumno_id'],),
+        'obtener_materias_por_docente': lambda c: (c['docente_id'],),
+        'obtener_materias_por_curso': lambda c: (c['curso'], c['division']),
+        'obtener_calificaciones_alumno': lambda c: (c['alumno_id'], c['periodo_id']),
+        'obtener_calificaciones_materia': lambda c: (c['materia_id'], c['periodo_id']),
+        'obtener_promedios_alumno': lambda c: (c['alumno_id'], c['periodo_id']),
+        'obtener_promedios_curso_materia': lambda c: (c['materia_id'], c['periodo_id'],
+                                                      c['curso'], c['division']),
+        'obtener_promedio_general_alumno': lambda c: (c['alumno_id'], c['periodo_id']),
+        'obtener_estadisticas_curso': lambda c: (c['curso'], c['division'], c['periodo_id']),
+        'cargar_datos_reporte_curso': lambda c: (c['curso'], c['division'], c['periodo_id']),
+        'obtener_alumnos_en_riesgo': lambda c: (c['periodo_id'],),
+        'evaluar_riesgo': lambda c: (c['periodo_id'],),
+        'reevaluar_riesgo': lambda c: (c['alumnos_curso'],),
+        'obtener_ranking_alumnos_por_promedio': lambda c: (c['materia_id'], c['periodo_id']),
+        'obtener_top_ranking': lambda c: (c['materia_id'], c['periodo_id']),
+        'obtener_posicion_ranking_alumno': lambda c: (c['materia_id'], c['periodo_id'], c['alumno_id']),
+        'obtener_alumnos_debajo_percentil': lambda c: (c['materia_id'], c['periodo_id'], 25.0),
+        'obtener_tendencias_promedios': lambda c: (c['materia_id'],),
+        'obtener_tendencias_curso': lambda c: (c['curso'], c['division']),
+        'obtener_tendencias_alumno': lambda c: (c['alumno_id'],),
+        'obtener_estadisticas_promedios_curso': lambda c: (c['curso'], c['division'], c['periodo_id']),
+        'actualizar_promedios_simple': lambda c: (c['alumno_id'], c['materia_id'], c['periodo_id']),
+        'registrar_calificacion': lambda c: (c['alumno_id'], c['materia_id'], c['docente_id'],
+                                             c['periodo_id'], c['tipo_evaluacion_id'], 7.5,
+                                             c['fecha']),
+        'registrar_calificaciones_lote': lambda c: (
+            c['materia_id'], c['docente_id'], c['periodo_id'], c['tipo_evaluacion_id'], c['fecha'],
+            [{'alumno_id': alumno_id, 'nota': 7.0} for alumno_id in c['alumnos_curso']]),
+    },
+    'AsistenciaManager': {
+        'obtener_asistencia_alumno': lambda c: (c['alumno_id'],),
+        'obtener_estadisticas_asistencia_curso': lambda c: (c['curso'], c['division'],
+                                                            c['fecha_inicio'], c['fecha_fin']),
+        'obtener_resumen_periodo_alumno': lambda c: (c['alumno_id'], c['periodo_id']),
+        'obtener_resumen_mensual_alumno': lambda c: (c['alumno_id'],),
+        'obtener_porcentajes_asistencia': lambda c: (c['periodo_id'], c['curso'], c['division']),
+        'obtener_alumnos_bajo_umbral_asistencia': lambda c: (c['periodo_id'],),
+        'registrar_asistencia_diaria': lambda c: (
+            c['fecha'], c['curso'], c['division'],
+            [{'alumno_id': alumno_id, 'estado': 'Presente'} for alumno_id in c['alumnos_curso']]),
+        'registrar_asistencia_lote': lambda c: (
+            [{'alumno_id': alumno_id, 'fecha': c['fecha'], 'estado': 'Presente'}
+             for alumno_id in c['alumnos_curso']],),
+    },
+    'BibliotecaManager': {
+        'obtener_libros_disponibles': lambda c: (c['categoria'],),
+        'obtener_libros_disponibles_pagina': lambda c: (c['categoria'],),
+        'obtener_prestamos_activos': lambda c: (),
+        'obtener_prestamos_activos_pagina': lambda c: (),
+        'registrar_prestamo': lambda c: (c['libro_id'], c['alumno_id'], c['docente_id']),
+    },
+}
+
+# Métodos que modifican datos: solo se miden con --incluir-escritura
+ESCRITURA = {
+    'registrar_calificacion', 'registrar_calificaciones_lote', 'actualizar_promedios',
+    'actualizar_promedios_pendientes', 'actualizar_promedios_simple',
+    'registrar_asistencia_diaria', 'registrar_asistencia_lote', 'reconstruir_resumen_asistencia',
+    'registrar_prestamo', 'devolver_libro',
+}
+
+# Métodos que no consultan la base (administración de cachés y conexiones)
+SIN_CONSULTA = {
+    'conectar', 'desconectar', 'invalidar_periodos', 'invalidar_tipos_evaluacion',
+    'invalidar_materias', 'invalidar_cache', 'invalidar_ranking', 'obtener_estadisticas_cache',
+    'refrescar_esquema', 'invalidar_tendencias',
+}
+
+
+def obtener_managers() -> Dict:
+    from server.calificaciones import CalificacionesManager
+    from server.asistencia_operations import AsistenciaManager
+    from server.biblioteca_operations import BibliotecaManager
+    return {
+        'CalificacionesManager': CalificacionesManager(),
+        'AsistenciaManager': AsistenciaManager(),
+        'BibliotecaManager': BibliotecaManager(),
+    }
+
+
+def obtener_contexto() -> Dict:
+    """Ids reales del conjunto cargado para usar como argumentos"""
+    connection = database.crear_conexion()
+    if not connection:
+        raise Error("Sin conexión a la base de datos")
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT c.alumno_id, c.materia_id, c.docente_id, c.periodo_id,
+                   c.tipo_evaluacion_id, c.fecha_evaluacion, a.curso, a.division,
+                   p.fecha_inicio, p.fecha_fin
+            FROM calificaciones c
+            JOIN alumnos a ON c.alumno_id = a.id
+            JOIN periodos_evaluacion p ON c.periodo_id = p.id
+            ORDER BY c.id
+            LIMIT 1
+        """)
+        fila = cursor.fetchone()
+        if not fila:
+            raise Error("No hay calificaciones cargadas")
+        contexto = dict(fila)
+        contexto['fecha'] = fila['fecha_evaluacion']
+
+        cursor.execute("SELECT id FROM alumnos WHERE curso = %s AND division = %s AND activo = TRUE",
+                       (fila['curso'], fila['division']))
+        contexto['alumnos_curso'] = [a['id'] for a in cursor.fetchall()]
+
+        contexto['libro_id'] = None
+        contexto['categoria'] = None
+        try:
+            cursor.execute("SELECT id, categoria FROM libros WHERE cantidad_disponible > 0 ORDER BY id LIMIT 1")
+            libro = cursor.fetchone()
+            if libro:
+                contexto['libro_id'] = libro['id']
+                contexto['categoria'] = libro['categoria']
+        except Error:
+            pass  # Instalación sin biblioteca
+        cursor.close()
+        return contexto
+    finally:
+        connection.close()
+
+
+def metodos_publicos(manager) -> List[str]:
+    return [nombre for nombre, _ in inspect.getmembers(manager, inspect.ismethod)
+            if not nombre.startswith('_')]
+
+
+def medir(funcion: Callable, argumentos: tuple, repeticiones: int) -> Dict:
+    """Tiempo de la primera llamada y estadísticas de las siguientes, en milisegundos"""
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones + 1):
+        inicio = time.perf_counter()
+        resultado = funcion(*argumentos)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    primera, resto = tiempos[0], sorted(tiempos[1:]) or tiempos
+    medicion = {
+        'primera_ms': round(primera, 3),
+        'mediana_ms': round(statistics.median(resto), 3),
+        'p95_ms': round(resto[min(len(resto) - 1, int(len(resto) * 0.95))], 3),
+        'min_ms': round(resto[0], 3),
+        'max_ms': round(resto[-1], 3),
+    }
+    if isinstance(resultado, (list, tuple)):
+        medicion['filas'] = len(resultado)
+    elif isinstance(resultado, dict) and 'filas' in resultado:
+        medicion['filas'] = len(resultado['filas'])
+    return medicion
+
+
+def ejecutar_escala(managers: Dict, contexto: Dict, repeticiones: int,
+                    incluir_escritura: bool) -> Dict:
+    resultados = {}
+    for nombre_clase, manager in managers.items():
+        argumentos_clase = ARGUMENTOS.get(nombre_clase, {})
+        for metodo in metodos_publicos(manager):
+            clave = f"{nombre_clase}.{metodo}"
+            if metodo in SIN_CONSULTA:
+                continue
+            if metodo in ESCRITURA and not incluir_escritura:
+                resultados[clave] = {'omitido': 'escritura (usar --incluir-escritura)'}
+                continue
+
+            funcion = getattr(manager, metodo)
+            if metodo in argumentos_clase:
+                argumentos = argumentos_clase[metodo](contexto)
+            else:
+                requeridos = [p for p in inspect.signature(funcion).parameters.values()
+                              if p.default is inspect.Parameter.empty
+                              and p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)]
+                if requeridos:
+                    resultados[clave] = {'omitido': 'sin argumentos registrados en ARGUMENTOS'}
+                    continue
+                argumentos = ()
+
+            if None in argumentos:
+                resultados[clave] = {'omitido': 'sin datos de muestra'}
+                continue
+
+            try:
+                resultados[clave] = medir(funcion, argumentos, repeticiones)
+            except Exception as e:
+                resultados[clave] = {'error': str(e)}
+            print(f"   {clave}: {resultados[clave]}", file=sys.stderr)
+    return resultados
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Medir los managers de GESJ a distintas escalas")
+    parser.add_argument("--base", default="gestion_escolar_bench", help="Base de datos de pruebas")
+    parser.add_argument("--escalas", default="chica,mediana",
+                        help=f"Escalas separadas por coma ({', '.join(sorted(ESCALAS))})")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", default="-", help="Archivo JSON de salida ('-' para stdout)")
+    parser.add_argument("--incluir-escritura", action="store_true",
+                        help="Medir también los métodos que modifican datos")
+    parser.add_argument("--sin-generar", action="store_true",
+                        help="Usar los datos ya cargados en la base (una sola escala)")
+    parser.add_argument("--sin-preparar", action="store_true",
+                        help="Ejecutar las sentencias registradas sin prepararlas (para comparar)")
+    args = parser.parse_args()
+
+    if args.base == "gestion_escolar" and not args.sin_generar:
+        print("❌ Los benchmarks regeneran los datos: use una base dedicada", file=sys.stderr)
+        return 2
+
+    usar_base(args.base)
+    escalas = ['actual'] if args.sin_generar else [e.strip() for e in args.escalas.split(",") if e.strip()]
+    informe = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'base': args.base,
+        'semilla': args.semilla,
+        'repeticiones': args.repeticiones,
+        'python': platform.python_version(),
+        'sentencias_preparadas': not args.sin_preparar,
+        'escalas': {},
+    }
+    database.obtener_pool().sentencias_preparadas = not args.sin_preparar
+
+    for escala in escalas:
+        print(f"📏 Escala {escala}", file=sys.stderr)
+        try:
+            dataset = None
+            if not args.sin_generar:
+                dataset = GeneradorDatos(configuracion_escala(escala), semilla=args.semilla).generar()
+            managers = obtener_managers()
+            managers['CalificacionesManager'].refrescar_esquema()
+            contexto = obtener_contexto()
+            obtener_registro_sentencias().reiniciar_estadisticas()
+        except Error as e:
+            print(f"❌ Error preparando la escala {escala}: {e}", file=sys.stderr)
+            return 1
+
+        informe['escalas'][escala] = {
+            'dataset': dataset,
+            'metodos': ejecutar_escala(managers, contexto, args.repeticiones, args.incluir_escritura),
+            # Preparaciones y ejecuciones de cada sentencia registrada durante la escala
+            'sentencias': obtener_registro_sentencias().obtener_estadisticas(),
+        }
+
+    texto = json.dumps(informe, indent=2, ensure_ascii=False, default=_serializar)
+    if args.salida == "-":
+        print(texto)
+    else:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto)
+        print(f"✅ Resultados guardados en {args.salida}", file=sys.stderr)
+    return 0
+
+
+def _serializar(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return str(valor)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
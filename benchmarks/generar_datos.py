@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Generador de datos sintéticos para pruebas de carga
+GESJ - Plataforma de Gestión Educativa
+
+Crea una escuela completa y reproducible (misma semilla, mismos datos):
+cursos x divisiones x alumnos, materias con su docente, períodos, tipos de
+evaluación, calificaciones, asistencia diaria y, si las tablas existen,
+libros y préstamos de biblioteca. Las notas y la asistencia de cada alumno
+siguen un perfil propio para que haya alumnos en riesgo, regulares y
+destacados como en una escuela real.
+
+El esquema debe existir (migraciones de supabase/migrations aplicadas).
+Vacía las tablas del sistema antes de cargar: usar una base dedicada.
+
+Uso:
+    python benchmarks/generar_datos.py --base gestion_escolar_bench --escala mediana
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mysql.connector import Error
+from server import database
+
+# Tamaños predefinidos; cualquier valor puede pisarse desde la línea de comandos
+ESCALAS = {
+    'chica': {'cursos': 2, 'divisiones': 1, 'alumnos_por_division': 35, 'materias_por_curso': 6,
+              'periodos': 2, 'tipos_evaluacion': 3, 'evaluaciones_por_tipo': 1,
+              'dias_asistencia': 40, 'libros': 100, 'prestamos_por_alumno': 1},
+    'mediana': {'cursos': 6, 'divisiones': 2, 'alumnos_por_division': 35, 'materias_por_curso': 8,
+                'periodos': 2, 'tipos_evaluacion': 3, 'evaluaciones_por_tipo': 2,
+                'dias_asistencia': 90, 'libros': 500, 'prestamos_por_alumno': 2},
+    'grande': {'cursos': 6, 'divisiones': 4, 'alumnos_por_division': 35, 'materias_por_curso': 10,
+               'periodos': 2, 'tipos_evaluacion': 3, 'evaluaciones_por_tipo': 3,
+               'dias_asistencia': 180, 'libros': 2000, 'prestamos_por_alumno': 3},
+}
+
+NOMBRES = ["Juan", "Ana", "Carlos", "Laura", "Mario", "Julia", "Sofía", "Mateo", "Valentina",
+           "Santiago", "Camila", "Benjamín", "Martina", "Lucas", "Catalina", "Joaquín", "Emma",
+           "Tomás", "Lucía", "Facundo", "Agustina", "Nicolás", "Milagros", "Thiago", "Florencia"]
+APELLIDOS = ["Pérez", "Gómez", "Martínez", "Díaz", "González", "Castro", "Rodríguez", "López",
+             "Fernández", "Sánchez", "Romero", "Sosa", "Torres", "Álvarez", "Ruiz", "Ramírez",
+             "Flores", "Benítez", "Acosta", "Medina", "Herrera", "Suárez", "Aguirre", "Giménez"]
+MATERIAS = [("Matemáticas", "MAT"), ("Lengua y Literatura", "LEN"), ("Ciencias Naturales", "CNA"),
+            ("Ciencias Sociales", "CSO"), ("Inglés", "ING"), ("Educación Física", "EFI"),
+            ("Educación Artística", "ART"), ("Tecnología", "TEC"), ("Física", "FIS"),
+            ("Química", "QUI"), ("Historia", "HIS"), ("Geografía", "GEO")]
+TIPOS_EVALUACION = [("Evaluación Diaria", 30.0), ("Evaluación Mensual", 40.0),
+                    ("Evaluación Cuatrimestral", 30.0), ("Trabajo Práctico", 20.0)]
+CATEGORIAS_LIBROS = ["Literatura", "Ciencias", "Historia", "Matemáticas", "Arte", "Referencia"]
+ESTADOS_ASISTENCIA = ('Presente', 'Ausente', 'Tarde', 'Justificado')
+
+# Tablas que se vacían antes de cargar, en orden compatible con las claves foráneas
+TABLAS_DATOS = ["prestamos_biblioteca", "libros", "asistencia_resumen_mensual",
+                "asistencia_resumen_periodo", "asistencia_diaria", "promedios_pendientes",
+                "promedios_alumnos", "calificaciones", "materias", "alumnos",
+                "periodos_evaluacion", "tipos_evaluacion"]
+
+PREFIJO_USUARIOS = "gen_"
+TAMANO_BLOQUE = 1000
+
+
+def usar_base(nombre: str):
+    """Apuntar el pool de conexiones a otra base (antes de la primera conexión)"""
+    database.DB_CONFIG['database'] = nombre
+
+
+def configuracion_escala(escala: str, **cambios) -> Dict:
+    """Parámetros de una escala predefinida con los cambios indicados"""
+    configuracion = dict(ESCALAS[escala])
+    configuracion.update({k: v for k, v in cambios.items() if v is not None})
+    return configuracion
+
+
+class GeneradorDatos:
+    """Carga en la base una escuela sintética según una configuración de escala"""
+
+    def __init__(self, configuracion: Dict, semilla: int = 42, anio: int = 2025):
+        self.configuracion = configuracion
+        self.semilla = semilla
+        self.anio = anio
+        self.random = random.Random(semilla)
+        self.connection = None
+        self.tablas = set()
+        self.conteos = {}
+
+    def generar(self) -> Dict:
+        """
+        Vaciar las tablas y cargar el conjunto de datos completo
+
+        Returns:
+            Dict con la cantidad de filas por tabla y los segundos empleados
+        """
+        inicio = time.perf_counter()
+        self.connection = database.crear_conexion()
+        if not self.connection:
+            raise Error("Sin conexión a la base de datos")
+
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("""
+                SELECT LOWER(TABLE_NAME) FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE()
+            """)
+            self.tablas = {fila[0] for fila in cursor.fetchall()}
+
+            self._limpiar(cursor)
+            docentes, padres = self._crear_usuarios(cursor)
+            periodos = self._crear_periodos(cursor)
+            tipos = self._crear_tipos(cursor)
+            alumnos = self._crear_alumnos(cursor, padres)
+            materias = self._crear_materias(cursor, docentes)
+            self._crear_calificaciones(cursor, alumnos, materias, periodos, tipos)
+            self._crear_asistencia(cursor, alumnos, periodos)
+            self._crear_biblioteca(cursor, alumnos, docentes)
+            cursor.close()
+        finally:
+            self.connection.close()
+
+        self._actualizar_resumenes()
+        self.conteos['segundos'] = round(time.perf_counter() - inicio, 2)
+        return dict(self.conteos)
+
+    # ==================== CARGA ====================
+
+    def _limpiar(self, cursor):
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        for tabla in TABLAS_DATOS:
+            if tabla in self.tablas:
+                cursor.execute(f"TRUNCATE TABLE {tabla}")
+        cursor.execute("DELETE FROM usuarios WHERE nombre_usuario LIKE %s", (PREFIJO_USUARIOS + "%",))
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        self.connection.commit()
+
+    def _insertar(self, cursor, tabla: str, columnas: List[str], filas: List[tuple]):
+        """Insertar en bloques con executemany (el conector los envía como INSERT multi-fila)"""
+        query = (f"INSERT INTO {tabla} ({', '.join(columnas)}) "
+                 f"VALUES ({', '.join(['%s'] * len(columnas))})")
+        for inicio in range(0, len(filas), TAMANO_BLOQUE):
+            cursor.executemany(query, filas[inicio:inicio + TAMANO_BLOQUE])
+            self.connection.commit()
+        self.conteos[tabla] = self.conteos.get(tabla, 0) + len(filas)
+
+    def _ids(self, cursor, query: str) -> List[tuple]:
+        cursor.execute(query)
+        return cursor.fetchall()
+
+    def _crear_usuarios(self, cursor):
+        c = self.configuracion
+        cantidad_docentes = max(1, c['cursos'] * c['divisiones'] * c['materias_por_curso'] // 4)
+        # Aproximadamente una familia cada 1,5 alumnos (hermanos en la escuela)
+        cantidad_padres = max(1, int(c['cursos'] * c['divisiones'] * c['alumnos_por_division'] / 1.5))
+
+        filas = [(f"{PREFIJO_USUARIOS}docente{i}", "1234", "Docente") for i in range(1, cantidad_docentes + 1)]
+        filas += [(f"{PREFIJO_USUARIOS}padre{i}", "1234", "Padre") for i in range(1, cantidad_padres + 1)]
+        self._insertar(cursor, "usuarios", ["nombre_usuario", "contrasena", "tipo_usuario"], filas)
+
+        docentes = [fila[0] for fila in self._ids(cursor, f"""
+            SELECT id FROM usuarios WHERE nombre_usuario LIKE '{PREFIJO_USUARIOS}docente%' ORDER BY id""")]
+        padres = [fila[0] for fila in self._ids(cursor, f"""
+            SELECT id FROM usuarios WHERE nombre_usuario LIKE '{PREFIJO_USUARIOS}padre%' ORDER BY id""")]
+        return docentes, padres
+
+    def _crear_periodos(self, cursor):
+        """Dividir el ciclo lectivo (1 de marzo al 15 de diciembre) en períodos iguales"""
+        cantidad = self.configuracion['periodos']
+        inicio_ciclo = date(self.anio, 3, 1)
+        dias = (date(self.anio, 12, 15) - inicio_ciclo).days
+        filas = []
+        for i in range(cantidad):
+            inicio = inicio_ciclo + timedelta(days=dias * i // cantidad)
+            fin = inicio_ciclo + timedelta(days=dias * (i + 1) // cantidad - 1)
+            filas.append((f"Período {i + 1} {self.anio}", "Generado para pruebas de carga",
+                          inicio, fin, self.anio))
+        self._insertar(cursor, "periodos_evaluacion",
+                       ["nombre", "descripcion", "fecha_inicio", "fecha_fin", "ano_lectivo"], filas)
+        return self._ids(cursor, "SELECT id, fecha_inicio, fecha_fin FROM periodos_evaluacion ORDER BY id")
+
+    def _crear_tipos(self, cursor):
+        filas = [(nombre, peso) for nombre, peso in TIPOS_EVALUACION[:self.configuracion['tipos_evaluacion']]]
+        self._insertar(cursor, "tipos_evaluacion", ["nombre", "peso_porcentual"], filas)
+        return [fila[0] for fila in self._ids(cursor, "SELECT id FROM tipos_evaluacion ORDER BY id")]
+
+    def _crear_alumnos(self, cursor, padres):
+        c = self.configuracion
+        filas = []
+        dni = 40000000
+        for numero_curso in range(1, c['cursos'] + 1):
+            curso = f"{numero_curso}º Año"
+            for division in [chr(ord('A') + i) for i in range(c['divisiones'])]:
+                for _ in range(c['alumnos_por_division']):
+                    dni += 1
+                    nacimiento = date(self.anio - 12 - numero_curso, 1, 1) + \
+                        timedelta(days=self.random.randint(0, 364))
+                    filas.append((self.random.choice(NOMBRES), self.random.choice(APELLIDOS),
+                                  str(dni), nacimiento, curso, division,
+                                  self.random.choice(padres)))
+        self._insertar(cursor, "alumnos",
+                       ["nombre", "apellido", "dni", "fecha_nacimiento", "curso", "division", "padre_id"],
+                       filas)
+
+        alumnos = []
+        for alumno_id, curso, division in self._ids(cursor, "SELECT id, curso, division FROM alumnos ORDER BY id"):
+            # Perfil del alumno: nivel académico y probabilidad de asistir
+            nivel = min(9.5, max(3.5, self.random.gauss(7.0, 1.3)))
+            asistencia = min(0.99, max(0.6, self.random.gauss(0.9, 0.07)))
+            alumnos.append({'id': alumno_id, 'curso': curso, 'division': division,
+                            'nivel': nivel, 'asistencia': asistencia})
+        return alumnos
+
+    def _crear_materias(self, cursor, docentes):
+        c = self.configuracion
+        filas = []
+        for numero_curso in range(1, c['cursos'] + 1):
+            for division in [chr(ord('A') + i) for i in range(c['divisiones'])]:
+                for nombre, abreviatura in MATERIAS[:c['materias_por_curso']]:
+                    filas.append((nombre, f"{abreviatura}{numero_curso}{division}", f"{numero_curso}º Año",
+                                  division, self.random.choice(docentes), self.random.randint(2, 6)))
+        self._insertar(cursor, "materias",
+                       ["nombre", "codigo", "curso", "division", "docente_id", "horas_semanales"], filas)
+
+        materias = {}
+        for materia_id, curso, division, docente_id in self._ids(
+                cursor, "SELECT id, curso, division, docente_id FROM materias ORDER BY id"):
+            dificultad = self.random.uniform(-1.0, 0.5)
+            materias.setdefault((curso, division), []).append((materia_id, docente_id, dificultad))
+        return materias
+
+    def _crear_calificaciones(self, cursor, alumnos, materias, periodos, tipos):
+        evaluaciones = self.configuracion['evaluaciones_por_tipo']
+        filas = []
+        for alumno in alumnos:
+            for materia_id, docente_id, dificultad in materias.get((alumno['curso'], alumno['division']), []):
+                for periodo_id, inicio, fin in periodos:
+                    duracion = (fin - inicio).days
+                    for tipo_id in tipos:
+                        for n in range(evaluaciones):
+                            fecha = inicio + timedelta(days=duracion * (n + 1) // (evaluaciones + 1))
+                            nota = round(min(10.0, max(1.0, self.random.gauss(alumno['nivel'] + dificultad, 1.2))), 2)
+                            filas.append((alumno['id'], materia_id, docente_id, periodo_id, tipo_id,
+                                          nota, fecha, ""))
+        self._insertar(cursor, "calificaciones",
+                       ["alumno_id", "materia_id", "docente_id", "periodo_id", "tipo_evaluacion_id",
+                        "nota", "fecha_evaluacion", "observaciones"], filas)
+
+    def _crear_asistencia(self, cursor, alumnos, periodos):
+        if "asistencia_diaria" not in self.tablas:
+            return
+
+        dias = []
+        for _, inicio, fin in periodos:
+            dia = inicio
+            while dia <= fin and len(dias) < self.configuracion['dias_asistencia']:
+                if dia.weekday() < 5:
+                    dias.append(dia)
+                dia += timedelta(days=1)
+
+        filas = []
+        for alumno in alumnos:
+            for dia in dias:
+                azar = self.random.random()
+                if azar < alumno['asistencia']:
+                    estado = 'Tarde' if self.random.random() < 0.05 else 'Presente'
+                else:
+                    estado = 'Justificado' if self.random.random() < 0.4 else 'Ausente'
+                filas.append((alumno['id'], dia, estado, "", None))
+        self._insertar(cursor, "asistencia_diaria",
+                       ["alumno_id", "fecha", "estado", "observaciones", "registrado_por"], filas)
+
+    def _crear_biblioteca(self, cursor, alumnos, docentes):
+        if "libros" not in self.tablas:
+            return
+
+        c = self.configuracion
+        filas = []
+        for i in range(1, c['libros'] + 1):
+            cantidad = self.random.randint(1, 5)
+            filas.append((f"Libro {i:05d}", f"{self.random.choice(NOMBRES)} {self.random.choice(APELLIDOS)}",
+                          f"978{i:010d}", self.random.choice(CATEGORIAS_LIBROS), "Editorial de Prueba",
+                          self.random.randint(1950, self.anio), cantidad, cantidad,
+                          f"Estante {self.random.randint(1, 40)}"))
+        self._insertar(cursor, "libros",
+                       ["titulo", "autor", "isbn", "categoria", "editorial", "año_publicacion",
+                        "cantidad_total", "cantidad_disponible", "ubicacion"], filas)
+
+        if "prestamos_biblioteca" not in self.tablas:
+            return
+
+        libros = [fila[0] for fila in self._ids(cursor, "SELECT id FROM libros ORDER BY id")]
+        hoy = date.today()
+        prestamos = []
+        activos = {}
+        for alumno in alumnos:
+            for _ in range(c['prestamos_por_alumno']):
+                libro_id = self.random.choice(libros)
+                fecha = hoy - timedelta(days=self.random.randint(0, 120))
+                esperada = fecha + timedelta(days=7)
+                if fecha > hoy - timedelta(days=10):
+                    # Préstamos recientes todavía activos
+                    prestamos.append((libro_id, alumno['id'], self.random.choice(docentes), fecha,
+                                      esperada, 'Activo', None, 0))
+                    activos[libro_id] = activos.get(libro_id, 0) + 1
+                else:
+                    devolucion = esperada + timedelta(days=self.random.randint(-3, 5))
+                    multa = max(0, (devolucion - esperada).days) * 50
+                    prestamos.append((libro_id, alumno['id'], self.random.choice(docentes), fecha,
+                                      esperada, 'Devuelto', devolucion, multa))
+        self._insertar(cursor, "prestamos_biblioteca",
+                       ["libro_id", "alumno_id", "docente_autoriza", "fecha_prestamo",
+                        "fecha_devolucion_esperada", "estado", "fecha_devolucion_real", "multa"],
+                       prestamos)
+
+        # Descontar los ejemplares prestados (sin bajar de cero)
+        cursor.executemany("""
+            UPDATE libros SET cantidad_disponible = GREATEST(0, cantidad_disponible - %s)
+            WHERE id = %s
+        """, [(cantidad, libro_id) for libro_id, cantidad in activos.items()])
+        self.connection.commit()
+
+    def _actualizar_resumenes(self):
+        """Calcular promedios y resúmenes de asistencia para el conjunto cargado"""
+        from server.schema_cache import refrescar_capacidades
+        from server.calificaciones.promedios import PromediosOperations
+        from server.asistencia_operations import AsistenciaManager
+
+        refrescar_capacidades()
+        if "promedios_alumnos" in self.tablas:
+            PromediosOperations().actualizar_todos()
+        if "asistencia_resumen_mensual" in self.tablas:
+            AsistenciaManager().reconstruir_resumen_asistencia()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cargar una escuela sintética para pruebas de carga")
+    parser.add_argument("--base", default="gestion_escolar_bench", help="Base de datos destino")
+    parser.add_argument("--escala", choices=sorted(ESCALAS), default="chica")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--cursos", type=int)
+    parser.add_argument("--divisiones", type=int)
+    parser.add_argument("--alumnos-por-division", type=int)
+    parser.add_argument("--forzar", action="store_true",
+                        help="Permitir cargar sobre la base principal gestion_escolar")
+    args = parser.parse_args()
+
+    if args.base == "gestion_escolar" and not args.forzar:
+        print("❌ El generador vacía las tablas: use una base dedicada o --forzar")
+        return 2
+
+    usar_base(args.base)
+    configuracion = configuracion_escala(args.escala, cursos=args.cursos, divisiones=args.divisiones,
+                                         alumnos_por_division=args.alumnos_por_division)
+    print(f"🏫 Generando escala '{args.escala}' en {args.base} (semilla {args.semilla})...")
+    try:
+        conteos = GeneradorDatos(configuracion, semilla=args.semilla).generar()
+    except Error as e:
+        print(f"❌ Error al generar datos: {e}")
+        return 1
+
+    for tabla, cantidad in conteos.items():
+        print(f"   - {tabla}: {cantidad}")
+    print("✅ Datos generados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
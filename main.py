@@ -12,6 +12,11 @@ import os
 # Agregar el directorio actual al path de Python
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Sólo biblioteca estándar: se importa antes que tkinter para poder medirlo
+from ui.carga_diferida import iniciar_medicion, medicion_solicitada
+
+medicion = iniciar_medicion() if medicion_solicitada() else None
+
 try:
     from ui.main_window import MainWindow
 except ImportError as e:
@@ -30,10 +35,22 @@ except ImportError as e:
         print("Reintentando importación...")
         from ui.main_window import MainWindow
 
+if medicion:
+    medicion.etapa("importar ui.main_window")
+
+def mostrar_informe_arranque(root):
+    """Cerrar la última etapa cuando la ventana ya está dibujada e imprimir el informe"""
+    root.update_idletasks()
+    medicion.etapa("primer dibujo de la ventana")
+    print(medicion.informe(), file=sys.stderr)
+
 def main():
     """Función principal de la aplicación"""
     try:
         app = MainWindow()
+        if medicion:
+            medicion.etapa("crear MainWindow")
+            app.root.after_idle(mostrar_informe_arranque, app.root)
         app.run()
     except Exception as e:
         print(f"Error al iniciar la aplicación: {e}")
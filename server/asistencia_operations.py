@@ -8,6 +8,22 @@ from mysql.connector import Error
 from datetime import datetime, date
 from typing import List, Dict, Optional, Tuple
 from .database import crear_conexion
+from .schema_cache import obtener_capacidades
+from .calificaciones.manager import TTL_CACHE, cache_referencia
+
+ESTADOS_ASISTENCIA = ('Presente', 'Ausente', 'Tarde', 'Justificado')
+
+# Posición de cada estado en los contadores de las tablas de resumen
+# (presentes, ausentes, tardes, justificados, total_registros)
+COLUMNAS_RESUMEN = ('presentes', 'ausentes', 'tardes', 'justificados', 'total_registros')
+INDICE_ESTADO = {estado: i for i, estado in enumerate(ESTADOS_ASISTENCIA)}
+
+# Filas por sentencia INSERT multi-fila y por transacción en la carga masiva
+TAMANO_BLOQUE_ASISTENCIA = 1000
+
+# Rangos (id, fecha_inicio, fecha_fin) de los períodos en la caché de datos de
+# referencia; CalificacionesManager.invalidar_periodos() también los descarta
+CLAVE_RANGOS_PERIODOS = ('periodos', 'rangos')
 
 class AsistenciaManager:
     """Gestor de operaciones de asistencia en la base de datos"""
@@ -40,33 +56,28 @@ class AsistenciaManager:
             bool: True si se registró correctamente
         """
         try:
+            fecha = _como_fecha(fecha)
+            # Mismo tipo que las claves (alumno_id, fecha) que _guardar_filas lee de la base
+            filas = [(int(asistencia['alumno_id']), fecha, asistencia['estado'],
+                      asistencia.get('observaciones', ''),
+                      asistencia.get('registrado_por', 1))  # ID del docente/preceptor
+                     for asistencia in asistencias]
+            if not filas:
+                return True
+            
             if not self.conectar():
                 return False
             
             cursor = self.connection.cursor()
-            
-            for asistencia in asistencias:
-                query = """
-                    INSERT INTO asistencia_diaria 
-                    (alumno_id, fecha, estado, observaciones, registrado_por)
-                    VALUES (%s, %s, %s, %s, %s)
-                    ON DUPLICATE KEY UPDATE
-                    estado = VALUES(estado),
-                    observaciones = VALUES(observaciones),
-                    fecha_modificacion = CURRENT_TIMESTAMP
-                """
-                cursor.execute(query, (
-                    asistencia['alumno_id'],
-                    fecha,
-                    asistencia['estado'],
-                    asistencia.get('observaciones', ''),
-                    asistencia.get('registrado_por', 1)  # ID del docente/preceptor
-                ))
+            self._guardar_filas(cursor, filas, self._resumen_disponible())
             
             self.connection.commit()
             cursor.close()
             return True
             
+        except (TypeError, ValueError) as e:
+            print(f"Error al registrar asistencia: {e}")
+            return False
         except Error as e:
             print(f"Error al registrar asistencia: {e}")
             if self.connection:
@@ -75,6 +86,215 @@ class AsistenciaManager:
         finally:
             self.desconectar()
     
+    def registrar_asistencia_lote(self, registros: List[Dict],
+                                  tamano_bloque: int = TAMANO_BLOQUE_ASISTENCIA) -> List[Dict]:
+        """
+        Registrar asistencia de muchos alumnos, cursos y días a la vez
+        (por ejemplo, un preceptor que carga la semana completa)
+        
+        Las filas se envían en sentencias INSERT multi-fila de hasta
+        tamano_bloque filas, con un commit por bloque. Si la base rechaza un
+        bloque, ese bloque se reintenta fila por fila para aislar las que fallan.
+        
+        Args:
+            registros: Lista de dict con alumno_id, fecha (date o 'AAAA-MM-DD'),
+                estado, observaciones (opcional) y registrado_por (opcional)
+            tamano_bloque: Filas por sentencia y por transacción
+        
+        Returns:
+            List[Dict]: Un resultado por registro, en el mismo orden, con
+            alumno_id, fecha, estado, exito (bool) y error (str o None)
+        """
+        resultados = []
+        filas = []
+        for registro in registros:
+            resultado = {
+                'alumno_id': registro.get('alumno_id'),
+                'fecha': registro.get('fecha'),
+                'estado': registro.get('estado'),
+                'exito': False,
+                'error': None
+            }
+            resultados.append(resultado)
+            
+            try:
+                fecha = _como_fecha(resultado['fecha'])
+            except (TypeError, ValueError):
+                resultado['error'] = "Fecha inválida"
+                continue
+            try:
+                resultado['alumno_id'] = int(resultado['alumno_id'])
+            except (TypeError, ValueError):
+                resultado['error'] = "alumno_id inválido"
+                continue
+            if resultado['estado'] not in ESTADOS_ASISTENCIA:
+                resultado['error'] = f"Estado inválido: {resultado['estado']}"
+                continue
+            
+            resultado['fecha'] = fecha
+            filas.append((resultado, (resultado['alumno_id'], fecha, resultado['estado'],
+                                      registro.get('observaciones', '') or '',
+                                      registro.get('registrado_por', 1))))
+        
+        if not filas:
+            return resultados
+        
+        tamano_bloque = max(1, tamano_bloque)
+        try:
+            if not self.conectar():
+                for resultado, _ in filas:
+                    resultado['error'] = "Sin conexión a la base de datos"
+                return resultados
+            
+            con_resumen = self._resumen_disponible()
+            cursor = self.connection.cursor()
+            for inicio in range(0, len(filas), tamano_bloque):
+                bloque = filas[inicio:inicio + tamano_bloque]
+                try:
+                    self._guardar_filas(cursor, [valores for _, valores in bloque], con_resumen)
+                    guardadas = bloque
+                except Error:
+                    # Alguna fila es rechazada (alumno inexistente, etc.):
+                    # se reintenta el bloque fila por fila con savepoints
+                    self.connection.rollback()
+                    guardadas = []
+                    for resultado, valores in bloque:
+                        cursor.execute("SAVEPOINT fila_asistencia")
+                        try:
+                            self._guardar_filas(cursor, [valores], con_resumen)
+                            guardadas.append((resultado, valores))
+                        except Error as e:
+                            cursor.execute("ROLLBACK TO SAVEPOINT fila_asistencia")
+                            resultado['error'] = str(e)
+                
+                self.connection.commit()
+                for resultado, _ in guardadas:
+                    resultado['exito'] = True
+            
+            cursor.close()
+            return resultados
+            
+        except Error as e:
+            print(f"Error al registrar asistencia en lote: {e}")
+            if self.connection:
+                self.connection.rollback()
+            # Los bloques ya confirmados conservan exito = True
+            for resultado, _ in filas:
+                if not resultado['exito']:
+                    resultado['error'] = resultado['error'] or str(e)
+            return resultados
+        finally:
+            self.desconectar()
+    
+    def _resumen_disponible(self) -> bool:
+        """
+        True si la base tiene las tablas de resumen de asistencia
+        
+        Si el esquema no se puede inspeccionar se lanza Error: guardar sin
+        actualizar los resúmenes los dejaría desfasados sin aviso.
+        """
+        capacidades = obtener_capacidades()
+        if not capacidades.cargar():
+            raise Error(msg="No se pudo inspeccionar el esquema para actualizar el resumen de asistencia")
+        return capacidades.tiene_tabla('asistencia_resumen_mensual')
+    
+    def _guardar_filas(self, cursor, filas: List[Tuple], con_resumen: bool):
+        """Actualizar el resumen (si existe) y guardar las filas, dentro de la transacción en curso"""
+        if con_resumen:
+            self._actualizar_resumen(cursor, filas)
+        self._insertar_filas(cursor, filas)
+    
+    def _actualizar_resumen(self, cursor, filas: List[Tuple]):
+        """
+        Sumar a los resúmenes mensual y por período la diferencia que producen
+        las filas a guardar. Debe llamarse antes de insertarlas: lee (y
+        bloquea) el estado anterior de cada (alumno, fecha) para restar lo que
+        una modificación reemplaza.
+        """
+        claves = list({(fila[0], fila[1]) for fila in filas})
+        marcadores = ", ".join(["(%s, %s)"] * len(claves))
+        cursor.execute(f"""
+            SELECT alumno_id, fecha, estado
+            FROM asistencia_diaria
+            WHERE (alumno_id, fecha) IN ({marcadores})
+            FOR UPDATE
+        """, tuple(valor for clave in claves for valor in clave))
+        estados = {(alumno_id, fecha): estado for alumno_id, fecha, estado in cursor.fetchall()}
+        
+        periodos = self._obtener_periodos(cursor, {fila[1] for fila in filas})
+        
+        mensual = {}
+        por_periodo = {}
+        for alumno_id, fecha, estado, *_ in filas:
+            anterior = estados.get((alumno_id, fecha))
+            if anterior == estado or estado not in INDICE_ESTADO:
+                continue  # Sin cambios, o estado inválido que la base va a rechazar
+            delta = [0] * len(COLUMNAS_RESUMEN)
+            if anterior in INDICE_ESTADO:
+                delta[INDICE_ESTADO[anterior]] -= 1
+            else:
+                delta[-1] += 1  # Día nuevo para el alumno
+            delta[INDICE_ESTADO[estado]] += 1
+            estados[(alumno_id, fecha)] = estado  # Filas repetidas en el mismo lote
+            
+            claves_delta = [(mensual, (alumno_id, fecha.year, fecha.month))]
+            claves_delta.extend((por_periodo, (alumno_id, periodo_id))
+                                for periodo_id, inicio, fin in periodos if inicio <= fecha <= fin)
+            for acumulado, clave in claves_delta:
+                actual = acumulado.setdefault(clave, [0] * len(COLUMNAS_RESUMEN))
+                for i, valor in enumerate(delta):
+                    actual[i] += valor
+        
+        self._sumar_resumen(cursor, 'asistencia_resumen_mensual', ('alumno_id', 'anio', 'mes'), mensual)
+        self._sumar_resumen(cursor, 'asistencia_resumen_periodo', ('alumno_id', 'periodo_id'), por_periodo)
+    
+    def _obtener_periodos(self, cursor, fechas) -> List[Tuple]:
+        """
+        Rangos de los períodos, desde la caché de datos de referencia
+        
+        Se vuelven a leer si alguna de las fechas no cae en ningún período
+        guardado (por ejemplo, un período cargado después).
+        """
+        def leer():
+            cursor.execute("SELECT id, fecha_inicio, fecha_fin FROM periodos_evaluacion")
+            return cursor.fetchall()
+        
+        ttl = TTL_CACHE['periodos']
+        periodos = cache_referencia.obtener(CLAVE_RANGOS_PERIODOS, leer, ttl=ttl)
+        if all(any(inicio <= fecha <= fin for _, inicio, fin in periodos) for fecha in fechas):
+            return periodos
+        cache_referencia.invalidar(CLAVE_RANGOS_PERIODOS)
+        return cache_referencia.obtener(CLAVE_RANGOS_PERIODOS, leer, ttl=ttl)
+    
+    def _sumar_resumen(self, cursor, tabla: str, columnas_clave: Tuple, deltas: Dict):
+        """Sumar los deltas a una tabla de resumen con un INSERT multi-fila"""
+        if not deltas:
+            return
+        columnas = columnas_clave + COLUMNAS_RESUMEN
+        marcador = "(" + ", ".join(["%s"] * len(columnas)) + ")"
+        actualizaciones = ",\n            ".join(f"{col} = {col} + VALUES({col})" for col in COLUMNAS_RESUMEN)
+        cursor.execute(f"""
+            INSERT INTO {tabla} ({", ".join(columnas)})
+            VALUES {", ".join([marcador] * len(deltas))}
+            ON DUPLICATE KEY UPDATE
+            {actualizaciones}
+        """, tuple(valor for clave, delta in deltas.items() for valor in clave + tuple(delta)))
+    
+    def _insertar_filas(self, cursor, filas: List[Tuple]):
+        """Insertar o actualizar filas (alumno_id, fecha, estado, observaciones, registrado_por)
+        con una sola sentencia INSERT multi-fila"""
+        marcadores = ", ".join(["(%s, %s, %s, %s, %s)"] * len(filas))
+        query = f"""
+            INSERT INTO asistencia_diaria 
+            (alumno_id, fecha, estado, observaciones, registrado_por)
+            VALUES {marcadores}
+            ON DUPLICATE KEY UPDATE
+            estado = VALUES(estado),
+            observaciones = VALUES(observaciones),
+            fecha_modificacion = CURRENT_TIMESTAMP
+        """
+        cursor.execute(query, tuple(valor for fila in filas for valor in fila))
+    
     def obtener_asistencia_alumno(self, alumno_id: int, fecha_inicio: date = None, 
                                  fecha_fin: date = None) -> List[Dict]:
         """Obtener historial de asistencia de un alumno"""
@@ -197,4 +417,175 @@ class AsistenciaManager:
             print(f"Error al obtener alumnos con inasistencias reiteradas: {e}")
             return []
         finally:
-            self.desconectar()
\ No newline at end of file
+            self.desconectar()
+    
+    # ==================== RESUMEN DE ASISTENCIA ====================
+    
+    def obtener_resumen_periodo_alumno(self, alumno_id: int, periodo_id: int) -> Dict:
+        """Conteos y porcentaje de asistencia de un alumno en un período, desde el resumen"""
+        try:
+            if not self.conectar():
+                return {}
+            
+            cursor = self.connection.cursor(dictionary=True)
+            query = """
+                SELECT 
+                    alumno_id, periodo_id, presentes, ausentes, tardes, justificados,
+                    total_registros,
+                    ROUND(presentes * 100.0 / NULLIF(total_registros, 0), 2) as porcentaje_asistencia
+                FROM asistencia_resumen_periodo
+                WHERE alumno_id = %s AND periodo_id = %s
+            """
+            cursor.execute(query, (alumno_id, periodo_id))
+            resumen = cursor.fetchone()
+            cursor.close()
+            return resumen or {}
+            
+        except Error as e:
+            print(f"Error al obtener resumen de asistencia del alumno: {e}")
+            return {}
+        finally:
+            self.desconectar()
+    
+    def obtener_resumen_mensual_alumno(self, alumno_id: int, anio: int = None) -> List[Dict]:
+        """Conteos y porcentaje de asistencia de un alumno mes a mes, desde el resumen"""
+        try:
+            if not self.conectar():
+                return []
+            
+            cursor = self.connection.cursor(dictionary=True)
+            query = """
+                SELECT 
+                    alumno_id, anio, mes, presentes, ausentes, tardes, justificados,
+                    total_registros,
+                    ROUND(presentes * 100.0 / NULLIF(total_registros, 0), 2) as porcentaje_asistencia
+                FROM asistencia_resumen_mensual
+                WHERE alumno_id = %s AND (%s IS NULL OR anio = %s)
+                ORDER BY anio, mes
+            """
+            cursor.execute(query, (alumno_id, anio, anio))
+            resumen = cursor.fetchall()
+            cursor.close()
+            return resumen
+            
+        except Error as e:
+            print(f"Error al obtener resumen mensual de asistencia: {e}")
+            return []
+        finally:
+            self.desconectar()
+    
+    def obtener_porcentajes_asistencia(self, periodo_id: int, curso: str = None,
+                                       division: str = None) -> List[Dict]:
+        """Porcentaje de asistencia en el período de cada alumno activo (opcionalmente de un curso)"""
+        try:
+            if not self.conectar():
+                return []
+            
+            cursor = self.connection.cursor(dictionary=True)
+            query = """
+                SELECT 
+                    a.id as alumno_id,
+                    CONCAT(a.apellido, ', ', a.nombre) as alumno,
+                    a.curso,
+                    a.division,
+                    r.presentes, r.ausentes, r.tardes, r.justificados, r.total_registros,
+                    ROUND(r.presentes * 100.0 / NULLIF(r.total_registros, 0), 2) as porcentaje_asistencia
+                FROM asistencia_resumen_periodo r
+                JOIN alumnos a ON r.alumno_id = a.id
+                WHERE r.periodo_id = %s AND a.activo = TRUE
+                AND (%s IS NULL OR a.curso = %s)
+                AND (%s IS NULL OR a.division = %s)
+                ORDER BY a.curso, a.division, a.apellido, a.nombre
+            """
+            cursor.execute(query, (periodo_id, curso, curso, division, division))
+            porcentajes = cursor.fetchall()
+            cursor.close()
+            return porcentajes
+            
+        except Error as e:
+            print(f"Error al obtener porcentajes de asistencia: {e}")
+            return []
+        finally:
+            self.desconectar()
+    
+    def obtener_alumnos_bajo_umbral_asistencia(self, periodo_id: int, umbral: float = 80.0,
+                                               curso: str = None, division: str = None) -> List[Dict]:
+        """Alumnos cuyo porcentaje de asistencia en el período es menor al umbral"""
+        return [alumno for alumno in self.obtener_porcentajes_asistencia(periodo_id, curso, division)
+                if alumno['porcentaje_asistencia'] is not None
+                and float(alumno['porcentaje_asistencia']) < umbral]
+    
+    def reconstruir_resumen_asistencia(self, alumno_ids: List[int] = None,
+                                       tamano_bloque: int = 500) -> bool:
+        """
+        Recalcular los resúmenes desde asistencia_diaria (por ejemplo, después de
+        modificaciones hechas fuera de la aplicación). Procesa los alumnos en
+        bloques, con un commit por bloque.
+        
+        Args:
+            alumno_ids: Alumnos a reconstruir; None para todos
+            tamano_bloque: Alumnos por transacción
+        """
+        try:
+            if not self.conectar():
+                return False
+            
+            cursor = self.connection.cursor()
+            if alumno_ids is None:
+                cursor.execute("SELECT DISTINCT alumno_id FROM asistencia_diaria ORDER BY alumno_id")
+                alumno_ids = [fila[0] for fila in cursor.fetchall()]
+            
+            for inicio in range(0, len(alumno_ids), tamano_bloque):
+                bloque = tuple(alumno_ids[inicio:inicio + tamano_bloque])
+                marcadores = ", ".join(["%s"] * len(bloque))
+                
+                cursor.execute(f"DELETE FROM asistencia_resumen_mensual WHERE alumno_id IN ({marcadores})", bloque)
+                cursor.execute(f"DELETE FROM asistencia_resumen_periodo WHERE alumno_id IN ({marcadores})", bloque)
+                cursor.execute(f"""
+                    INSERT INTO asistencia_resumen_mensual
+                    (alumno_id, anio, mes, presentes, ausentes, tardes, justificados, total_registros)
+                    SELECT 
+                        alumno_id, YEAR(fecha), MONTH(fecha),
+                        SUM(estado = 'Presente'), SUM(estado = 'Ausente'),
+                        SUM(estado = 'Tarde'), SUM(estado = 'Justificado'),
+                        COUNT(*)
+                    FROM asistencia_diaria
+                    WHERE alumno_id IN ({marcadores})
+                    GROUP BY alumno_id, YEAR(fecha), MONTH(fecha)
+                """, bloque)
+                cursor.execute(f"""
+                    INSERT INTO asistencia_resumen_periodo
+                    (alumno_id, periodo_id, presentes, ausentes, tardes, justificados, total_registros)
+                    SELECT 
+                        ad.alumno_id, p.id,
+                        SUM(ad.estado = 'Presente'), SUM(ad.estado = 'Ausente'),
+                        SUM(ad.estado = 'Tarde'), SUM(ad.estado = 'Justificado'),
+                        COUNT(*)
+                    FROM asistencia_diaria ad
+                    JOIN periodos_evaluacion p ON ad.fecha BETWEEN p.fecha_inicio AND p.fecha_fin
+                    WHERE ad.alumno_id IN ({marcadores})
+                    GROUP BY ad.alumno_id, p.id
+                """, bloque)
+                self.connection.commit()
+            
+            cursor.close()
+            return True
+            
+        except Error as e:
+            print(f"Error al reconstruir resumen de asistencia: {e}")
+            if self.connection:
+                self.connection.rollback()
+            return False
+        finally:
+            self.desconectar()
+
+
+def _como_fecha(valor) -> date:
+    """Normalizar una fecha (date, datetime o 'AAAA-MM-DD') a date"""
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    if isinstance(valor, str):
+        return date.fromisoformat(valor)
+    raise TypeError(f"Fecha inválida: {valor!r}")
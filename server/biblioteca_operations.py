@@ -8,6 +8,7 @@ from mysql.connector import Error
 from datetime import datetime, date, timedelta
 from typing import List, Dict, Optional
 from .database import crear_conexion
+from .pagination import consultar_pagina, pagina_vacia, TAMANO_PAGINA_DEFECTO
 
 class BibliotecaManager:
     """Gestor de operaciones de biblioteca en la base de datos"""
@@ -80,6 +81,52 @@ class BibliotecaManager:
         finally:
             self.desconectar()
     
+    def obtener_libros_disponibles_pagina(self, categoria: str = None, cursor: str = None,
+                                          tamano_pagina: int = TAMANO_PAGINA_DEFECTO) -> Dict:
+        """
+        Obtener una página del catálogo, en el mismo orden que obtener_libros_disponibles
+        
+        Returns:
+            Dict: filas, siguiente_cursor, hay_mas y tamano_pagina
+        """
+        try:
+            if not self.conectar():
+                return pagina_vacia(tamano_pagina)
+            
+            consulta = """
+                SELECT 
+                    l.id,
+                    l.titulo,
+                    l.autor,
+                    l.isbn,
+                    l.categoria,
+                    l.editorial,
+                    l.año_publicacion,
+                    l.cantidad_total,
+                    l.cantidad_disponible,
+                    l.ubicacion
+                FROM libros l
+                WHERE l.activo = TRUE {filtro}{filtro_cursor}
+            """
+            if categoria:
+                consulta = consulta.replace("{filtro}", "AND l.categoria = %s ")
+                parametros = (categoria,)
+                orden = [("l.titulo", "titulo", "ASC"), ("l.id", "id", "ASC")]
+            else:
+                consulta = consulta.replace("{filtro}", "")
+                parametros = ()
+                orden = [("l.categoria", "categoria", "ASC"), ("l.titulo", "titulo", "ASC"),
+                         ("l.id", "id", "ASC")]
+            
+            return consultar_pagina(self.connection, consulta, parametros, orden,
+                                    cursor, tamano_pagina)
+            
+        except (Error, ValueError) as e:
+            print(f"Error al obtener página de libros: {e}")
+            return pagina_vacia(tamano_pagina)
+        finally:
+            self.desconectar()
+    
     def registrar_prestamo(self, libro_id: int, alumno_id: int, docente_id: int,
                           fecha_prestamo: date = None, dias_prestamo: int = 7) -> bool:
         """Registrar un préstamo de libro"""
@@ -186,6 +233,53 @@ class BibliotecaManager:
         finally:
             self.desconectar()
     
+    def obtener_prestamos_activos_pagina(self, alumno_id: int = None, cursor: str = None,
+                                         tamano_pagina: int = TAMANO_PAGINA_DEFECTO) -> Dict:
+        """
+        Obtener una página de préstamos activos, ordenados por vencimiento
+        
+        Returns:
+            Dict: filas, siguiente_cursor, hay_mas y tamano_pagina
+        """
+        try:
+            if not self.conectar():
+                return pagina_vacia(tamano_pagina)
+            
+            consulta = """
+                SELECT 
+                    p.id,
+                    l.titulo,
+                    l.autor,
+                    CONCAT(a.apellido, ', ', a.nombre) as alumno,
+                    a.curso,
+                    a.division,
+                    p.fecha_prestamo,
+                    p.fecha_devolucion_esperada,
+                    DATEDIFF(p.fecha_devolucion_esperada, CURDATE()) as dias_restantes,
+                    p.estado
+                FROM prestamos_biblioteca p
+                JOIN libros l ON p.libro_id = l.id
+                JOIN alumnos a ON p.alumno_id = a.id
+                WHERE p.estado = 'Activo' {filtro}{filtro_cursor}
+            """
+            if alumno_id:
+                consulta = consulta.replace("{filtro}", "AND p.alumno_id = %s ")
+                parametros = (alumno_id,)
+            else:
+                consulta = consulta.replace("{filtro}", "")
+                parametros = ()
+            
+            orden = [("p.fecha_devolucion_esperada", "fecha_devolucion_esperada", "ASC"),
+                     ("p.id", "id", "ASC")]
+            return consultar_pagina(self.connection, consulta, parametros, orden,
+                                    cursor, tamano_pagina)
+            
+        except (Error, ValueError) as e:
+            print(f"Error al obtener página de préstamos activos: {e}")
+            return pagina_vacia(tamano_pagina)
+        finally:
+            self.desconectar()
+    
     def devolver_libro(self, prestamo_id: int, fecha_devolucion: date = None, 
                       observaciones: str = "") -> bool:
         """Registrar devolución de un libro"""
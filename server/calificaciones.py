@@ -26,6 +26,3 @@ __all__ = [
     'EstadisticasOperations',
     'ReportesOperations'
 ]
-
-# Mensaje informativo
-print("✅ Módulo de calificaciones cargado correctamente")
\ No newline at end of file
@@ -9,6 +9,10 @@ from .evaluaciones import EvaluacionesOperations
 from .promedios import PromediosOperations
 from .estadisticas import EstadisticasOperations
 from .reportes import ReportesOperations
+from .riesgo import RiesgoOperations
+from .ranking import RankingOperations
+from .tendencias import TendenciasOperations
+from .reporte_datos import DatosReporteCurso
 
 __all__ = [
     'CalificacionesManager',
@@ -17,5 +21,9 @@ __all__ = [
     'EvaluacionesOperations',
     'PromediosOperations',
     'EstadisticasOperations',
-    'ReportesOperations'
+    'ReportesOperations',
+    'RiesgoOperations',
+    'RankingOperations',
+    'TendenciasOperations',
+    'DatosReporteCurso'
 ]
\ No newline at end of file
@@ -7,6 +7,22 @@ import mysql.connector
 from mysql.connector import Error
 from typing import List, Dict, Optional
 from ..database import crear_conexion
+from ..sentencias import registrar_sentencia
+
+# Sentencias preparadas una vez por conexión (ver server/sentencias.py)
+ALUMNOS_CURSO = registrar_sentencia('alumnos.curso', """
+    SELECT id, nombre, apellido, dni, curso, division, fecha_nacimiento
+    FROM alumnos 
+    WHERE curso = %s AND division = %s AND activo = TRUE
+    ORDER BY apellido, nombre
+""", "Alumnos activos de un curso y división")
+
+ALUMNO_POR_ID = registrar_sentencia('alumnos.por_id', """
+    SELECT a.*, CONCAT(u.nombre_usuario) as padre_nombre
+    FROM alumnos a
+    LEFT JOIN usuarios u ON a.padre_id = u.id
+    WHERE a.id = %s AND a.activo = TRUE
+""", "Ficha de un alumno activo con el usuario del padre")
 
 class AlumnosOperations:
     """Operaciones especializadas para gestión de alumnos"""
@@ -30,17 +46,7 @@ class AlumnosOperations:
             if not self.conectar():
                 return []
             
-            cursor = self.connection.cursor(dictionary=True)
-            query = """
-                SELECT id, nombre, apellido, dni, curso, division, fecha_nacimiento
-                FROM alumnos 
-                WHERE curso = %s AND division = %s AND activo = TRUE
-                ORDER BY apellido, nombre
-            """
-            cursor.execute(query, (curso, division))
-            alumnos = cursor.fetchall()
-            cursor.close()
-            return alumnos
+            return self.connection.ejecutar_sentencia(ALUMNOS_CURSO, (curso, division))
             
         except Error as e:
             print(f"Error al obtener alumnos: {e}")
@@ -54,17 +60,8 @@ class AlumnosOperations:
             if not self.conectar():
                 return None
             
-            cursor = self.connection.cursor(dictionary=True)
-            query = """
-                SELECT a.*, CONCAT(u.nombre_usuario) as padre_nombre
-                FROM alumnos a
-                LEFT JOIN usuarios u ON a.padre_id = u.id
-                WHERE a.id = %s AND a.activo = TRUE
-            """
-            cursor.execute(query, (alumno_id,))
-            alumno = cursor.fetchone()
-            cursor.close()
-            return alumno
+            alumnos = self.connection.ejecutar_sentencia(ALUMNO_POR_ID, (alumno_id,))
+            return alumnos[0] if alumnos else None
             
         except Error as e:
             print(f"Error al obtener alumno: {e}")
@@ -0,0 +1,92 @@
+"""
+Caché de datos de referencia para el Sistema de Calificaciones
+GESJ - Plataforma de Gestión Educativa
+
+Períodos, tipos de evaluación y materias cambian pocas veces al año pero se
+consultan cada vez que se abre una ventana o se refresca un combo. Esta
+caché de lectura los conserva en memoria con un vencimiento por clave y un
+tamaño máximo (se descartan primero las claves menos usadas).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+class ReferenceCache:
+    """Caché de lectura con vencimiento por clave, tamaño acotado (LRU) e invalidación"""
+
+    def __init__(self, tamano_maximo: int = 256, ttl_defecto: float = 300.0):
+        self.tamano_maximo = tamano_maximo
+        self.ttl_defecto = ttl_defecto
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()  # clave -> (valor, vence)
+        self._estadisticas = {'hits': 0, 'misses': 0, 'vencidas': 0, 'descartadas': 0,
+                              'invalidadas': 0}
+
+    def obtener(self, clave: Hashable, cargar: Callable[[], Any], ttl: float = None,
+                guardar_vacio: bool = False) -> Any:
+        """
+        Devolver el valor de la clave, cargándolo con cargar() si no está o venció
+
+        Args:
+            clave: Clave de la entrada; las tuplas permiten invalidar por prefijo
+            cargar: Función que consulta la base cuando hace falta
+            ttl: Segundos de validez; por defecto ttl_defecto
+            guardar_vacio: Si es False, un resultado vacío no se guarda (las
+                operaciones devuelven [] también ante errores de conexión)
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                valor, vence = entrada
+                if vence > ahora:
+                    self._entradas.move_to_end(clave)
+                    self._estadisticas['hits'] += 1
+                    return valor
+                del self._entradas[clave]
+                self._estadisticas['vencidas'] += 1
+            self._estadisticas['misses'] += 1
+
+        valor = cargar()
+        if not valor and not guardar_vacio:
+            return valor
+
+        with self._lock:
+            self._entradas[clave] = (valor, time.monotonic() + (ttl or self.ttl_defecto))
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.tamano_maximo:
+                self._entradas.popitem(last=False)
+                self._estadisticas['descartadas'] += 1
+        return valor
+
+    def invalidar(self, clave: Hashable):
+        """Invalidar una clave exacta o, si es una tupla, todas las que empiezan con ella"""
+        with self._lock:
+            if isinstance(clave, tuple):
+                largo = len(clave)
+                afectadas = [c for c in self._entradas
+                             if isinstance(c, tuple) and c[:largo] == clave]
+            else:
+                afectadas = [clave] if clave in self._entradas else []
+            for c in afectadas:
+                del self._entradas[c]
+            self._estadisticas['invalidadas'] += len(afectadas)
+
+    def limpiar(self):
+        """Vaciar toda la caché"""
+        with self._lock:
+            self._estadisticas['invalidadas'] += len(self._entradas)
+            self._entradas.clear()
+
+    def obtener_estadisticas(self) -> Dict:
+        """Contadores de uso y tasa de aciertos"""
+        with self._lock:
+            estadisticas = dict(self._estadisticas)
+            estadisticas['entradas'] = len(self._entradas)
+            estadisticas['tamano_maximo'] = self.tamano_maximo
+        total = estadisticas['hits'] + estadisticas['misses']
+        estadisticas['tasa_hits'] = round(estadisticas['hits'] / total, 4) if total else 0.0
+        return estadisticas
@@ -7,6 +7,35 @@ import mysql.connector
 from mysql.connector import Error
 from typing import List, Dict, Optional
 from ..database import crear_conexion
+from ..sentencias import registrar_sentencia
+
+# Sentencias preparadas una vez por conexión (ver server/sentencias.py)
+ESTADISTICAS_CURSO = registrar_sentencia('estadisticas.curso', """
+    SELECT 
+        COUNT(DISTINCT a.id) as total_alumnos,
+        COUNT(DISTINCT m.id) as total_materias,
+        ROUND(AVG(c.nota), 2) as promedio_curso,
+        COUNT(c.id) as total_calificaciones
+    FROM alumnos a
+    JOIN calificaciones c ON a.id = c.alumno_id
+    JOIN materias m ON c.materia_id = m.id
+    WHERE a.curso = %s AND a.division = %s AND c.periodo_id = %s
+""", "Totales y promedio general de un curso en un período")
+
+ALUMNOS_EN_RIESGO = registrar_sentencia('estadisticas.alumnos_en_riesgo', """
+    SELECT 
+        a.id,
+        CONCAT(a.apellido, ', ', a.nombre) as alumno,
+        a.curso, a.division,
+        ROUND(AVG(pa.promedio), 2) as promedio_general,
+        COUNT(pa.materia_id) as materias_cursadas
+    FROM alumnos a
+    JOIN promedios_alumnos pa ON a.id = pa.alumno_id
+    WHERE pa.periodo_id = %s AND a.activo = TRUE
+    GROUP BY a.id
+    HAVING promedio_general < %s
+    ORDER BY promedio_general ASC
+""", "Alumnos con promedio general por debajo del mínimo en un período")
 
 class EstadisticasOperations:
     """Operaciones especializadas para estadísticas académicas"""
@@ -30,23 +59,8 @@ class EstadisticasOperations:
             if not self.conectar():
                 return {}
             
-            cursor = self.connection.cursor(dictionary=True)
-            query = """
-                SELECT 
-                    COUNT(DISTINCT a.id) as total_alumnos,
-                    COUNT(DISTINCT m.id) as total_materias,
-                    ROUND(AVG(c.nota), 2) as promedio_curso,
-                    COUNT(c.id) as total_calificaciones
-                FROM alumnos a
-                JOIN calificaciones c ON a.id = c.alumno_id
-                JOIN materias m ON c.materia_id = m.id
-                WHERE a.curso = %s AND a.division = %s AND c.periodo_id = %s
-            """
-            cursor.execute(query, (curso, division, periodo_id))
-            estadisticas = cursor.fetchone()
-            cursor.close()
-            
-            return estadisticas or {}
+            filas = self.connection.ejecutar_sentencia(ESTADISTICAS_CURSO, (curso, division, periodo_id))
+            return filas[0] if filas else {}
             
         except Error as e:
             print(f"Error al obtener estadísticas del curso: {e}")
@@ -60,25 +74,7 @@ class EstadisticasOperations:
             if not self.conectar():
                 return []
             
-            cursor = self.connection.cursor(dictionary=True)
-            query = """
-                SELECT 
-                    a.id,
-                    CONCAT(a.apellido, ', ', a.nombre) as alumno,
-                    a.curso, a.division,
-                    ROUND(AVG(pa.promedio), 2) as promedio_general,
-                    COUNT(pa.materia_id) as materias_cursadas
-                FROM alumnos a
-                JOIN promedios_alumnos pa ON a.id = pa.alumno_id
-                WHERE pa.periodo_id = %s AND a.activo = TRUE
-                GROUP BY a.id
-                HAVING promedio_general < %s
-                ORDER BY promedio_general ASC
-            """
-            cursor.execute(query, (periodo_id, promedio_minimo))
-            alumnos_riesgo = cursor.fetchall()
-            cursor.close()
-            return alumnos_riesgo
+            return self.connection.ejecutar_sentencia(ALUMNOS_EN_RIESGO, (periodo_id, promedio_minimo))
             
         except Error as e:
             print(f"Error al obtener alumnos en riesgo: {e}")
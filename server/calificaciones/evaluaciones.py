@@ -6,8 +6,57 @@ GESJ - Plataforma de Gestión Educativa
 import mysql.connector
 from mysql.connector import Error
 from datetime import datetime, date
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
 from ..database import crear_conexion
+from ..sentencias import obtener_registro_sentencias, registrar_sentencia
+
+# Columnas y joins comunes a los listados de calificaciones
+_SELECT_CALIFICACIONES = """
+    SELECT 
+        c.id, c.alumno_id, c.materia_id, c.periodo_id, c.tipo_evaluacion_id,
+        CONCAT(a.apellido, ', ', a.nombre) AS alumno,
+        a.curso, a.division,
+        m.nombre AS materia, m.codigo AS codigo_materia,
+        u.nombre_usuario AS docente,
+        p.nombre AS periodo,
+        te.nombre AS tipo_evaluacion,
+        c.nota, c.fecha_evaluacion, c.observaciones, c.fecha_registro
+    FROM calificaciones c
+    JOIN alumnos a ON c.alumno_id = a.id
+    JOIN materias m ON c.materia_id = m.id
+    JOIN usuarios u ON c.docente_id = u.id
+    JOIN periodos_evaluacion p ON c.periodo_id = p.id
+    JOIN tipos_evaluacion te ON c.tipo_evaluacion_id = te.id
+"""
+
+# Sentencias preparadas una vez por conexión (ver server/sentencias.py)
+CALIFICACIONES_ALUMNO_PERIODO = registrar_sentencia('calificaciones.alumno_periodo', _SELECT_CALIFICACIONES + """
+    WHERE c.alumno_id = %s AND c.periodo_id = %s 
+    AND a.activo = TRUE AND m.activa = TRUE
+    ORDER BY m.nombre, c.fecha_evaluacion
+""", "Calificaciones de un alumno en un período")
+
+CALIFICACIONES_ALUMNO = registrar_sentencia('calificaciones.alumno', _SELECT_CALIFICACIONES + """
+    WHERE c.alumno_id = %s AND a.activo = TRUE AND m.activa = TRUE
+    ORDER BY p.nombre, m.nombre, c.fecha_evaluacion
+""", "Calificaciones de un alumno en todos los períodos")
+
+CALIFICACIONES_MATERIA = registrar_sentencia('calificaciones.materia_periodo', _SELECT_CALIFICACIONES + """
+    WHERE c.materia_id = %s AND c.periodo_id = %s 
+    AND a.activo = TRUE AND m.activa = TRUE
+    ORDER BY a.apellido, a.nombre, te.nombre, c.fecha_evaluacion
+""", "Calificaciones de una materia en un período")
+
+GUARDAR_CALIFICACION = registrar_sentencia('calificaciones.guardar', """
+    INSERT INTO calificaciones 
+    (alumno_id, materia_id, docente_id, periodo_id, tipo_evaluacion_id, 
+     nota, fecha_evaluacion, observaciones)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+    nota = VALUES(nota),
+    observaciones = VALUES(observaciones),
+    fecha_modificacion = CURRENT_TIMESTAMP
+""", "Alta o reemplazo de una calificación")
 
 class EvaluacionesOperations:
     """Operaciones especializadas para gestión de evaluaciones"""
@@ -81,27 +130,30 @@ class EvaluacionesOperations:
             if not self.conectar():
                 return False
             
+            filas = self.connection.ejecutar_sentencia(
+                GUARDAR_CALIFICACION, (alumno_id, materia_id, docente_id, periodo_id,
+                                       tipo_evaluacion_id, nota, fecha_evaluacion, observaciones))
+            
+            # 1: fila nueva; 2: reemplazó una nota existente
+            nueva = filas == 1
+            
             cursor = self.connection.cursor()
-            query = """
-                INSERT INTO calificaciones 
-                (alumno_id, materia_id, docente_id, periodo_id, tipo_evaluacion_id, 
-                 nota, fecha_evaluacion, observaciones)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                nota = VALUES(nota),
-                observaciones = VALUES(observaciones),
-                fecha_modificacion = CURRENT_TIMESTAMP
-            """
-            cursor.execute(query, (alumno_id, materia_id, docente_id, periodo_id, 
-                                 tipo_evaluacion_id, nota, fecha_evaluacion, observaciones))
             
+            # Actualizar promedios automáticamente, en la misma transacción
+            from .promedios import PromediosOperations
+            PromediosOperations().recalcular_en_transaccion(
+                cursor, materia_id, periodo_id, [alumno_id], nueva
+            )
+            
+            from .tendencias import TendenciasOperations
+            version_tendencias = TendenciasOperations.version_carga()
             self.connection.commit()
             cursor.close()
             
-            # Actualizar promedios automáticamente
-            from .promedios import PromediosOperations
-            promedios_ops = PromediosOperations()
-            promedios_ops.actualizar_simple(alumno_id, materia_id, periodo_id)
+            from .ranking import RankingOperations
+            RankingOperations.marcar_modificados(materia_id, periodo_id, [alumno_id])
+            TendenciasOperations.registrar_notas(materia_id, periodo_id, fecha_evaluacion,
+                                                 [(alumno_id, nota)], nueva, version_tendencias)
             
             return True
             
@@ -113,60 +165,141 @@ class EvaluacionesOperations:
         finally:
             self.desconectar()
     
+    def registrar_calificaciones_lote(self, materia_id: int, docente_id: int, periodo_id: int,
+                                      tipo_evaluacion_id: int, fecha_evaluacion: date,
+                                      calificaciones: List[Dict]) -> List[Dict]:
+        """
+        Registrar las calificaciones de una planilla completa en una sola transacción
+        
+        Args:
+            materia_id, docente_id, periodo_id, tipo_evaluacion_id, fecha_evaluacion:
+                Datos comunes a toda la planilla
+            calificaciones: Lista de dict con alumno_id, nota y observaciones (opcional)
+        
+        Returns:
+            List[Dict]: Un resultado por fila, en el mismo orden, con alumno_id,
+            nota, observaciones, exito (bool) y error (str o None)
+        """
+        resultados = []
+        filas = []
+        for cal in calificaciones:
+            resultado = {
+                'alumno_id': cal.get('alumno_id'),
+                'nota': cal.get('nota'),
+                'observaciones': cal.get('observaciones', '') or '',
+                'exito': False,
+                'error': None
+            }
+            resultados.append(resultado)
+            
+            try:
+                nota = float(resultado['nota'])
+            except (TypeError, ValueError):
+                resultado['error'] = "Nota inválida"
+                continue
+            if nota < 1.0 or nota > 10.0:
+                resultado['error'] = "La nota debe estar entre 1.0 y 10.0"
+                continue
+            
+            resultado['nota'] = nota
+            filas.append((resultado, (resultado['alumno_id'], materia_id, docente_id, periodo_id,
+                                      tipo_evaluacion_id, nota, fecha_evaluacion,
+                                      resultado['observaciones'])))
+        
+        if not filas:
+            return resultados
+        
+        try:
+            if not self.conectar():
+                for resultado, _ in filas:
+                    resultado['error'] = "Sin conexión a la base de datos"
+                return resultados
+            
+            cursor = self.connection.cursor()
+            query = obtener_registro_sentencias().obtener(GUARDAR_CALIFICACION).sql
+            
+            try:
+                # rowcount del upsert suma 1 por alta, 2 por reemplazo y 0 por fila sin
+                # cambios, así que no distingue altas: se buscan antes las que ya existen
+                # (FOR UPDATE, para que nadie las inserte hasta el commit)
+                alumno_ids = [resultado['alumno_id'] for resultado, _ in filas]
+                cursor.execute(f"""
+                    SELECT alumno_id FROM calificaciones
+                    WHERE alumno_id IN ({', '.join(['%s'] * len(alumno_ids))})
+                    AND materia_id = %s AND periodo_id = %s
+                    AND tipo_evaluacion_id = %s AND fecha_evaluacion = %s
+                    FOR UPDATE
+                """, (*alumno_ids, materia_id, periodo_id, tipo_evaluacion_id, fecha_evaluacion))
+                existentes = cursor.fetchall()
+                nuevas = not existentes and len(set(alumno_ids)) == len(alumno_ids)
+                
+                cursor.executemany(query, [valores for _, valores in filas])
+                guardadas = filas
+            except Error:
+                # Alguna fila es rechazada por la base (alumno inexistente, etc.):
+                # se reintenta fila por fila con savepoints para aislar las que fallan
+                self.connection.rollback()
+                guardadas = []
+                nuevas = False
+                for resultado, valores in filas:
+                    cursor.execute("SAVEPOINT fila_calificacion")
+                    try:
+                        cursor.execute(query, valores)
+                        guardadas.append((resultado, valores))
+                    except Error as e:
+                        cursor.execute("ROLLBACK TO SAVEPOINT fila_calificacion")
+                        resultado['error'] = str(e)
+            
+            if guardadas:
+                # Recalcular los promedios afectados dentro de la misma transacción
+                from .promedios import PromediosOperations
+                PromediosOperations().recalcular_en_transaccion(
+                    cursor, materia_id, periodo_id,
+                    [resultado['alumno_id'] for resultado, _ in guardadas], nuevas
+                )
+            
+            from .tendencias import TendenciasOperations
+            version_tendencias = TendenciasOperations.version_carga()
+            self.connection.commit()
+            cursor.close()
+            
+            from .ranking import RankingOperations
+            RankingOperations.marcar_modificados(
+                materia_id, periodo_id, [resultado['alumno_id'] for resultado, _ in guardadas]
+            )
+            TendenciasOperations.registrar_notas(
+                materia_id, periodo_id, fecha_evaluacion,
+                [(resultado['alumno_id'], resultado['nota']) for resultado, _ in guardadas], nuevas,
+                version_tendencias
+            )
+            
+            for resultado, _ in guardadas:
+                resultado['exito'] = True
+            return resultados
+            
+        except Error as e:
+            print(f"Error al registrar calificaciones en lote: {e}")
+            if self.connection:
+                self.connection.rollback()
+            for resultado, _ in filas:
+                resultado['exito'] = False
+                resultado['error'] = resultado['error'] or str(e)
+            return resultados
+        finally:
+            self.desconectar()
+    
     def obtener_calificaciones_alumno(self, alumno_id: int, periodo_id: int = None) -> List[Dict]:
         """Obtener calificaciones de un alumno específico"""
         try:
             if not self.conectar():
                 return []
             
-            cursor = self.connection.cursor(dictionary=True)
-            
             if periodo_id:
-                query = """
-                    SELECT 
-                        c.id, c.alumno_id, c.materia_id, c.periodo_id, c.tipo_evaluacion_id,
-                        CONCAT(a.apellido, ', ', a.nombre) AS alumno,
-                        a.curso, a.division,
-                        m.nombre AS materia, m.codigo AS codigo_materia,
-                        u.nombre_usuario AS docente,
-                        p.nombre AS periodo,
-                        te.nombre AS tipo_evaluacion,
-                        c.nota, c.fecha_evaluacion, c.observaciones, c.fecha_registro
-                    FROM calificaciones c
-                    JOIN alumnos a ON c.alumno_id = a.id
-                    JOIN materias m ON c.materia_id = m.id
-                    JOIN usuarios u ON c.docente_id = u.id
-                    JOIN periodos_evaluacion p ON c.periodo_id = p.id
-                    JOIN tipos_evaluacion te ON c.tipo_evaluacion_id = te.id
-                    WHERE c.alumno_id = %s AND c.periodo_id = %s 
-                    AND a.activo = TRUE AND m.activa = TRUE
-                    ORDER BY m.nombre, c.fecha_evaluacion
-                """
-                cursor.execute(query, (alumno_id, periodo_id))
+                calificaciones = self.connection.ejecutar_sentencia(
+                    CALIFICACIONES_ALUMNO_PERIODO, (alumno_id, periodo_id))
             else:
-                query = """
-                    SELECT 
-                        c.id, c.alumno_id, c.materia_id, c.periodo_id, c.tipo_evaluacion_id,
-                        CONCAT(a.apellido, ', ', a.nombre) AS alumno,
-                        a.curso, a.division,
-                        m.nombre AS materia, m.codigo AS codigo_materia,
-                        u.nombre_usuario AS docente,
-                        p.nombre AS periodo,
-                        te.nombre AS tipo_evaluacion,
-                        c.nota, c.fecha_evaluacion, c.observaciones, c.fecha_registro
-                    FROM calificaciones c
-                    JOIN alumnos a ON c.alumno_id = a.id
-                    JOIN materias m ON c.materia_id = m.id
-                    JOIN usuarios u ON c.docente_id = u.id
-                    JOIN periodos_evaluacion p ON c.periodo_id = p.id
-                    JOIN tipos_evaluacion te ON c.tipo_evaluacion_id = te.id
-                    WHERE c.alumno_id = %s AND a.activo = TRUE AND m.activa = TRUE
-                    ORDER BY p.nombre, m.nombre, c.fecha_evaluacion
-                """
-                cursor.execute(query, (alumno_id,))
-            
-            calificaciones = cursor.fetchall()
-            cursor.close()
+                calificaciones = self.connection.ejecutar_sentencia(
+                    CALIFICACIONES_ALUMNO, (alumno_id,))
             return calificaciones
             
         except Error as e:
@@ -181,34 +314,55 @@ class EvaluacionesOperations:
             if not self.conectar():
                 return []
             
-            cursor = self.connection.cursor(dictionary=True)
-            query = """
+            return self.connection.ejecutar_sentencia(
+                CALIFICACIONES_MATERIA, (materia_id, periodo_id))
+            
+        except Error as e:
+            print(f"Error al obtener calificaciones de la materia: {e}")
+            return []
+        finally:
+            self.desconectar()
+    
+    def iterar_calificaciones_escuela(self, periodo_id: int = None,
+                                      tamano_lote: int = 1000) -> Iterator[Dict]:
+        """
+        Recorrer las calificaciones de toda la escuela sin cargarlas en memoria.
+        
+        El cursor no es buffered: las filas llegan del servidor en lotes de
+        tamano_lote a medida que se consumen. Vienen ordenadas por curso y
+        división (lo que necesita la exportación con una hoja por curso).
+        La conexión queda tomada hasta agotar o cerrar el generador.
+        """
+        connection = crear_conexion()
+        if not connection:
+            return
+        try:
+            cursor = connection.cursor(dictionary=True)
+            filtro = "AND c.periodo_id = %s" if periodo_id else ""
+            cursor.execute(f"""
                 SELECT 
-                    c.id, c.alumno_id, c.materia_id, c.periodo_id, c.tipo_evaluacion_id,
-                    CONCAT(a.apellido, ', ', a.nombre) AS alumno,
                     a.curso, a.division,
-                    m.nombre AS materia, m.codigo AS codigo_materia,
-                    u.nombre_usuario AS docente,
+                    CONCAT(a.apellido, ', ', a.nombre) AS alumno,
+                    m.nombre AS materia,
                     p.nombre AS periodo,
                     te.nombre AS tipo_evaluacion,
-                    c.nota, c.fecha_evaluacion, c.observaciones, c.fecha_registro
+                    c.nota, c.fecha_evaluacion, c.observaciones
                 FROM calificaciones c
                 JOIN alumnos a ON c.alumno_id = a.id
                 JOIN materias m ON c.materia_id = m.id
-                JOIN usuarios u ON c.docente_id = u.id
                 JOIN periodos_evaluacion p ON c.periodo_id = p.id
                 JOIN tipos_evaluacion te ON c.tipo_evaluacion_id = te.id
-                WHERE c.materia_id = %s AND c.periodo_id = %s 
-                AND a.activo = TRUE AND m.activa = TRUE
-                ORDER BY a.apellido, a.nombre, te.nombre, c.fecha_evaluacion
-            """
-            cursor.execute(query, (materia_id, periodo_id))
-            calificaciones = cursor.fetchall()
+                WHERE a.activo = TRUE {filtro}
+                ORDER BY a.curso, a.division, a.apellido, a.nombre, m.nombre, c.fecha_evaluacion
+            """, (periodo_id,) if periodo_id else ())
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                if not filas:
+                    break
+                yield from filas
             cursor.close()
-            return calificaciones
             
         except Error as e:
-            print(f"Error al obtener calificaciones de la materia: {e}")
-            return []
+            print(f"Error al recorrer calificaciones: {e}")
         finally:
-            self.desconectar()
\ No newline at end of file
+            connection.close()
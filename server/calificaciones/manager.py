@@ -9,17 +9,37 @@ from .evaluaciones import EvaluacionesOperations
 from .promedios import PromediosOperations
 from .estadisticas import EstadisticasOperations
 from .reportes import ReportesOperations
+from .riesgo import RiesgoOperations
+from .ranking import RankingOperations
+from .tendencias import TendenciasOperations
+from .cache import ReferenceCache
+from ..schema_cache import refrescar_capacidades
+
+# Vencimiento (segundos) de los datos de referencia en caché
+TTL_CACHE = {
+    'periodos': 600,
+    'tipos_evaluacion': 3600,
+    'materias_docente': 300,
+    'materias_curso': 300
+}
+
+# Caché compartida por todas las instancias del manager en el proceso
+cache_referencia = ReferenceCache(tamano_maximo=256)
 
 class CalificacionesManager:
     """Manager principal que coordina todas las operaciones de calificaciones"""
     
     def __init__(self):
+        self.cache = cache_referencia
         self.alumnos = AlumnosOperations()
         self.materias = MateriasOperations()
         self.evaluaciones = EvaluacionesOperations()
         self.promedios = PromediosOperations()
         self.estadisticas = EstadisticasOperations()
         self.reportes = ReportesOperations()
+        self.riesgo = RiesgoOperations()
+        self.ranking = RankingOperations()
+        self.tendencias = TendenciasOperations()
     
     # Delegación a módulos especializados
     def obtener_alumnos_por_curso(self, curso: str, division: str = 'A'):
@@ -29,16 +49,48 @@ class CalificacionesManager:
         return self.alumnos.obtener_por_id(alumno_id)
     
     def obtener_materias_por_docente(self, docente_id: int):
-        return self.materias.obtener_por_docente(docente_id)
+        return self._desde_cache(('materias_docente', docente_id),
+                                 lambda: self.materias.obtener_por_docente(docente_id))
     
     def obtener_materias_por_curso(self, curso: str, division: str = 'A'):
-        return self.materias.obtener_por_curso(curso, division)
+        return self._desde_cache(('materias_curso', curso, division),
+                                 lambda: self.materias.obtener_por_curso(curso, division))
     
     def obtener_periodos_activos(self):
-        return self.evaluaciones.obtener_periodos_activos()
+        return self._desde_cache(('periodos',), self.evaluaciones.obtener_periodos_activos)
     
     def obtener_tipos_evaluacion(self):
-        return self.evaluaciones.obtener_tipos_evaluacion()
+        return self._desde_cache(('tipos_evaluacion',), self.evaluaciones.obtener_tipos_evaluacion)
+    
+    # Caché de datos de referencia
+    def invalidar_periodos(self):
+        self.cache.invalidar(('periodos',))
+    
+    def invalidar_tipos_evaluacion(self):
+        self.cache.invalidar(('tipos_evaluacion',))
+    
+    def invalidar_materias(self, docente_id: int = None, curso: str = None, division: str = None):
+        """Invalidar materias de un docente y/o curso; sin argumentos, todas"""
+        if docente_id is None and curso is None:
+            self.cache.invalidar(('materias_docente',))
+            self.cache.invalidar(('materias_curso',))
+            return
+        if docente_id is not None:
+            self.cache.invalidar(('materias_docente', docente_id))
+        if curso is not None:
+            self.cache.invalidar(('materias_curso', curso) if division is None
+                                 else ('materias_curso', curso, division))
+    
+    def invalidar_cache(self):
+        self.cache.limpiar()
+    
+    def obtener_estadisticas_cache(self):
+        return self.cache.obtener_estadisticas()
+    
+    def _desde_cache(self, clave, cargar):
+        """Leer de la caché; se devuelven copias para que la UI no altere lo guardado"""
+        valor = self.cache.obtener(clave, cargar, ttl=TTL_CACHE.get(clave[0]))
+        return [dict(fila) for fila in valor] if valor else valor
     
     def registrar_calificacion(self, alumno_id: int, materia_id: int, docente_id: int, 
                              periodo_id: int, tipo_evaluacion_id: int, nota: float, 
@@ -48,35 +100,96 @@ class CalificacionesManager:
             tipo_evaluacion_id, nota, fecha_evaluacion, observaciones
         )
     
+    def registrar_calificaciones_lote(self, materia_id: int, docente_id: int, periodo_id: int,
+                                      tipo_evaluacion_id: int, fecha_evaluacion, calificaciones):
+        return self.evaluaciones.registrar_calificaciones_lote(
+            materia_id, docente_id, periodo_id, tipo_evaluacion_id,
+            fecha_evaluacion, calificaciones
+        )
+    
     def obtener_calificaciones_alumno(self, alumno_id: int, periodo_id: int = None):
         return self.evaluaciones.obtener_calificaciones_alumno(alumno_id, periodo_id)
     
     def obtener_calificaciones_materia(self, materia_id: int, periodo_id: int):
         return self.evaluaciones.obtener_calificaciones_materia(materia_id, periodo_id)
     
+    def iterar_calificaciones_escuela(self, periodo_id: int = None, tamano_lote: int = 1000):
+        return self.evaluaciones.iterar_calificaciones_escuela(periodo_id, tamano_lote)
+    
+    def iterar_promedios_escuela(self, periodo_id: int = None, tamano_lote: int = 1000):
+        return self.promedios.iterar_promedios_escuela(periodo_id, tamano_lote)
+    
     def obtener_promedios_alumno(self, alumno_id: int, periodo_id: int = None):
         return self.promedios.obtener_promedios_alumno(alumno_id, periodo_id)
     
+    def obtener_promedios_curso_materia(self, materia_id: int, periodo_id: int,
+                                        curso: str, division: str = 'A'):
+        return self.promedios.obtener_promedios_curso_materia(materia_id, periodo_id, curso, division)
+    
     def obtener_promedio_general_alumno(self, alumno_id: int, periodo_id: int):
         return self.promedios.obtener_promedio_general(alumno_id, periodo_id)
     
     def actualizar_promedios(self):
         return self.promedios.actualizar_todos()
     
+    def actualizar_promedios_pendientes(self):
+        return self.promedios.actualizar_pendientes()
+    
     def actualizar_promedios_simple(self, alumno_id: int, materia_id: int, periodo_id: int):
         return self.promedios.actualizar_simple(alumno_id, materia_id, periodo_id)
     
+    def refrescar_esquema(self):
+        """Volver a detectar tablas, procedimientos y funciones disponibles"""
+        self.cache.limpiar()
+        # Los datos pudieron regenerarse con los mismos ids: no servir rankings
+        # ni tendencias de antes hasta la próxima verificación
+        self.invalidar_ranking()
+        self.invalidar_tendencias()
+        return refrescar_capacidades()
+    
+    def cargar_datos_reporte_curso(self, curso: str, division: str, periodo_id: int):
+        return self.reportes.cargar_datos_curso(curso, division, periodo_id)
+    
     def obtener_estadisticas_curso(self, curso: str, division: str, periodo_id: int):
         return self.estadisticas.obtener_estadisticas_curso(curso, division, periodo_id)
     
     def obtener_alumnos_en_riesgo(self, periodo_id: int, promedio_minimo: float = 6.0):
         return self.estadisticas.obtener_alumnos_en_riesgo(periodo_id, promedio_minimo)
     
+    def evaluar_riesgo(self, periodo_id: int, nivel_minimo: str = 'MODERADO'):
+        return self.riesgo.evaluar(periodo_id, nivel_minimo=nivel_minimo)
+    
+    def reevaluar_riesgo(self, alumno_ids=None, nivel_minimo: str = 'MODERADO'):
+        return self.riesgo.reevaluar(alumno_ids, nivel_minimo)
+    
     def obtener_ranking_alumnos_por_promedio(self, materia_id: int, periodo_id: int):
-        return self.estadisticas.obtener_ranking_alumnos(materia_id, periodo_id)
+        return self.ranking.obtener_ranking(materia_id, periodo_id)
+    
+    def obtener_top_ranking(self, materia_id: int, periodo_id: int, n: int = 10):
+        return self.ranking.obtener_top(materia_id, periodo_id, n)
+    
+    def obtener_posicion_ranking_alumno(self, materia_id: int, periodo_id: int, alumno_id: int):
+        return self.ranking.obtener_posicion_alumno(materia_id, periodo_id, alumno_id)
+    
+    def obtener_alumnos_debajo_percentil(self, materia_id: int, periodo_id: int, percentil: float):
+        return self.ranking.obtener_debajo_percentil(materia_id, periodo_id, percentil)
+    
+    def invalidar_ranking(self, materia_id: int = None, periodo_id: int = None):
+        self.ranking.invalidar(materia_id, periodo_id)
     
     def obtener_tendencias_promedios(self, materia_id: int, alumno_id: int = None):
-        return self.estadisticas.obtener_tendencias_promedios(materia_id, alumno_id)
+        if alumno_id:
+            return self.tendencias.obtener_puntos_periodo(materia_id, alumno_id)
+        return self.estadisticas.obtener_tendencias_promedios(materia_id)
+    
+    def obtener_tendencias_curso(self, curso: str, division: str, materia_id: int = None):
+        return self.tendencias.obtener_tendencias_curso(curso, division, materia_id)
+    
+    def obtener_tendencias_alumno(self, alumno_id: int, materia_id: int = None):
+        return self.tendencias.obtener_tendencias_alumno(alumno_id, materia_id)
+    
+    def invalidar_tendencias(self):
+        self.tendencias.invalidar()
     
     def obtener_estadisticas_promedios_curso(self, curso: str, division: str, periodo_id: int):
         return self.estadisticas.obtener_estadisticas_promedios_curso(curso, division, periodo_id)
\ No newline at end of file
@@ -4,13 +4,77 @@ GESJ - Plataforma de Gestión Educativa
 """
 
 import mysql.connector
+import threading
 from mysql.connector import Error
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
 from ..database import crear_conexion
+from ..schema_cache import obtener_capacidades
+from ..sentencias import registrar_sentencia
+
+# Promedio por materia y período de un alumno, calculado sobre calificaciones
+_SELECT_PROMEDIOS_ALUMNO = """
+    SELECT 
+        a.id AS alumno_id,
+        CONCAT(a.apellido, ', ', a.nombre) AS alumno,
+        a.curso, a.division,
+        m.id AS materia_id, m.nombre AS materia,
+        p.id AS periodo_id, p.nombre AS periodo,
+        ROUND(AVG(c.nota), 2) AS promedio,
+        COUNT(c.nota) AS cantidad_notas,
+        MIN(c.nota) AS nota_min_calc,
+        MAX(c.nota) AS nota_max_calc
+    FROM calificaciones c
+    JOIN alumnos a ON c.alumno_id = a.id
+    JOIN materias m ON c.materia_id = m.id
+    JOIN periodos_evaluacion p ON c.periodo_id = p.id
+"""
+
+# Sentencias preparadas una vez por conexión (ver server/sentencias.py)
+PROMEDIOS_ALUMNO_PERIODO = registrar_sentencia('promedios.alumno_periodo', _SELECT_PROMEDIOS_ALUMNO + """
+    WHERE c.alumno_id = %s AND c.periodo_id = %s 
+    AND a.activo = TRUE AND m.activa = TRUE
+    GROUP BY a.id, m.id, p.id
+    ORDER BY m.nombre
+""", "Promedios de un alumno en un período")
+
+PROMEDIOS_ALUMNO = registrar_sentencia('promedios.alumno', _SELECT_PROMEDIOS_ALUMNO + """
+    WHERE c.alumno_id = %s AND a.activo = TRUE AND m.activa = TRUE
+    GROUP BY a.id, m.id, p.id
+    ORDER BY p.nombre, m.nombre
+""", "Promedios de un alumno en todos los períodos")
+
+PROMEDIOS_CURSO_MATERIA = registrar_sentencia('promedios.curso_materia', """
+    SELECT 
+        a.id AS alumno_id,
+        a.nombre, a.apellido,
+        CONCAT(a.apellido, ', ', a.nombre) AS alumno,
+        ROUND(AVG(c.nota), 2) AS promedio,
+        COUNT(c.nota) AS cantidad_notas,
+        MIN(c.nota) AS nota_min,
+        MAX(c.nota) AS nota_max
+    FROM alumnos a
+    LEFT JOIN calificaciones c 
+        ON c.alumno_id = a.id AND c.materia_id = %s AND c.periodo_id = %s
+    WHERE a.curso = %s AND a.division = %s AND a.activo = TRUE
+    GROUP BY a.id, a.nombre, a.apellido
+    ORDER BY a.apellido, a.nombre
+""", "Promedio, cantidad, mínima y máxima de cada alumno de un curso en una materia")
 
 class PromediosOperations:
     """Operaciones especializadas para cálculo y gestión de promedios"""
     
+    # Con recalculo_diferido activo, las escrituras solo marcan las claves
+    # afectadas y actualizar_pendientes() las recalcula luego en bloque
+    recalculo_diferido = False
+    
+    # Triggers que marcan en promedios_pendientes las claves de cada escritura
+    # sobre calificaciones (migración 20251018100000_quiet_ledger.sql)
+    TRIGGERS_PENDIENTES = ('marcar_promedio_pendiente_insert', 'marcar_promedio_pendiente_update')
+    
+    # Claves marcadas en este proceso cuando no existe promedios_pendientes
+    _pendientes = set()
+    _pendientes_lock = threading.Lock()
+    
     def __init__(self):
         self.connection = None
     
@@ -30,54 +94,11 @@ class PromediosOperations:
             if not self.conectar():
                 return []
             
-            cursor = self.connection.cursor(dictionary=True)
-            
             if periodo_id:
-                query = """
-                    SELECT 
-                        a.id AS alumno_id,
-                        CONCAT(a.apellido, ', ', a.nombre) AS alumno,
-                        a.curso, a.division,
-                        m.id AS materia_id, m.nombre AS materia,
-                        p.id AS periodo_id, p.nombre AS periodo,
-                        ROUND(AVG(c.nota), 2) AS promedio,
-                        COUNT(c.nota) AS cantidad_notas,
-                        MIN(c.nota) AS nota_min_calc,
-                        MAX(c.nota) AS nota_max_calc
-                    FROM calificaciones c
-                    JOIN alumnos a ON c.alumno_id = a.id
-                    JOIN materias m ON c.materia_id = m.id
-                    JOIN periodos_evaluacion p ON c.periodo_id = p.id
-                    WHERE c.alumno_id = %s AND c.periodo_id = %s 
-                    AND a.activo = TRUE AND m.activa = TRUE
-                    GROUP BY a.id, m.id, p.id
-                    ORDER BY m.nombre
-                """
-                cursor.execute(query, (alumno_id, periodo_id))
+                promedios = self.connection.ejecutar_sentencia(
+                    PROMEDIOS_ALUMNO_PERIODO, (alumno_id, periodo_id))
             else:
-                query = """
-                    SELECT 
-                        a.id AS alumno_id,
-                        CONCAT(a.apellido, ', ', a.nombre) AS alumno,
-                        a.curso, a.division,
-                        m.id AS materia_id, m.nombre AS materia,
-                        p.id AS periodo_id, p.nombre AS periodo,
-                        ROUND(AVG(c.nota), 2) AS promedio,
-                        COUNT(c.nota) AS cantidad_notas,
-                        MIN(c.nota) AS nota_min_calc,
-                        MAX(c.nota) AS nota_max_calc
-                    FROM calificaciones c
-                    JOIN alumnos a ON c.alumno_id = a.id
-                    JOIN materias m ON c.materia_id = m.id
-                    JOIN periodos_evaluacion p ON c.periodo_id = p.id
-                    WHERE c.alumno_id = %s AND a.activo = TRUE AND m.activa = TRUE
-                    GROUP BY a.id, m.id, p.id
-                    ORDER BY p.nombre, m.nombre
-                """
-                cursor.execute(query, (alumno_id,))
-            
-            promedios = cursor.fetchall()
-            cursor.close()
+                promedios = self.connection.ejecutar_sentencia(PROMEDIOS_ALUMNO, (alumno_id,))
             return promedios
             
         except Error as e:
@@ -86,6 +107,65 @@ class PromediosOperations:
         finally:
             self.desconectar()
     
+    def obtener_promedios_curso_materia(self, materia_id: int, periodo_id: int,
+                                        curso: str, division: str = 'A') -> List[Dict]:
+        """
+        Obtener promedio, cantidad, mínima y máxima de todos los alumnos de un curso
+        en una materia y período, con una sola consulta agrupada.
+        Los alumnos sin notas aparecen con cantidad_notas = 0 y promedio NULL.
+        """
+        try:
+            if not self.conectar():
+                return []
+            
+            return self.connection.ejecutar_sentencia(
+                PROMEDIOS_CURSO_MATERIA, (materia_id, periodo_id, curso, division))
+            
+        except Error as e:
+            print(f"Error al obtener promedios del curso: {e}")
+            return []
+        finally:
+            self.desconectar()
+    
+    def iterar_promedios_escuela(self, periodo_id: int = None,
+                                 tamano_lote: int = 1000) -> Iterator[Dict]:
+        """
+        Recorrer promedio y cantidad de notas por alumno y materia de toda la
+        escuela, ordenados por curso y división, leyendo del servidor en lotes
+        (cursor no buffered). Sin periodo_id se promedia el año completo.
+        """
+        connection = crear_conexion()
+        if not connection:
+            return
+        try:
+            cursor = connection.cursor(dictionary=True)
+            filtro = "AND c.periodo_id = %s" if periodo_id else ""
+            cursor.execute(f"""
+                SELECT 
+                    a.curso, a.division,
+                    CONCAT(a.apellido, ', ', a.nombre) AS alumno,
+                    m.nombre AS materia,
+                    ROUND(AVG(c.nota), 2) AS promedio,
+                    COUNT(c.nota) AS cantidad_notas
+                FROM calificaciones c
+                JOIN alumnos a ON c.alumno_id = a.id
+                JOIN materias m ON c.materia_id = m.id
+                WHERE a.activo = TRUE {filtro}
+                GROUP BY a.curso, a.division, a.id, a.apellido, a.nombre, m.id, m.nombre
+                ORDER BY a.curso, a.division, a.apellido, a.nombre, m.nombre
+            """, (periodo_id,) if periodo_id else ())
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                if not filas:
+                    break
+                yield from filas
+            cursor.close()
+            
+        except Error as e:
+            print(f"Error al recorrer promedios: {e}")
+        finally:
+            connection.close()
+    
     def obtener_promedio_general(self, alumno_id: int, periodo_id: int) -> float:
         """Obtener promedio general de un alumno en un período"""
         try:
@@ -94,23 +174,15 @@ class PromediosOperations:
             
             cursor = self.connection.cursor()
             
-            # Intentar usar la función si existe
-            try:
+            if obtener_capacidades().tiene_funcion('PromedioGeneralAlumno'):
                 query = "SELECT PromedioGeneralAlumno(%s, %s) as promedio"
-                cursor.execute(query, (alumno_id, periodo_id))
-                resultado = cursor.fetchone()
-                if resultado and resultado[0]:
-                    cursor.close()
-                    return float(resultado[0])
-            except Error:
-                pass
-            
-            # Método alternativo si no existe la función
-            query = """
-                SELECT ROUND(AVG(nota), 2) as promedio
-                FROM calificaciones
-                WHERE alumno_id = %s AND periodo_id = %s
-            """
+            else:
+                # Método alternativo si no existe la función
+                query = """
+                    SELECT ROUND(AVG(nota), 2) as promedio
+                    FROM calificaciones
+                    WHERE alumno_id = %s AND periodo_id = %s
+                """
             cursor.execute(query, (alumno_id, periodo_id))
             resultado = cursor.fetchone()
             cursor.close()
@@ -123,31 +195,18 @@ class PromediosOperations:
         finally:
             self.desconectar()
     
-    def actualizar_todos(self):
-        """Actualizar tabla de promedios calculados"""
+    def actualizar_todos(self, tamano_bloque: int = 200):
+        """Reconstruir toda la tabla de promedios calculados, por bloques de alumnos"""
+        capacidades = obtener_capacidades()
+        if capacidades.cargar() and not capacidades.tiene_tabla('promedios_alumnos'):
+            print("Tabla promedios_alumnos no existe, saltando actualización")
+            return True
+        
         try:
             if not self.conectar():
                 return False
             
-            cursor = self.connection.cursor()
-            
-            # Verificar si existe la tabla promedios_alumnos
-            cursor.execute("SHOW TABLES LIKE 'promedios_alumnos'")
-            if not cursor.fetchone():
-                print("Tabla promedios_alumnos no existe, saltando actualización")
-                cursor.close()
-                return True
-            
-            # Verificar si existe el procedimiento
-            cursor.execute("SHOW PROCEDURE STATUS WHERE Name = 'CalcularPromedios'")
-            if cursor.fetchone():
-                cursor.callproc('CalcularPromedios')
-                self.connection.commit()
-            else:
-                print("Procedimiento CalcularPromedios no existe, usando método alternativo")
-                self.actualizar_manual()
-            
-            cursor.close()
+            self.actualizar_manual(tamano_bloque)
             return True
             
         except Error as e:
@@ -158,18 +217,16 @@ class PromediosOperations:
     
     def actualizar_simple(self, alumno_id: int, materia_id: int, periodo_id: int):
         """Actualizar promedio específico de un alumno en una materia"""
+        capacidades = obtener_capacidades()
+        if capacidades.cargar() and not capacidades.tiene_tabla('promedios_alumnos'):
+            return True
+        
         try:
             if not self.conectar():
                 return False
             
             cursor = self.connection.cursor()
             
-            # Verificar si existe la tabla promedios_alumnos
-            cursor.execute("SHOW TABLES LIKE 'promedios_alumnos'")
-            if not cursor.fetchone():
-                cursor.close()
-                return True
-            
             # Calcular promedio
             cursor.execute("""
                 SELECT 
@@ -203,27 +260,217 @@ class PromediosOperations:
         finally:
             self.desconectar()
     
-    def actualizar_manual(self):
-        """Actualizar promedios manualmente si no existe el procedimiento"""
-        try:
-            cursor = self.connection.cursor()
-            
-            # Limpiar tabla de promedios
-            cursor.execute("DELETE FROM promedios_alumnos")
+    def recalcular_en_transaccion(self, cursor, materia_id: int, periodo_id: int,
+                                  alumno_ids: List[int], nuevas: bool = False):
+        """
+        Recalcular (o marcar como pendientes) los promedios de varios alumnos
+        
+        Usa el cursor recibido, sin confirmar, para que el recálculo forme
+        parte de la transacción del llamador.
+        
+        Con el trigger actualizar_promedio_after_insert, las inserciones
+        (nuevas=True) ya actualizaron promedios_alumnos y no se recalculan.
+        Los triggers de promedios_pendientes, si están instalados, también
+        marcan las claves de esta escritura: como quedan al día acá, esas
+        marcas se borran en la misma transacción y actualizar_pendientes()
+        sólo recalcula lo modificado fuera de la aplicación.
+        """
+        claves = {(alumno_id, materia_id, periodo_id) for alumno_id in alumno_ids}
+        if self.recalculo_diferido:
+            self.marcar_pendientes(cursor, claves)
+            return
+        
+        capacidades = obtener_capacidades()
+        if not (nuevas and capacidades.tiene_trigger('actualizar_promedio_after_insert')):
+            self.recalcular_claves(cursor, claves)
+        if claves and all(capacidades.tiene_trigger(nombre) for nombre in self.TRIGGERS_PENDIENTES):
+            filtro, parametros = self._filtro_claves(sorted(claves))
+            cursor.execute(f"DELETE FROM promedios_pendientes WHERE {filtro}", parametros)
+    
+    def marcar_pendientes(self, cursor, claves):
+        """Registrar claves (alumno_id, materia_id, periodo_id) para recalcular luego"""
+        claves = sorted(set(claves))
+        if not claves:
+            return
+        
+        if obtener_capacidades().tiene_tabla('promedios_pendientes'):
+            cursor.executemany("""
+                INSERT IGNORE INTO promedios_pendientes (alumno_id, materia_id, periodo_id)
+                VALUES (%s, %s, %s)
+            """, claves)
+        else:
+            with PromediosOperations._pendientes_lock:
+                PromediosOperations._pendientes.update(claves)
+    
+    def recalcular_claves(self, cursor, claves, tamano_bloque: int = 500):
+        """
+        Recalcular en bloque los promedios de las claves (alumno_id, materia_id, periodo_id)
+        indicadas, borrando los que ya no tienen calificaciones. No confirma la transacción.
+        """
+        if not obtener_capacidades().tiene_tabla('promedios_alumnos'):
+            return
+        
+        claves = sorted(set(claves))
+        for inicio in range(0, len(claves), tamano_bloque):
+            bloque = claves[inicio:inicio + tamano_bloque]
+            filtro, parametros = self._filtro_claves(bloque)
             
-            # Insertar promedios calculados
-            cursor.execute("""
-                INSERT INTO promedios_alumnos (alumno_id, materia_id, periodo_id, promedio, cantidad_notas)
+            cursor.execute(f"""
+                INSERT INTO promedios_alumnos 
+                (alumno_id, materia_id, periodo_id, promedio, cantidad_notas)
                 SELECT 
                     alumno_id, materia_id, periodo_id,
                     ROUND(AVG(nota), 2) as promedio,
                     COUNT(*) as cantidad_notas
                 FROM calificaciones
+                WHERE {filtro}
                 GROUP BY alumno_id, materia_id, periodo_id
-            """)
+                ON DUPLICATE KEY UPDATE
+                promedio = VALUES(promedio),
+                cantidad_notas = VALUES(cantidad_notas)
+            """, parametros)
+            
+            cursor.execute(f"""
+                DELETE FROM promedios_alumnos
+                WHERE {filtro}
+                AND NOT EXISTS (
+                    SELECT 1 FROM calificaciones c
+                    WHERE c.alumno_id = promedios_alumnos.alumno_id
+                    AND c.materia_id = promedios_alumnos.materia_id
+                    AND c.periodo_id = promedios_alumnos.periodo_id
+                )
+            """, parametros)
+    
+    def actualizar_pendientes(self, tamano_bloque: int = 500) -> int:
+        """
+        Recalcular solo los promedios marcados como pendientes
+        
+        Toma las claves marcadas en este proceso y las de la tabla
+        promedios_pendientes (cargada por la aplicación o por los triggers).
+        
+        Returns:
+            int: Cantidad de claves recalculadas
+        """
+        with PromediosOperations._pendientes_lock:
+            en_memoria = sorted(PromediosOperations._pendientes)
+            PromediosOperations._pendientes.clear()
+        
+        recalculadas = 0
+        try:
+            if not self.conectar():
+                raise Error("Sin conexión a la base de datos")
+            
+            cursor = self.connection.cursor()
+            
+            while en_memoria:
+                bloque = en_memoria[:tamano_bloque]
+                self.recalcular_claves(cursor, bloque)
+                self.connection.commit()
+                en_memoria = en_memoria[tamano_bloque:]
+                recalculadas += len(bloque)
             
+            if obtener_capacidades().tiene_tabla('promedios_pendientes'):
+                while True:
+                    # FOR UPDATE: una marca nueva sobre estas claves espera al commit
+                    # y queda pendiente para la próxima pasada
+                    cursor.execute("""
+                        SELECT alumno_id, materia_id, periodo_id
+                        FROM promedios_pendientes
+                        ORDER BY alumno_id, materia_id, periodo_id
+                        LIMIT %s
+                        FOR UPDATE
+                    """, (tamano_bloque,))
+                    bloque = [tuple(fila) for fila in cursor.fetchall()]
+                    if not bloque:
+                        self.connection.commit()
+                        break
+                    
+                    filtro, parametros = self._filtro_claves(bloque)
+                    cursor.execute(f"DELETE FROM promedios_pendientes WHERE {filtro}", parametros)
+                    self.recalcular_claves(cursor, bloque)
+                    self.connection.commit()
+                    recalculadas += len(bloque)
+            
+            cursor.close()
+            return recalculadas
+            
+        except Error as e:
+            print(f"Error al actualizar promedios pendientes: {e}")
+            if self.connection:
+                self.connection.rollback()
+            # Las claves en memoria no procesadas se conservan para el próximo intento
+            with PromediosOperations._pendientes_lock:
+                PromediosOperations._pendientes.update(en_memoria)
+            return recalculadas
+        finally:
+            self.desconectar()
+    
+    def actualizar_manual(self, tamano_bloque: int = 200):
+        """
+        Reconstruir promedios_alumnos por bloques de alumnos
+        
+        Cada bloque se actualiza con upsert y se confirma por separado, sin
+        vaciar la tabla, para que las lecturas concurrentes sigan viendo datos.
+        """
+        try:
+            cursor = self.connection.cursor()
+            
+            cursor.execute("SELECT NOW()")
+            inicio_reconstruccion = cursor.fetchone()[0]
+            
+            cursor.execute("""
+                SELECT MIN(alumno_id), MAX(alumno_id) FROM (
+                    SELECT alumno_id FROM calificaciones
+                    UNION ALL
+                    SELECT alumno_id FROM promedios_alumnos
+                ) ids
+            """)
+            minimo, maximo = cursor.fetchone()
             self.connection.commit()
             
+            if minimo is not None:
+                for desde in range(minimo, maximo + 1, tamano_bloque):
+                    hasta = desde + tamano_bloque - 1
+                    
+                    cursor.execute("""
+                        INSERT INTO promedios_alumnos (alumno_id, materia_id, periodo_id, promedio, cantidad_notas)
+                        SELECT 
+                            alumno_id, materia_id, periodo_id,
+                            ROUND(AVG(nota), 2) as promedio,
+                            COUNT(*) as cantidad_notas
+                        FROM calificaciones
+                        WHERE alumno_id BETWEEN %s AND %s
+                        GROUP BY alumno_id, materia_id, periodo_id
+                        ON DUPLICATE KEY UPDATE
+                        promedio = VALUES(promedio),
+                        cantidad_notas = VALUES(cantidad_notas)
+                    """, (desde, hasta))
+                    
+                    cursor.execute("""
+                        DELETE pa FROM promedios_alumnos pa
+                        LEFT JOIN calificaciones c 
+                            ON c.alumno_id = pa.alumno_id AND c.materia_id = pa.materia_id
+                            AND c.periodo_id = pa.periodo_id
+                        WHERE pa.alumno_id BETWEEN %s AND %s AND c.id IS NULL
+                    """, (desde, hasta))
+                    
+                    self.connection.commit()
+            
+            # Lo marcado antes de empezar ya quedó cubierto por la reconstrucción
+            if obtener_capacidades().tiene_tabla('promedios_pendientes'):
+                cursor.execute("DELETE FROM promedios_pendientes WHERE fecha_marcado < %s",
+                               (inicio_reconstruccion,))
+                self.connection.commit()
+            
+            cursor.close()
+            
         except Error as e:
             print(f"Error en actualización manual de promedios: {e}")
-            raise e
\ No newline at end of file
+            raise e
+    
+    def _filtro_claves(self, claves):
+        """Condición SQL y parámetros para filtrar por claves (alumno, materia, período)"""
+        filtro = "(alumno_id, materia_id, periodo_id) IN (" + \
+                 ", ".join(["(%s, %s, %s)"] * len(claves)) + ")"
+        parametros = tuple(valor for clave in claves for valor in clave)
+        return filtro, parametros
@@ -0,0 +1,304 @@
+"""
+Ranking Materializado por Materia y Período
+GESJ - Plataforma de Gestión Educativa
+
+Cada (materia_id, periodo_id) consultado guarda en memoria los agregados
+por alumno (suma, cantidad, mínima y máxima de las notas) y el ranking ya
+ordenado, con posición, percentil y categoría. Las consultas de "top N",
+"posición de un alumno" y "alumnos debajo del percentil p" leen de ahí sin
+volver a agregar las calificaciones.
+
+Cuando cambian notas de la materia sólo se vuelven a agregar los alumnos
+afectados: los que marca esta aplicación al registrar calificaciones y,
+cada RANKING_CONFIG['segundos_verificacion'], los modificados por otros
+procesos según fecha_modificacion. Si la cantidad de notas no coincide
+(bajas de registros, alumnos dados de baja) se recarga la materia completa.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from mysql.connector import Error
+from ..database import crear_conexion
+from .reporte_datos import categoria_promedio
+
+# Configuración del ranking en memoria
+RANKING_CONFIG = {
+    'segundos_verificacion': 30,   # Cada cuánto se buscan cambios hechos fuera de la aplicación
+    'maximo_incremental': 200,     # Más alumnos modificados que esto: se recarga la materia completa
+    'maximo_indices': 500,         # Materias/períodos en memoria (se descartan los menos usados)
+}
+
+
+class IndiceRanking:
+    """Ranking de una materia en un período, con posiciones y percentiles ya calculados"""
+
+    def __init__(self, materia_id: int, periodo_id: int):
+        self.materia_id = materia_id
+        self.periodo_id = periodo_id
+        self.lock = threading.Lock()
+        self.marca = None           # Hora del servidor de la última búsqueda de cambios
+        self.verificado = 0.0       # time.monotonic() de esa búsqueda
+        self.modificados = set()    # Alumnos marcados por escrituras de esta aplicación
+        self.total_notas = 0
+        self._agregados: Dict[int, Dict] = {}
+        self._ordenados: List[Dict] = []
+        self._posiciones: Dict[int, int] = {}
+        self._claves_percentil: List[float] = []
+
+    @property
+    def cargado(self) -> bool:
+        return self.marca is not None
+
+    def reemplazar(self, filas: Iterable[Dict], alumno_ids: Iterable[int] = None):
+        """
+        Sustituir los agregados de los alumnos indicados y reordenar
+
+        Args:
+            filas: Agregados nuevos (alumno_id, apellido, nombre, curso, division,
+                suma, cantidad_notas, nota_minima, nota_maxima)
+            alumno_ids: Alumnos reagregados; los que no vienen en filas se quitan.
+                None reemplaza el ranking completo
+        """
+        if alumno_ids is None:
+            self._agregados = {}
+        else:
+            for alumno_id in alumno_ids:
+                self._agregados.pop(alumno_id, None)
+        for fila in filas:
+            self._agregados[fila['alumno_id']] = fila
+        self.total_notas = sum(fila['cantidad_notas'] for fila in self._agregados.values())
+        self._ordenar()
+
+    def _ordenar(self):
+        """Ordenar por promedio (desempate por apellido y nombre) y asignar posición y percentil"""
+        entradas = []
+        for fila in self._agregados.values():
+            suma = Decimal(str(fila['suma']))
+            cantidad = fila['cantidad_notas']
+            entradas.append({
+                'alumno_id': fila['alumno_id'],
+                'alumno': f"{fila['apellido']}, {fila['nombre']}",
+                'curso': fila['curso'],
+                'division': fila['division'],
+                'promedio': float((suma / cantidad).quantize(Decimal('0.01'), ROUND_HALF_UP)),
+                'cantidad_notas': cantidad,
+                'nota_minima': fila['nota_minima'],
+                'nota_maxima': fila['nota_maxima'],
+                'categoria': categoria_promedio(float(suma) / cantidad),
+            })
+        entradas.sort(key=lambda e: (-e['promedio'], e['alumno'].lower(), e['alumno_id']))
+
+        # Empates: misma posición; percentil = (menores + la mitad de los iguales) / total
+        total = len(entradas)
+        inicio = 0
+        while inicio < total:
+            fin = inicio
+            while fin < total and entradas[fin]['promedio'] == entradas[inicio]['promedio']:
+                fin += 1
+            percentil = round(100.0 * ((total - fin) + (fin - inicio) / 2) / total, 1)
+            for entrada in entradas[inicio:fin]:
+                entrada['posicion'] = inicio + 1
+                entrada['percentil'] = percentil
+            inicio = fin
+
+        self._ordenados = entradas
+        self._posiciones = {entrada['alumno_id']: i for i, entrada in enumerate(entradas)}
+        self._claves_percentil = [-entrada['percentil'] for entrada in entradas]
+
+    # ==================== CONSULTAS ====================
+
+    def todos(self) -> List[Dict]:
+        """Ranking completo"""
+        return [dict(entrada) for entrada in self._ordenados]
+
+    def top(self, n: int) -> List[Dict]:
+        """Los n primeros (los empatados en la posición n pueden quedar afuera)"""
+        return [dict(entrada) for entrada in self._ordenados[:max(n, 0)]]
+
+    def posicion(self, alumno_id: int) -> Optional[Dict]:
+        """Entrada de un alumno, o None si no tiene notas en la materia"""
+        indice = self._posiciones.get(alumno_id)
+        if indice is None:
+            return None
+        entrada = dict(self._ordenados[indice])
+        entrada['total_alumnos'] = len(self._ordenados)
+        return entrada
+
+    def debajo_percentil(self, percentil: float) -> List[Dict]:
+        """Alumnos con percentil menor a 'percentil', en orden de ranking"""
+        # El percentil no crece a lo largo del ranking: los alumnos buscados son el final
+        inicio = bisect_right(self._claves_percentil, -percentil)
+        return [dict(entrada) for entrada in self._ordenados[inicio:]]
+
+
+class RankingOperations:
+    """Rankings materializados por (materia_id, periodo_id), compartidos en el proceso"""
+
+    _indices: 'OrderedDict[Tuple[int, int], IndiceRanking]' = OrderedDict()
+    _indices_lock = threading.Lock()
+
+    def __init__(self):
+        self.connection = None
+
+    def conectar(self):
+        """Establecer conexión a la base de datos"""
+        self.connection = crear_conexion()
+        return self.connection is not None
+
+    def desconectar(self):
+        """Cerrar conexión a la base de datos"""
+        if self.connection and self.connection.is_connected():
+            self.connection.close()
+
+    # ==================== CONSULTAS ====================
+
+    def obtener_ranking(self, materia_id: int, periodo_id: int) -> List[Dict]:
+        """Ranking completo: alumno_id, alumno, curso, division, promedio, cantidad_notas,
+        nota_minima, nota_maxima, categoria, posicion y percentil"""
+        indice = self.obtener_indice(materia_id, periodo_id)
+        return indice.todos() if indice else []
+
+    def obtener_top(self, materia_id: int, periodo_id: int, n: int = 10) -> List[Dict]:
+        """Los n mejores promedios de la materia"""
+        indice = self.obtener_indice(materia_id, periodo_id)
+        return indice.top(n) if indice else []
+
+    def obtener_posicion_alumno(self, materia_id: int, periodo_id: int,
+                                alumno_id: int) -> Optional[Dict]:
+        """Posición y percentil de un alumno (con total_alumnos), o None"""
+        indice = self.obtener_indice(materia_id, periodo_id)
+        return indice.posicion(alumno_id) if indice else None
+
+    def obtener_debajo_percentil(self, materia_id: int, periodo_id: int,
+                                 percentil: float) -> List[Dict]:
+        """Alumnos de la materia por debajo del percentil indicado (0-100)"""
+        indice = self.obtener_indice(materia_id, periodo_id)
+        return indice.debajo_percentil(percentil) if indice else []
+
+    # ==================== MANTENIMIENTO ====================
+
+    @classmethod
+    def marcar_modificados(cls, materia_id: int, periodo_id: int, alumno_ids: Iterable[int]):
+        """Registrar alumnos con notas nuevas; se reagregan en la próxima consulta"""
+        with cls._indices_lock:
+            indice = cls._indices.get((materia_id, periodo_id))
+        if indice is not None:
+            with indice.lock:
+                indice.modificados.update(alumno_ids)
+
+    @classmethod
+    def invalidar(cls, materia_id: int = None, periodo_id: int = None):
+        """Descartar rankings (de una materia, de un período o todos) para recargarlos"""
+        with cls._indices_lock:
+            for clave in list(cls._indices):
+                if ((materia_id is None or clave[0] == materia_id)
+                        and (periodo_id is None or clave[1] == periodo_id)):
+                    del cls._indices[clave]
+
+    def obtener_indice(self, materia_id: int, periodo_id: int) -> Optional[IndiceRanking]:
+        """Ranking de la materia al día, cargándolo o actualizándolo si hace falta"""
+        clave = (materia_id, periodo_id)
+        with RankingOperations._indices_lock:
+            indice = RankingOperations._indices.get(clave)
+            if indice is None:
+                indice = IndiceRanking(materia_id, periodo_id)
+                RankingOperations._indices[clave] = indice
+                while len(RankingOperations._indices) > RANKING_CONFIG['maximo_indices']:
+                    RankingOperations._indices.popitem(last=False)
+            RankingOperations._indices.move_to_end(clave)
+
+        with indice.lock:
+            verificar = time.monotonic() - indice.verificado >= RANKING_CONFIG['segundos_verificacion']
+            if indice.cargado and not verificar and not indice.modificados:
+                return indice
+
+            try:
+                if not self.conectar():
+                    return indice if indice.cargado else None
+
+                cursor = self.connection.cursor(dictionary=True)
+                if indice.cargado:
+                    self._actualizar(cursor, indice, verificar)
+                else:
+                    self._cargar(cursor, indice)
+                cursor.close()
+                return indice
+
+            except Error as e:
+                print(f"Error al actualizar ranking de alumnos: {e}")
+                # Ante un error se sigue sirviendo el último ranking calculado
+                return indice if indice.cargado else None
+            finally:
+                self.desconectar()
+
+    def _cargar(self, cursor, indice: IndiceRanking):
+        """Agregar la materia completa"""
+        marca = self._obtener_marca(cursor)
+        indice.reemplazar(self._agregar(cursor, indice.materia_id, indice.periodo_id))
+        indice.modificados.clear()
+        indice.marca = marca
+        indice.verificado = time.monotonic()
+
+    def _actualizar(self, cursor, indice: IndiceRanking, verificar: bool):
+        """Reagregar sólo los alumnos modificados; ante diferencias, recargar todo"""
+        marca = self._obtener_marca(cursor) if verificar else None
+        modificados = set(indice.modificados)
+        if verificar:
+            cursor.execute("""
+                SELECT DISTINCT alumno_id FROM calificaciones
+                WHERE materia_id = %s AND periodo_id = %s AND fecha_modificacion >= %s
+            """, (indice.materia_id, indice.periodo_id, indice.marca))
+            modificados.update(fila['alumno_id'] for fila in cursor.fetchall())
+
+        if len(modificados) > RANKING_CONFIG['maximo_incremental']:
+            self._cargar(cursor, indice)
+            return
+
+        if modificados:
+            indice.reemplazar(self._agregar(cursor, indice.materia_id, indice.periodo_id,
+                                            sorted(modificados)), modificados)
+        indice.modificados.difference_update(modificados)
+
+        if verificar:
+            cursor.execute("""
+                SELECT COUNT(*) AS total
+                FROM calificaciones c
+                JOIN alumnos a ON c.alumno_id = a.id
+                WHERE c.materia_id = %s AND c.periodo_id = %s AND a.activo = TRUE
+            """, (indice.materia_id, indice.periodo_id))
+            if cursor.fetchone()['total'] != indice.total_notas:
+                self._cargar(cursor, indice)
+                return
+            indice.marca = marca
+            indice.verificado = time.monotonic()
+
+    def _agregar(self, cursor, materia_id: int, periodo_id: int,
+                 alumno_ids: List[int] = None) -> List[Dict]:
+        """Suma, cantidad, mínima y máxima de las notas por alumno activo"""
+        filtro, parametros = "", (materia_id, periodo_id)
+        if alumno_ids is not None:
+            filtro = f" AND c.alumno_id IN ({', '.join(['%s'] * len(alumno_ids))})"
+            parametros += tuple(alumno_ids)
+        cursor.execute(f"""
+            SELECT
+                a.id AS alumno_id, a.apellido, a.nombre, a.curso, a.division,
+                SUM(c.nota) AS suma,
+                COUNT(c.nota) AS cantidad_notas,
+                MIN(c.nota) AS nota_minima,
+                MAX(c.nota) AS nota_maxima
+            FROM calificaciones c
+            JOIN alumnos a ON c.alumno_id = a.id
+            WHERE c.materia_id = %s AND c.periodo_id = %s AND a.activo = TRUE{filtro}
+            GROUP BY a.id, a.apellido, a.nombre, a.curso, a.division
+        """, parametros)
+        return cursor.fetchall()
+
+    def _obtener_marca(self, cursor):
+        """Hora del servidor antes de leer; lo modificado desde entonces se reagrega"""
+        cursor.execute("SELECT NOW() AS ahora")
+        return cursor.fetchone()['ahora']
@@ -0,0 +1,295 @@
+"""
+Datos de Reporte de Curso para el Sistema de Calificaciones
+GESJ - Plataforma de Gestión Educativa
+
+Las notas de un curso y período se leen una sola vez (ver
+ReportesOperations.cargar_datos_curso) y se guardan en columnas compactas:
+índice de alumno, índice de materia y nota. Información general,
+promedios por materia, aprobados, ranking y distribución se calculan a
+partir de esas columnas, con NumPy si está instalado o con Python puro si
+no, así el mismo viaje a la base sirve al PDF y al Excel.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+NOTA_APROBACION = 6.0
+
+# Categorías de promedio, de mayor a menor (igual que el ranking en SQL)
+CATEGORIAS_PROMEDIO = (
+    ('Excelente', 9.0),
+    ('Muy Bueno', 8.0),
+    ('Bueno', 7.0),
+    ('Regular', 6.0),
+    ('En Riesgo', None),
+)
+
+# Claves de la distribución de notas (como obtener_estadisticas_promedios_curso)
+CLAVES_DISTRIBUCION = ('notas_excelentes', 'notas_muy_buenas', 'notas_buenas',
+                       'notas_regulares', 'notas_en_riesgo')
+
+
+def categoria_promedio(promedio: float) -> str:
+    """Categoría cualitativa de un promedio"""
+    for categoria, minimo in CATEGORIAS_PROMEDIO:
+        if minimo is None or promedio >= minimo:
+            return categoria
+    return CATEGORIAS_PROMEDIO[-1][0]
+
+
+class DatosReporteCurso:
+    """Notas de un curso y período en columnas, con los agregados de los reportes"""
+
+    def __init__(self, curso: str, division: str, periodo_id: int,
+                 alumnos: List[Dict], materias: List[Dict],
+                 idx_alumno: Sequence[int], idx_materia: Sequence[int], notas: Sequence[float]):
+        """
+        Args:
+            alumnos: [{'alumno_id', 'alumno', 'dni'}] de todos los alumnos activos del curso
+            materias: [{'materia_id', 'materia'}] de las materias con notas
+            idx_alumno, idx_materia, notas: una posición por calificación
+        """
+        self.curso = curso
+        self.division = division
+        self.periodo_id = periodo_id
+        self.alumnos = alumnos
+        self.materias = materias
+        if NUMPY_AVAILABLE:
+            self.idx_alumno = np.asarray(idx_alumno, dtype=np.int32)
+            self.idx_materia = np.asarray(idx_materia, dtype=np.int32)
+            self.notas = np.asarray(notas, dtype=np.float64)
+        else:
+            self.idx_alumno = list(idx_alumno)
+            self.idx_materia = list(idx_materia)
+            self.notas = list(notas)
+        self._cache = {}
+
+    @classmethod
+    def desde_filas(cls, curso: str, division: str, periodo_id: int, filas) -> 'DatosReporteCurso':
+        """
+        Construir desde filas (alumno_id, alumno, dni, materia_id, materia, nota);
+        los alumnos sin notas vienen con materia_id y nota NULL
+        """
+        alumnos, materias = [], []
+        pos_alumno, pos_materia = {}, {}
+        idx_alumno, idx_materia, notas = [], [], []
+        for alumno_id, alumno, dni, materia_id, materia, nota in filas:
+            i = pos_alumno.get(alumno_id)
+            if i is None:
+                i = pos_alumno[alumno_id] = len(alumnos)
+                alumnos.append({'alumno_id': alumno_id, 'alumno': alumno, 'dni': dni})
+            if nota is None:
+                continue
+            j = pos_materia.get(materia_id)
+            if j is None:
+                j = pos_materia[materia_id] = len(materias)
+                materias.append({'materia_id': materia_id, 'materia': materia})
+            idx_alumno.append(i)
+            idx_materia.append(j)
+            notas.append(float(nota))
+        return cls(curso, division, periodo_id, alumnos, materias, idx_alumno, idx_materia, notas)
+
+    # ---- Agregados básicos ----
+
+    def _agregar(self, clave: str) -> Dict[str, list]:
+        """
+        Suma, cantidad, mínimo, máximo y aprobados de las notas agrupadas
+        por 'alumno', 'materia' o 'alumno_materia' (listas indexadas por grupo)
+        """
+        if clave in self._cache:
+            return self._cache[clave]
+
+        n_alumnos, n_materias = len(self.alumnos), len(self.materias)
+        tamanos = {'alumno': n_alumnos, 'materia': n_materias, 'alumno_materia': n_alumnos * n_materias}
+        n = tamanos[clave]
+
+        if NUMPY_AVAILABLE:
+            grupos = {'alumno': self.idx_alumno, 'materia': self.idx_materia,
+                      'alumno_materia': self.idx_alumno * n_materias + self.idx_materia}[clave]
+            notas = self.notas
+            minimos = np.full(n, np.inf)
+            maximos = np.full(n, -np.inf)
+            np.minimum.at(minimos, grupos, notas)
+            np.maximum.at(maximos, grupos, notas)
+            resultado = {
+                'suma': np.bincount(grupos, weights=notas, minlength=n).tolist(),
+                'cantidad': np.bincount(grupos, minlength=n).tolist(),
+                'aprobados': np.bincount(grupos, weights=(notas >= NOTA_APROBACION), minlength=n).astype(int).tolist(),
+                'minimo': minimos.tolist(),
+                'maximo': maximos.tolist(),
+            }
+        else:
+            resultado = {'suma': [0.0] * n, 'cantidad': [0] * n, 'aprobados': [0] * n,
+                         'minimo': [float('inf')] * n, 'maximo': [float('-inf')] * n}
+            for i, j, nota in zip(self.idx_alumno, self.idx_materia, self.notas):
+                g = {'alumno': i, 'materia': j, 'alumno_materia': i * n_materias + j}[clave]
+                resultado['suma'][g] += nota
+                resultado['cantidad'][g] += 1
+                resultado['aprobados'][g] += nota >= NOTA_APROBACION
+                resultado['minimo'][g] = min(resultado['minimo'][g], nota)
+                resultado['maximo'][g] = max(resultado['maximo'][g], nota)
+
+        self._cache[clave] = resultado
+        return resultado
+
+    @staticmethod
+    def _promedio(suma: float, cantidad: int) -> Optional[float]:
+        return round(suma / cantidad, 2) if cantidad else None
+
+    # ---- Vistas para los reportes ----
+
+    def info_general(self) -> Dict:
+        """Mismas claves que ReportesOperations.obtener_datos_reporte_curso()['info_general']"""
+        total = len(self.notas)
+        suma = float(sum(self._agregar('materia')['suma']))
+        aprobados = int(sum(self._agregar('materia')['aprobados']))
+        con_notas = sum(1 for cantidad in self._agregar('alumno')['cantidad'] if cantidad)
+        return {
+            'total_alumnos': con_notas,
+            'alumnos_sin_notas': len(self.alumnos) - con_notas,
+            'total_materias': len(self.materias),
+            'promedio_curso': self._promedio(suma, total),
+            'total_calificaciones': total,
+            'aprobados': aprobados,
+            'desaprobados': total - aprobados,
+        }
+
+    def promedios_materias(self) -> List[Dict]:
+        """Promedio, evaluaciones y aprobados por materia, de mayor a menor promedio"""
+        agregados = self._agregar('materia')
+        filas = []
+        for j, materia in enumerate(self.materias):
+            cantidad = agregados['cantidad'][j]
+            filas.append({
+                'materia_id': materia['materia_id'],
+                'materia': materia['materia'],
+                'promedio_materia': self._promedio(agregados['suma'][j], cantidad),
+                'evaluaciones': cantidad,
+                'aprobados': agregados['aprobados'][j],
+                'desaprobados': cantidad - agregados['aprobados'][j],
+            })
+        filas.sort(key=lambda fila: -(fila['promedio_materia'] or 0))
+        return filas
+
+    def promedios_alumnos(self) -> List[Dict]:
+        """Promedio de cada alumno en cada materia (formato de ExcelManager.crear_workbook_promedios)"""
+        agregados = self._agregar('alumno_materia')
+        n_materias = len(self.materias)
+        orden_materias = sorted(range(n_materias), key=lambda j: self.materias[j]['materia'])
+        filas = []
+        for i, alumno in enumerate(self.alumnos):
+            for j in orden_materias:
+                g = i * n_materias + j
+                cantidad = agregados['cantidad'][g]
+                if not cantidad:
+                    continue
+                filas.append({
+                    'alumno_id': alumno['alumno_id'],
+                    'alumno': alumno['alumno'],
+                    'materia_id': self.materias[j]['materia_id'],
+                    'materia': self.materias[j]['materia'],
+                    'promedio': self._promedio(agregados['suma'][g], cantidad),
+                    'cantidad_notas': cantidad,
+                    'nota_min': agregados['minimo'][g],
+                    'nota_max': agregados['maximo'][g],
+                })
+        return filas
+
+    def boletin(self, alumno_id: int) -> List[Dict]:
+        """Promedio por materia de un alumno (formato de PDFManager.escribir_boletin)"""
+        return [
+            {'materia': fila['materia'], 'promedio': fila['promedio'], 'evaluaciones': fila['cantidad_notas'],
+             'nota_minima': fila['nota_min'], 'nota_maxima': fila['nota_max']}
+            for fila in self.promedios_alumnos() if fila['alumno_id'] == alumno_id
+        ]
+
+    def ranking(self, materia_id: int = None) -> List[Dict]:
+        """
+        Alumnos ordenados por promedio (de todas las materias o de una),
+        con posición y categoría; los empates comparten posición
+        """
+        if materia_id is None:
+            agregados = self._agregar('alumno')
+            grupo = lambda i: i
+        else:
+            posiciones = [j for j, materia in enumerate(self.materias) if materia['materia_id'] == materia_id]
+            if not posiciones:
+                return []
+            agregados = self._agregar('alumno_materia')
+            n_materias, j = len(self.materias), posiciones[0]
+            grupo = lambda i: i * n_materias + j
+
+        filas = []
+        for i, alumno in enumerate(self.alumnos):
+            g = grupo(i)
+            cantidad = agregados['cantidad'][g]
+            if not cantidad:
+                continue
+            promedio = self._promedio(agregados['suma'][g], cantidad)
+            filas.append({
+                'alumno_id': alumno['alumno_id'],
+                'alumno': alumno['alumno'],
+                'promedio': promedio,
+                'cantidad_notas': cantidad,
+                'nota_minima': agregados['minimo'][g],
+                'nota_maxima': agregados['maximo'][g],
+                'categoria': categoria_promedio(promedio),
+            })
+        filas.sort(key=lambda fila: (-fila['promedio'], fila['alumno']))
+
+        anterior, posicion = None, 0
+        for n, fila in enumerate(filas, 1):
+            if fila['promedio'] != anterior:
+                posicion, anterior = n, fila['promedio']
+            fila['posicion'] = posicion
+        return filas
+
+    def distribucion(self) -> Dict:
+        """Dispersión y cantidad de notas por categoría (como obtener_estadisticas_promedios_curso)"""
+        total = len(self.notas)
+        resultado = {
+            'total_alumnos': self.info_general()['total_alumnos'],
+            'total_evaluaciones': total,
+            'promedio_general': None,
+            'desviacion_estandar': None,
+            'nota_minima': None,
+            'nota_maxima': None,
+        }
+        cortes = [minimo for _, minimo in CATEGORIAS_PROMEDIO if minimo is not None]
+        if NUMPY_AVAILABLE:
+            notas = self.notas
+            # Índice de categoría: 0 = Excelente ... 4 = En Riesgo
+            categorias = len(cortes) - np.searchsorted(np.array(cortes[::-1]), notas, side='right')
+            conteos = np.bincount(categorias, minlength=len(CLAVES_DISTRIBUCION)).tolist()
+            if total:
+                resultado.update(promedio_general=round(float(notas.mean()), 2),
+                                 desviacion_estandar=round(float(notas.std()), 2),
+                                 nota_minima=float(notas.min()), nota_maxima=float(notas.max()))
+        else:
+            conteos = [0] * len(CLAVES_DISTRIBUCION)
+            for nota in self.notas:
+                conteos[next((k for k, corte in enumerate(cortes) if nota >= corte), len(cortes))] += 1
+            if total:
+                media = sum(self.notas) / total
+                resultado.update(promedio_general=round(media, 2),
+                                 desviacion_estandar=round((sum((n - media) ** 2 for n in self.notas) / total) ** 0.5, 2),
+                                 nota_minima=min(self.notas), nota_maxima=max(self.notas))
+        resultado.update(zip(CLAVES_DISTRIBUCION, conteos))
+        return resultado
+
+    def como_dict(self) -> Dict:
+        """Todo el paquete de datos del reporte de curso"""
+        return {
+            'curso': self.curso,
+            'division': self.division,
+            'periodo_id': self.periodo_id,
+            'info_general': self.info_general(),
+            'promedios_materias': self.promedios_materias(),
+            'ranking': self.ranking(),
+            'distribucion': self.distribucion(),
+        }
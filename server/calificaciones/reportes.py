@@ -7,6 +7,34 @@ import mysql.connector
 from mysql.connector import Error
 from typing import List, Dict, Optional
 from ..database import crear_conexion
+from ..sentencias import registrar_sentencia
+from .reporte_datos import DatosReporteCurso
+
+# Sentencias preparadas una vez por conexión (ver server/sentencias.py)
+DATOS_CURSO = registrar_sentencia('reportes.datos_curso', """
+    SELECT 
+        a.id, CONCAT(a.apellido, ', ', a.nombre), a.dni,
+        m.id, m.nombre, c.nota
+    FROM alumnos a
+    LEFT JOIN calificaciones c ON c.alumno_id = a.id AND c.periodo_id = %s
+    LEFT JOIN materias m ON c.materia_id = m.id
+    WHERE a.curso = %s AND a.division = %s AND a.activo = TRUE
+    ORDER BY a.apellido, a.nombre
+""", "Notas de todos los alumnos de un curso en un período (reportes de curso)")
+
+MATERIAS_REPORTE_ALUMNO = registrar_sentencia('reportes.alumno_materias', """
+    SELECT 
+        m.nombre as materia,
+        ROUND(AVG(c.nota), 2) as promedio,
+        COUNT(c.nota) as evaluaciones,
+        MIN(c.nota) as nota_minima,
+        MAX(c.nota) as nota_maxima
+    FROM calificaciones c
+    JOIN materias m ON c.materia_id = m.id
+    WHERE c.alumno_id = %s AND c.periodo_id = %s
+    GROUP BY m.id, m.nombre
+    ORDER BY m.nombre
+""", "Promedio, cantidad, mínima y máxima por materia de un alumno (boletín)")
 
 class ReportesOperations:
     """Operaciones especializadas para generación de reportes"""
@@ -24,62 +52,35 @@ class ReportesOperations:
         if self.connection and self.connection.is_connected():
             self.connection.close()
     
-    def obtener_datos_reporte_curso(self, curso: str, division: str, periodo_id: int) -> Dict:
-        """Obtener datos completos para reporte de curso"""
+    def cargar_datos_curso(self, curso: str, division: str, periodo_id: int) -> Optional[DatosReporteCurso]:
+        """
+        Leer con una sola consulta todas las notas de un curso en un período.
+        Todos los agregados del reporte (PDF o Excel) salen del objeto devuelto.
+        """
         try:
             if not self.conectar():
-                return {}
-            
-            cursor = self.connection.cursor(dictionary=True)
-            
-            # Información general del curso
-            cursor.execute("""
-                SELECT 
-                    COUNT(DISTINCT a.id) as total_alumnos,
-                    COUNT(DISTINCT m.id) as total_materias,
-                    ROUND(AVG(c.nota), 2) as promedio_curso,
-                    COUNT(c.id) as total_calificaciones,
-                    COUNT(CASE WHEN c.nota >= 6.0 THEN 1 END) as aprobados,
-                    COUNT(CASE WHEN c.nota < 6.0 THEN 1 END) as desaprobados
-                FROM alumnos a
-                JOIN calificaciones c ON a.id = c.alumno_id
-                JOIN materias m ON c.materia_id = m.id
-                WHERE a.curso = %s AND a.division = %s AND c.periodo_id = %s
-            """, (curso, division, periodo_id))
-            
-            info_general = cursor.fetchone()
-            
-            # Promedios por materia
-            cursor.execute("""
-                SELECT 
-                    m.nombre as materia,
-                    ROUND(AVG(c.nota), 2) as promedio_materia,
-                    COUNT(c.nota) as evaluaciones,
-                    COUNT(CASE WHEN c.nota >= 6.0 THEN 1 END) as aprobados,
-                    COUNT(CASE WHEN c.nota < 6.0 THEN 1 END) as desaprobados
-                FROM calificaciones c
-                JOIN materias m ON c.materia_id = m.id
-                JOIN alumnos a ON c.alumno_id = a.id
-                WHERE a.curso = %s AND a.division = %s AND c.periodo_id = %s
-                GROUP BY m.id, m.nombre
-                ORDER BY promedio_materia DESC
-            """, (curso, division, periodo_id))
-            
-            promedios_materias = cursor.fetchall()
-            
-            cursor.close()
+                return None
             
-            return {
-                'info_general': info_general,
-                'promedios_materias': promedios_materias
-            }
+            filas = self.connection.ejecutar_sentencia(
+                DATOS_CURSO, (periodo_id, curso, division), diccionario=False)
+            return DatosReporteCurso.desde_filas(curso, division, periodo_id, filas)
             
         except Error as e:
-            print(f"Error al obtener datos de reporte: {e}")
-            return {}
+            print(f"Error al cargar datos del curso: {e}")
+            return None
         finally:
             self.desconectar()
     
+    def obtener_datos_reporte_curso(self, curso: str, division: str, periodo_id: int) -> Dict:
+        """Obtener datos completos para reporte de curso"""
+        datos = self.cargar_datos_curso(curso, division, periodo_id)
+        if datos is None:
+            return {}
+        return {
+            'info_general': datos.info_general(),
+            'promedios_materias': datos.promedios_materias()
+        }
+    
     def obtener_datos_reporte_alumno(self, alumno_id: int, periodo_id: int) -> Dict:
         """Obtener datos completos para reporte individual de alumno"""
         try:
@@ -101,25 +102,12 @@ class ReportesOperations:
             
             info_alumno = cursor.fetchone()
             
-            # Calificaciones por materia
-            cursor.execute("""
-                SELECT 
-                    m.nombre as materia,
-                    ROUND(AVG(c.nota), 2) as promedio,
-                    COUNT(c.nota) as evaluaciones,
-                    MIN(c.nota) as nota_minima,
-                    MAX(c.nota) as nota_maxima
-                FROM calificaciones c
-                JOIN materias m ON c.materia_id = m.id
-                WHERE c.alumno_id = %s AND c.periodo_id = %s
-                GROUP BY m.id, m.nombre
-                ORDER BY m.nombre
-            """, (alumno_id, periodo_id))
-            
-            calificaciones_materias = cursor.fetchall()
-            
             cursor.close()
             
+            # Calificaciones por materia
+            calificaciones_materias = self.connection.ejecutar_sentencia(
+                MATERIAS_REPORTE_ALUMNO, (alumno_id, periodo_id))
+            
             return {
                 'info_alumno': info_alumno,
                 'calificaciones_materias': calificaciones_materias
@@ -191,4 +179,90 @@ class ReportesOperations:
             print(f"Error al obtener datos comparativos temporales: {e}")
             return []
         finally:
-            self.desconectar()
\ No newline at end of file
+            self.desconectar()
+    
+    def obtener_cursos_con_alumnos(self) -> List[Dict]:
+        """Cursos y divisiones con la cantidad de alumnos activos de cada uno"""
+        try:
+            if not self.conectar():
+                return []
+            
+            cursor = self.connection.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT curso, division, COUNT(*) as total_alumnos
+                FROM alumnos
+                WHERE activo = TRUE
+                GROUP BY curso, division
+                ORDER BY curso, division
+            """)
+            cursos = cursor.fetchall()
+            cursor.close()
+            return cursos
+            
+        except Error as e:
+            print(f"Error al obtener cursos: {e}")
+            return []
+        finally:
+            self.desconectar()
+    
+    def obtener_datos_boletines_curso(self, curso: str, division: str, periodo_id: int) -> List[Dict]:
+        """
+        Datos del boletín de todos los alumnos de un curso con una sola consulta.
+        
+        Returns:
+            Una entrada por alumno activo (también los que no tienen notas) con
+            alumno, dni, curso, division, periodo y calificaciones: lista de
+            {materia, promedio, evaluaciones} como espera PDFManager.escribir_boletin
+        """
+        try:
+            if not self.conectar():
+                return []
+            
+            cursor = self.connection.cursor(dictionary=True)
+            cursor.execute("SELECT nombre FROM periodos_evaluacion WHERE id = %s", (periodo_id,))
+            periodo = cursor.fetchone()
+            nombre_periodo = periodo['nombre'] if periodo else str(periodo_id)
+            
+            cursor.execute("""
+                SELECT 
+                    a.id as alumno_id,
+                    CONCAT(a.apellido, ', ', a.nombre) as alumno,
+                    a.dni, a.curso, a.division,
+                    m.nombre as materia,
+                    ROUND(AVG(c.nota), 2) as promedio,
+                    COUNT(c.nota) as evaluaciones
+                FROM alumnos a
+                LEFT JOIN calificaciones c ON c.alumno_id = a.id AND c.periodo_id = %s
+                LEFT JOIN materias m ON c.materia_id = m.id
+                WHERE a.curso = %s AND a.division = %s AND a.activo = TRUE
+                GROUP BY a.id, a.apellido, a.nombre, a.dni, a.curso, a.division, m.id, m.nombre
+                ORDER BY a.apellido, a.nombre, m.nombre
+            """, (periodo_id, curso, division))
+            
+            boletines = {}
+            for fila in cursor.fetchall():
+                boletin = boletines.get(fila['alumno_id'])
+                if boletin is None:
+                    boletin = boletines[fila['alumno_id']] = {
+                        'alumno_id': fila['alumno_id'],
+                        'alumno': fila['alumno'],
+                        'dni': fila['dni'],
+                        'curso': fila['curso'],
+                        'division': fila['division'],
+                        'periodo': nombre_periodo,
+                        'calificaciones': [],
+                    }
+                if fila['materia'] is not None:
+                    boletin['calificaciones'].append({
+                        'materia': fila['materia'],
+                        'promedio': float(fila['promedio']),
+                        'evaluaciones': fila['evaluaciones'],
+                    })
+            cursor.close()
+            return list(boletines.values())
+            
+        except Error as e:
+            print(f"Error al obtener datos de boletines: {e}")
+            return []
+        finally:
+            self.desconectar()
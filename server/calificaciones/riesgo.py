@@ -0,0 +1,471 @@
+"""
+Motor de Riesgo Académico para el Sistema de Calificaciones
+GESJ - Plataforma de Gestión Educativa
+
+Arma una matriz de características por alumno (promedio del período,
+pendiente de la tendencia entre períodos del ciclo lectivo, materias
+desaprobadas, porcentaje de asistencia y ausencias recientes) y puntúa a
+toda la escuela en una sola pasada vectorizada con NumPy. El puntaje va de
+0 a 100 y se clasifica en los niveles de NIVELES_RIESGO.
+
+Después de una evaluación completa, reevaluar() vuelve a cargar y puntuar
+sólo los alumnos cuyas calificaciones o asistencia cambiaron desde
+entonces (según fecha_modificacion), o los que se le indiquen.
+"""
+
+import threading
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from mysql.connector import Error
+from ..database import crear_conexion
+from ..schema_cache import obtener_capacidades
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Columnas de la matriz de características, en orden
+CARACTERISTICAS = ('promedio', 'pendiente', 'materias_desaprobadas', 'asistencia', 'ausencias_recientes')
+
+# Peso de cada característica en el puntaje (se normalizan sobre las disponibles)
+PESOS_RIESGO = {
+    'promedio': 0.35,
+    'pendiente': 0.15,
+    'materias_desaprobadas': 0.20,
+    'asistencia': 0.20,
+    'ausencias_recientes': 0.10,
+}
+
+# Valores a partir de los cuales cada característica no aporta riesgo (0)
+# y a partir de los cuales aporta el máximo (1); en el medio, lineal
+CRITERIOS_RIESGO = {
+    'nota_aprobacion': 6.0,
+    'promedio_sin_riesgo': 7.0,
+    'promedio_riesgo_maximo': 4.0,
+    'caida_maxima': 1.5,                 # Puntos de promedio perdidos por período
+    'materias_desaprobadas_maximo': 3,
+    'asistencia_sin_riesgo': 90.0,
+    'asistencia_riesgo_maxima': 70.0,
+    'ausencias_recientes_maximo': 5,
+    'dias_recientes': 14,
+}
+
+# Puntaje mínimo (0-100) de cada nivel, de mayor a menor
+NIVELES_RIESGO = (
+    ('CRÍTICO', 70.0),
+    ('ALTO', 50.0),
+    ('MODERADO', 30.0),
+)
+
+# Más alumnos modificados que esto y conviene evaluar la escuela completa
+MAXIMO_REEVALUACION = 1000
+
+
+class RiesgoOperations:
+    """Evaluación de riesgo académico de todos los alumnos activos"""
+
+    def __init__(self, pesos: Dict[str, float] = None, criterios: Dict = None,
+                 niveles=None):
+        self.connection = None
+        self.pesos = dict(PESOS_RIESGO, **(pesos or {}))
+        self.criterios = dict(CRITERIOS_RIESGO, **(criterios or {}))
+        self.niveles = tuple(niveles or NIVELES_RIESGO)
+
+        # Estado de la última evaluación, base de la reevaluación incremental
+        self._lock = threading.Lock()
+        self._periodo_id = None
+        self._fecha_referencia = None
+        self._marca = None
+        self._ids = None
+        self._alumnos: List[Dict] = []
+        self._caracteristicas = None
+        self._puntajes = None
+
+    def conectar(self):
+        """Establecer conexión a la base de datos"""
+        self.connection = crear_conexion()
+        return self.connection is not None
+
+    def desconectar(self):
+        """Cerrar conexión a la base de datos"""
+        if self.connection and self.connection.is_connected():
+            self.connection.close()
+
+    def evaluar(self, periodo_id: int, fecha_referencia: date = None,
+                nivel_minimo: str = 'MODERADO') -> List[Dict]:
+        """
+        Cargar y puntuar a todos los alumnos activos en el período.
+
+        Args:
+            periodo_id: Período a evaluar (la tendencia usa los anteriores del mismo ciclo)
+            fecha_referencia: Fin de la ventana de ausencias recientes (por defecto hoy,
+                o el fin del período si ya terminó)
+            nivel_minimo: Nivel mínimo a devolver; None devuelve todos los alumnos
+
+        Returns:
+            Alumnos ordenados por puntaje descendente
+        """
+        if not NUMPY_AVAILABLE:
+            print("⚠️ NumPy no está disponible. Instale con: pip install numpy")
+            return []
+
+        try:
+            if not self.conectar():
+                return []
+
+            cursor = self.connection.cursor()
+            periodo = self._obtener_periodo(cursor, periodo_id)
+            if not periodo:
+                cursor.close()
+                return []
+
+            fecha_referencia = fecha_referencia or min(date.today(), periodo['fecha_fin'])
+            marca = self._obtener_marca(cursor)
+            alumnos, ids, caracteristicas = self._cargar(cursor, periodo, fecha_referencia)
+            cursor.close()
+
+            puntajes = self._puntuar(caracteristicas)
+            with self._lock:
+                self._periodo_id = periodo_id
+                self._fecha_referencia = fecha_referencia
+                self._marca = marca
+                self._ids = ids
+                self._alumnos = alumnos
+                self._caracteristicas = caracteristicas
+                self._puntajes = puntajes
+            return self.obtener_resultados(nivel_minimo)
+
+        except Error as e:
+            print(f"Error al evaluar riesgo académico: {e}")
+            return []
+        finally:
+            self.desconectar()
+
+    def reevaluar(self, alumno_ids: List[int] = None, nivel_minimo: str = 'MODERADO') -> List[Dict]:
+        """
+        Volver a puntuar sólo los alumnos modificados desde la última evaluación.
+
+        Args:
+            alumno_ids: Alumnos a reevaluar; None detecta los que tienen calificaciones
+                o asistencia modificadas (las bajas de registros no se detectan)
+            nivel_minimo: Nivel mínimo de la lista completa que se devuelve
+
+        Returns:
+            Resultado actualizado de todos los alumnos, como evaluar()
+        """
+        if self._periodo_id is None:
+            print("⚠️ No hay una evaluación previa: use evaluar(periodo_id) primero")
+            return []
+        if not NUMPY_AVAILABLE:
+            return []
+
+        try:
+            if not self.conectar():
+                return []
+
+            cursor = self.connection.cursor()
+            periodo = self._obtener_periodo(cursor, self._periodo_id)
+            if not periodo:
+                cursor.close()
+                return []
+
+            # Con otro día cambia la ventana de ausencias de todos los alumnos
+            fecha_referencia = min(date.today(), periodo['fecha_fin'])
+            if fecha_referencia != self._fecha_referencia and alumno_ids is None:
+                cursor.close()
+                self.desconectar()
+                return self.evaluar(self._periodo_id, nivel_minimo=nivel_minimo)
+
+            marca = self._obtener_marca(cursor)
+            if alumno_ids is None:
+                alumno_ids = self._obtener_modificados(cursor, self._marca)
+            if len(alumno_ids) > MAXIMO_REEVALUACION:
+                cursor.close()
+                self.desconectar()
+                return self.evaluar(self._periodo_id, self._fecha_referencia, nivel_minimo)
+
+            if alumno_ids:
+                alumnos, ids, caracteristicas = self._cargar(
+                    cursor, periodo, self._fecha_referencia, alumno_ids)
+                self._reemplazar(alumno_ids, alumnos, ids, caracteristicas)
+            cursor.close()
+            self._marca = marca
+            return self.obtener_resultados(nivel_minimo)
+
+        except Error as e:
+            print(f"Error al reevaluar riesgo académico: {e}")
+            return []
+        finally:
+            self.desconectar()
+
+    def obtener_resultados(self, nivel_minimo: str = 'MODERADO') -> List[Dict]:
+        """Resultado de la última evaluación, ordenado por puntaje descendente"""
+        with self._lock:
+            if self._puntajes is None:
+                return []
+            umbral = self._umbral_nivel(nivel_minimo)
+            orden = np.argsort(-self._puntajes, kind='stable')
+            orden = orden[self._puntajes[orden] >= umbral]
+            return [self._resultado(int(fila)) for fila in orden]
+
+    # ==================== PUNTAJE VECTORIZADO ====================
+
+    def _puntuar(self, caracteristicas) -> 'np.ndarray':
+        """Puntaje 0-100 de cada fila de la matriz de características"""
+        if len(caracteristicas) == 0:
+            return np.zeros(0)
+        componentes = self._componentes(caracteristicas)
+        pesos = np.array([self.pesos[nombre] for nombre in CARACTERISTICAS])
+
+        disponibles = ~np.isnan(componentes)
+        suma = np.where(disponibles, componentes, 0.0) @ pesos
+        peso_disponible = disponibles @ pesos
+        with np.errstate(invalid='ignore', divide='ignore'):
+            puntajes = np.where(peso_disponible > 0, suma / peso_disponible, 0.0)
+        return np.round(puntajes * 100, 1)
+
+    def _componentes(self, caracteristicas) -> 'np.ndarray':
+        """Riesgo 0-1 aportado por cada característica (NaN si no hay datos)"""
+        c = self.criterios
+        promedio, pendiente, desaprobadas, asistencia, ausencias = caracteristicas.T
+        componentes = np.column_stack((
+            (c['promedio_sin_riesgo'] - promedio) / (c['promedio_sin_riesgo'] - c['promedio_riesgo_maximo']),
+            -pendiente / c['caida_maxima'],
+            desaprobadas / c['materias_desaprobadas_maximo'],
+            (c['asistencia_sin_riesgo'] - asistencia) / (c['asistencia_sin_riesgo'] - c['asistencia_riesgo_maxima']),
+            ausencias / c['ausencias_recientes_maximo'],
+        ))
+        return np.clip(componentes, 0.0, 1.0)
+
+    def _umbral_nivel(self, nivel: Optional[str]) -> float:
+        if nivel is None:
+            return -1.0
+        for nombre, minimo in self.niveles:
+            if nombre == nivel:
+                return minimo
+        raise ValueError(f"Nivel de riesgo desconocido: {nivel}")
+
+    def _nivel(self, puntaje: float) -> Optional[str]:
+        for nombre, minimo in self.niveles:
+            if puntaje >= minimo:
+                return nombre
+        return None
+
+    def _resultado(self, fila: int) -> Dict:
+        """Armar el diccionario de un alumno a partir de su fila en la matriz"""
+        valores = self._caracteristicas[fila]
+        puntaje = float(self._puntajes[fila])
+        resultado = dict(self._alumnos[fila])
+        resultado['puntaje'] = puntaje
+        resultado['nivel'] = self._nivel(puntaje)
+        for nombre, valor in zip(CARACTERISTICAS, valores):
+            resultado[nombre] = None if np.isnan(valor) else round(float(valor), 2)
+        resultado['motivos'] = self._motivos(resultado, self._componentes(valores[np.newaxis, :])[0])
+        return resultado
+
+    def _motivos(self, resultado: Dict, componentes) -> List[str]:
+        """Descripción de las características que más aportan al riesgo"""
+        textos = {
+            'promedio': lambda r: f"Promedio bajo ({r['promedio']:.2f})",
+            'pendiente': lambda r: f"Promedio en descenso ({r['pendiente']:+.2f} por período)",
+            'materias_desaprobadas': lambda r: f"{int(r['materias_desaprobadas'])} materias desaprobadas",
+            'asistencia': lambda r: f"Asistencia baja ({r['asistencia']:.1f}%)",
+            'ausencias_recientes': lambda r: (f"{int(r['ausencias_recientes'])} ausencias en los "
+                                              f"últimos {self.criterios['dias_recientes']} días"),
+        }
+        return [textos[nombre](resultado)
+                for nombre, componente in zip(CARACTERISTICAS, componentes)
+                if not np.isnan(componente) and componente >= 0.5]
+
+    # ==================== CARGA DE CARACTERÍSTICAS ====================
+
+    def _cargar(self, cursor, periodo: Dict, fecha_referencia: date, alumno_ids: List[int] = None):
+        """Alumnos activos (ordenados por id), sus ids y su matriz de características"""
+        filtro, parametros = "", ()
+        if alumno_ids is not None:
+            filtro = f" AND a.id IN ({', '.join(['%s'] * len(alumno_ids))})"
+            parametros = tuple(alumno_ids)
+
+        cursor.execute(f"""
+            SELECT a.id, CONCAT(a.apellido, ', ', a.nombre), a.curso, a.division
+            FROM alumnos a
+            WHERE a.activo = TRUE{filtro}
+            ORDER BY a.id
+        """, parametros)
+        alumnos = [{'alumno_id': fila[0], 'alumno': fila[1], 'curso': fila[2], 'division': fila[3]}
+                   for fila in cursor.fetchall()]
+        ids = np.array([alumno['alumno_id'] for alumno in alumnos], dtype=np.int64)
+
+        caracteristicas = np.full((len(ids), len(CARACTERISTICAS)), np.nan)
+        if len(ids) == 0:
+            return alumnos, ids, caracteristicas
+
+        self._cargar_notas(cursor, periodo, ids, filtro, parametros, caracteristicas)
+        self._cargar_asistencia(cursor, periodo, ids, filtro, parametros, caracteristicas)
+        self._cargar_ausencias(cursor, fecha_referencia, ids, filtro, parametros, caracteristicas)
+        return alumnos, ids, caracteristicas
+
+    def _cargar_notas(self, cursor, periodo, ids, filtro, parametros, caracteristicas):
+        """Promedio, pendiente y materias desaprobadas a partir de los promedios por materia"""
+        periodos = periodo['periodos']
+        marcadores = ', '.join(['%s'] * len(periodos))
+        cursor.execute(f"""
+            SELECT c.alumno_id, c.periodo_id, AVG(c.nota)
+            FROM calificaciones c
+            JOIN alumnos a ON c.alumno_id = a.id
+            WHERE c.periodo_id IN ({marcadores}) AND a.activo = TRUE{filtro}
+            GROUP BY c.alumno_id, c.periodo_id, c.materia_id
+        """, tuple(periodos) + parametros)
+        filas = np.array(cursor.fetchall(), dtype=float).reshape(-1, 3)
+
+        filas_alumno = self._posiciones(ids, filas[:, 0])
+        validas = filas_alumno >= 0
+        filas_alumno = filas_alumno[validas]
+        # Los períodos están en orden cronológico, no necesariamente de id
+        periodos_ids = np.array(periodos, dtype=np.int64)
+        por_id = np.argsort(periodos_ids)
+        columnas = por_id[np.searchsorted(periodos_ids[por_id], filas[validas, 1].astype(np.int64))]
+        notas = filas[validas, 2]
+
+        # Promedio general de cada alumno en cada período (media de sus materias)
+        forma = (len(ids), len(periodos))
+        suma = np.zeros(forma)
+        cantidad = np.zeros(forma)
+        np.add.at(suma, (filas_alumno, columnas), notas)
+        np.add.at(cantidad, (filas_alumno, columnas), 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            promedios = np.where(cantidad > 0, suma / cantidad, np.nan)
+
+        # El período evaluado es la última columna
+        actual = columnas == len(periodos) - 1
+        desaprobadas = np.zeros(len(ids))
+        np.add.at(desaprobadas, filas_alumno[actual],
+                  notas[actual] < self.criterios['nota_aprobacion'])
+
+        caracteristicas[:, 0] = promedios[:, -1]
+        caracteristicas[:, 1] = self._pendientes(promedios)
+        caracteristicas[:, 2] = np.where(np.isnan(promedios[:, -1]), np.nan, desaprobadas)
+
+    def _pendientes(self, promedios) -> 'np.ndarray':
+        """Pendiente de mínimos cuadrados de cada fila, ignorando períodos sin notas"""
+        x = np.arange(promedios.shape[1], dtype=float)
+        presentes = ~np.isnan(promedios)
+        y = np.where(presentes, promedios, 0.0)
+
+        n = presentes.sum(axis=1)
+        suma_x = presentes @ x
+        suma_xx = presentes @ (x * x)
+        suma_y = y.sum(axis=1)
+        suma_xy = y @ x
+        denominador = n * suma_xx - suma_x ** 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pendientes = (n * suma_xy - suma_x * suma_y) / denominador
+        return np.where((n >= 2) & (denominador > 0), pendientes, np.nan)
+
+    def _cargar_asistencia(self, cursor, periodo, ids, filtro, parametros, caracteristicas):
+        """Porcentaje de presentes en el período, del resumen si existe"""
+        capacidades = obtener_capacidades()
+        if capacidades.tiene_tabla('asistencia_resumen_periodo'):
+            cursor.execute(f"""
+                SELECT r.alumno_id, r.presentes * 100.0 / NULLIF(r.total_registros, 0)
+                FROM asistencia_resumen_periodo r
+                JOIN alumnos a ON r.alumno_id = a.id
+                WHERE r.periodo_id = %s AND a.activo = TRUE{filtro}
+            """, (periodo['id'],) + parametros)
+        elif capacidades.tiene_tabla('asistencia_diaria'):
+            cursor.execute(f"""
+                SELECT ad.alumno_id, SUM(ad.estado = 'Presente') * 100.0 / COUNT(*)
+                FROM asistencia_diaria ad
+                JOIN alumnos a ON ad.alumno_id = a.id
+                WHERE ad.fecha BETWEEN %s AND %s AND a.activo = TRUE{filtro}
+                GROUP BY ad.alumno_id
+            """, (periodo['fecha_inicio'], periodo['fecha_fin']) + parametros)
+        else:
+            return
+        self._asignar(caracteristicas, 3, ids, cursor.fetchall())
+
+    def _cargar_ausencias(self, cursor, fecha_referencia, ids, filtro, parametros, caracteristicas):
+        """Ausencias en los últimos días; sin la tabla de asistencia queda sin datos"""
+        if not obtener_capacidades().tiene_tabla('asistencia_diaria'):
+            return
+        desde = fecha_referencia - timedelta(days=self.criterios['dias_recientes'] - 1)
+        caracteristicas[:, 4] = 0.0
+        cursor.execute(f"""
+            SELECT ad.alumno_id, COUNT(*)
+            FROM asistencia_diaria ad
+            JOIN alumnos a ON ad.alumno_id = a.id
+            WHERE ad.fecha BETWEEN %s AND %s AND ad.estado = 'Ausente'
+            AND a.activo = TRUE{filtro}
+            GROUP BY ad.alumno_id
+        """, (desde, fecha_referencia) + parametros)
+        self._asignar(caracteristicas, 4, ids, cursor.fetchall())
+
+    def _asignar(self, caracteristicas, columna: int, ids, filas):
+        """Copiar pares (alumno_id, valor) a una columna de la matriz"""
+        if not filas:
+            return
+        valores = np.array(filas, dtype=float).reshape(-1, 2)
+        posiciones = self._posiciones(ids, valores[:, 0])
+        validas = posiciones >= 0
+        caracteristicas[posiciones[validas], columna] = valores[validas, 1]
+
+    @staticmethod
+    def _posiciones(ids, alumno_ids) -> 'np.ndarray':
+        """Fila de cada alumno_id en ids (ordenado), o -1 si no está"""
+        alumno_ids = alumno_ids.astype(np.int64)
+        if len(ids) == 0:
+            return np.full(len(alumno_ids), -1)
+        posiciones = np.minimum(np.searchsorted(ids, alumno_ids), len(ids) - 1)
+        return np.where(ids[posiciones] == alumno_ids, posiciones, -1)
+
+    # ==================== ESTADO INCREMENTAL ====================
+
+    def _reemplazar(self, alumno_ids: List[int], alumnos: List[Dict], ids, caracteristicas):
+        """Sustituir las filas de los alumnos reevaluados y puntuar sólo esas"""
+        puntajes = self._puntuar(caracteristicas)
+        with self._lock:
+            conservar = ~np.isin(self._ids, np.array(alumno_ids, dtype=np.int64))
+            todos_ids = np.concatenate((self._ids[conservar], ids))
+            orden = np.argsort(todos_ids, kind='stable')
+            previos = [alumno for alumno, conservado in zip(self._alumnos, conservar) if conservado]
+
+            self._ids = todos_ids[orden]
+            self._alumnos = [(previos + alumnos)[i] for i in orden]
+            self._caracteristicas = np.concatenate((self._caracteristicas[conservar], caracteristicas))[orden]
+            self._puntajes = np.concatenate((self._puntajes[conservar], puntajes))[orden]
+
+    def _obtener_periodo(self, cursor, periodo_id: int) -> Optional[Dict]:
+        """Datos del período y ids de los períodos del ciclo hasta él (en orden)"""
+        cursor.execute("""
+            SELECT id, fecha_inicio, fecha_fin, ano_lectivo
+            FROM periodos_evaluacion WHERE id = %s
+        """, (periodo_id,))
+        fila = cursor.fetchone()
+        if not fila:
+            return None
+        periodo = {'id': fila[0], 'fecha_inicio': fila[1], 'fecha_fin': fila[2], 'ano_lectivo': fila[3]}
+
+        cursor.execute("""
+            SELECT id FROM periodos_evaluacion
+            WHERE ano_lectivo = %s AND (fecha_inicio < %s OR id = %s)
+            ORDER BY fecha_inicio, id
+        """, (periodo['ano_lectivo'], periodo['fecha_inicio'], periodo_id))
+        anteriores = [fila[0] for fila in cursor.fetchall() if fila[0] != periodo_id]
+        periodo['periodos'] = anteriores + [periodo_id]
+        return periodo
+
+    def _obtener_marca(self, cursor):
+        """Hora del servidor antes de leer; lo modificado desde entonces se reevalúa"""
+        cursor.execute("SELECT NOW()")
+        return cursor.fetchone()[0]
+
+    def _obtener_modificados(self, cursor, desde) -> List[int]:
+        """Alumnos con calificaciones o asistencia modificadas desde la marca"""
+        consultas = ["SELECT alumno_id FROM calificaciones WHERE fecha_modificacion >= %s"]
+        if obtener_capacidades().tiene_tabla('asistencia_diaria'):
+            consultas.append("SELECT alumno_id FROM asistencia_diaria WHERE fecha_modificacion >= %s")
+        cursor.execute(" UNION ".join(consultas), (desde,) * len(consultas))
+        return [fila[0] for fila in cursor.fetchall()]
@@ -0,0 +1,432 @@
+"""
+Series de Tendencias por Alumno y Materia
+GESJ - Plataforma de Gestión Educativa
+
+Guarda en memoria, para cada alumno y materia, una serie con un punto por
+período y otro por mes (suma de notas en centésimos y cantidad, en arrays
+compactos) y las pendientes de ambas ya calculadas. Las ventanas de
+tendencias y trayectorias piden las series de un curso entero: se cargan
+con una sola consulta agrupada y las siguientes lecturas salen de memoria.
+
+Las notas nuevas registradas por la aplicación se agregan a las series
+cargadas sin consultar la base; las notas modificadas (o cambiadas por
+otros procesos, según fecha_modificacion) hacen recargar sólo la serie del
+alumno afectado.
+"""
+
+import threading
+import time
+from array import array
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from mysql.connector import Error
+from ..database import crear_conexion
+
+# Configuración de las series en memoria
+TENDENCIAS_CONFIG = {
+    'segundos_verificacion': 60,   # Cada cuánto se buscan notas modificadas fuera de la aplicación
+    'segundos_vigencia': 1800,     # Después de esto se descarta todo (bajas, cambios de curso)
+}
+
+# Pendiente (puntos de promedio por punto de la serie) considerada estable
+PENDIENTE_ESTABLE = 0.1
+
+
+def _promedio(centesimos: int, cantidad: int) -> float:
+    """Promedio redondeado a dos decimales hacia arriba en el medio, como ROUND(AVG()) de MySQL"""
+    return ((2 * centesimos + cantidad) // (2 * cantidad)) / 100
+
+
+def _pendiente(xs: List[float], ys: List[float]) -> Optional[float]:
+    """Pendiente de la recta de mínimos cuadrados, o None con menos de dos puntos"""
+    n = len(xs)
+    if n < 2:
+        return None
+    media_x = sum(xs) / n
+    media_y = sum(ys) / n
+    varianza = sum((x - media_x) ** 2 for x in xs)
+    if not varianza:
+        return None
+    return round(sum((x - media_x) * (y - media_y) for x, y in zip(xs, ys)) / varianza, 3)
+
+
+def tendencia_pendiente(pendiente: Optional[float]) -> str:
+    """Flecha para mostrar una pendiente"""
+    if pendiente is None or abs(pendiente) < PENDIENTE_ESTABLE:
+        return "→"
+    return "↗" if pendiente > 0 else "↘"
+
+
+class SerieTendencia:
+    """Notas de un alumno en una materia, por período (en orden) y por mes"""
+
+    __slots__ = ('periodos', 'centesimos_periodo', 'notas_periodo', 'inicio_periodo',
+                 'meses', 'centesimos_mes', 'notas_mes', 'pendiente_periodos', 'pendiente_meses')
+
+    def __init__(self):
+        self.periodos = array('l')            # periodo_id, en el orden de los períodos
+        self.centesimos_periodo = array('q')
+        self.notas_periodo = array('l')
+        self.inicio_periodo = array('l')      # Primera fecha de evaluación (ordinal)
+        self.meses = array('l')               # año * 12 + mes - 1, ascendente
+        self.centesimos_mes = array('q')
+        self.notas_mes = array('l')
+        self.pendiente_periodos = None
+        self.pendiente_meses = None
+
+    def agregar(self, periodo_id: int, orden_periodo: Dict[int, int], fecha: date,
+                centesimos: int, cantidad: int = 1):
+        """Sumar notas a los puntos del período y del mes (sin recalcular pendientes)"""
+        orden = orden_periodo.get(periodo_id, len(orden_periodo))
+        for i, existente in enumerate(self.periodos):
+            if existente == periodo_id:
+                self.centesimos_periodo[i] += centesimos
+                self.notas_periodo[i] += cantidad
+                self.inicio_periodo[i] = min(self.inicio_periodo[i], fecha.toordinal())
+                break
+            if orden_periodo.get(existente, len(orden_periodo)) > orden:
+                self._insertar_periodo(i, periodo_id, fecha, centesimos, cantidad)
+                break
+        else:
+            self._insertar_periodo(len(self.periodos), periodo_id, fecha, centesimos, cantidad)
+
+        mes = fecha.year * 12 + fecha.month - 1
+        for i, existente in enumerate(self.meses):
+            if existente == mes:
+                self.centesimos_mes[i] += centesimos
+                self.notas_mes[i] += cantidad
+                return
+            if existente > mes:
+                break
+        else:
+            i = len(self.meses)
+        self.meses.insert(i, mes)
+        self.centesimos_mes.insert(i, centesimos)
+        self.notas_mes.insert(i, cantidad)
+
+    def _insertar_periodo(self, i: int, periodo_id: int, fecha: date, centesimos: int, cantidad: int):
+        self.periodos.insert(i, periodo_id)
+        self.centesimos_periodo.insert(i, centesimos)
+        self.notas_periodo.insert(i, cantidad)
+        self.inicio_periodo.insert(i, fecha.toordinal())
+
+    def calcular_pendientes(self):
+        """Pendiente entre períodos consecutivos y por mes transcurrido"""
+        self.pendiente_periodos = _pendiente(
+            list(range(len(self.periodos))),
+            [_promedio(c, n) for c, n in zip(self.centesimos_periodo, self.notas_periodo)])
+        self.pendiente_meses = _pendiente(
+            [float(mes) for mes in self.meses],
+            [_promedio(c, n) for c, n in zip(self.centesimos_mes, self.notas_mes)])
+
+    def puntos_periodo(self, nombres_periodo: Dict[int, str]) -> List[Dict]:
+        """Un punto por período, con el formato de obtener_tendencias_promedios"""
+        return [{
+            'periodo_id': periodo_id,
+            'periodo': nombres_periodo.get(periodo_id, str(periodo_id)),
+            'promedio': _promedio(centesimos, cantidad),
+            'cantidad_notas': cantidad,
+            'mes_año': date.fromordinal(inicio).strftime('%m/%Y'),
+        } for periodo_id, centesimos, cantidad, inicio in zip(
+            self.periodos, self.centesimos_periodo, self.notas_periodo, self.inicio_periodo)]
+
+    def puntos_mes(self) -> List[Dict]:
+        """Un punto por mes con notas"""
+        return [{
+            'mes': f"{mes % 12 + 1:02d}/{mes // 12}",
+            'promedio': _promedio(centesimos, cantidad),
+            'cantidad_notas': cantidad,
+        } for mes, centesimos, cantidad in zip(self.meses, self.centesimos_mes, self.notas_mes)]
+
+    def como_dict(self, nombres_periodo: Dict[int, str]) -> Dict:
+        return {
+            'periodos': self.puntos_periodo(nombres_periodo),
+            'meses': self.puntos_mes(),
+            'pendiente_periodos': self.pendiente_periodos,
+            'pendiente_meses': self.pendiente_meses,
+            'tendencia': tendencia_pendiente(self.pendiente_periodos),
+        }
+
+
+class AlmacenTendencias:
+    """Series de todos los alumnos cargados: {alumno_id: {materia_id: SerieTendencia}}"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.series: Dict[int, Dict[int, SerieTendencia]] = {}
+        self.cursos: Dict[Tuple[str, str], List[int]] = {}
+        self.orden_periodo: Dict[int, int] = {}
+        self.nombres_periodo: Dict[int, str] = {}
+        self.marca = None
+        self.verificado = 0.0
+        self.creado = time.monotonic()
+        # Cada reemplazar() incrementa la versión y la anota en sus alumnos
+        self.version = 0
+        self.version_alumno: Dict[int, int] = {}
+
+    def limpiar(self):
+        with self.lock:
+            self.series.clear()
+            self.version_alumno.clear()
+            self.cursos.clear()
+            self.orden_periodo.clear()
+            self.nombres_periodo.clear()
+            self.marca = None
+            self.verificado = 0.0
+            self.creado = time.monotonic()
+
+    def reemplazar(self, alumno_ids: Iterable[int], filas: Iterable[Tuple]):
+        """
+        Reconstruir las series de los alumnos indicados
+
+        Args:
+            alumno_ids: Alumnos cargados (quedan con series vacías si no tienen notas)
+            filas: (alumno_id, materia_id, periodo_id, primera_fecha, centesimos, cantidad)
+                agrupadas por alumno, materia, período y mes
+        """
+        with self.lock:
+            nuevas = {alumno_id: {} for alumno_id in alumno_ids}
+            for alumno_id, materia_id, periodo_id, fecha, centesimos, cantidad in filas:
+                serie = nuevas.setdefault(alumno_id, {}).get(materia_id)
+                if serie is None:
+                    serie = nuevas[alumno_id][materia_id] = SerieTendencia()
+                serie.agregar(periodo_id, self.orden_periodo, fecha, int(centesimos), int(cantidad))
+            for materias in nuevas.values():
+                for serie in materias.values():
+                    serie.calcular_pendientes()
+            self.series.update(nuevas)
+            self.version += 1
+            for alumno_id in nuevas:
+                self.version_alumno[alumno_id] = self.version
+
+    def agregar_notas(self, materia_id: int, periodo_id: int, fecha: date,
+                      notas: Iterable[Tuple[int, float]], version: int = None) -> bool:
+        """
+        Agregar notas nuevas a las series ya cargadas
+
+        Args:
+            version: self.version tomada antes del commit de las notas. Una
+                serie cargada después pudo leerlas ya de la base: se descarta
+                en lugar de sumarlas dos veces
+
+        Returns:
+            False si el período es desconocido (hay que recargar los alumnos)
+        """
+        with self.lock:
+            if periodo_id not in self.orden_periodo:
+                return False
+            for alumno_id, nota in notas:
+                materias = self.series.get(alumno_id)
+                if materias is None:
+                    continue
+                if version is not None and self.version_alumno.get(alumno_id, 0) > version:
+                    self.series.pop(alumno_id, None)
+                    continue
+                serie = materias.get(materia_id)
+                if serie is None:
+                    serie = materias[materia_id] = SerieTendencia()
+                serie.agregar(periodo_id, self.orden_periodo, fecha, int(round(float(nota) * 100)))
+                serie.calcular_pendientes()
+            return True
+
+    def descartar_alumnos(self, alumno_ids: Iterable[int]):
+        """Olvidar series para que se recarguen en la próxima lectura"""
+        with self.lock:
+            for alumno_id in alumno_ids:
+                self.series.pop(alumno_id, None)
+                self.version_alumno.pop(alumno_id, None)
+
+    def obtener(self, alumno_id: int, materia_id: int = None) -> Dict[int, Dict]:
+        """{materia_id: serie como dict} de un alumno cargado"""
+        with self.lock:
+            materias = self.series.get(alumno_id, {})
+            return {mid: serie.como_dict(self.nombres_periodo) for mid, serie in materias.items()
+                    if materia_id is None or mid == materia_id}
+
+
+_almacen = None
+_almacen_lock = threading.Lock()
+
+
+def obtener_almacen_tendencias() -> AlmacenTendencias:
+    """Almacén de series compartido por el proceso"""
+    global _almacen
+    if _almacen is None:
+        with _almacen_lock:
+            if _almacen is None:
+                _almacen = AlmacenTendencias()
+    return _almacen
+
+
+class TendenciasOperations:
+    """Carga y mantenimiento de las series de tendencias"""
+
+    def __init__(self):
+        self.connection = None
+        self.almacen = obtener_almacen_tendencias()
+
+    def conectar(self):
+        """Establecer conexión a la base de datos"""
+        self.connection = crear_conexion()
+        return self.connection is not None
+
+    def desconectar(self):
+        """Cerrar conexión a la base de datos"""
+        if self.connection and self.connection.is_connected():
+            self.connection.close()
+
+    # ==================== CONSULTAS ====================
+
+    def obtener_tendencias_curso(self, curso: str, division: str,
+                                 materia_id: int = None) -> Dict[int, Dict[int, Dict]]:
+        """
+        Series de todos los alumnos activos de un curso
+
+        Returns:
+            {alumno_id: {materia_id: {'periodos', 'meses', 'pendiente_periodos',
+            'pendiente_meses', 'tendencia'}}}
+        """
+        with self.almacen.lock:
+            if not self._preparar(curso=(curso, division)):
+                return {}
+            return {alumno_id: self.almacen.obtener(alumno_id, materia_id)
+                    for alumno_id in self.almacen.cursos.get((curso, division), [])}
+
+    def obtener_tendencias_alumno(self, alumno_id: int, materia_id: int = None) -> Dict[int, Dict]:
+        """Series de un alumno: {materia_id: serie}"""
+        with self.almacen.lock:
+            if not self._preparar(alumno_ids=[alumno_id]):
+                return {}
+            return self.almacen.obtener(alumno_id, materia_id)
+
+    def obtener_puntos_periodo(self, materia_id: int, alumno_id: int) -> List[Dict]:
+        """Promedio por período de un alumno en una materia (periodo, promedio,
+        cantidad_notas, mes_año), en orden cronológico"""
+        serie = self.obtener_tendencias_alumno(alumno_id, materia_id).get(materia_id)
+        return serie['periodos'] if serie else []
+
+    # ==================== MANTENIMIENTO ====================
+
+    @staticmethod
+    def version_carga() -> int:
+        """Versión de las series; se toma antes del commit y se pasa a registrar_notas"""
+        almacen = obtener_almacen_tendencias()
+        with almacen.lock:
+            return almacen.version
+
+    @staticmethod
+    def registrar_notas(materia_id: int, periodo_id: int, fecha: date,
+                        notas: List[Tuple[int, float]], nuevas: bool = True, version: int = None):
+        """
+        Reflejar en las series las notas recién guardadas
+
+        Args:
+            notas: (alumno_id, nota) guardadas
+            nuevas: True si todas fueron inserciones; si alguna reemplazó una
+                nota existente las series de esos alumnos se recargan
+            version: version_carga() de antes del commit; las series cargadas
+                entre el commit y esta llamada ya incluyen las notas y se recargan
+        """
+        almacen = obtener_almacen_tendencias()
+        # La fecha puede llegar como texto desde la interfaz: en ese caso se recarga
+        if (not nuevas or not isinstance(fecha, date)
+                or not almacen.agregar_notas(materia_id, periodo_id, fecha, notas, version)):
+            almacen.descartar_alumnos(alumno_id for alumno_id, _ in notas)
+
+    def invalidar(self):
+        """Descartar todas las series"""
+        self.almacen.limpiar()
+
+    def _preparar(self, curso: Tuple[str, str] = None, alumno_ids: List[int] = None) -> bool:
+        """Verificar cambios y cargar lo que falte del curso o de los alumnos (con el lock tomado)"""
+        almacen = self.almacen
+        ahora = time.monotonic()
+        if ahora - almacen.creado >= TENDENCIAS_CONFIG['segundos_vigencia']:
+            almacen.limpiar()
+
+        verificar = (almacen.marca is not None
+                     and ahora - almacen.verificado >= TENDENCIAS_CONFIG['segundos_verificacion'])
+        faltan_curso = curso is not None and curso not in almacen.cursos
+        faltan = [alumno_id for alumno_id in (alumno_ids or almacen.cursos.get(curso, []))
+                  if alumno_id not in almacen.series]
+        if not (verificar or faltan_curso or faltan):
+            return True
+
+        try:
+            if not self.conectar():
+                return curso in almacen.cursos if curso else not faltan
+
+            cursor = self.connection.cursor()
+            cursor.execute("SELECT NOW()")
+            marca = cursor.fetchone()[0]
+            if not almacen.orden_periodo:
+                self._cargar_periodos(cursor)
+
+            if verificar:
+                cursor.execute("""
+                    SELECT DISTINCT alumno_id FROM calificaciones WHERE fecha_modificacion >= %s
+                """, (almacen.marca,))
+                modificados = [fila[0] for fila in cursor.fetchall() if fila[0] in almacen.series]
+                faltan = list(dict.fromkeys(faltan + modificados))
+                almacen.verificado = ahora
+
+            if faltan_curso:
+                ids, filas = self._cargar_curso(cursor, *curso)
+                almacen.cursos[curso] = ids
+                almacen.reemplazar(ids, filas)
+                faltan = [alumno_id for alumno_id in faltan if alumno_id not in ids]
+            if faltan:
+                almacen.reemplazar(faltan, self._cargar_alumnos(cursor, faltan))
+
+            cursor.close()
+            if almacen.marca is None or verificar:
+                almacen.marca = marca
+                almacen.verificado = ahora
+            return True
+
+        except Error as e:
+            print(f"Error al cargar tendencias de promedios: {e}")
+            return curso in almacen.cursos if curso else False
+        finally:
+            self.desconectar()
+
+    def _cargar_periodos(self, cursor):
+        cursor.execute("SELECT id, nombre FROM periodos_evaluacion ORDER BY fecha_inicio, id")
+        for orden, (periodo_id, nombre) in enumerate(cursor.fetchall()):
+            self.almacen.orden_periodo[periodo_id] = orden
+            self.almacen.nombres_periodo[periodo_id] = nombre
+
+    def _cargar_curso(self, cursor, curso: str, division: str) -> Tuple[List[int], List[Tuple]]:
+        """Alumnos activos del curso y sus notas agrupadas, en dos consultas"""
+        cursor.execute("""
+            SELECT id FROM alumnos
+            WHERE curso = %s AND division = %s AND activo = TRUE
+            ORDER BY apellido, nombre
+        """, (curso, division))
+        ids = [fila[0] for fila in cursor.fetchall()]
+        return ids, self._consultar_agrupadas(
+            cursor, "a.curso = %s AND a.division = %s AND a.activo = TRUE", (curso, division))
+
+    def _cargar_alumnos(self, cursor, alumno_ids: List[int]) -> List[Tuple]:
+        return self._consultar_agrupadas(
+            cursor, f"c.alumno_id IN ({', '.join(['%s'] * len(alumno_ids))})", tuple(alumno_ids))
+
+    def _consultar_agrupadas(self, cursor, filtro: str, parametros: tuple) -> List[Tuple]:
+        """Notas agrupadas por alumno, materia, período y mes; recarga los períodos si aparece uno nuevo"""
+        cursor.execute(f"""
+            SELECT
+                c.alumno_id, c.materia_id, c.periodo_id,
+                MIN(c.fecha_evaluacion) AS primera_fecha,
+                SUM(ROUND(c.nota * 100)) AS centesimos,
+                COUNT(*) AS cantidad
+            FROM calificaciones c
+            JOIN alumnos a ON c.alumno_id = a.id
+            WHERE {filtro}
+            GROUP BY c.alumno_id, c.materia_id, c.periodo_id,
+                     YEAR(c.fecha_evaluacion), MONTH(c.fecha_evaluacion)
+        """, parametros)
+        filas = cursor.fetchall()
+        if any(fila[2] not in self.almacen.orden_periodo for fila in filas):
+            self._cargar_periodos(cursor)
+        return filas
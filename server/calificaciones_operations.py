@@ -11,6 +11,3 @@ from .calificaciones.manager import CalificacionesManager
 
 # Mantener compatibilidad con importaciones existentes
 __all__ = ['CalificacionesManager']
-
-# Mensaje informativo
-print("✅ Usando sistema modular de calificaciones")
\ No newline at end of file
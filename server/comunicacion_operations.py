@@ -8,6 +8,7 @@ from mysql.connector import Error
 from datetime import datetime
 from typing import List, Dict, Optional
 from .database import crear_conexion
+from .pagination import consultar_pagina, pagina_vacia, TAMANO_PAGINA_DEFECTO
 
 class ComunicacionManager:
     """Gestor de operaciones de comunicación en la base de datos"""
@@ -104,6 +105,66 @@ class ComunicacionManager:
         finally:
             self.desconectar()
     
+    def obtener_mensajes_usuario_pagina(self, usuario_id: int, tipo: str = "recibidos",
+                                        cursor: str = None,
+                                        tamano_pagina: int = TAMANO_PAGINA_DEFECTO) -> Dict:
+        """
+        Obtener una página de mensajes de un usuario, del más reciente al más antiguo
+        
+        Args:
+            usuario_id: Usuario dueño de la bandeja
+            tipo: "recibidos" o "enviados"
+            cursor: siguiente_cursor de la página anterior (None para la primera)
+            tamano_pagina: Cantidad de mensajes por página
+        
+        Returns:
+            Dict: filas, siguiente_cursor, hay_mas y tamano_pagina
+        """
+        try:
+            if not self.conectar():
+                return pagina_vacia(tamano_pagina)
+            
+            if tipo == "recibidos":
+                consulta = """
+                    SELECT 
+                        m.id,
+                        m.asunto,
+                        m.mensaje,
+                        m.fecha_envio,
+                        m.leido,
+                        m.tipo_mensaje,
+                        ur.nombre_usuario as remitente,
+                        ur.tipo_usuario as tipo_remitente
+                    FROM mensajes_internos m
+                    JOIN usuarios ur ON m.remitente_id = ur.id
+                    WHERE m.destinatario_id = %s {filtro_cursor}
+                """
+            else:  # enviados
+                consulta = """
+                    SELECT 
+                        m.id,
+                        m.asunto,
+                        m.mensaje,
+                        m.fecha_envio,
+                        m.leido,
+                        m.tipo_mensaje,
+                        ud.nombre_usuario as destinatario,
+                        ud.tipo_usuario as tipo_destinatario
+                    FROM mensajes_internos m
+                    JOIN usuarios ud ON m.destinatario_id = ud.id
+                    WHERE m.remitente_id = %s {filtro_cursor}
+                """
+            
+            orden = [("m.fecha_envio", "fecha_envio", "DESC"), ("m.id", "id", "DESC")]
+            return consultar_pagina(self.connection, consulta, (usuario_id,), orden,
+                                    cursor, tamano_pagina)
+            
+        except Exception as e:
+            print(f"Error al obtener página de mensajes: {e}")
+            return pagina_vacia(tamano_pagina)
+        finally:
+            self.desconectar()
+    
     def crear_anuncio_institucional(self, titulo: str, contenido: str, autor_id: int,
                                    dirigido_a: str = "Toda la comunidad", 
                                    prioridad: str = "Normal") -> bool:
@@ -0,0 +1,400 @@
+"""
+Pool de conexiones MySQL compartido por todo el proceso
+GESJ - Plataforma de Gestión Educativa
+
+crear_conexion() entrega conexiones de este pool. Cada conexión entregada
+es un PooledConnection: se usa igual que una conexión de mysql.connector,
+pero close() la devuelve al pool en lugar de cerrar el socket. De esta forma
+el patrón conectar()/desconectar() de los managers funciona sin cambios.
+Si el pool tiene una Instrumentacion, los cursores de las conexiones
+prestadas se entregan instrumentados (ver instrumentacion.py).
+
+Las sentencias del registro (ver sentencias.py) se ejecutan con
+ejecutar_sentencia(nombre, parametros): cada conexión física conserva un
+cursor preparado por sentencia, que se prepara en el servidor la primera
+vez y se reutiliza mientras la conexión siga en el pool.
+
+Al volver al pool se descarta la transacción abierta. Si el préstamo
+ejecutó algo que cambia el estado de la sesión (SET, USE, LOCK TABLES,
+tablas temporales, variables @, procedimientos) la conexión además se
+reinicia con COM_RESET_CONNECTION, para que el próximo préstamo no herede
+por ejemplo FOREIGN_KEY_CHECKS=0. El reinicio cierra las sentencias
+preparadas, por eso no se hace en cada devolución.
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import mysql.connector
+from mysql.connector import Error
+from mysql.connector.errors import PoolError
+
+# Sentencias que dejan estado en la sesión
+_RE_INICIO_SESION = re.compile(r"\s*(?:SET|USE|LOCK\s+TABLES|CREATE\s+TEMPORARY|CALL)\b", re.IGNORECASE)
+_RE_VARIABLE_USUARIO = re.compile(r"(?<!@)@\w+\s*:=|\bINTO\s+@", re.IGNORECASE)
+
+
+def _cambia_sesion(sql) -> bool:
+    if not isinstance(sql, str):
+        return True
+    return (_RE_INICIO_SESION.match(sql) is not None
+            or ('@' in sql and _RE_VARIABLE_USUARIO.search(sql) is not None))
+
+
+class _CursorSesion:
+    """Cursor que avisa a su conexión si una sentencia cambia el estado de la sesión"""
+
+    __slots__ = ('_cursor', '_conexion')
+
+    def __init__(self, cursor, conexion: 'PooledConnection'):
+        self._cursor = cursor
+        self._conexion = conexion
+
+    def execute(self, operation, *args, **kwargs):
+        if _cambia_sesion(operation):
+            self._conexion._sesion_modificada = True
+        return self._cursor.execute(operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        if _cambia_sesion(operation):
+            self._conexion._sesion_modificada = True
+        return self._cursor.executemany(operation, *args, **kwargs)
+
+    def callproc(self, *args, **kwargs):
+        # Un procedimiento puede cambiar variables de sesión
+        self._conexion._sesion_modificada = True
+        return self._cursor.callproc(*args, **kwargs)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+class PooledConnection:
+    """Conexión prestada por el pool; close() la devuelve en lugar de cerrarla"""
+
+    def __init__(self, pool: 'ConnectionPool', conexion):
+        self._pool = pool
+        self._conexion = conexion
+        self._cursores = []
+        self._sesion_modificada = False
+
+    def cursor(self, *args, **kwargs):
+        conexion = self.__dict__.get('_conexion')
+        if conexion is None:
+            raise PoolError(msg="La conexión ya fue devuelta al pool")
+        cursor = conexion.cursor(*args, **kwargs)
+        instrumentacion = self._pool.instrumentacion
+        if instrumentacion is not None and instrumentacion.habilitada:
+            cursor = instrumentacion.envolver_cursor(cursor)
+            self._cursores.append(cursor)
+        return _CursorSesion(cursor, self)
+
+    def ejecutar_sentencia(self, nombre: str, parametros=(), diccionario: bool = True):
+        """
+        Ejecutar una sentencia del registro, preparada una sola vez por conexión
+
+        Args:
+            nombre: Nombre con que se registró la sentencia
+            parametros: Valores para los marcadores %s, en orden
+            diccionario: Devolver las filas como dict (como cursor(dictionary=True))
+
+        Returns:
+            Las filas leídas si la sentencia devuelve resultados; si no, las filas afectadas
+        """
+        conexion = self.__dict__.get('_conexion')
+        if conexion is None:
+            raise PoolError(msg="La conexión ya fue devuelta al pool")
+        registro = self._pool.registro_sentencias
+        if registro is None:
+            raise PoolError(msg="El pool no tiene un registro de sentencias")
+        sentencia = registro.obtener(nombre)
+
+        preparado, nueva = self._pool.obtener_preparada(conexion, sentencia)
+        if preparado is None:
+            # Sin sentencias preparadas: cursor común, con el texto original
+            cursor = self.cursor(dictionary=diccionario)
+            try:
+                cursor.execute(sentencia.sql, tuple(parametros))
+                resultado = cursor.fetchall() if cursor.with_rows else cursor.rowcount
+            finally:
+                cursor.close()
+            registro.registrar_uso(sentencia, False)
+            return resultado
+
+        cursor = preparado
+        instrumentacion = self._pool.instrumentacion
+        if instrumentacion is not None and instrumentacion.habilitada:
+            cursor = instrumentacion.envolver_cursor(preparado)
+        try:
+            cursor.execute(sentencia.sql_preparada, tuple(parametros))
+            if cursor.with_rows:
+                filas = cursor.fetchall()
+                if diccionario:
+                    columnas = preparado.column_names
+                    filas = [dict(zip(columnas, fila)) for fila in filas]
+                resultado = filas
+            else:
+                resultado = preparado.rowcount
+                if cursor is not preparado:
+                    cursor.finalizar()
+        except Error:
+            # El handle pudo quedar inválido: se vuelve a preparar la próxima vez
+            self._pool.descartar_preparada(conexion, nombre)
+            raise
+        registro.registrar_uso(sentencia, nueva)
+        return resultado
+
+    def close(self):
+        """Devolver la conexión al pool"""
+        # Cerrar las mediciones de cursores que el llamador no cerró
+        cursores, self._cursores = self._cursores, []
+        for cursor in cursores:
+            cursor.finalizar()
+        conexion, self._conexion = self._conexion, None
+        if conexion is not None:
+            self._pool.devolver_conexion(conexion, self._sesion_modificada)
+
+    def is_connected(self) -> bool:
+        if self._conexion is None:
+            return False
+        return self._conexion.is_connected()
+
+    def __getattr__(self, nombre):
+        conexion = self.__dict__.get('_conexion')
+        if conexion is None:
+            raise PoolError(msg="La conexión ya fue devuelta al pool")
+        return getattr(conexion, nombre)
+
+    def __del__(self):
+        # Si un llamador olvidó cerrar, la conexión vuelve igual al pool
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Pool de conexiones acotado, con verificación de salud y expiración por inactividad"""
+
+    def __init__(self, config: Dict, tamano_maximo: int = 10, timeout_espera: float = 10.0,
+                 max_inactividad: float = 300.0, intervalo_verificacion: float = 30.0,
+                 instrumentacion=None, registro_sentencias=None,
+                 sentencias_preparadas: bool = True):
+        """
+        Args:
+            config: Parámetros para mysql.connector.connect
+            tamano_maximo: Máximo de conexiones abiertas (prestadas + libres)
+            timeout_espera: Segundos a esperar una conexión libre antes de fallar
+            max_inactividad: Segundos que una conexión libre puede quedar sin uso
+            intervalo_verificacion: Inactividad a partir de la cual se hace ping al prestarla
+            instrumentacion: Instrumentacion que mide esperas y consultas (opcional)
+            registro_sentencias: RegistroSentencias para ejecutar_sentencia (opcional)
+            sentencias_preparadas: Preparar en el servidor las sentencias del registro;
+                con False se ejecutan con cursores comunes
+        """
+        self.config = dict(config)
+        self.tamano_maximo = tamano_maximo
+        self.timeout_espera = timeout_espera
+        self.max_inactividad = max_inactividad
+        self.intervalo_verificacion = intervalo_verificacion
+        self.instrumentacion = instrumentacion
+        self.registro_sentencias = registro_sentencias
+        self.sentencias_preparadas = sentencias_preparadas
+
+        self._condicion = threading.Condition()
+        self._libres = deque()  # (conexion, ultimo_uso); la más reciente a la derecha
+        self._abiertas = 0
+        self._preparadas: Dict[int, Dict[str, object]] = {}  # id(conexion) -> {nombre: cursor}
+        self._estadisticas = {
+            'hits': 0,
+            'misses': 0,
+            'esperas': 0,
+            'timeouts': 0,
+            'descartadas': 0,
+            'expiradas': 0,
+            'reiniciadas': 0,
+            'tiempo_espera_total': 0.0,
+        }
+
+    def obtener_conexion(self) -> PooledConnection:
+        """Prestar una conexión del pool, creando una nueva si hay lugar"""
+        if self.instrumentacion is None or not self.instrumentacion.habilitada:
+            return self._prestar_conexion()
+
+        inicio = time.perf_counter()
+        error = True
+        try:
+            conexion = self._prestar_conexion()
+            error = False
+            return conexion
+        finally:
+            self.instrumentacion.registrar_espera(time.perf_counter() - inicio, error)
+
+    def _prestar_conexion(self) -> PooledConnection:
+        inicio = time.monotonic()
+        espero = False
+
+        with self._condicion:
+            while True:
+                self._expirar_inactivas()
+
+                while self._libres:
+                    conexion, ultimo_uso = self._libres.pop()
+                    if self._conexion_saludable(conexion, ultimo_uso):
+                        self._estadisticas['hits'] += 1
+                        self._registrar_espera(inicio, espero)
+                        return PooledConnection(self, conexion)
+                    self._estadisticas['descartadas'] += 1
+                    self._descartar(conexion)
+
+                if self._abiertas < self.tamano_maximo:
+                    self._abiertas += 1
+                    break
+
+                restante = self.timeout_espera - (time.monotonic() - inicio)
+                if restante <= 0:
+                    self._estadisticas['timeouts'] += 1
+                    self._registrar_espera(inicio, espero)
+                    raise PoolError(msg="No hay conexiones disponibles en el pool")
+                if not espero:
+                    espero = True
+                    self._estadisticas['esperas'] += 1
+                self._condicion.wait(restante)
+
+            self._estadisticas['misses'] += 1
+            self._registrar_espera(inicio, espero)
+
+        # La conexión nueva se abre fuera del lock para no frenar a otros hilos.
+        # Cualquier falla (no sólo Error: TypeError por configuración,
+        # KeyboardInterrupt) tiene que liberar el lugar reservado
+        try:
+            conexion = mysql.connector.connect(**self.config)
+        except BaseException:
+            with self._condicion:
+                self._abiertas -= 1
+                self._condicion.notify()
+            raise
+
+        return PooledConnection(self, conexion)
+
+    def devolver_conexion(self, conexion, sesion_modificada: bool = False):
+        """
+        Recibir una conexión prestada y dejarla libre para el próximo uso
+
+        Args:
+            sesion_modificada: El préstamo cambió variables u otro estado de la
+                sesión; se reinicia la sesión (o se descarta la conexión)
+        """
+        try:
+            # Cerrar cualquier transacción abierta para no arrastrar snapshots ni locks
+            conexion.rollback()
+            reutilizable = conexion.is_connected()
+            if reutilizable and sesion_modificada:
+                conexion.cmd_reset_connection()
+        except (Error, AttributeError):
+            reutilizable = False
+
+        with self._condicion:
+            if reutilizable and sesion_modificada:
+                # El reinicio también cerró en el servidor las sentencias preparadas
+                self._preparadas.pop(id(conexion), None)
+                self._estadisticas['reiniciadas'] += 1
+            if reutilizable:
+                self._libres.append((conexion, time.monotonic()))
+            else:
+                self._estadisticas['descartadas'] += 1
+                self._descartar(conexion)
+            self._condicion.notify()
+
+    def cerrar_todas(self):
+        """Cerrar todas las conexiones libres del pool"""
+        with self._condicion:
+            while self._libres:
+                conexion, _ = self._libres.pop()
+                self._descartar(conexion)
+            self._condicion.notify_all()
+
+    def obtener_estadisticas(self) -> Dict:
+        """Contadores de uso del pool"""
+        with self._condicion:
+            estadisticas = dict(self._estadisticas)
+            estadisticas['abiertas'] = self._abiertas
+            estadisticas['libres'] = len(self._libres)
+            estadisticas['prestadas'] = self._abiertas - len(self._libres)
+            estadisticas['tamano_maximo'] = self.tamano_maximo
+            total = estadisticas['hits'] + estadisticas['misses']
+            estadisticas['tasa_hits'] = round(estadisticas['hits'] / total, 4) if total else 0.0
+        return estadisticas
+
+    def obtener_preparada(self, conexion, sentencia) -> Tuple[Optional[object], bool]:
+        """
+        Cursor preparado de la sentencia en esta conexión física
+
+        Sólo lo usa quien tiene la conexión prestada, así que no compite con
+        otros hilos por el mismo cursor.
+
+        Returns:
+            (cursor, True) si se preparó ahora, (cursor, False) si ya estaba,
+            (None, False) si las sentencias preparadas no están disponibles
+        """
+        if not self.sentencias_preparadas:
+            return None, False
+        cursores = self._preparadas.setdefault(id(conexion), {})
+        cursor = cursores.get(sentencia.nombre)
+        if cursor is not None:
+            return cursor, False
+        try:
+            cursor = conexion.cursor(prepared=True)
+        except (Error, ValueError, TypeError) as e:
+            print(f"⚠️ Sentencias preparadas no disponibles, se usan cursores comunes: {e}")
+            self.sentencias_preparadas = False
+            return None, False
+        cursores[sentencia.nombre] = cursor
+        return cursor, True
+
+    def descartar_preparada(self, conexion, nombre: str):
+        """Olvidar el cursor preparado de una sentencia en una conexión"""
+        cursor = self._preparadas.get(id(conexion), {}).pop(nombre, None)
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Error:
+                pass
+
+    def _conexion_saludable(self, conexion, ultimo_uso: float) -> bool:
+        """Verificar con ping las conexiones que estuvieron inactivas un tiempo"""
+        if time.monotonic() - ultimo_uso < self.intervalo_verificacion:
+            return True
+        try:
+            conexion.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    def _expirar_inactivas(self):
+        """Cerrar conexiones libres que superaron el tiempo máximo de inactividad"""
+        limite = time.monotonic() - self.max_inactividad
+        while self._libres and self._libres[0][1] < limite:
+            conexion, _ = self._libres.popleft()
+            self._estadisticas['expiradas'] += 1
+            self._descartar(conexion)
+
+    def _descartar(self, conexion):
+        """Cerrar físicamente una conexión y liberar su lugar (requiere el lock)"""
+        self._abiertas -= 1
+        # Los handles preparados mueren con la conexión
+        self._preparadas.pop(id(conexion), None)
+        try:
+            conexion.close()
+        except Error:
+            pass
+
+    def _registrar_espera(self, inicio: float, espero: bool):
+        if espero:
+            self._estadisticas['tiempo_espera_total'] += time.monotonic() - inicio
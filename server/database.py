@@ -1,6 +1,18 @@
 import mysql.connector
 from mysql.connector import Error
+import atexit
 import os
+import threading
+
+try:
+    from .connection_pool import ConnectionPool
+    from .instrumentacion import Instrumentacion
+    from .sentencias import obtener_registro_sentencias
+except ImportError:
+    # Ejecución directa de scripts dentro de server/ (test_connection.py, etc.)
+    from connection_pool import ConnectionPool
+    from instrumentacion import Instrumentacion
+    from sentencias import obtener_registro_sentencias
 
 # Configuración de la base de datos MySQL
 DB_CONFIG = {
@@ -11,12 +23,67 @@ DB_CONFIG = {
     'port': 3306
 }
 
+# Configuración del pool de conexiones compartido por todo el proceso
+POOL_CONFIG = {
+    'tamano_maximo': 10,            # Conexiones abiertas como máximo
+    'timeout_espera': 10.0,         # Segundos a esperar una conexión libre
+    'max_inactividad': 300.0,       # Segundos antes de cerrar una conexión libre
+    'intervalo_verificacion': 30.0, # Inactividad a partir de la cual se hace ping
+    'sentencias_preparadas': True   # Preparar en el servidor las sentencias registradas
+}
+
+# Medición de consultas (ver instrumentacion.py)
+INSTRUMENTACION_CONFIG = {
+    'habilitada': True,
+    'umbral_lento_ms': 500.0,       # A partir de cuántos ms una consulta es lenta
+    # Archivo donde se agregan las consultas lentas; None las guarda sólo en memoria
+    'archivo_lentas': os.environ.get('GESJ_LOG_CONSULTAS_LENTAS'),
+    'ventana': 500                  # Mediciones recientes por consulta para los percentiles
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+_instrumentacion = None
+
+def obtener_instrumentacion():
+    """Obtiene el registro de mediciones de consultas del proceso"""
+    global _instrumentacion
+    if _instrumentacion is None:
+        with _pool_lock:
+            if _instrumentacion is None:
+                _instrumentacion = Instrumentacion(**INSTRUMENTACION_CONFIG)
+    return _instrumentacion
+
+def obtener_pool():
+    """Obtiene el pool de conexiones del proceso, creándolo la primera vez"""
+    global _pool
+    if _pool is None:
+        instrumentacion = obtener_instrumentacion()
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_CONFIG, instrumentacion=instrumentacion,
+                                       registro_sentencias=obtener_registro_sentencias(),
+                                       **POOL_CONFIG)
+                atexit.register(_pool.cerrar_todas)
+    return _pool
+
+def obtener_estadisticas_pool():
+    """Devuelve los contadores de hits, misses y esperas del pool"""
+    return obtener_pool().obtener_estadisticas()
+
+def obtener_instantanea_consultas(limite=50):
+    """Devuelve latencias por consulta, llamador y pantalla, consultas lentas y estado del pool"""
+    instantanea = obtener_instrumentacion().obtener_instantanea(limite)
+    instantanea['pool'] = obtener_estadisticas_pool()
+    return instantanea
+
 def crear_conexion():
-    """Crea una conexión a la base de datos MySQL"""
+    """Presta una conexión del pool; al cerrarla vuelve al pool"""
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
+        connection = obtener_pool().obtener_conexion()
         if connection.is_connected():
             return connection
+        connection.close()
     except Error as e:
         print(f"Error al conectar a MySQL: {e}")
         return None
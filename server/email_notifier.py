@@ -3,7 +3,6 @@ Sistema de notificaciones por email para GESJ
 Provincia de San Juan, República Argentina
 """
 
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
@@ -13,6 +12,8 @@ from datetime import datetime
 from typing import List, Dict, Optional
 import mysql.connector
 from .database import crear_conexion
+from .notifications.mail_queue import obtener_cola_correo
+from .notifications.notification_templates import NotificationTemplates
 
 # Configuración del servidor de email (Gmail como ejemplo)
 EMAIL_CONFIG = {
@@ -36,6 +37,14 @@ class EmailNotifier:
         self.password = EMAIL_CONFIG['password']
         self.sender_name = EMAIL_CONFIG['sender_name']
         self.simulation_mode = SIMULATION_MODE or not (self.email and self.password)
+        # Fuera de simulación los mensajes se encolan y los entrega el hilo de la cola
+        self.cola = None if self.simulation_mode else obtener_cola_correo({
+            'servidor': self.smtp_server,
+            'puerto': self.smtp_port,
+            'usuario': self.email,
+            'password': self.password,
+        })
+        self.templates = NotificationTemplates()
     
     def enviar_notificacion_notas_subidas(self, docente_nombre: str, materia_nombre: str, 
                                         curso: str, division: str, periodo: str,
@@ -75,186 +84,85 @@ class EmailNotifier:
             return True
         
         try:
-            # Crear conexión SMTP
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.email, self.password)
+            mensajes = []
             
-            # Enviar a preceptores
+            # Mensajes para preceptores
             if emails_preceptores:
-                self._enviar_a_preceptores(server, docente_nombre, materia_nombre, 
-                                         curso, division, periodo, emails_preceptores, archivo_adjunto)
+                mensajes += self._mensajes_preceptores(docente_nombre, materia_nombre, 
+                                                       curso, division, periodo, emails_preceptores,
+                                                       archivo_adjunto)
             
-            # Enviar a padres
+            # Mensajes para padres
             if emails_padres:
-                self._enviar_a_padres(server, docente_nombre, materia_nombre, 
-                                    curso, division, periodo, emails_padres)
+                mensajes += self._mensajes_padres(docente_nombre, materia_nombre, 
+                                                  curso, division, periodo, emails_padres)
             
-            server.quit()
-            return True
+            # Se encolan todos juntos; el envío ocurre en segundo plano
+            return self.cola.encolar_varios(mensajes)
             
         except Exception as e:
-            print(f"Error al enviar notificaciones: {e}")
+            print(f"Error al encolar notificaciones: {e}")
             return False
     
-    def _enviar_a_preceptores(self, server, docente_nombre: str, materia_nombre: str,
-                            curso: str, division: str, periodo: str, 
-                            emails_preceptores: List[str], archivo_adjunto: str = None):
-        """Enviar notificación específica a preceptores"""
+    def _mensajes_preceptores(self, docente_nombre: str, materia_nombre: str,
+                              curso: str, division: str, periodo: str, 
+                              emails_preceptores: List[str], archivo_adjunto: str = None) -> List[MIMEMultipart]:
+        """Armar la notificación específica para cada preceptor"""
         
         asunto = f"📊 Calificaciones Actualizadas - {materia_nombre} - {curso} {division}"
         
-        # Crear mensaje HTML para preceptores
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                .header {{ background-color: #2E7D32; color: white; padding: 20px; text-align: center; }}
-                .content {{ padding: 20px; background-color: #f5f5f5; }}
-                .info-box {{ background-color: white; padding: 15px; margin: 10px 0; border-left: 4px solid #2E7D32; }}
-                .footer {{ background-color: #E8F5E9; padding: 15px; text-align: center; font-size: 12px; }}
-                .highlight {{ color: #2E7D32; font-weight: bold; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>🏛️ GESJ - Sistema de Gestión Educativa</h1>
-                <h2>Provincia de San Juan, República Argentina</h2>
-            </div>
-            
-            <div class="content">
-                <h2>📊 Notificación de Calificaciones Actualizadas</h2>
-                
-                <div class="info-box">
-                    <h3>📋 Información de la Actualización:</h3>
-                    <p><strong>Docente:</strong> <span class="highlight">{docente_nombre}</span></p>
-                    <p><strong>Materia:</strong> <span class="highlight">{materia_nombre}</span></p>
-                    <p><strong>Curso:</strong> <span class="highlight">{curso} - División {division}</span></p>
-                    <p><strong>Período:</strong> <span class="highlight">{periodo}</span></p>
-                    <p><strong>Fecha de actualización:</strong> <span class="highlight">{datetime.now().strftime('%d/%m/%Y %H:%M')}</span></p>
-                </div>
-                
-                <div class="info-box">
-                    <h3>📝 Acciones Recomendadas para Preceptores:</h3>
-                    <ul>
-                        <li>✅ Revisar las calificaciones en el sistema</li>
-                        <li>📞 Contactar a padres de alumnos con bajo rendimiento</li>
-                        <li>📋 Actualizar registros de seguimiento académico</li>
-                        <li>🚨 Identificar alumnos que requieren intervención</li>
-                    </ul>
-                </div>
-                
-                <div class="info-box">
-                    <p><strong>💻 Acceso al Sistema:</strong> Ingrese al sistema GESJ con sus credenciales para ver el detalle completo de las calificaciones.</p>
-                </div>
-            </div>
-            
-            <div class="footer">
-                <p>Este es un mensaje automático del Sistema GESJ</p>
-                <p>📧 No responder a este email | 📞 Consultas: gesj.sanjuan@edu.ar</p>
-            </div>
-        </body>
-        </html>
-        """
+        # El HTML se renderiza y codifica una sola vez para todos los preceptores
+        html_part = MIMEText(self.templates.renderizar(
+            "notas_subidas_preceptor",
+            **self._valores_plantilla(docente_nombre, materia_nombre, curso, division, periodo)
+        ), 'html', 'utf-8')
         
+        mensajes = []
         for email_preceptor in emails_preceptores:
-            msg = MIMEMultipart('alternative')
-            msg['From'] = f"{self.sender_name} <{self.email}>"
-            msg['To'] = email_preceptor
-            msg['Subject'] = asunto
-            
-            # Agregar contenido HTML
-            html_part = MIMEText(html_content, 'html', 'utf-8')
-            msg.attach(html_part)
+            msg = self._crear_mensaje(email_preceptor, asunto, html_part)
             
             # Adjuntar archivo si existe
             if archivo_adjunto and os.path.exists(archivo_adjunto):
                 self._adjuntar_archivo(msg, archivo_adjunto)
             
-            # Enviar
-            server.send_message(msg)
-            print(f"✅ Notificación enviada a preceptor: {email_preceptor}")
+            mensajes.append(msg)
+        return mensajes
     
-    def _enviar_a_padres(self, server, docente_nombre: str, materia_nombre: str,
-                       curso: str, division: str, periodo: str, emails_padres: List[str]):
-        """Enviar notificación específica a padres"""
+    def _mensajes_padres(self, docente_nombre: str, materia_nombre: str,
+                         curso: str, division: str, periodo: str,
+                         emails_padres: List[str]) -> List[MIMEMultipart]:
+        """Armar la notificación específica para cada padre"""
         
         asunto = f"📚 Calificaciones Disponibles - {materia_nombre} - {curso} {division}"
         
-        # Crear mensaje HTML para padres
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                .header {{ background-color: #1976D2; color: white; padding: 20px; text-align: center; }}
-                .content {{ padding: 20px; background-color: #f5f5f5; }}
-                .info-box {{ background-color: white; padding: 15px; margin: 10px 0; border-left: 4px solid #1976D2; }}
-                .footer {{ background-color: #E3F2FD; padding: 15px; text-align: center; font-size: 12px; }}
-                .highlight {{ color: #1976D2; font-weight: bold; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>🏛️ GESJ - Sistema de Gestión Educativa</h1>
-                <h2>Provincia de San Juan, República Argentina</h2>
-            </div>
-            
-            <div class="content">
-                <h2>📚 Nuevas Calificaciones Disponibles</h2>
-                
-                <p>Estimado/a Padre/Madre de Familia,</p>
-                
-                <div class="info-box">
-                    <h3>📋 Información de las Calificaciones:</h3>
-                    <p><strong>Docente:</strong> <span class="highlight">{docente_nombre}</span></p>
-                    <p><strong>Materia:</strong> <span class="highlight">{materia_nombre}</span></p>
-                    <p><strong>Curso:</strong> <span class="highlight">{curso} - División {division}</span></p>
-                    <p><strong>Período:</strong> <span class="highlight">{periodo}</span></p>
-                    <p><strong>Fecha de actualización:</strong> <span class="highlight">{datetime.now().strftime('%d/%m/%Y %H:%M')}</span></p>
-                </div>
-                
-                <div class="info-box">
-                    <h3>👨‍👩‍👧‍👦 Información para Padres:</h3>
-                    <p>Las calificaciones de su hijo/a en la materia <strong>{materia_nombre}</strong> han sido actualizadas por el docente <strong>{docente_nombre}</strong>.</p>
-                    
-                    <h4>📱 Cómo acceder:</h4>
-                    <ol>
-                        <li>Ingrese al sistema GESJ con sus credenciales</li>
-                        <li>Vaya a la sección "Padres"</li>
-                        <li>Seleccione "Ver Rendimiento y Asistencia"</li>
-                        <li>Consulte las calificaciones actualizadas</li>
-                    </ol>
-                </div>
-                
-                <div class="info-box">
-                    <p><strong>💡 Recomendación:</strong> Le sugerimos revisar regularmente el progreso académico de su hijo/a y mantener comunicación con los docentes ante cualquier consulta.</p>
-                </div>
-            </div>
-            
-            <div class="footer">
-                <p>Este es un mensaje automático del Sistema GESJ</p>
-                <p>📧 No responder a este email | 📞 Consultas: gesj.sanjuan@edu.ar</p>
-                <p>🏛️ Institución Educativa - Provincia de San Juan</p>
-            </div>
-        </body>
-        </html>
-        """
+        # El HTML se renderiza y codifica una sola vez para todos los padres
+        html_part = MIMEText(self.templates.renderizar(
+            "notas_subidas_padre",
+            **self._valores_plantilla(docente_nombre, materia_nombre, curso, division, periodo)
+        ), 'html', 'utf-8')
         
-        for email_padre in emails_padres:
-            msg = MIMEMultipart('alternative')
-            msg['From'] = f"{self.sender_name} <{self.email}>"
-            msg['To'] = email_padre
-            msg['Subject'] = asunto
-            
-            # Agregar contenido HTML
-            html_part = MIMEText(html_content, 'html', 'utf-8')
-            msg.attach(html_part)
-            
-            # Enviar
-            server.send_message(msg)
-            print(f"✅ Notificación enviada a padre: {email_padre}")
+        return [self._crear_mensaje(email_padre, asunto, html_part) for email_padre in emails_padres]
+    
+    def _valores_plantilla(self, docente_nombre: str, materia_nombre: str,
+                           curso: str, division: str, periodo: str) -> Dict:
+        """Campos comunes de las plantillas de notas subidas"""
+        return {
+            'docente': docente_nombre,
+            'materia': materia_nombre,
+            'curso': curso,
+            'division': division,
+            'periodo': periodo,
+            'fecha': datetime.now().strftime('%d/%m/%Y %H:%M'),
+        }
+    
+    def _crear_mensaje(self, destinatario: str, asunto: str, html_part: MIMEText) -> MIMEMultipart:
+        """Mensaje para un destinatario con la parte HTML compartida"""
+        msg = MIMEMultipart('alternative')
+        msg['From'] = f"{self.sender_name} <{self.email}>"
+        msg['To'] = destinatario
+        msg['Subject'] = asunto
+        msg.attach(html_part)
+        return msg
     
     def _adjuntar_archivo(self, msg, archivo_path: str):
         """Adjuntar archivo al mensaje de email"""
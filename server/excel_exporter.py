@@ -5,14 +5,19 @@ GESJ - Plataforma de Gestión Educativa
 Redirige al nuevo sistema modular de exportaciones.
 """
 
-from .exports.excel_manager import ExcelManager
-
 class ExcelExporter:
     """Clase de compatibilidad para ExcelExporter"""
     
     def __init__(self):
-        self.excel_manager = ExcelManager()
-        print("✅ Usando sistema modular de exportación Excel")
+        self._excel_manager = None
+    
+    @property
+    def excel_manager(self):
+        """ExcelManager (openpyxl) se importa en la primera exportación"""
+        if self._excel_manager is None:
+            from .exports.excel_manager import ExcelManager
+            self._excel_manager = ExcelManager()
+        return self._excel_manager
     
     def exportar_calificaciones_materia(self, materia_id: int, periodo_id: int, docente_id: int) -> str:
         """Método de compatibilidad"""
@@ -23,4 +28,33 @@ class ExcelExporter:
         calificaciones = cal_manager.obtener_calificaciones_materia(materia_id, periodo_id)
         info_materia = cal_manager.materias.obtener_por_id(materia_id)
         
-        return self.excel_manager.crear_workbook_calificaciones(calificaciones, info_materia or {})
\ No newline at end of file
+        return self.excel_manager.crear_workbook_calificaciones(calificaciones, info_materia or {})
+    
+    def exportar_libro_calificaciones(self, periodo_id: int = None) -> str:
+        """Libro de calificaciones de toda la escuela (una hoja por curso), en streaming"""
+        from .calificaciones.manager import CalificacionesManager
+        cal_manager = CalificacionesManager()
+        
+        return self.excel_manager.crear_workbook_calificaciones_streaming(
+            cal_manager.iterar_calificaciones_escuela(periodo_id),
+            {'titulo': 'Libro de Calificaciones', 'periodo': self._nombre_periodo(cal_manager, periodo_id)}
+        )
+    
+    def exportar_libro_promedios(self, periodo_id: int = None) -> str:
+        """Promedios de toda la escuela (una hoja por curso), en streaming"""
+        from .calificaciones.manager import CalificacionesManager
+        cal_manager = CalificacionesManager()
+        
+        return self.excel_manager.crear_workbook_promedios_streaming(
+            cal_manager.iterar_promedios_escuela(periodo_id),
+            {'titulo': 'Promedios', 'periodo': self._nombre_periodo(cal_manager, periodo_id)}
+        )
+    
+    def _nombre_periodo(self, cal_manager, periodo_id: int = None) -> str:
+        """Nombre del período para el encabezado ('Año completo' si no se indica)"""
+        if not periodo_id:
+            return 'Año completo'
+        for periodo in cal_manager.obtener_periodos_activos():
+            if periodo.get('id') == periodo_id:
+                return periodo.get('nombre', str(periodo_id))
+        return str(periodo_id)
@@ -2,12 +2,30 @@
 # Plataforma de Gestión Educativa
 # Provincia de San Juan, República Argentina
 
-from .excel_manager import ExcelManager
-from .pdf_manager import PDFManager
-from .report_generator import ReportGenerator
+# Cada clase se importa la primera vez que se pide: openpyxl y ReportLab son
+# pesados y quien sólo usa uno de los dos no tiene por qué cargar el otro
+import importlib
+
+_EXPORTACIONES = {
+    'ExcelManager': '.excel_manager',
+    'PDFManager': '.pdf_manager',
+    'ReportGenerator': '.report_generator',
+    'GeneradorBoletines': '.boletines',
+}
+
+
+def __getattr__(nombre):
+    modulo = _EXPORTACIONES.get(nombre)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(importlib.import_module(modulo, __name__), nombre)
+    globals()[nombre] = valor
+    return valor
+
 
 __all__ = [
     'ExcelManager',
     'PDFManager',
-    'ReportGenerator'
+    'ReportGenerator',
+    'GeneradorBoletines'
 ]
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""
+Generación Masiva de Boletines
+GESJ - Plataforma de Gestión Educativa
+
+Al cierre de un período se necesita el boletín de cada alumno de la
+escuela. Los datos se leen con una consulta por curso y los PDF se
+renderizan en un ProcessPoolExecutor (ReportLab es Python puro, así que
+los hilos no escalan por el GIL). Los procesos devuelven los bytes del
+PDF y sólo el proceso principal escribe en la carpeta o el ZIP de salida.
+"""
+
+import io
+import multiprocessing
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from ..calificaciones.reportes import ReportesOperations
+from .pdf_manager import PDFManager, REPORTLAB_AVAILABLE
+
+# Configuración de la generación masiva
+BOLETINES_CONFIG = {
+    'max_procesos': None,       # None: uno por núcleo (os.cpu_count())
+    'pendientes_por_proceso': 8,  # PDFs en vuelo por proceso antes de leer el próximo curso
+}
+
+# Un PDFManager por proceso de trabajo
+_pdf_manager = None
+
+
+def renderizar_boletin(datos_alumno: Dict) -> bytes:
+    """Renderizar el boletín de un alumno y devolver el PDF (se ejecuta en los procesos)"""
+    global _pdf_manager
+    if _pdf_manager is None:
+        _pdf_manager = PDFManager()
+    buffer = io.BytesIO()
+    _pdf_manager.escribir_boletin(buffer, datos_alumno, datos_alumno.get('calificaciones', []))
+    return buffer.getvalue()
+
+
+def _nombre_archivo(texto: str) -> str:
+    """Texto apto para nombre de archivo o carpeta"""
+    texto = re.sub(r'[^\w\-]+', '_', str(texto), flags=re.UNICODE).strip('_')
+    return texto or "sin_nombre"
+
+
+class GeneradorBoletines:
+    """Boletines de todos los alumnos (o de algunos cursos) de un período"""
+
+    def __init__(self, max_procesos: int = None, reportes: ReportesOperations = None):
+        self.max_procesos = max_procesos or BOLETINES_CONFIG['max_procesos'] or os.cpu_count() or 1
+        self.reportes = reportes or ReportesOperations()
+        if not REPORTLAB_AVAILABLE:
+            print("⚠️ ReportLab no está disponible. Instale con: pip install reportlab")
+
+    def generar(self, periodo_id: int, destino: str = "exportaciones_pdf", formato: str = "zip",
+                cursos: List[tuple] = None,
+                progreso: Callable[[int, int, str], None] = None,
+                cancelado: Callable[[], bool] = None) -> Dict:
+        """
+        Generar los boletines de un período
+
+        Args:
+            periodo_id: Período de los boletines
+            destino: Carpeta donde se crea la salida
+            formato: 'zip' (un único archivo) o 'carpeta' (un PDF por alumno)
+            cursos: [(curso, division), ...] a incluir; None para toda la escuela
+            progreso: progreso(hechos, total, mensaje), llamado por cada boletín
+                terminado desde el hilo que ejecuta generar()
+            cancelado: Si devuelve True se dejan de enviar boletines nuevos
+
+        Returns:
+            {'ruta', 'total', 'generados', 'errores': [(alumno, error)], 'segundos'}
+        """
+        if not REPORTLAB_AVAILABLE:
+            raise ImportError("ReportLab no está instalado")
+        if formato not in ("zip", "carpeta"):
+            raise ValueError(f"Formato de salida no válido: {formato}")
+
+        inicio = time.perf_counter()
+        lista_cursos = self.reportes.obtener_cursos_con_alumnos()
+        if cursos is not None:
+            elegidos = {(curso, division) for curso, division in cursos}
+            lista_cursos = [c for c in lista_cursos if (c['curso'], c['division']) in elegidos]
+        total = sum(c['total_alumnos'] for c in lista_cursos)
+
+        nombre = f"Boletines_{periodo_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        os.makedirs(destino, exist_ok=True)
+        ruta = os.path.abspath(os.path.join(destino, nombre + (".zip" if formato == "zip" else "")))
+        salida = _SalidaZip(ruta) if formato == "zip" else _SalidaCarpeta(ruta)
+
+        resumen = {'ruta': ruta, 'total': total, 'generados': 0, 'errores': [], 'segundos': 0.0}
+        hechos = 0
+        limite = self.max_procesos * BOLETINES_CONFIG['pendientes_por_proceso']
+        pendientes = {}
+
+        def recoger(futuros):
+            nonlocal hechos
+            for futuro in futuros:
+                datos = pendientes.pop(futuro)
+                try:
+                    salida.escribir(self._ruta_relativa(datos), futuro.result())
+                    resumen['generados'] += 1
+                except Exception as e:
+                    resumen['errores'].append((datos.get('alumno'), str(e)))
+                hechos += 1
+                if progreso:
+                    progreso(hechos, total, f"{datos.get('curso')} {datos.get('division')} - {datos.get('alumno')}")
+
+        try:
+            with self._crear_executor() as executor:
+                for curso in lista_cursos:
+                    if cancelado and cancelado():
+                        break
+                    # Una consulta por curso; mientras tanto los procesos siguen renderizando
+                    for datos in self.reportes.obtener_datos_boletines_curso(
+                            curso['curso'], curso['division'], periodo_id):
+                        if cancelado and cancelado():
+                            break
+                        pendientes[executor.submit(renderizar_boletin, datos)] = datos
+                        if len(pendientes) >= limite:
+                            terminados, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                            recoger(terminados)
+                    terminados = [f for f in pendientes if f.done()]
+                    recoger(terminados)
+
+                if cancelado and cancelado():
+                    for futuro in list(pendientes):
+                        if futuro.cancel():
+                            pendientes.pop(futuro)
+                while pendientes:
+                    terminados, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                    recoger(terminados)
+        finally:
+            salida.cerrar()
+
+        resumen['segundos'] = round(time.perf_counter() - inicio, 2)
+        return resumen
+
+    def _crear_executor(self):
+        """Pool de procesos, o ejecución en el mismo proceso si sólo hay uno"""
+        if self.max_procesos <= 1:
+            return _EjecutorLocal()
+        # 'spawn' también en Linux: generar() suele correr en un hilo de la interfaz
+        # y hacer fork de un proceso con hilos (Tk, pool MySQL) no es seguro
+        return ProcessPoolExecutor(max_workers=self.max_procesos,
+                                   mp_context=multiprocessing.get_context('spawn'))
+
+    def _ruta_relativa(self, datos: Dict) -> str:
+        """Curso_División/Apellido_Nombre_DNI.pdf"""
+        carpeta = _nombre_archivo(f"{datos.get('curso', '')}_{datos.get('division', '')}")
+        archivo = _nombre_archivo(f"{datos.get('alumno', 'Alumno')}_{datos.get('dni') or datos.get('alumno_id', '')}")
+        return f"{carpeta}/{archivo}.pdf"
+
+
+class _EjecutorLocal:
+    """Misma interfaz que el pool, pero renderiza en el proceso actual (evita arrancar procesos)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def submit(self, funcion, *args) -> Future:
+        futuro = Future()
+        try:
+            futuro.set_result(funcion(*args))
+        except Exception as e:
+            futuro.set_exception(e)
+        return futuro
+
+
+class _SalidaCarpeta:
+    """Escribe cada boletín en su carpeta de curso"""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        os.makedirs(ruta, exist_ok=True)
+
+    def escribir(self, relativa: str, contenido: bytes):
+        archivo = os.path.join(self.ruta, *relativa.split('/'))
+        os.makedirs(os.path.dirname(archivo), exist_ok=True)
+        with open(archivo, 'wb') as f:
+            f.write(contenido)
+
+    def cerrar(self):
+        pass
+
+
+class _SalidaZip:
+    """Agrega cada boletín a un único ZIP, con la misma estructura de carpetas"""
+
+    def __init__(self, ruta: str):
+        self.zip = zipfile.ZipFile(ruta, 'w', compression=zipfile.ZIP_DEFLATED)
+
+    def escribir(self, relativa: str, contenido: bytes):
+        self.zip.writestr(relativa, contenido)
+
+    def cerrar(self):
+        self.zip.close()
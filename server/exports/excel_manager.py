@@ -4,17 +4,50 @@ GESJ - Plataforma de Gestión Educativa
 """
 
 import os
-from datetime import datetime
-from typing import List, Dict, Optional
+import re
+from datetime import date, datetime
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Tuple
 
 try:
     from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
     from openpyxl.utils import get_column_letter
     OPENPYXL_AVAILABLE = True
 except ImportError:
     OPENPYXL_AVAILABLE = False
 
+# Columnas de los libros en streaming: (encabezado, campo de la fila, conversión)
+COLUMNAS_CALIFICACIONES = [
+    ('Alumno', 'alumno', None),
+    ('Materia', 'materia', None),
+    ('Período', 'periodo', None),
+    ('Tipo Evaluación', 'tipo_evaluacion', None),
+    ('Nota', 'nota', float),
+    ('Fecha', 'fecha_evaluacion', None),
+    ('Observaciones', 'observaciones', None),
+]
+COLUMNAS_PROMEDIOS = [
+    ('Alumno', 'alumno', None),
+    ('Materia', 'materia', None),
+    ('Promedio', 'promedio', float),
+    ('Evaluaciones', 'cantidad_notas', int),
+    ('Estado', 'promedio', lambda promedio: estado_promedio(float(promedio))),
+]
+
+def estado_promedio(promedio: float) -> str:
+    """Estado cualitativo de un promedio"""
+    if promedio >= 9.0:
+        return "Excelente"
+    elif promedio >= 8.0:
+        return "Muy Bueno"
+    elif promedio >= 7.0:
+        return "Bueno"
+    elif promedio >= 6.0:
+        return "Regular"
+    return "En Riesgo"
+
 class ExcelManager:
     """Gestor especializado para exportación a Excel"""
     
@@ -171,17 +204,133 @@ class ExcelManager:
             ws.cell(row=row, column=4, value=int(dato.get('cantidad_notas', 0)))
             
             # Estado basado en promedio
-            promedio = float(dato.get('promedio', 0))
-            if promedio >= 9.0:
-                estado = "Excelente"
-            elif promedio >= 8.0:
-                estado = "Muy Bueno"
-            elif promedio >= 7.0:
-                estado = "Bueno"
-            elif promedio >= 6.0:
-                estado = "Regular"
-            else:
-                estado = "En Riesgo"
-            
-            ws.cell(row=row, column=5, value=estado)
-            row += 1
\ No newline at end of file
+            ws.cell(row=row, column=5, value=estado_promedio(float(dato.get('promedio', 0))))
+            row += 1
+    
+    # ---- Exportación en streaming (libros completos, una hoja por curso) ----
+    
+    def crear_workbook_calificaciones_streaming(self, filas: Iterable[Dict], info: Dict = None) -> str:
+        """
+        Crear el libro de calificaciones de toda la escuela en modo streaming.
+        
+        Args:
+            filas: Iterable de calificaciones (p. ej. CalificacionesManager.
+                iterar_calificaciones_escuela) ordenado por curso y división
+            info: Datos para el encabezado ('titulo', 'periodo')
+        """
+        return self._crear_workbook_streaming(
+            "Libro_Calificaciones", "Calificaciones", filas, info or {},
+            COLUMNAS_CALIFICACIONES, "gesj_encabezado_calificaciones"
+        )
+    
+    def crear_workbook_promedios_streaming(self, filas: Iterable[Dict], info: Dict = None) -> str:
+        """Crear el libro de promedios de toda la escuela en modo streaming (ver calificaciones)"""
+        return self._crear_workbook_streaming(
+            "Libro_Promedios", "Promedios", filas, info or {},
+            COLUMNAS_PROMEDIOS, "gesj_encabezado_promedios"
+        )
+    
+    def _crear_workbook_streaming(self, prefijo: str, titulo: str, filas: Iterable[Dict],
+                                  info: Dict, columnas: List[Tuple], estilo_encabezado: str) -> str:
+        """
+        Escribir un libro write-only: cada fila se vuelca a disco al agregarla,
+        por lo que la memoria no depende de la cantidad de filas. Se abre una
+        hoja nueva cada vez que cambia (curso, división); si las filas no
+        vienen ordenadas, un curso repetido abre otra hoja con sufijo.
+        """
+        if not OPENPYXL_AVAILABLE:
+            raise ImportError("OpenPyXL no está instalado")
+        
+        try:
+            export_dir = "exportaciones_excel"
+            os.makedirs(export_dir, exist_ok=True)
+            
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filepath = os.path.join(export_dir, f"{prefijo}_{timestamp}.xlsx")
+            
+            wb = Workbook(write_only=True)
+            self._registrar_estilos(wb)
+            fecha = datetime.now().strftime("%d/%m/%Y %H:%M")
+            nombres_usados = set()
+            
+            curso_de = lambda fila: (fila.get('curso') or 'Sin curso', fila.get('division') or '')
+            for (curso, division), filas_curso in groupby(filas, key=curso_de):
+                ws = wb.create_sheet(self._nombre_hoja(f"{curso} {division}".strip(), nombres_usados))
+                for col in range(1, len(columnas) + 1):
+                    ws.column_dimensions[get_column_letter(col)].width = 20
+                
+                ws.append([self._celda(ws, f"{info.get('titulo', titulo)} - {curso} {division}".strip(),
+                                       "gesj_titulo")])
+                ws.append([self._celda(ws, "Período:", "gesj_etiqueta"), info.get('periodo', 'Todos')])
+                ws.append([self._celda(ws, "Fecha de exportación:", "gesj_etiqueta"), fecha])
+                ws.append([])
+                ws.append([self._celda(ws, encabezado, estilo_encabezado) for encabezado, _, _ in columnas])
+                
+                for fila in filas_curso:
+                    ws.append([self._celda(ws, valor, "gesj_celda")
+                               for valor in self._valores_fila(fila, columnas)])
+            
+            if not wb.worksheets:
+                ws = wb.create_sheet(titulo)
+                ws.append([self._celda(ws, "Sin datos para exportar", "gesj_titulo")])
+            
+            wb.save(filepath)
+            return os.path.abspath(filepath)
+            
+        except Exception as e:
+            print(f"Error al crear Excel en streaming: {e}")
+            raise e
+    
+    def _registrar_estilos(self, wb):
+        """Estilos con nombre del libro: se guardan una vez y las celdas sólo los referencian"""
+        borde = Border(
+            left=Side(style='thin'), right=Side(style='thin'),
+            top=Side(style='thin'), bottom=Side(style='thin')
+        )
+        estilos = [
+            NamedStyle(name="gesj_titulo", font=Font(bold=True, size=16)),
+            NamedStyle(name="gesj_etiqueta", font=Font(bold=True)),
+            NamedStyle(name="gesj_celda", border=borde),
+            # El estilo reemplaza el formato de fecha que WriteOnlyCell asigna al valor
+            NamedStyle(name="gesj_celda_fecha", border=borde, number_format='DD/MM/YYYY'),
+        ]
+        for nombre, color in (("gesj_encabezado_calificaciones", "366092"),
+                              ("gesj_encabezado_promedios", "4CAF50")):
+            estilos.append(NamedStyle(
+                name=nombre,
+                font=Font(bold=True, color="FFFFFF"),
+                fill=PatternFill(start_color=color, end_color=color, fill_type="solid"),
+                border=borde,
+                alignment=Alignment(horizontal='center')
+            ))
+        for estilo in estilos:
+            wb.add_named_style(estilo)
+    
+    def _celda(self, ws, valor, estilo: str):
+        """Celda de una hoja write-only con un estilo con nombre"""
+        celda = WriteOnlyCell(ws, value=valor)
+        if estilo == "gesj_celda" and isinstance(valor, date):
+            estilo = "gesj_celda_fecha"
+        celda.style = estilo
+        return celda
+    
+    def _valores_fila(self, fila: Dict, columnas: List[Tuple]) -> List:
+        """Valores de una fila según la definición de columnas"""
+        valores = []
+        for _, campo, conversion in columnas:
+            valor = fila.get(campo)
+            if conversion and valor is not None:
+                valor = conversion(valor)
+            valores.append('' if valor is None else valor)
+        return valores
+    
+    def _nombre_hoja(self, nombre: str, usados: set) -> str:
+        """Nombre de hoja válido para Excel (31 caracteres, sin []:*?/\\) y sin repetir"""
+        base = re.sub(r'[\[\]:*?/\\]', '-', nombre)[:31] or "Hoja"
+        candidato, n = base, 2
+        while candidato.lower() in usados:
+            sufijo = f" ({n})"
+            candidato = base[:31 - len(sufijo)] + sufijo
+            n += 1
+        usados.add(candidato.lower())
+        return candidato
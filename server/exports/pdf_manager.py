@@ -39,91 +39,101 @@ class PDFManager:
             filename = f"Boletin_{alumno_nombre}_{timestamp}.pdf"
             filepath = os.path.join(export_dir, filename)
             
-            # Crear documento
-            doc = SimpleDocTemplate(filepath, pagesize=letter)
-            story = []
-            
-            # Estilos
-            styles = getSampleStyleSheet()
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=18,
-                spaceAfter=30,
-                alignment=1
-            )
-            
-            # Título
-            title = Paragraph("🏛️ GESJ - Boletín de Calificaciones", title_style)
-            story.append(title)
-            story.append(Spacer(1, 12))
-            
-            # Información del alumno
-            info_data = [
-                ['Alumno:', datos_alumno.get('alumno', 'N/A')],
-                ['Curso:', f"{datos_alumno.get('curso', 'N/A')} - División {datos_alumno.get('division', 'A')}"],
-                ['DNI:', datos_alumno.get('dni', 'N/A')],
-                ['Período:', datos_alumno.get('periodo', 'N/A')],
-                ['Fecha:', datetime.now().strftime("%d/%m/%Y")]
-            ]
-            
-            info_table = Table(info_data, colWidths=[2*inch, 4*inch])
-            info_table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ]))
-            
-            story.append(info_table)
-            story.append(Spacer(1, 20))
-            
-            # Tabla de calificaciones
-            if calificaciones:
-                cal_data = [['Materia', 'Promedio', 'Evaluaciones', 'Estado']]
-                
-                for cal in calificaciones:
-                    promedio = float(cal.get('promedio', 0))
-                    if promedio >= 9.0:
-                        estado = "Excelente"
-                    elif promedio >= 8.0:
-                        estado = "Muy Bueno"
-                    elif promedio >= 7.0:
-                        estado = "Bueno"
-                    elif promedio >= 6.0:
-                        estado = "Regular"
-                    else:
-                        estado = "En Riesgo"
-                    
-                    cal_data.append([
-                        cal.get('materia', ''),
-                        str(promedio),
-                        str(cal.get('evaluaciones', 0)),
-                        estado
-                    ])
-                
-                cal_table = Table(cal_data, colWidths=[2.5*inch, 1*inch, 1*inch, 1.5*inch])
-                cal_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 9),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ]))
-                
-                story.append(cal_table)
-            
-            # Generar PDF
-            doc.build(story)
+            self.escribir_boletin(filepath, datos_alumno, calificaciones)
             return os.path.abspath(filepath)
             
         except Exception as e:
             print(f"Error al crear boletín PDF: {e}")
             raise e
     
+    def escribir_boletin(self, destino, datos_alumno: Dict, calificaciones: List[Dict]):
+        """
+        Escribir el PDF de un boletín en destino (ruta o archivo binario, p. ej. BytesIO).
+        Lo usan crear_boletin_individual y la generación masiva de boletines.
+        """
+        if not REPORTLAB_AVAILABLE:
+            raise ImportError("ReportLab no está instalado")
+        
+        # Crear documento
+        doc = SimpleDocTemplate(destino, pagesize=letter)
+        story = []
+        
+        # Estilos
+        styles = getSampleStyleSheet()
+        title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=18,
+            spaceAfter=30,
+            alignment=1
+        )
+        
+        # Título
+        title = Paragraph("🏛️ GESJ - Boletín de Calificaciones", title_style)
+        story.append(title)
+        story.append(Spacer(1, 12))
+        
+        # Información del alumno
+        info_data = [
+            ['Alumno:', datos_alumno.get('alumno', 'N/A')],
+            ['Curso:', f"{datos_alumno.get('curso', 'N/A')} - División {datos_alumno.get('division', 'A')}"],
+            ['DNI:', datos_alumno.get('dni', 'N/A')],
+            ['Período:', datos_alumno.get('periodo', 'N/A')],
+            ['Fecha:', datetime.now().strftime("%d/%m/%Y")]
+        ]
+        
+        info_table = Table(info_data, colWidths=[2*inch, 4*inch])
+        info_table.setStyle(TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]))
+        
+        story.append(info_table)
+        story.append(Spacer(1, 20))
+        
+        # Tabla de calificaciones
+        if calificaciones:
+            cal_data = [['Materia', 'Promedio', 'Evaluaciones', 'Estado']]
+            
+            for cal in calificaciones:
+                promedio = float(cal.get('promedio', 0))
+                if promedio >= 9.0:
+                    estado = "Excelente"
+                elif promedio >= 8.0:
+                    estado = "Muy Bueno"
+                elif promedio >= 7.0:
+                    estado = "Bueno"
+                elif promedio >= 6.0:
+                    estado = "Regular"
+                else:
+                    estado = "En Riesgo"
+                
+                cal_data.append([
+                    cal.get('materia', ''),
+                    str(promedio),
+                    str(cal.get('evaluaciones', 0)),
+                    estado
+                ])
+            
+            cal_table = Table(cal_data, colWidths=[2.5*inch, 1*inch, 1*inch, 1.5*inch])
+            cal_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 10),
+                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 1), (-1, -1), 9),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ]))
+            
+            story.append(cal_table)
+        
+        # Generar PDF
+        doc.build(story)
+    
     def crear_reporte_curso(self, datos_curso: Dict, estadisticas: Dict) -> str:
         """Crear reporte de curso en PDF"""
         if not REPORTLAB_AVAILABLE:
@@ -3,6 +3,7 @@ Generador de Reportes Unificado
 GESJ - Plataforma de Gestión Educativa
 """
 
+from datetime import datetime
 from typing import List, Dict, Optional
 from .excel_manager import ExcelManager
 from .pdf_manager import PDFManager
@@ -51,29 +52,33 @@ class ReportGenerator:
         else:
             raise ValueError(f"Formato no soportado: {formato}")
     
+    def obtener_datos_reporte_curso(self, curso: str, division: str, periodo_id: int) -> Dict:
+        """
+        Paquete de datos del reporte de curso (info general, promedios por
+        materia, ranking, distribución y promedios por alumno) a partir de
+        una sola consulta
+        """
+        datos = self.cal_manager.cargar_datos_reporte_curso(curso, division, periodo_id)
+        if datos is None:
+            return {}
+        paquete = datos.como_dict()
+        paquete['promedios_alumnos'] = datos.promedios_alumnos()
+        return paquete
+    
     def _generar_reporte_curso(self, parametros: Dict, formato: str) -> str:
         """Generar reporte de curso completo"""
         curso = parametros['curso']
         division = parametros['division']
         periodo_id = parametros['periodo_id']
         
-        # Obtener estadísticas del curso
-        estadisticas = self.cal_manager.obtener_estadisticas_curso(curso, division, periodo_id)
+        # Un único viaje a la base sirve al PDF y al Excel
+        datos = self.obtener_datos_reporte_curso(curso, division, periodo_id)
         info_curso = {'curso': curso, 'division': division}
         
         if formato.lower() == "excel":
-            # Obtener promedios para Excel
-            alumnos = self.cal_manager.obtener_alumnos_por_curso(curso, division)
-            promedios_data = []
-            
-            for alumno in alumnos:
-                promedios = self.cal_manager.obtener_promedios_alumno(alumno['id'], periodo_id)
-                for promedio in promedios:
-                    promedios_data.append(promedio)
-            
-            return self.excel_manager.crear_workbook_promedios(promedios_data, info_curso)
+            return self.excel_manager.crear_workbook_promedios(datos.get('promedios_alumnos', []), info_curso)
         elif formato.lower() == "pdf":
-            return self.pdf_manager.crear_reporte_curso(info_curso, estadisticas)
+            return self.pdf_manager.crear_reporte_curso(info_curso, datos.get('info_general', {}))
         else:
             raise ValueError(f"Formato no soportado: {formato}")
     
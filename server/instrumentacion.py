@@ -0,0 +1,389 @@
+"""
+Instrumentación de consultas SQL
+GESJ - Plataforma de Gestión Educativa
+
+El pool envuelve los cursores de cada conexión prestada en un
+CursorInstrumentado que mide cada consulta sin que los managers cambien:
+huella de la sentencia (SQL normalizado, sin literales), método que la
+ejecutó, pantalla de la interfaz que la originó, duración (ejecución +
+lectura de filas), filas devueltas y tiempo de espera para obtener la
+conexión. Los percentiles se calculan sobre una ventana de las últimas
+mediciones de cada consulta; las que superan el umbral configurado se
+guardan en un registro de consultas lentas (en memoria y, si se indica
+un archivo, como líneas JSON).
+
+Los parámetros de las consultas nunca se registran: pueden contener
+contraseñas y datos personales.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+_RE_COMENTARIOS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_RE_CADENAS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_RE_PARAMETROS = re.compile(r"%\(\w+\)s|%s")
+_RE_NUMEROS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_ESPACIOS = re.compile(r"\s+")
+_RE_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_FILAS_REPETIDAS = re.compile(r"(\((?:\?|, )+\))(?:\s*,\s*\1)+")
+
+# Archivos cuyos marcos se saltean al buscar quién ejecutó la consulta
+_ARCHIVOS_INTERNOS = {
+    os.path.normcase(os.path.abspath(__file__)),
+    os.path.normcase(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'connection_pool.py')),
+}
+# Funciones que sólo intermedian el préstamo de la conexión
+_FUNCIONES_INTERMEDIAS = {'crear_conexion', 'conectar'}
+_DIRECTORIO_UI = os.path.normcase(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ui')) + os.sep
+
+
+@lru_cache(maxsize=1024)
+def huella_sql(sql: str) -> str:
+    """Normalizar una sentencia para agrupar las ejecuciones de la misma consulta"""
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode('utf-8', errors='replace')
+    texto = _RE_COMENTARIOS.sub(' ', sql)
+    texto = _RE_CADENAS.sub('?', texto)
+    texto = _RE_PARAMETROS.sub('?', texto)
+    texto = _RE_NUMEROS.sub('?', texto)
+    texto = _RE_ESPACIOS.sub(' ', texto).strip()
+    # IN (?, ?, ?) y VALUES (...), (...) varían de largo pero son la misma consulta
+    texto = _RE_FILAS_REPETIDAS.sub(r'\1, ...', texto)
+    texto = _RE_LISTAS.sub('(?+)', texto)
+    return texto
+
+
+def obtener_llamador() -> Dict[str, Optional[str]]:
+    """Método que ejecutó la consulta y, si la hay, pantalla de ui/ que la originó"""
+    marco = sys._getframe(1)
+    llamador = None
+    pantalla = None
+    while marco is not None:
+        codigo = marco.f_code
+        archivo = os.path.normcase(os.path.abspath(codigo.co_filename))
+        if archivo not in _ARCHIVOS_INTERNOS and codigo.co_name not in _FUNCIONES_INTERMEDIAS:
+            nombre = _nombre_funcion(marco)
+            if llamador is None:
+                llamador = nombre
+            if archivo.startswith(_DIRECTORIO_UI):
+                pantalla = nombre
+                break
+        marco = marco.f_back
+    return {'llamador': llamador or '?', 'pantalla': pantalla}
+
+
+def _nombre_funcion(marco) -> str:
+    codigo = marco.f_code
+    instancia = marco.f_locals.get('self')
+    if instancia is not None:
+        return f"{type(instancia).__name__}.{codigo.co_name}"
+    # co_qualname existe desde Python 3.11
+    return getattr(codigo, 'co_qualname', codigo.co_name)
+
+
+def _percentil(valores: List[float], fraccion: float) -> float:
+    """Percentil por rango más cercano sobre una lista ordenada"""
+    if not valores:
+        return 0.0
+    posicion = max(0, min(len(valores) - 1, int(round(fraccion * len(valores) + 0.5)) - 1))
+    return valores[posicion]
+
+
+class _Serie:
+    """Contadores acumulados y ventana de duraciones recientes"""
+
+    def __init__(self, ventana: int):
+        self.ejecuciones = 0
+        self.errores = 0
+        self.filas = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.espera = 0.0
+        self.duraciones = deque(maxlen=ventana)
+        self.ultima = None
+
+    def agregar(self, duracion: float, filas: int = 0, error: bool = False):
+        self.ejecuciones += 1
+        self.total += duracion
+        self.filas += filas
+        if error:
+            self.errores += 1
+        if duracion > self.maximo:
+            self.maximo = duracion
+        self.duraciones.append(duracion)
+        self.ultima = time.time()
+
+    def resumen(self) -> Dict:
+        ordenadas = sorted(self.duraciones)
+        return {
+            'ejecuciones': self.ejecuciones,
+            'errores': self.errores,
+            'filas_total': self.filas,
+            'filas_promedio': round(self.filas / self.ejecuciones, 1) if self.ejecuciones else 0.0,
+            'total_ms': round(self.total * 1000, 1),
+            'promedio_ms': round(self.total * 1000 / self.ejecuciones, 2) if self.ejecuciones else 0.0,
+            'p50_ms': round(_percentil(ordenadas, 0.50) * 1000, 2),
+            'p95_ms': round(_percentil(ordenadas, 0.95) * 1000, 2),
+            'p99_ms': round(_percentil(ordenadas, 0.99) * 1000, 2),
+            'max_ms': round(self.maximo * 1000, 2),
+            'ultima': datetime.fromtimestamp(self.ultima).strftime('%H:%M:%S') if self.ultima else None,
+        }
+
+
+class Instrumentacion:
+    """Registro en memoria de las consultas ejecutadas por el proceso"""
+
+    def __init__(self, habilitada: bool = True, umbral_lento_ms: float = 500.0,
+                 archivo_lentas: Optional[str] = None, ventana: int = 500,
+                 max_lentas: int = 200, max_consultas: int = 500):
+        """
+        Args:
+            habilitada: Si es False los cursores se entregan sin envolver
+            umbral_lento_ms: Duración a partir de la cual una consulta es lenta
+            archivo_lentas: Archivo donde agregar las consultas lentas (None: sólo memoria)
+            ventana: Duraciones recientes por consulta usadas para los percentiles
+            max_lentas: Consultas lentas que se conservan en memoria
+            max_consultas: Huellas distintas que se siguen; las demás se agrupan en '(otras)'
+        """
+        self.habilitada = habilitada
+        self.umbral_lento_ms = umbral_lento_ms
+        self.archivo_lentas = archivo_lentas
+        self.ventana = ventana
+        self.max_consultas = max_consultas
+
+        self._lock = threading.Lock()
+        self._archivo_lock = threading.Lock()
+        self._consultas: Dict[str, _Serie] = {}
+        self._llamadores_consulta: Dict[str, Dict[str, int]] = {}
+        self._llamadores: Dict[str, _Serie] = {}
+        self._pantallas: Dict[str, _Serie] = {}
+        self._espera = _Serie(ventana)
+        self._lentas = deque(maxlen=max_lentas)
+        self._desde = time.time()
+
+    def envolver_cursor(self, cursor) -> 'CursorInstrumentado':
+        return CursorInstrumentado(cursor, self)
+
+    def registrar(self, sql, duracion: float, filas: int, origen: Dict, error: bool = False):
+        """Registrar una ejecución ya medida"""
+        huella = huella_sql(sql)
+        llamador = origen['llamador']
+        pantalla = origen['pantalla']
+
+        with self._lock:
+            serie = self._consultas.get(huella)
+            if serie is None:
+                if len(self._consultas) >= self.max_consultas:
+                    huella = '(otras)'
+                serie = self._consultas.setdefault(huella, _Serie(self.ventana))
+            serie.agregar(duracion, filas, error)
+
+            por_llamador = self._llamadores_consulta.setdefault(huella, {})
+            por_llamador[llamador] = por_llamador.get(llamador, 0) + 1
+
+            self._serie(self._llamadores, llamador).agregar(duracion, filas, error)
+            if pantalla:
+                self._serie(self._pantallas, pantalla).agregar(duracion, filas, error)
+
+        duracion_ms = duracion * 1000
+        if duracion_ms >= self.umbral_lento_ms:
+            self._registrar_lenta(huella, sql, duracion_ms, filas, origen, error)
+
+    def registrar_espera(self, duracion: float, error: bool = False):
+        """Registrar el tiempo que tardó el pool en entregar una conexión"""
+        origen = obtener_llamador()
+        with self._lock:
+            self._espera.agregar(duracion, error=error)
+            self._serie(self._llamadores, origen['llamador']).espera += duracion
+
+    def obtener_instantanea(self, limite: int = 50) -> Dict:
+        """Estado actual de las métricas, listo para mostrar o serializar"""
+        with self._lock:
+            consultas = []
+            for huella, serie in self._consultas.items():
+                resumen = serie.resumen()
+                resumen['huella'] = huella
+                llamadores = self._llamadores_consulta.get(huella, {})
+                resumen['llamadores'] = sorted(llamadores, key=llamadores.get, reverse=True)[:3]
+                consultas.append(resumen)
+
+            llamadores = []
+            for nombre, serie in self._llamadores.items():
+                if not serie.ejecuciones:
+                    continue
+                resumen = serie.resumen()
+                resumen['llamador'] = nombre
+                resumen['espera_ms'] = round(serie.espera * 1000, 1)
+                llamadores.append(resumen)
+
+            pantallas = []
+            for nombre, serie in self._pantallas.items():
+                resumen = serie.resumen()
+                resumen['pantalla'] = nombre
+                pantallas.append(resumen)
+
+            espera = self._espera.resumen()
+            lentas = list(self._lentas)
+
+        por_total = lambda resumen: resumen['total_ms']
+        return {
+            'desde': datetime.fromtimestamp(self._desde).strftime('%Y-%m-%d %H:%M:%S'),
+            'umbral_lento_ms': self.umbral_lento_ms,
+            'consultas': sorted(consultas, key=por_total, reverse=True)[:limite],
+            'llamadores': sorted(llamadores, key=por_total, reverse=True)[:limite],
+            'pantallas': sorted(pantallas, key=por_total, reverse=True)[:limite],
+            'espera_conexion': espera,
+            'lentas': lentas[::-1],
+        }
+
+    def reiniciar(self):
+        """Descartar todas las mediciones acumuladas"""
+        with self._lock:
+            self._consultas.clear()
+            self._llamadores_consulta.clear()
+            self._llamadores.clear()
+            self._pantallas.clear()
+            self._espera = _Serie(self.ventana)
+            self._lentas.clear()
+            self._desde = time.time()
+
+    def _serie(self, series: Dict[str, _Serie], nombre: str) -> _Serie:
+        serie = series.get(nombre)
+        if serie is None:
+            serie = series[nombre] = _Serie(self.ventana)
+        return serie
+
+    def _registrar_lenta(self, huella: str, sql, duracion_ms: float, filas: int,
+                         origen: Dict, error: bool):
+        if isinstance(sql, (bytes, bytearray)):
+            sql = sql.decode('utf-8', errors='replace')
+        entrada = {
+            'fecha': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'duracion_ms': round(duracion_ms, 1),
+            'filas': filas,
+            'error': error,
+            'llamador': origen['llamador'],
+            'pantalla': origen['pantalla'],
+            'huella': huella,
+            'sql': _RE_ESPACIOS.sub(' ', sql).strip()[:2000],
+        }
+        with self._lock:
+            self._lentas.append(entrada)
+
+        if not self.archivo_lentas:
+            return
+        try:
+            with self._archivo_lock:
+                with open(self.archivo_lentas, 'a', encoding='utf-8') as archivo:
+                    archivo.write(json.dumps(entrada, ensure_ascii=False) + '\n')
+        except OSError as e:
+            print(f"Error al escribir el registro de consultas lentas: {e}")
+
+
+class CursorInstrumentado:
+    """Cursor que mide ejecución y lectura de filas; el resto se delega al cursor real
+
+    La medición de una consulta se cierra al leer todas sus filas, al
+    ejecutar otra sentencia o al cerrar el cursor, de modo que la duración
+    incluye el tiempo de lectura de los cursores sin buffer.
+    """
+
+    def __init__(self, cursor, instrumentacion: Instrumentacion):
+        self._cursor = cursor
+        self._instrumentacion = instrumentacion
+        self._pendiente = None
+
+    def execute(self, operation, *args, **kwargs):
+        return self._medir(operation, self._cursor.execute, operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        return self._medir(operation, self._cursor.executemany, operation, *args, **kwargs)
+
+    def callproc(self, procname, *args, **kwargs):
+        return self._medir(f"CALL {procname}", self._cursor.callproc, procname, *args, **kwargs)
+
+    def fetchone(self):
+        fila = self._leer(self._cursor.fetchone)
+        if fila is None:
+            self.finalizar()
+        elif self._pendiente is not None:
+            self._pendiente[2] += 1
+        return fila
+
+    def fetchmany(self, *args, **kwargs):
+        filas = self._leer(self._cursor.fetchmany, *args, **kwargs)
+        if self._pendiente is not None:
+            self._pendiente[2] += len(filas)
+        return filas
+
+    def fetchall(self):
+        filas = self._leer(self._cursor.fetchall)
+        if self._pendiente is not None:
+            self._pendiente[2] += len(filas)
+        self.finalizar()
+        return filas
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        self.finalizar()
+        return self._cursor.close()
+
+    def finalizar(self):
+        """Registrar la medición en curso, si la hay"""
+        pendiente, self._pendiente = self._pendiente, None
+        if pendiente is None:
+            return
+        sql, duracion, filas, leyo, origen = pendiente
+        if not leyo:
+            # Sentencias sin resultado: filas afectadas
+            filas = max(getattr(self._cursor, 'rowcount', 0) or 0, 0)
+        self._instrumentacion.registrar(sql, duracion, filas, origen)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+    def __del__(self):
+        try:
+            self.finalizar()
+        except Exception:
+            pass
+
+    def _medir(self, sql, metodo, *args, **kwargs):
+        self.finalizar()
+        origen = obtener_llamador()
+        inicio = time.perf_counter()
+        try:
+            resultado = metodo(*args, **kwargs)
+        except Exception:
+            self._instrumentacion.registrar(sql, time.perf_counter() - inicio, 0, origen, error=True)
+            raise
+        # [sql, duración, filas leídas, se leyeron filas, origen]
+        self._pendiente = [sql, time.perf_counter() - inicio, 0, False, origen]
+        return resultado
+
+    def _leer(self, metodo, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return metodo(*args, **kwargs)
+        finally:
+            if self._pendiente is not None:
+                self._pendiente[1] += time.perf_counter() - inicio
+                self._pendiente[3] = True
@@ -5,9 +5,17 @@
 from .email_manager import EmailManager
 from .alert_system import AlertSystem
 from .notification_templates import NotificationTemplates
+from .mail_queue import MailQueue, obtener_cola_correo
+from .recipient_resolver import RecipientResolver
+from .template_engine import PlantillaCompilada, HtmlSeguro
 
 __all__ = [
     'EmailManager',
     'AlertSystem',
-    'NotificationTemplates'
+    'NotificationTemplates',
+    'MailQueue',
+    'obtener_cola_correo',
+    'RecipientResolver',
+    'PlantillaCompilada',
+    'HtmlSeguro'
 ]
\ No newline at end of file
@@ -3,9 +3,16 @@ Sistema de Alertas Automáticas
 GESJ - Plataforma de Gestión Educativa
 """
 
+from datetime import datetime
 from typing import List, Dict, Optional
 from .email_manager import EmailManager
 from .notification_templates import NotificationTemplates
+from .recipient_resolver import RecipientResolver, id_alumno
+
+# Orden de gravedad (los resúmenes muestran primero los críticos)
+ORDEN_NIVEL = {"CRÍTICO": 0, "ALTO": 1, "MODERADO": 2}
+COLORES_NIVEL = {"CRÍTICO": "#F44336", "ALTO": "#FF9800", "MODERADO": "#4CAF50"}
+NOMBRES_PLANTILLA_NIVEL = {"CRÍTICO": "critico", "ALTO": "alto", "MODERADO": "moderado"}
 
 class AlertSystem:
     """Sistema especializado para gestión de alertas automáticas"""
@@ -13,59 +20,92 @@ class AlertSystem:
     def __init__(self):
         self.email_manager = EmailManager()
         self.templates = NotificationTemplates()
+        self.resolver = RecipientResolver()
     
     def procesar_alertas_riesgo(self, alumnos_riesgo: List[Dict]) -> bool:
-        """Procesar alertas para alumnos en riesgo académico"""
+        """
+        Procesar alertas para alumnos en riesgo académico.
+
+        Cada preceptor recibe un único resumen con todos los alumnos (o la
+        alerta del nivel si hay uno solo) y cada familia un único email con
+        el bloque de cada hijo.
+        """
         try:
-            for alumno in alumnos_riesgo:
-                # Determinar nivel de riesgo
-                promedio = float(alumno.get('promedio_general', 0))
-                
-                if promedio < 5.0:
-                    nivel = "CRÍTICO"
-                    template = self.templates.get_template_riesgo_critico()
-                elif promedio < 6.0:
-                    nivel = "ALTO"
-                    template = self.templates.get_template_riesgo_alto()
-                else:
-                    nivel = "MODERADO"
-                    template = self.templates.get_template_riesgo_moderado()
-                
-                # Enviar a preceptores
-                emails_preceptores = self.email_manager.obtener_emails_por_rol(
-                    "Preceptor", alumno['curso'], alumno['division']
-                )
-                
-                for email in emails_preceptores:
-                    asunto = f"🚨 Alerta de Riesgo {nivel} - {alumno['alumno']}"
-                    contenido = template.format(
-                        alumno=alumno['alumno'],
-                        curso=alumno['curso'],
-                        division=alumno['division'],
-                        promedio=promedio,
-                        nivel=nivel
-                    )
-                    self.email_manager.enviar_email_html(email, asunto, contenido)
-                
-                # Enviar a padres
-                emails_padres = self.email_manager.obtener_emails_por_rol(
-                    "Padre", alumno['curso'], alumno['division']
-                )
-                
-                for email in emails_padres:
-                    asunto = f"📚 Información Académica - {alumno['alumno']}"
-                    contenido = self.templates.get_template_padre_riesgo().format(
-                        alumno=alumno['alumno'],
-                        promedio=promedio
-                    )
-                    self.email_manager.enviar_email_html(email, asunto, contenido)
+            # Destinatarios de todos los alumnos en una sola resolución
+            destinatarios = self.resolver.resolver(alumnos_riesgo)
+            datos = {id_alumno(alumno): self._datos_alerta(alumno) for alumno in alumnos_riesgo}
+            mensajes = []
+            
+            # Un resumen por preceptor; los que reciben el mismo grupo comparten el HTML
+            resumenes: Dict[tuple, tuple] = {}
+            for email, alumnos in destinatarios['preceptores'].items():
+                grupo = tuple(dict.fromkeys(id_alumno(alumno) for alumno in alumnos))
+                if grupo not in resumenes:
+                    resumenes[grupo] = self._resumen_preceptor([datos[alumno_id] for alumno_id in grupo])
+                asunto, contenido = resumenes[grupo]
+                mensajes.append((email, asunto, contenido))
             
-            return True
+            # Un único email por familia, aunque tenga varios hijos en la lista
+            for email, hijos in destinatarios['padres'].items():
+                items = [datos[id_alumno(hijo)] for hijo in hijos]
+                nombres = " y ".join(item['alumno'] for item in items)
+                asunto = f"📚 Información Académica - {nombres}"
+                contenido = self.templates.renderizar_resumen(
+                    "resumen_padre_riesgo", "item_padre_riesgo", items, alumnos=nombres)
+                mensajes.append((email, asunto, contenido))
+            
+            return self.email_manager.enviar_emails_html(mensajes)
             
         except Exception as e:
             print(f"Error procesando alertas de riesgo: {e}")
             return False
     
+    def _datos_alerta(self, alumno: Dict) -> Dict:
+        """Valores de plantilla de un alumno en riesgo"""
+        promedio = self._promedio(alumno)
+        nivel = self._nivel_riesgo(alumno, promedio)
+        return {
+            'alumno': alumno['alumno'],
+            'curso': alumno['curso'],
+            'division': alumno['division'],
+            'promedio': promedio,
+            'nivel': nivel,
+            'color': COLORES_NIVEL[nivel],
+        }
+    
+    def _resumen_preceptor(self, items: List[Dict]) -> tuple:
+        """Asunto y contenido del resumen para preceptores, ordenado por gravedad"""
+        if len(items) == 1:
+            item = items[0]
+            plantilla = f"riesgo_{NOMBRES_PLANTILLA_NIVEL[item['nivel']]}"
+            return (f"🚨 Alerta de Riesgo {item['nivel']} - {item['alumno']}",
+                    self.templates.renderizar(plantilla, **item))
+        
+        items = sorted(items, key=lambda item: (ORDEN_NIVEL[item['nivel']], item['promedio']))
+        conteo = {nivel: 0 for nivel in ORDEN_NIVEL}
+        for item in items:
+            conteo[item['nivel']] += 1
+        asunto = f"🚨 Resumen de Alertas de Riesgo - {len(items)} alumnos ({conteo['CRÍTICO']} críticos)"
+        contenido = self.templates.renderizar_resumen(
+            "resumen_preceptor_riesgo", "item_preceptor_riesgo", items,
+            total=len(items), criticos=conteo['CRÍTICO'],
+            altos=conteo['ALTO'], moderados=conteo['MODERADO'])
+        return asunto, contenido
+    
+    def _promedio(self, alumno: Dict) -> float:
+        """Promedio del alumno (obtener_alumnos_en_riesgo o motor de riesgo)"""
+        return float(alumno.get('promedio_general', alumno.get('promedio')) or 0)
+    
+    def _nivel_riesgo(self, alumno: Dict, promedio: float) -> str:
+        """Nivel calculado por el motor de riesgo o, si no viene, según el promedio"""
+        if alumno.get('nivel') in ("CRÍTICO", "ALTO", "MODERADO"):
+            return alumno['nivel']
+        if promedio < 5.0:
+            return "CRÍTICO"
+        if promedio < 6.0:
+            return "ALTO"
+        return "MODERADO"
+    
     def enviar_notificacion_calificaciones(self, docente_nombre: str, materia_nombre: str,
                                          curso: str, division: str, periodo: str) -> bool:
         """Enviar notificación cuando se suben calificaciones"""
@@ -76,33 +116,24 @@ class AlertSystem:
             # Obtener emails de padres
             emails_padres = self.email_manager.obtener_emails_por_rol("Padre", curso, division)
             
-            # Enviar a preceptores
-            for email in emails_preceptores:
-                asunto = f"📊 Calificaciones Actualizadas - {materia_nombre} - {curso} {division}"
-                contenido = self.templates.get_template_calificaciones_preceptor().format(
-                    docente=docente_nombre,
-                    materia=materia_nombre,
-                    curso=curso,
-                    division=division,
-                    periodo=periodo,
-                    fecha=datetime.now().strftime('%d/%m/%Y %H:%M')
-                )
-                self.email_manager.enviar_email_html(email, asunto, contenido)
+            # El contenido es igual para todos: se renderiza una vez por rol
+            valores = {
+                'docente': docente_nombre,
+                'materia': materia_nombre,
+                'curso': curso,
+                'division': division,
+                'periodo': periodo,
+                'fecha': datetime.now().strftime('%d/%m/%Y %H:%M'),
+            }
+            asunto = f"📊 Calificaciones Actualizadas - {materia_nombre} - {curso} {division}"
+            contenido = self.templates.renderizar("calificaciones_preceptor", **valores)
+            mensajes = [(email, asunto, contenido) for email in emails_preceptores]
             
-            # Enviar a padres
-            for email in emails_padres:
-                asunto = f"📚 Calificaciones Disponibles - {materia_nombre}"
-                contenido = self.templates.get_template_calificaciones_padre().format(
-                    docente=docente_nombre,
-                    materia=materia_nombre,
-                    curso=curso,
-                    division=division,
-                    periodo=periodo,
-                    fecha=datetime.now().strftime('%d/%m/%Y %H:%M')
-                )
-                self.email_manager.enviar_email_html(email, asunto, contenido)
+            asunto = f"📚 Calificaciones Disponibles - {materia_nombre}"
+            contenido = self.templates.renderizar("calificaciones_padre", **valores)
+            mensajes += [(email, asunto, contenido) for email in emails_padres]
             
-            return True
+            return self.email_manager.enviar_emails_html(mensajes)
             
         except Exception as e:
             print(f"Error enviando notificación de calificaciones: {e}")
@@ -3,15 +3,15 @@ Gestor de Email para Notificaciones
 GESJ - Plataforma de Gestión Educativa
 """
 
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 import os
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from ..database import crear_conexion
+from .mail_queue import obtener_cola_correo
 
 # Configuración del servidor de email
 EMAIL_CONFIG = {
@@ -35,6 +35,13 @@ class EmailManager:
         self.password = EMAIL_CONFIG['password']
         self.sender_name = EMAIL_CONFIG['sender_name']
         self.simulation_mode = SIMULATION_MODE or not (self.email and self.password)
+        # Fuera de simulación los mensajes se encolan y los entrega el hilo de la cola
+        self.cola = None if self.simulation_mode else obtener_cola_correo({
+            'servidor': self.smtp_server,
+            'puerto': self.smtp_port,
+            'usuario': self.email,
+            'password': self.password,
+        })
     
     def enviar_email_simple(self, destinatario: str, asunto: str, mensaje: str) -> bool:
         """Enviar email simple"""
@@ -44,21 +51,15 @@ class EmailManager:
             return True
         
         try:
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.email, self.password)
-            
             msg = MIMEText(mensaje, 'plain', 'utf-8')
             msg['From'] = f"{self.sender_name} <{self.email}>"
             msg['To'] = destinatario
             msg['Subject'] = asunto
             
-            server.send_message(msg)
-            server.quit()
-            return True
+            return self.cola.encolar(msg)
             
         except Exception as e:
-            print(f"Error al enviar email: {e}")
+            print(f"Error al encolar email: {e}")
             return False
     
     def enviar_email_html(self, destinatario: str, asunto: str, contenido_html: str, 
@@ -72,29 +73,56 @@ class EmailManager:
             return True
         
         try:
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.email, self.password)
-            
-            msg = MIMEMultipart('alternative')
-            msg['From'] = f"{self.sender_name} <{self.email}>"
-            msg['To'] = destinatario
-            msg['Subject'] = asunto
+            return self.cola.encolar(
+                self.crear_mensaje_html(destinatario, asunto, contenido_html, archivo_adjunto))
             
-            html_part = MIMEText(contenido_html, 'html', 'utf-8')
-            msg.attach(html_part)
-            
-            # Adjuntar archivo si existe
-            if archivo_adjunto and os.path.exists(archivo_adjunto):
-                self._adjuntar_archivo(msg, archivo_adjunto)
-            
-            server.send_message(msg)
-            server.quit()
+        except Exception as e:
+            print(f"Error al encolar email HTML: {e}")
+            return False
+    
+    def enviar_emails_html(self, mensajes: List[Tuple[str, str, str]]) -> bool:
+        """
+        Enviar un lote de emails HTML (destinatario, asunto, contenido_html).
+
+        Los mensajes con el mismo contenido comparten la parte HTML ya
+        codificada y todo el lote se encola de una vez.
+        """
+        if self.simulation_mode:
+            for destinatario, asunto, _ in mensajes:
+                print(f"📧 SIMULACIÓN - Email HTML enviado a: {destinatario}")
+                print(f"   Asunto: {asunto}")
             return True
-            
+
+        try:
+            partes: Dict[str, MIMEText] = {}
+            lote = []
+            for destinatario, asunto, contenido_html in mensajes:
+                if contenido_html not in partes:
+                    partes[contenido_html] = MIMEText(contenido_html, 'html', 'utf-8')
+                lote.append(self.crear_mensaje_html(destinatario, asunto, contenido_html,
+                                                    parte_html=partes[contenido_html]))
+            return self.cola.encolar_varios(lote)
+
         except Exception as e:
-            print(f"Error al enviar email HTML: {e}")
+            print(f"Error al encolar lote de emails HTML: {e}")
             return False
+
+    def crear_mensaje_html(self, destinatario: str, asunto: str, contenido_html: str,
+                           archivo_adjunto: str = None, parte_html: MIMEText = None) -> MIMEMultipart:
+        """Armar el mensaje MIME que se guarda en la cola (parte_html: parte ya codificada a reutilizar)"""
+        msg = MIMEMultipart('alternative')
+        msg['From'] = f"{self.sender_name} <{self.email}>"
+        msg['To'] = destinatario
+        msg['Subject'] = asunto
+
+        html_part = parte_html or MIMEText(contenido_html, 'html', 'utf-8')
+        msg.attach(html_part)
+        
+        # Adjuntar archivo si existe
+        if archivo_adjunto and os.path.exists(archivo_adjunto):
+            self._adjuntar_archivo(msg, archivo_adjunto)
+        
+        return msg
     
     def _adjuntar_archivo(self, msg, archivo_path: str):
         """Adjuntar archivo al mensaje de email"""
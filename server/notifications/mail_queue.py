@@ -0,0 +1,539 @@
+"""
+Cola de Envío de Emails
+GESJ - Plataforma de Gestión Educativa
+
+Los llamadores sólo encolan: el mensaje MIME ya armado se guarda en la
+tabla cola_emails y un hilo de envío lo entrega en segundo plano. El hilo
+reutiliza una sesión SMTP autenticada para muchos mensajes (se renueva
+cada mensajes_por_conexion envíos o tras un tiempo inactiva), respeta un
+límite de mensajes por minuto y reintenta los errores transitorios con
+espera exponencial. Los errores permanentes (destinatario rechazado,
+códigos 5xx) marcan el mensaje como fallido sin reintentar.
+
+Los mensajes se reservan con una marca de lote y un vencimiento, de modo
+que si el proceso se cae a mitad de un envío otro proceso (o el mismo al
+reiniciarse) los retoma cuando vence la reserva. Sin la tabla cola_emails
+la cola funciona igual, pero sólo en memoria.
+
+Para probarla sin un servidor real alcanza con un SMTP local de prueba:
+
+    python -m smtpd -n -c DebuggingServer localhost:1025
+
+y una configuración {'servidor': 'localhost', 'puerto': 1025, 'usar_tls': False}.
+"""
+
+import atexit
+import random
+import smtplib
+import ssl
+import threading
+import time
+import uuid
+from email.message import Message
+from typing import Dict, List, Optional, Tuple
+
+from mysql.connector import Error
+from ..database import crear_conexion
+from ..schema_cache import obtener_capacidades
+
+# Parámetros de la cola y del hilo de envío
+COLA_CONFIG = {
+    'mensajes_por_conexion': 50,     # Envíos por sesión SMTP (y tamaño de cada lote)
+    'mensajes_por_minuto': 120,      # Límite de envío; 0 desactiva el límite
+    'max_intentos': 6,               # Intentos antes de marcar el mensaje como fallido
+    'espera_base': 30.0,             # Segundos antes del primer reintento (se duplica)
+    'espera_maxima': 3600.0,         # Tope de espera entre reintentos
+    'intervalo_sondeo': 5.0,         # Cada cuánto se revisa la cola si no hay avisos
+    'duracion_reserva': 300,         # Segundos que un lote queda reservado por un hilo
+    'max_inactividad_smtp': 60.0,    # Segundos que una sesión SMTP puede quedar ociosa
+}
+
+
+class ErrorPermanente(Exception):
+    """El servidor rechazó el mensaje y reintentar no cambiaría el resultado"""
+
+
+# ==================== ALMACENAMIENTO ====================
+
+class AlmacenMySQL:
+    """Mensajes pendientes en la tabla cola_emails"""
+
+    def agregar(self, mensajes: List[Tuple[str, str, bytes]]) -> bool:
+        connection = crear_conexion()
+        if not connection:
+            return False
+        try:
+            cursor = connection.cursor()
+            cursor.executemany("""
+                INSERT INTO cola_emails (destinatario, asunto, mensaje)
+                VALUES (%s, %s, %s)
+            """, mensajes)
+            connection.commit()
+            cursor.close()
+            return True
+        except Error as e:
+            print(f"Error al encolar emails: {e}")
+            connection.rollback()
+            return False
+        finally:
+            connection.close()
+
+    def reservar(self, limite: int, duracion: int) -> List[Dict]:
+        """Marcar hasta `limite` mensajes listos con un lote propio y devolverlos"""
+        connection = crear_conexion()
+        if not connection:
+            return []
+        lote = uuid.uuid4().hex
+        try:
+            cursor = connection.cursor(dictionary=True)
+            # UPDATE ... LIMIT es atómico: dos hilos o procesos no reservan el mismo mensaje
+            cursor.execute("""
+                UPDATE cola_emails
+                SET lote = %s, reservado_hasta = NOW() + INTERVAL %s SECOND
+                WHERE estado = 'pendiente' AND proximo_intento <= NOW()
+                AND (reservado_hasta IS NULL OR reservado_hasta < NOW())
+                ORDER BY proximo_intento, id
+                LIMIT %s
+            """, (lote, duracion, limite))
+            connection.commit()
+            if cursor.rowcount == 0:
+                cursor.close()
+                return []
+            cursor.execute("""
+                SELECT id, destinatario, asunto, mensaje, intentos
+                FROM cola_emails WHERE lote = %s ORDER BY id
+            """, (lote,))
+            mensajes = cursor.fetchall()
+            cursor.close()
+            return mensajes
+        except Error as e:
+            print(f"Error al reservar emails de la cola: {e}")
+            connection.rollback()
+            return []
+        finally:
+            connection.close()
+
+    def confirmar(self, ids: List[int]):
+        self._actualizar("""
+            UPDATE cola_emails
+            SET estado = 'enviado', fecha_envio = NOW(), intentos = intentos + 1,
+                lote = NULL, reservado_hasta = NULL
+            WHERE id = %s
+        """, [(mensaje_id,) for mensaje_id in ids])
+
+    def reprogramar(self, reintentos: List[Tuple[int, float, str]]):
+        """Volver a dejar pendientes, con un intento más, a partir de la espera indicada"""
+        self._actualizar("""
+            UPDATE cola_emails
+            SET intentos = intentos + 1, proximo_intento = NOW() + INTERVAL %s SECOND,
+                ultimo_error = %s, lote = NULL, reservado_hasta = NULL
+            WHERE id = %s
+        """, [(int(espera), error[:500], mensaje_id) for mensaje_id, espera, error in reintentos])
+
+    def descartar(self, fallidos: List[Tuple[int, str]]):
+        self._actualizar("""
+            UPDATE cola_emails
+            SET estado = 'fallido', intentos = intentos + 1, ultimo_error = %s,
+                lote = NULL, reservado_hasta = NULL
+            WHERE id = %s
+        """, [(error[:500], mensaje_id) for mensaje_id, error in fallidos])
+
+    def liberar(self, ids: List[int]):
+        """Devolver mensajes reservados sin contar un intento (envío interrumpido)"""
+        self._actualizar("""
+            UPDATE cola_emails SET lote = NULL, reservado_hasta = NULL WHERE id = %s
+        """, [(mensaje_id,) for mensaje_id in ids])
+
+    def contar(self) -> Dict[str, int]:
+        connection = crear_conexion()
+        if not connection:
+            return {}
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT estado, COUNT(*) FROM cola_emails GROUP BY estado")
+            conteo = {estado: total for estado, total in cursor.fetchall()}
+            cursor.close()
+            return conteo
+        except Error as e:
+            print(f"Error al contar emails de la cola: {e}")
+            return {}
+        finally:
+            connection.close()
+
+    def purgar_enviados(self, dias: int = 30) -> int:
+        """Borrar los mensajes enviados hace más de `dias` días"""
+        connection = crear_conexion()
+        if not connection:
+            return 0
+        try:
+            cursor = connection.cursor()
+            cursor.execute("""
+                DELETE FROM cola_emails
+                WHERE estado = 'enviado' AND fecha_envio < NOW() - INTERVAL %s DAY
+            """, (dias,))
+            borrados = cursor.rowcount
+            connection.commit()
+            cursor.close()
+            return borrados
+        except Error as e:
+            print(f"Error al purgar la cola de emails: {e}")
+            connection.rollback()
+            return 0
+        finally:
+            connection.close()
+
+    def _actualizar(self, query: str, filas: List[Tuple]):
+        if not filas:
+            return
+        connection = crear_conexion()
+        if not connection:
+            return
+        try:
+            cursor = connection.cursor()
+            cursor.executemany(query, filas)
+            connection.commit()
+            cursor.close()
+        except Error as e:
+            # Si no se pudo registrar, la reserva vence y el mensaje se vuelve a tomar
+            print(f"Error al actualizar la cola de emails: {e}")
+            connection.rollback()
+        finally:
+            connection.close()
+
+
+class AlmacenMemoria:
+    """Mensajes pendientes en memoria (se pierden si el proceso termina)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._mensajes: Dict[int, Dict] = {}
+        self._siguiente_id = 1
+
+    def agregar(self, mensajes: List[Tuple[str, str, bytes]]) -> bool:
+        with self._lock:
+            for destinatario, asunto, mensaje in mensajes:
+                self._mensajes[self._siguiente_id] = {
+                    'id': self._siguiente_id, 'destinatario': destinatario, 'asunto': asunto,
+                    'mensaje': mensaje, 'intentos': 0, 'estado': 'pendiente',
+                    'proximo_intento': 0.0, 'reservado_hasta': 0.0, 'ultimo_error': None,
+                }
+                self._siguiente_id += 1
+        return True
+
+    def reservar(self, limite: int, duracion: int) -> List[Dict]:
+        ahora = time.time()
+        with self._lock:
+            listos = [m for m in self._mensajes.values()
+                      if m['estado'] == 'pendiente' and m['proximo_intento'] <= ahora
+                      and m['reservado_hasta'] < ahora]
+            listos.sort(key=lambda m: (m['proximo_intento'], m['id']))
+            reservados = listos[:limite]
+            for mensaje in reservados:
+                mensaje['reservado_hasta'] = ahora + duracion
+            return [dict(mensaje) for mensaje in reservados]
+
+    def confirmar(self, ids: List[int]):
+        with self._lock:
+            for mensaje_id in ids:
+                # Los enviados no se conservan: no hay historial que consultar en memoria
+                self._mensajes.pop(mensaje_id, None)
+
+    def reprogramar(self, reintentos: List[Tuple[int, float, str]]):
+        ahora = time.time()
+        with self._lock:
+            for mensaje_id, espera, error in reintentos:
+                mensaje = self._mensajes[mensaje_id]
+                mensaje['intentos'] += 1
+                mensaje['proximo_intento'] = ahora + espera
+                mensaje['reservado_hasta'] = 0.0
+                mensaje['ultimo_error'] = error
+
+    def descartar(self, fallidos: List[Tuple[int, str]]):
+        with self._lock:
+            for mensaje_id, error in fallidos:
+                mensaje = self._mensajes[mensaje_id]
+                mensaje['intentos'] += 1
+                mensaje['estado'] = 'fallido'
+                mensaje['ultimo_error'] = error
+
+    def liberar(self, ids: List[int]):
+        with self._lock:
+            for mensaje_id in ids:
+                self._mensajes[mensaje_id]['reservado_hasta'] = 0.0
+
+    def contar(self) -> Dict[str, int]:
+        with self._lock:
+            conteo = {}
+            for mensaje in self._mensajes.values():
+                conteo[mensaje['estado']] = conteo.get(mensaje['estado'], 0) + 1
+            return conteo
+
+    def purgar_enviados(self, dias: int = 30) -> int:
+        return 0
+
+
+def crear_almacen():
+    """Almacén persistente si existe la tabla cola_emails; si no, en memoria"""
+    if obtener_capacidades().tiene_tabla('cola_emails'):
+        return AlmacenMySQL()
+    print("⚠️ La tabla cola_emails no existe: los emails pendientes se guardan sólo en memoria")
+    return AlmacenMemoria()
+
+
+# ==================== COLA Y TRABAJADOR ====================
+
+class MailQueue:
+    """Cola de salida con un hilo que entrega los mensajes por SMTP"""
+
+    def __init__(self, config_smtp: Dict, almacen=None, **config):
+        """
+        Args:
+            config_smtp: servidor, puerto, usuario, password, usar_tls (True) y timeout (30)
+            almacen: Dónde guardar los pendientes (por defecto, ver crear_almacen)
+            **config: Valores que reemplazan a los de COLA_CONFIG
+        """
+        self.config_smtp = dict({'usar_tls': True, 'timeout': 30, 'usuario': '', 'password': ''},
+                                **config_smtp)
+        self.config = dict(COLA_CONFIG, **config)
+        self.almacen = almacen if almacen is not None else crear_almacen()
+
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+        self._sesion: Optional[smtplib.SMTP] = None
+        self._envios_sesion = 0
+        self._ultimo_uso = 0.0
+        self._proximo_envio = 0.0
+        self._pausa_hasta = 0.0
+
+        self._estadisticas = {
+            'encolados': 0,
+            'enviados': 0,
+            'reintentos': 0,
+            'fallidos': 0,
+            'conexiones': 0,
+            'lotes': 0,
+        }
+
+    def encolar(self, mensaje: Message) -> bool:
+        """Guardar un mensaje para envío; devuelve False si no se pudo encolar"""
+        return self.encolar_varios([mensaje])
+
+    def encolar_varios(self, mensajes: List[Message]) -> bool:
+        """Guardar varios mensajes en una sola operación"""
+        if not mensajes:
+            return True
+        filas = [(str(m['To']), str(m['Subject'] or '')[:255], m.as_bytes()) for m in mensajes]
+        if not self.almacen.agregar(filas):
+            return False
+        with self._lock:
+            self._estadisticas['encolados'] += len(filas)
+        self.iniciar()
+        self._despertar.set()
+        return True
+
+    def iniciar(self):
+        """Arrancar el hilo de envío si no está corriendo"""
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._trabajar, name="gesj-mail-queue", daemon=True)
+            self._hilo.start()
+
+    def detener(self, timeout: float = 10.0):
+        """Detener el hilo; lo que no se envió queda pendiente en el almacén"""
+        self._detener.set()
+        self._despertar.set()
+        hilo = self._hilo
+        if hilo is not None and hilo is not threading.current_thread():
+            hilo.join(timeout)
+
+    def procesar_pendientes(self, timeout: float = 60.0) -> int:
+        """Enviar en el hilo actual lo que esté listo (scripts y pruebas); devuelve los enviados"""
+        limite = time.monotonic() + timeout
+        enviados = 0
+        try:
+            while time.monotonic() < limite and not self._en_pausa():
+                procesados = self.procesar_lote()
+                if not procesados:
+                    break
+                enviados += procesados
+        finally:
+            self._cerrar_sesion()
+        return enviados
+
+    def procesar_lote(self) -> int:
+        """Reservar un lote de mensajes y enviarlo por una misma sesión SMTP"""
+        mensajes = self.almacen.reservar(self.config['mensajes_por_conexion'],
+                                         self.config['duracion_reserva'])
+        if not mensajes:
+            return 0
+        with self._lock:
+            self._estadisticas['lotes'] += 1
+
+        enviados, reintentos, fallidos = [], [], []
+        pendientes = list(mensajes)
+        try:
+            while pendientes and not self._detener.is_set():
+                mensaje = pendientes[0]
+                self._esperar_turno()
+                if self._detener.is_set():
+                    break
+                try:
+                    self._enviar(mensaje)
+                    enviados.append(mensaje['id'])
+                except ErrorPermanente as e:
+                    fallidos.append((mensaje['id'], str(e)))
+                except (smtplib.SMTPException, OSError) as e:
+                    # Error de conexión o transitorio: la sesión no es confiable y se
+                    # espera antes de volver a intentar con el resto del lote
+                    self._cerrar_sesion()
+                    self._pausa_hasta = time.monotonic() + self.config['espera_base']
+                    self._clasificar_reintento(mensaje, str(e), reintentos, fallidos)
+                    pendientes.pop(0)
+                    break
+                pendientes.pop(0)
+        finally:
+            self.almacen.confirmar(enviados)
+            self.almacen.reprogramar(reintentos)
+            self.almacen.descartar(fallidos)
+            # Lo que quedó sin intentar vuelve a la cola sin sumar un intento
+            self.almacen.liberar([mensaje['id'] for mensaje in pendientes])
+
+        with self._lock:
+            self._estadisticas['enviados'] += len(enviados)
+            self._estadisticas['reintentos'] += len(reintentos)
+            self._estadisticas['fallidos'] += len(fallidos)
+        return len(enviados) + len(reintentos) + len(fallidos)
+
+    def obtener_estadisticas(self) -> Dict:
+        with self._lock:
+            estadisticas = dict(self._estadisticas)
+        estadisticas['por_estado'] = self.almacen.contar()
+        estadisticas['activo'] = self._hilo is not None and self._hilo.is_alive()
+        return estadisticas
+
+    # ==================== ENVÍO ====================
+
+    def _trabajar(self):
+        while not self._detener.is_set():
+            if self._en_pausa():
+                self._detener.wait(self._pausa_hasta - time.monotonic())
+                continue
+            try:
+                procesados = self.procesar_lote()
+            except Exception as e:
+                print(f"Error en el envío de emails: {e}")
+                procesados = 0
+            if procesados:
+                continue
+            self._cerrar_sesion_inactiva()
+            self._despertar.wait(self.config['intervalo_sondeo'])
+            self._despertar.clear()
+        self._cerrar_sesion()
+
+    def _en_pausa(self) -> bool:
+        return time.monotonic() < self._pausa_hasta
+
+    def _enviar(self, mensaje: Dict):
+        sesion = self._obtener_sesion()
+        remitente = self.config_smtp['usuario'] or 'gesj@localhost'
+        try:
+            rechazados = sesion.sendmail(remitente, [mensaje['destinatario']], mensaje['mensaje'])
+        except smtplib.SMTPRecipientsRefused as e:
+            raise ErrorPermanente(f"Destinatario rechazado: {e.recipients}")
+        except smtplib.SMTPResponseException as e:
+            if 500 <= e.smtp_code < 600:
+                raise ErrorPermanente(f"{e.smtp_code} {e.smtp_error!r}")
+            raise
+        if rechazados:
+            raise ErrorPermanente(f"Destinatario rechazado: {rechazados}")
+
+        self._envios_sesion += 1
+        self._ultimo_uso = time.monotonic()
+        if self._envios_sesion >= self.config['mensajes_por_conexion']:
+            self._cerrar_sesion()
+
+    def _obtener_sesion(self) -> smtplib.SMTP:
+        """Sesión SMTP autenticada, reutilizada mientras siga viva"""
+        if self._sesion is not None:
+            if time.monotonic() - self._ultimo_uso < self.config['max_inactividad_smtp']:
+                return self._sesion
+            try:
+                if self._sesion.noop()[0] == 250:
+                    return self._sesion
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._cerrar_sesion()
+
+        config = self.config_smtp
+        sesion = smtplib.SMTP(config['servidor'], config['puerto'], timeout=config['timeout'])
+        try:
+            sesion.ehlo()
+            if config['usar_tls']:
+                sesion.starttls(context=ssl.create_default_context())
+                sesion.ehlo()
+            if config['usuario'] and config['password']:
+                sesion.login(config['usuario'], config['password'])
+        except Exception:
+            sesion.close()
+            raise
+
+        self._sesion = sesion
+        self._envios_sesion = 0
+        self._ultimo_uso = time.monotonic()
+        with self._lock:
+            self._estadisticas['conexiones'] += 1
+        return sesion
+
+    def _cerrar_sesion(self):
+        sesion, self._sesion = self._sesion, None
+        if sesion is None:
+            return
+        try:
+            sesion.quit()
+        except (smtplib.SMTPException, OSError):
+            sesion.close()
+
+    def _cerrar_sesion_inactiva(self):
+        if (self._sesion is not None
+                and time.monotonic() - self._ultimo_uso >= self.config['max_inactividad_smtp']):
+            self._cerrar_sesion()
+
+    def _esperar_turno(self):
+        """Espaciar los envíos según mensajes_por_minuto"""
+        por_minuto = self.config['mensajes_por_minuto']
+        if not por_minuto:
+            return
+        ahora = time.monotonic()
+        if self._proximo_envio > ahora:
+            self._detener.wait(self._proximo_envio - ahora)
+            ahora = time.monotonic()
+        self._proximo_envio = max(self._proximo_envio, ahora) + 60.0 / por_minuto
+
+    def _clasificar_reintento(self, mensaje: Dict, error: str, reintentos: List, fallidos: List):
+        intentos = mensaje['intentos'] + 1
+        if intentos >= self.config['max_intentos']:
+            fallidos.append((mensaje['id'], f"Sin éxito tras {intentos} intentos: {error}"))
+            return
+        espera = min(self.config['espera_maxima'], self.config['espera_base'] * 2 ** (intentos - 1))
+        reintentos.append((mensaje['id'], espera * random.uniform(0.8, 1.2), error))
+
+
+# Una cola por servidor y cuenta SMTP en todo el proceso
+_colas: Dict[Tuple, MailQueue] = {}
+_colas_lock = threading.Lock()
+
+
+def obtener_cola_correo(config_smtp: Dict) -> MailQueue:
+    """Obtiene la cola compartida para una configuración SMTP, creándola la primera vez"""
+    clave = (config_smtp['servidor'], config_smtp['puerto'], config_smtp.get('usuario', ''))
+    with _colas_lock:
+        cola = _colas.get(clave)
+        if cola is None:
+            cola = _colas[clave] = MailQueue(config_smtp)
+            atexit.register(cola.detener)
+    return cola
@@ -3,9 +3,36 @@ Plantillas de Notificaciones
 GESJ - Plataforma de Gestión Educativa
 """
 
+from typing import Dict, Iterable, List
+
+from .template_engine import CachePlantillas, HtmlSeguro, PlantillaCompilada
+
+# Compartida por todas las instancias: cada plantilla se compila una vez por proceso
+_CACHE_PLANTILLAS = CachePlantillas()
+
 class NotificationTemplates:
     """Plantillas HTML para diferentes tipos de notificaciones"""
     
+    def compilar(self, nombre: str) -> PlantillaCompilada:
+        """Plantilla compilada a partir de get_template_<nombre>()"""
+        return _CACHE_PLANTILLAS.obtener(nombre, getattr(self, f"get_template_{nombre}"))
+    
+    def renderizar(self, nombre: str, **valores) -> str:
+        """Renderizar una plantilla para un destinatario"""
+        return self.compilar(nombre).renderizar(valores)
+    
+    def renderizar_lote(self, nombre: str, lista_valores: Iterable[Dict]) -> List[str]:
+        """Renderizar una plantilla para varios destinatarios con una sola compilación"""
+        return self.compilar(nombre).renderizar_lote(lista_valores)
+    
+    def renderizar_resumen(self, nombre: str, nombre_item: str, items: Iterable[Dict], **valores) -> str:
+        """
+        Renderizar un resumen: un bloque 'nombre_item' por cada item,
+        insertados en el campo {detalle} de la plantilla 'nombre'
+        """
+        detalle = "".join(self.renderizar_lote(nombre_item, items))
+        return self.renderizar(nombre, detalle=HtmlSeguro(detalle), **valores)
+    
     def get_template_base(self) -> str:
         """Plantilla base HTML para emails"""
         return """
@@ -62,7 +89,7 @@ class NotificationTemplates:
             </ul>
         </div>
         """
-        return self.get_template_base().format(contenido=contenido)
+        return self.get_template_base().replace("{contenido}", contenido)
     
     def get_template_calificaciones_padre(self) -> str:
         """Plantilla para notificar calificaciones a padres"""
@@ -93,7 +120,7 @@ class NotificationTemplates:
             </ol>
         </div>
         """
-        return self.get_template_base().format(contenido=contenido)
+        return self.get_template_base().replace("{contenido}", contenido)
     
     def get_template_riesgo_critico(self) -> str:
         """Plantilla para alerta de riesgo crítico"""
@@ -118,7 +145,7 @@ class NotificationTemplates:
             </ul>
         </div>
         """
-        return self.get_template_base().format(contenido=contenido)
+        return self.get_template_base().replace("{contenido}", contenido)
     
     def get_template_riesgo_alto(self) -> str:
         """Plantilla para alerta de riesgo alto"""
@@ -143,7 +170,7 @@ class NotificationTemplates:
             </ul>
         </div>
         """
-        return self.get_template_base().format(contenido=contenido)
+        return self.get_template_base().replace("{contenido}", contenido)
     
     def get_template_riesgo_moderado(self) -> str:
         """Plantilla para alerta de riesgo moderado"""
@@ -168,7 +195,7 @@ class NotificationTemplates:
             </ul>
         </div>
         """
-        return self.get_template_base().format(contenido=contenido)
+        return self.get_template_base().replace("{contenido}", contenido)
     
     def get_template_padre_riesgo(self) -> str:
         """Plantilla específica para padres sobre riesgo académico"""
@@ -198,4 +225,173 @@ class NotificationTemplates:
             <p><strong>💡 Próximos Pasos:</strong> Nos pondremos en contacto para coordinar una reunión y establecer un plan de apoyo personalizado.</p>
         </div>
         """
-        return self.get_template_base().format(contenido=contenido)
\ No newline at end of file
+        return self.get_template_base().replace("{contenido}", contenido)
+    
+    def get_template_resumen_padre_riesgo(self) -> str:
+        """Plantilla de resumen para una familia: un bloque {detalle} por hijo"""
+        contenido = """
+        <h2>📚 Información sobre el Rendimiento Académico</h2>
+        
+        <p>Estimado/a Padre/Madre de Familia,</p>
+        
+        <p>Nos dirigimos a usted para informarle sobre el rendimiento académico de <strong>{alumnos}</strong>.</p>
+        
+        {detalle}
+        
+        <div class="info-box">
+            <h3>🤝 Trabajo en Conjunto:</h3>
+            <p>Para apoyar el progreso académico, sugerimos:</p>
+            <ul>
+                <li>📚 Establecer rutina de estudio en casa</li>
+                <li>📞 Mantener comunicación con docentes</li>
+                <li>🎯 Participar en reuniones de seguimiento</li>
+                <li>💪 Brindar apoyo emocional y motivacional</li>
+            </ul>
+        </div>
+        
+        <div class="info-box">
+            <p><strong>💡 Próximos Pasos:</strong> Nos pondremos en contacto para coordinar una reunión y establecer un plan de apoyo personalizado.</p>
+        </div>
+        """
+        return self.get_template_base().replace("{contenido}", contenido)
+    
+    def get_template_item_padre_riesgo(self) -> str:
+        """Bloque de un hijo dentro del resumen para padres"""
+        return """
+        <div class="info-box">
+            <h3>📊 {alumno}</h3>
+            <p><strong>Curso:</strong> <span class="highlight">{curso} - División {division}</span></p>
+            <p><strong>Promedio Actual:</strong> <span class="highlight">{promedio:.2f}</span></p>
+        </div>
+        """
+    
+    def get_template_resumen_preceptor_riesgo(self) -> str:
+        """Plantilla de resumen para preceptores: una fila {detalle} por alumno"""
+        contenido = """
+        <h2>🚨 Resumen de Alertas de Riesgo Académico</h2>
+        
+        <div class="info-box" style="border-left-color: #F44336;">
+            <h3>⚠️ Alumnos en Seguimiento:</h3>
+            <p><strong>Total:</strong> <span class="highlight">{total}</span> &nbsp;|&nbsp;
+               <strong>Crítico:</strong> <span style="color: #F44336; font-weight: bold;">{criticos}</span> &nbsp;|&nbsp;
+               <strong>Alto:</strong> <span style="color: #FF9800; font-weight: bold;">{altos}</span> &nbsp;|&nbsp;
+               <strong>Moderado:</strong> <span style="color: #4CAF50; font-weight: bold;">{moderados}</span></p>
+            <table style="width: 100%; border-collapse: collapse;">
+                <tr style="text-align: left; border-bottom: 1px solid #ccc;">
+                    <th>Alumno</th><th>Curso</th><th>Promedio</th><th>Nivel</th>
+                </tr>
+                {detalle}
+            </table>
+        </div>
+        
+        <div class="info-box">
+            <h3>🎯 Acciones según Nivel:</h3>
+            <ul>
+                <li>🔴 Crítico: evaluación psicopedagógica, plan de recuperación intensiva y reunión urgente con padres</li>
+                <li>🟡 Alto: tutoría académica adicional, plan de reforzamiento y seguimiento quincenal</li>
+                <li>🟢 Moderado: reforzamiento en materias específicas y seguimiento mensual</li>
+            </ul>
+        </div>
+        """
+        return self.get_template_base().replace("{contenido}", contenido)
+    
+    def get_template_item_preceptor_riesgo(self) -> str:
+        """Fila de un alumno dentro del resumen para preceptores"""
+        return """
+                <tr style="border-bottom: 1px solid #eee;">
+                    <td>{alumno}</td>
+                    <td>{curso} - {division}</td>
+                    <td>{promedio:.2f}</td>
+                    <td style="color: {color}; font-weight: bold;">{nivel}</td>
+                </tr>"""
+    
+    def get_template_notas_subidas_preceptor(self) -> str:
+        """Plantilla de EmailNotifier cuando un docente sube notas (preceptores)"""
+        contenido = """
+        <h2>📊 Notificación de Calificaciones Actualizadas</h2>
+        
+        <div class="info-box">
+            <h3>📋 Información de la Actualización:</h3>
+            <p><strong>Docente:</strong> <span class="highlight">{docente}</span></p>
+            <p><strong>Materia:</strong> <span class="highlight">{materia}</span></p>
+            <p><strong>Curso:</strong> <span class="highlight">{curso} - División {division}</span></p>
+            <p><strong>Período:</strong> <span class="highlight">{periodo}</span></p>
+            <p><strong>Fecha de actualización:</strong> <span class="highlight">{fecha}</span></p>
+        </div>
+        
+        <div class="info-box">
+            <h3>📝 Acciones Recomendadas para Preceptores:</h3>
+            <ul>
+                <li>✅ Revisar las calificaciones en el sistema</li>
+                <li>📞 Contactar a padres de alumnos con bajo rendimiento</li>
+                <li>📋 Actualizar registros de seguimiento académico</li>
+                <li>🚨 Identificar alumnos que requieren intervención</li>
+            </ul>
+        </div>
+        
+        <div class="info-box">
+            <p><strong>💻 Acceso al Sistema:</strong> Ingrese al sistema GESJ con sus credenciales para ver el detalle completo de las calificaciones.</p>
+        </div>
+        """
+        return self.get_template_base().replace("{contenido}", contenido)
+    
+    def get_template_notas_subidas_padre(self) -> str:
+        """Plantilla de EmailNotifier cuando un docente sube notas (padres)"""
+        return """
+        <html>
+        <head>
+            <style>
+                body {{ font-family: Arial, sans-serif; margin: 20px; }}
+                .header {{ background-color: #1976D2; color: white; padding: 20px; text-align: center; }}
+                .content {{ padding: 20px; background-color: #f5f5f5; }}
+                .info-box {{ background-color: white; padding: 15px; margin: 10px 0; border-left: 4px solid #1976D2; }}
+                .footer {{ background-color: #E3F2FD; padding: 15px; text-align: center; font-size: 12px; }}
+                .highlight {{ color: #1976D2; font-weight: bold; }}
+            </style>
+        </head>
+        <body>
+            <div class="header">
+                <h1>🏛️ GESJ - Sistema de Gestión Educativa</h1>
+                <h2>Provincia de San Juan, República Argentina</h2>
+            </div>
+            
+            <div class="content">
+                <h2>📚 Nuevas Calificaciones Disponibles</h2>
+                
+                <p>Estimado/a Padre/Madre de Familia,</p>
+                
+                <div class="info-box">
+                    <h3>📋 Información de las Calificaciones:</h3>
+                    <p><strong>Docente:</strong> <span class="highlight">{docente}</span></p>
+                    <p><strong>Materia:</strong> <span class="highlight">{materia}</span></p>
+                    <p><strong>Curso:</strong> <span class="highlight">{curso} - División {division}</span></p>
+                    <p><strong>Período:</strong> <span class="highlight">{periodo}</span></p>
+                    <p><strong>Fecha de actualización:</strong> <span class="highlight">{fecha}</span></p>
+                </div>
+                
+                <div class="info-box">
+                    <h3>👨‍👩‍👧‍👦 Información para Padres:</h3>
+                    <p>Las calificaciones de su hijo/a en la materia <strong>{materia}</strong> han sido actualizadas por el docente <strong>{docente}</strong>.</p>
+                    
+                    <h4>📱 Cómo acceder:</h4>
+                    <ol>
+                        <li>Ingrese al sistema GESJ con sus credenciales</li>
+                        <li>Vaya a la sección "Padres"</li>
+                        <li>Seleccione "Ver Rendimiento y Asistencia"</li>
+                        <li>Consulte las calificaciones actualizadas</li>
+                    </ol>
+                </div>
+                
+                <div class="info-box">
+                    <p><strong>💡 Recomendación:</strong> Le sugerimos revisar regularmente el progreso académico de su hijo/a y mantener comunicación con los docentes ante cualquier consulta.</p>
+                </div>
+            </div>
+            
+            <div class="footer">
+                <p>Este es un mensaje automático del Sistema GESJ</p>
+                <p>📧 No responder a este email | 📞 Consultas: gesj.sanjuan@edu.ar</p>
+                <p>🏛️ Institución Educativa - Provincia de San Juan</p>
+            </div>
+        </body>
+        </html>
+        """
@@ -0,0 +1,93 @@
+"""
+Resolución de Destinatarios para Alertas
+GESJ - Plataforma de Gestión Educativa
+
+Recibe la lista completa de alumnos a notificar y obtiene, con una
+consulta para los padres (por alumnos.padre_id) y otra para los
+preceptores, las direcciones de cada alumno. También agrupa a los
+alumnos por destinatario, de modo que un padre con dos hijos en la
+lista reciba un único resumen.
+"""
+
+from typing import Dict, List
+
+from mysql.connector import Error
+from ..database import crear_conexion
+
+# Alumnos por consulta IN (...)
+TAMANO_BLOQUE_ALUMNOS = 1000
+
+# Preceptores de ejemplo si no hay base de datos (igual que EmailManager)
+PRECEPTORES_EJEMPLO = ["preceptor1@gesj.edu.ar", "preceptor.general@gesj.edu.ar"]
+
+
+def email_usuario(nombre_usuario: str) -> str:
+    """Dirección de un usuario: el nombre si ya es un email, si no el dominio institucional"""
+    if '@' in nombre_usuario:
+        return nombre_usuario
+    return f"{nombre_usuario}@gesj.edu.ar"
+
+
+def id_alumno(alumno: Dict) -> int:
+    """Id de un alumno venga de obtener_alumnos_en_riesgo ('id') o del motor de riesgo ('alumno_id')"""
+    return alumno['alumno_id'] if 'alumno_id' in alumno else alumno['id']
+
+
+class RecipientResolver:
+    """Direcciones de preceptores y padres para un conjunto de alumnos"""
+
+    def resolver(self, alumnos: List[Dict]) -> Dict:
+        """
+        Resolver los destinatarios de todos los alumnos a la vez.
+
+        Returns:
+            {
+                'por_alumno': {alumno_id: {'preceptores': [...], 'padres': [...]}},
+                'padres': {email: [alumno, ...]},
+                'preceptores': {email: [alumno, ...]},
+            }
+            donde los alumnos son los mismos diccionarios recibidos, en su orden
+        """
+        ids = list(dict.fromkeys(id_alumno(alumno) for alumno in alumnos))
+        padres_por_alumno: Dict[int, List[str]] = {alumno_id: [] for alumno_id in ids}
+        preceptores = PRECEPTORES_EJEMPLO
+
+        connection = crear_conexion() if ids else None
+        if connection:
+            try:
+                cursor = connection.cursor()
+                for inicio in range(0, len(ids), TAMANO_BLOQUE_ALUMNOS):
+                    bloque = tuple(ids[inicio:inicio + TAMANO_BLOQUE_ALUMNOS])
+                    marcadores = ", ".join(["%s"] * len(bloque))
+                    cursor.execute(f"""
+                        SELECT a.id, u.nombre_usuario
+                        FROM alumnos a
+                        JOIN usuarios u ON u.id = a.padre_id
+                        WHERE a.id IN ({marcadores}) AND u.tipo_usuario = 'Padre'
+                    """, bloque)
+                    for alumno_id, nombre_usuario in cursor.fetchall():
+                        padres_por_alumno[alumno_id].append(email_usuario(nombre_usuario))
+
+                # No hay asignación de preceptores por curso: todos reciben las alertas
+                cursor.execute("""
+                    SELECT DISTINCT nombre_usuario FROM usuarios WHERE tipo_usuario = 'Preceptor'
+                """)
+                preceptores = [email_usuario(fila[0]) for fila in cursor.fetchall()]
+                cursor.close()
+            except Error as e:
+                print(f"Error al resolver destinatarios: {e}")
+            finally:
+                connection.close()
+
+        resultado = {'por_alumno': {}, 'padres': {}, 'preceptores': {}}
+        for alumno in alumnos:
+            alumno_id = id_alumno(alumno)
+            if alumno_id in resultado['por_alumno']:
+                continue
+            padres = padres_por_alumno.get(alumno_id, [])
+            resultado['por_alumno'][alumno_id] = {'preceptores': list(preceptores), 'padres': padres}
+            for email in padres:
+                resultado['padres'].setdefault(email, []).append(alumno)
+            for email in preceptores:
+                resultado['preceptores'].setdefault(email, []).append(alumno)
+        return resultado
@@ -0,0 +1,85 @@
+"""
+Motor de Plantillas Compiladas
+GESJ - Plataforma de Gestión Educativa
+
+Las plantillas de NotificationTemplates usan la sintaxis de str.format
+({campo}, {campo:.2f}, {{ y }} literales). Aquí se analizan una sola vez
+y se guardan como una lista de trozos literales y campos, de modo que
+renderizar para cientos de destinatarios sólo concatena textos.
+
+Los valores se escapan como HTML salvo que vengan envueltos en
+HtmlSeguro (por ejemplo, el detalle ya renderizado de un resumen).
+"""
+
+import html
+import threading
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, Iterable, List
+
+
+class HtmlSeguro(str):
+    """Texto que ya es HTML válido y no debe escaparse al insertarlo"""
+
+
+class PlantillaCompilada:
+    """Plantilla analizada: trozos literales intercalados con campos"""
+
+    def __init__(self, texto: str):
+        self.partes = []
+        for literal, campo, formato, conversion in Formatter().parse(texto):
+            if campo is not None and not campo.isidentifier():
+                raise ValueError(f"Campo de plantilla no soportado: '{campo}'")
+            self.partes.append((literal, campo, formato or "", conversion))
+        self.campos = frozenset(campo for _, campo, _, _ in self.partes if campo)
+
+    def renderizar(self, valores: Dict) -> str:
+        """Reemplazar los campos; lanza KeyError si falta alguno (igual que format)"""
+        trozos = []
+        for literal, campo, formato, conversion in self.partes:
+            if literal:
+                trozos.append(literal)
+            if campo is None:
+                continue
+            valor = valores[campo]
+            if conversion == 'r':
+                valor = repr(valor)
+            elif conversion == 's':
+                valor = str(valor)
+            texto = format(valor, formato)
+            trozos.append(texto if isinstance(valor, HtmlSeguro) else html.escape(texto, quote=False))
+        return ''.join(trozos)
+
+    def renderizar_lote(self, lista_valores: Iterable[Dict]) -> List[str]:
+        """Renderizar la plantilla para varios destinatarios"""
+        return [self.renderizar(valores) for valores in lista_valores]
+
+
+@lru_cache(maxsize=128)
+def compilar(texto: str) -> PlantillaCompilada:
+    """Compilar una plantilla (el resultado se reutiliza para el mismo texto)"""
+    return PlantillaCompilada(texto)
+
+
+class CachePlantillas:
+    """Plantillas compiladas por nombre, construidas la primera vez que se piden"""
+
+    def __init__(self):
+        self._compiladas: Dict[str, PlantillaCompilada] = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, nombre: str, generador) -> PlantillaCompilada:
+        """Plantilla compilada 'nombre'; generador() devuelve el texto si aún no está"""
+        plantilla = self._compiladas.get(nombre)
+        if plantilla is None:
+            with self._lock:
+                plantilla = self._compiladas.get(nombre)
+                if plantilla is None:
+                    plantilla = compilar(generador())
+                    self._compiladas[nombre] = plantilla
+        return plantilla
+
+    def limpiar(self):
+        """Olvidar las plantillas compiladas (p. ej. tras editar sus textos)"""
+        with self._lock:
+            self._compiladas.clear()
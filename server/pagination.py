@@ -0,0 +1,141 @@
+"""
+Paginación por clave (keyset) para consultas de listados
+GESJ - Plataforma de Gestión Educativa
+
+En lugar de traer todo el historial con fetchall(), los listados piden una
+página a la vez. Cada página termina con un token opaco (siguiente_cursor)
+que codifica los valores de orden de la última fila; la página siguiente se
+obtiene filtrando "después de" esos valores, sin OFFSET, de modo que el costo
+no crece con la cantidad de páginas ya recorridas. Las columnas de orden
+deben estar indexadas y terminar en una columna única (normalmente el id).
+"""
+
+import base64
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# (expresión SQL, campo en la fila resultado, 'ASC' o 'DESC')
+Orden = Sequence[Tuple[str, str, str]]
+
+TAMANO_PAGINA_DEFECTO = 50
+TAMANO_PAGINA_MAXIMO = 500
+
+
+def pagina_vacia(tamano_pagina: int = TAMANO_PAGINA_DEFECTO) -> Dict:
+    """Página sin filas, usada también cuando la consulta falla"""
+    return {'filas': [], 'siguiente_cursor': None, 'hay_mas': False,
+            'tamano_pagina': tamano_pagina}
+
+
+def consultar_pagina(connection, consulta: str, parametros: Sequence, orden: Orden,
+                     cursor: Optional[str] = None,
+                     tamano_pagina: int = TAMANO_PAGINA_DEFECTO) -> Dict:
+    """
+    Ejecutar una consulta paginada por clave
+
+    Args:
+        connection: Conexión abierta (la de conectar() del manager)
+        consulta: SELECT con un WHERE que contiene el marcador {filtro_cursor};
+            no debe incluir ORDER BY ni LIMIT
+        parametros: Parámetros de la consulta base
+        orden: Columnas de orden; la última debe ser única
+        cursor: Token devuelto por la página anterior, o None para la primera
+        tamano_pagina: Filas por página
+
+    Returns:
+        Dict con filas, siguiente_cursor (None en la última página),
+        hay_mas y tamano_pagina
+
+    Raises:
+        ValueError: Si el token no corresponde a este orden
+    """
+    tamano_pagina = max(1, min(int(tamano_pagina), TAMANO_PAGINA_MAXIMO))
+    parametros = list(parametros)
+
+    filtro = ""
+    if cursor:
+        valores = decodificar_cursor(cursor)
+        if len(valores) != len(orden):
+            raise ValueError("El cursor de paginación no corresponde a esta consulta")
+        condicion, parametros_cursor = _condicion_despues_de(orden, valores)
+        filtro = f"AND ({condicion})"
+        parametros.extend(parametros_cursor)
+
+    orden_sql = ", ".join(f"{expresion} {direccion}" for expresion, _, direccion in orden)
+    sql = (consulta.replace("{filtro_cursor}", filtro) +
+           f"\nORDER BY {orden_sql}\nLIMIT %s")
+    parametros.append(tamano_pagina + 1)
+
+    cur = connection.cursor(dictionary=True)
+    cur.execute(sql, tuple(parametros))
+    filas = cur.fetchall()
+    cur.close()
+
+    hay_mas = len(filas) > tamano_pagina
+    filas = filas[:tamano_pagina]
+    siguiente = None
+    if hay_mas and filas:
+        siguiente = codificar_cursor([filas[-1][campo] for _, campo, _ in orden])
+
+    return {'filas': filas, 'siguiente_cursor': siguiente, 'hay_mas': hay_mas,
+            'tamano_pagina': tamano_pagina}
+
+
+def codificar_cursor(valores: List) -> str:
+    """Convertir los valores de orden de una fila en un token opaco"""
+    texto = json.dumps(valores, default=_serializar, separators=(",", ":"))
+    return base64.urlsafe_b64encode(texto.encode("utf-8")).decode("ascii")
+
+
+def decodificar_cursor(token: str) -> List:
+    """Recuperar los valores de orden codificados en un token"""
+    try:
+        texto = base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8")
+        valores = json.loads(texto, object_hook=_deserializar)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Cursor de paginación inválido: {e}")
+    if not isinstance(valores, list):
+        raise ValueError("Cursor de paginación inválido")
+    return valores
+
+
+def _condicion_despues_de(orden: Orden, valores: List) -> Tuple[str, List]:
+    """(a > x) OR (a = x AND b > y) ..., respetando la dirección de cada columna"""
+    alternativas = []
+    parametros = []
+    for i, (expresion, _, direccion) in enumerate(orden):
+        partes = []
+        for anterior, _, _ in orden[:i]:
+            partes.append(f"{anterior} = %s")
+        operador = "<" if direccion.upper() == "DESC" else ">"
+        partes.append(f"{expresion} {operador} %s")
+        alternativas.append("(" + " AND ".join(partes) + ")")
+        parametros.extend(valores[:i + 1])
+    return " OR ".join(alternativas), parametros
+
+
+def _serializar(valor):
+    if isinstance(valor, datetime):
+        return {"__tipo__": "datetime", "valor": valor.isoformat()}
+    if isinstance(valor, date):
+        return {"__tipo__": "date", "valor": valor.isoformat()}
+    if isinstance(valor, timedelta):
+        return {"__tipo__": "timedelta", "valor": valor.total_seconds()}
+    if isinstance(valor, Decimal):
+        return {"__tipo__": "decimal", "valor": str(valor)}
+    raise TypeError(f"Tipo no soportado en cursor de paginación: {type(valor).__name__}")
+
+
+def _deserializar(objeto):
+    tipo = objeto.get("__tipo__")
+    if tipo == "datetime":
+        return datetime.fromisoformat(objeto["valor"])
+    if tipo == "date":
+        return date.fromisoformat(objeto["valor"])
+    if tipo == "timedelta":
+        return timedelta(seconds=objeto["valor"])
+    if tipo == "decimal":
+        return Decimal(objeto["valor"])
+    return objeto
@@ -5,14 +5,19 @@ GESJ - Plataforma de Gestión Educativa
 Redirige al nuevo sistema modular de exportaciones.
 """
 
-from .exports.pdf_manager import PDFManager
-
 class PDFExporter:
     """Clase de compatibilidad para PDFExporter"""
     
     def __init__(self):
-        self.pdf_manager = PDFManager()
-        print("✅ Usando sistema modular de exportación PDF")
+        self._pdf_manager = None
+    
+    @property
+    def pdf_manager(self):
+        """PDFManager (ReportLab) se importa en la primera exportación"""
+        if self._pdf_manager is None:
+            from .exports.pdf_manager import PDFManager
+            self._pdf_manager = PDFManager()
+        return self._pdf_manager
     
     def exportar_calificaciones_materia_pdf(self, materia_id: int, periodo_id: int, docente_id: int) -> str:
         """Método de compatibilidad"""
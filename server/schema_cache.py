@@ -0,0 +1,133 @@
+"""
+Caché de capacidades del esquema de la base de datos
+GESJ - Plataforma de Gestión Educativa
+
+Las migraciones de GESJ no siempre se aplicaron completas: según la
+instalación pueden faltar la tabla promedios_alumnos, el procedimiento
+CalcularPromedios o la función PromedioGeneralAlumno. En lugar de
+consultarlo en cada operación, el esquema se inspecciona una sola vez por
+proceso y las operaciones consultan esta caché. refrescar() fuerza una
+nueva inspección (por ejemplo, después de aplicar una migración).
+"""
+
+import threading
+from typing import Dict, Set
+
+from mysql.connector import Error
+from .database import crear_conexion
+
+
+class SchemaCapabilities:
+    """Tablas, vistas, procedimientos, funciones y triggers disponibles en la base"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cargado = False
+        self.tablas: Set[str] = set()
+        self.vistas: Set[str] = set()
+        self.procedimientos: Set[str] = set()
+        self.funciones: Set[str] = set()
+        self.triggers: Set[str] = set()
+
+    def cargar(self) -> bool:
+        """Inspeccionar el esquema si todavía no se hizo"""
+        if self._cargado:
+            return True
+        with self._lock:
+            if not self._cargado:
+                self._cargado = self._inspeccionar()
+        return self._cargado
+
+    def refrescar(self) -> bool:
+        """Descartar lo detectado y volver a inspeccionar el esquema"""
+        with self._lock:
+            self._cargado = self._inspeccionar()
+        return self._cargado
+
+    def tiene_tabla(self, nombre: str) -> bool:
+        return self.cargar() and nombre.lower() in self.tablas
+
+    def tiene_vista(self, nombre: str) -> bool:
+        return self.cargar() and nombre.lower() in self.vistas
+
+    def tiene_procedimiento(self, nombre: str) -> bool:
+        return self.cargar() and nombre.lower() in self.procedimientos
+
+    def tiene_funcion(self, nombre: str) -> bool:
+        return self.cargar() and nombre.lower() in self.funciones
+
+    def tiene_trigger(self, nombre: str) -> bool:
+        return self.cargar() and nombre.lower() in self.triggers
+
+    def obtener_resumen(self) -> Dict:
+        """Resumen de lo detectado, útil para diagnóstico"""
+        self.cargar()
+        return {
+            'cargado': self._cargado,
+            'tablas': sorted(self.tablas),
+            'vistas': sorted(self.vistas),
+            'procedimientos': sorted(self.procedimientos),
+            'funciones': sorted(self.funciones),
+            'triggers': sorted(self.triggers)
+        }
+
+    def _inspeccionar(self) -> bool:
+        """Leer information_schema; si no hay conexión no se marca como cargado"""
+        connection = crear_conexion()
+        if not connection:
+            return False
+
+        try:
+            cursor = connection.cursor()
+
+            cursor.execute("""
+                SELECT TABLE_NAME, TABLE_TYPE
+                FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE()
+            """)
+            tablas, vistas = set(), set()
+            for nombre, tipo in cursor.fetchall():
+                (vistas if tipo == 'VIEW' else tablas).add(nombre.lower())
+
+            cursor.execute("""
+                SELECT ROUTINE_NAME, ROUTINE_TYPE
+                FROM information_schema.ROUTINES
+                WHERE ROUTINE_SCHEMA = DATABASE()
+            """)
+            procedimientos, funciones = set(), set()
+            for nombre, tipo in cursor.fetchall():
+                (funciones if tipo == 'FUNCTION' else procedimientos).add(nombre.lower())
+
+            cursor.execute("""
+                SELECT TRIGGER_NAME
+                FROM information_schema.TRIGGERS
+                WHERE TRIGGER_SCHEMA = DATABASE()
+            """)
+            triggers = {fila[0].lower() for fila in cursor.fetchall()}
+
+            cursor.close()
+
+            self.tablas, self.vistas = tablas, vistas
+            self.procedimientos, self.funciones = procedimientos, funciones
+            self.triggers = triggers
+            return True
+
+        except Error as e:
+            print(f"Error al inspeccionar el esquema: {e}")
+            return False
+        finally:
+            connection.close()
+
+
+# Instancia compartida por todo el proceso
+capacidades = SchemaCapabilities()
+
+
+def obtener_capacidades() -> SchemaCapabilities:
+    """Obtener la caché de capacidades del esquema"""
+    return capacidades
+
+
+def refrescar_capacidades() -> bool:
+    """Volver a inspeccionar el esquema (después de aplicar migraciones)"""
+    return capacidades.refrescar()
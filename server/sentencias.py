@@ -0,0 +1,105 @@
+"""
+Registro de sentencias SQL con nombre
+GESJ - Plataforma de Gestión Educativa
+
+Las consultas que las operaciones repiten en cada pantalla (joins largos
+de calificaciones, promedios, alumnos) se registran aquí una vez, con un
+nombre, al importar su módulo. Cada conexión del pool las prepara en el
+servidor la primera vez que se ejecutan y después reutiliza el handle, de
+modo que MySQL no vuelve a analizar el texto (ver
+PooledConnection.ejecutar_sentencia).
+
+El registro también es el lugar donde ver todas esas consultas: listar()
+devuelve nombre, descripción y SQL, y obtener_estadisticas() cuántas
+veces se preparó y ejecutó cada una.
+"""
+
+import re
+import threading
+from typing import Dict, List
+
+# Marcadores %s fuera de literales; el protocolo binario usa '?'
+_RE_MARCADOR = re.compile(r"'(?:[^'\\]|\\.|'')*'|%s")
+
+
+class Sentencia:
+    """Sentencia registrada: texto con marcadores %s y su versión para preparar"""
+
+    __slots__ = ('nombre', 'sql', 'sql_preparada', 'descripcion', 'preparaciones', 'ejecuciones')
+
+    def __init__(self, nombre: str, sql: str, descripcion: str = ""):
+        self.nombre = nombre
+        self.sql = sql
+        self.sql_preparada = _RE_MARCADOR.sub(
+            lambda m: '?' if m.group(0) == '%s' else m.group(0), sql)
+        self.descripcion = descripcion
+        self.preparaciones = 0
+        self.ejecuciones = 0
+
+
+class RegistroSentencias:
+    """Sentencias de la aplicación por nombre"""
+
+    def __init__(self):
+        self._sentencias: Dict[str, Sentencia] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, nombre: str, sql: str, descripcion: str = "") -> str:
+        """
+        Registrar una sentencia y devolver su nombre
+
+        Volver a registrar el mismo nombre con el mismo texto no hace nada
+        (recarga de módulos); con otro texto es un error de programación.
+        """
+        sql = sql.strip()
+        with self._lock:
+            existente = self._sentencias.get(nombre)
+            if existente is not None:
+                if existente.sql != sql:
+                    raise ValueError(f"La sentencia '{nombre}' ya está registrada con otro texto")
+                return nombre
+            self._sentencias[nombre] = Sentencia(nombre, sql, descripcion)
+        return nombre
+
+    def obtener(self, nombre: str) -> Sentencia:
+        try:
+            return self._sentencias[nombre]
+        except KeyError:
+            raise KeyError(f"Sentencia no registrada: '{nombre}'") from None
+
+    def listar(self) -> List[Dict]:
+        """Nombre, descripción y SQL de cada sentencia, ordenadas por nombre"""
+        with self._lock:
+            return [{'nombre': s.nombre, 'descripcion': s.descripcion, 'sql': s.sql}
+                    for s in sorted(self._sentencias.values(), key=lambda s: s.nombre)]
+
+    def registrar_uso(self, sentencia: Sentencia, preparada: bool):
+        with self._lock:
+            sentencia.ejecuciones += 1
+            if preparada:
+                sentencia.preparaciones += 1
+
+    def obtener_estadisticas(self) -> Dict[str, Dict]:
+        """{nombre: {'preparaciones', 'ejecuciones'}}"""
+        with self._lock:
+            return {s.nombre: {'preparaciones': s.preparaciones, 'ejecuciones': s.ejecuciones}
+                    for s in self._sentencias.values()}
+
+    def reiniciar_estadisticas(self):
+        with self._lock:
+            for sentencia in self._sentencias.values():
+                sentencia.preparaciones = 0
+                sentencia.ejecuciones = 0
+
+
+_registro = RegistroSentencias()
+
+
+def obtener_registro_sentencias() -> RegistroSentencias:
+    """Registro de sentencias del proceso"""
+    return _registro
+
+
+def registrar_sentencia(nombre: str, sql: str, descripcion: str = "") -> str:
+    """Registrar una sentencia en el registro del proceso (ver RegistroSentencias.registrar)"""
+    return _registro.registrar(nombre, sql, descripcion)
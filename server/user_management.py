@@ -8,6 +8,7 @@ from mysql.connector import Error
 from datetime import datetime
 from typing import List, Dict, Optional
 from .database import crear_conexion
+from .pagination import consultar_pagina, pagina_vacia, TAMANO_PAGINA_DEFECTO
 
 class UserManager:
     """Gestor avanzado de usuarios del sistema"""
@@ -191,6 +192,39 @@ class UserManager:
         finally:
             self.desconectar()
     
+    def listar_usuarios_por_tipo_pagina(self, tipo_usuario: str, cursor: str = None,
+                                        tamano_pagina: int = TAMANO_PAGINA_DEFECTO) -> Dict:
+        """Listar usuarios de un tipo, una página a la vez, por nombre de usuario"""
+        return self._pagina_usuarios("WHERE tipo_usuario = %s {filtro_cursor}",
+                                     (tipo_usuario,), cursor, tamano_pagina)
+    
+    def obtener_usuarios_pagina(self, cursor: str = None,
+                                tamano_pagina: int = TAMANO_PAGINA_DEFECTO) -> Dict:
+        """Listar todos los usuarios, una página a la vez, por nombre de usuario"""
+        return self._pagina_usuarios("WHERE 1 = 1 {filtro_cursor}", (), cursor, tamano_pagina)
+    
+    def _pagina_usuarios(self, where: str, parametros: tuple, cursor: str,
+                         tamano_pagina: int) -> Dict:
+        """Consulta paginada sobre usuarios ordenada por nombre_usuario (UNIQUE)"""
+        try:
+            if not self.conectar():
+                return pagina_vacia(tamano_pagina)
+            
+            consulta = f"""
+                SELECT id, nombre_usuario, tipo_usuario, fecha_creacion
+                FROM usuarios 
+                {where}
+            """
+            orden = [("nombre_usuario", "nombre_usuario", "ASC")]
+            return consultar_pagina(self.connection, consulta, parametros, orden,
+                                    cursor, tamano_pagina)
+            
+        except (Error, ValueError) as e:
+            print(f"Error al obtener página de usuarios: {e}")
+            return pagina_vacia(tamano_pagina)
+        finally:
+            self.desconectar()
+    
     def cambiar_contrasena(self, nombre_usuario: str, nueva_contrasena: str) -> bool:
         """Cambiar contraseña de un usuario"""
         return self.actualizar_usuario(nombre_usuario, {'contrasena': nueva_contrasena})
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Verificación de los libros Excel en streaming
+GESJ - Plataforma de Gestión Educativa
+
+Genera un libro de calificaciones con filas de ejemplo (sin base de datos),
+lo vuelve a abrir con openpyxl y comprueba que la columna Fecha quede como
+fecha con formato DD/MM/YYYY y la columna Nota como número, igual que en
+el libro que se arma celda por celda.
+
+Uso:
+    cd server
+    python verificar_exportaciones.py
+
+Código de salida: 0 si el libro es correcto, 1 si no, 2 si openpyxl no
+está instalado.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date
+from decimal import Decimal
+
+try:
+    from .exports.excel_manager import ExcelManager, OPENPYXL_AVAILABLE
+except ImportError:
+    from exports.excel_manager import ExcelManager, OPENPYXL_AVAILABLE
+
+FILAS_EJEMPLO = [
+    {'curso': '1º Año', 'division': 'A', 'alumno': 'Pérez, Juan', 'materia': 'Matemáticas',
+     'periodo': 'Primer Cuatrimestre', 'tipo_evaluacion': 'Evaluación Diaria',
+     'nota': Decimal('8.50'), 'fecha_evaluacion': date(2025, 1, 2), 'observaciones': ''},
+    {'curso': '1º Año', 'division': 'A', 'alumno': 'Gómez, Ana', 'materia': 'Matemáticas',
+     'periodo': 'Primer Cuatrimestre', 'tipo_evaluacion': 'Evaluación Mensual',
+     'nota': Decimal('6.00'), 'fecha_evaluacion': date(2025, 3, 14), 'observaciones': 'Recupera'},
+]
+
+
+def verificar_libro_calificaciones(ruta: str) -> list:
+    """Problemas encontrados en las filas de datos del libro"""
+    from openpyxl import load_workbook
+
+    problemas = []
+    ws = load_workbook(ruta).worksheets[0]
+    filas = list(ws.iter_rows(min_row=6, values_only=False))
+    if len(filas) != len(FILAS_EJEMPLO):
+        return [f"Se esperaban {len(FILAS_EJEMPLO)} filas de datos y hay {len(filas)}"]
+    for fila, esperada in zip(filas, FILAS_EJEMPLO):
+        nota, fecha = fila[4], fila[5]
+        if not isinstance(nota.value, (int, float)) or nota.value != float(esperada['nota']):
+            problemas.append(f"{nota.coordinate}: la nota es {nota.value!r}, no un número")
+        if getattr(fecha.value, 'date', lambda: None)() != esperada['fecha_evaluacion']:
+            problemas.append(f"{fecha.coordinate}: la fecha es {fecha.value!r}")
+        if fecha.number_format != 'DD/MM/YYYY':
+            problemas.append(f"{fecha.coordinate}: formato '{fecha.number_format}' en lugar de DD/MM/YYYY")
+    return problemas
+
+
+def main() -> int:
+    print("🔍 Verificando libros Excel en streaming...")
+    print("=" * 60)
+
+    if not OPENPYXL_AVAILABLE:
+        print("⚠️ OpenPyXL no está disponible. Instale con: pip install openpyxl")
+        return 2
+
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        os.chdir(directorio)
+        try:
+            ruta = ExcelManager().crear_workbook_calificaciones_streaming(
+                iter(FILAS_EJEMPLO), {'titulo': 'Verificación', 'periodo': 'Primer Cuatrimestre'})
+            problemas = verificar_libro_calificaciones(ruta)
+        finally:
+            os.chdir(directorio_original)
+
+    if problemas:
+        print("❌ Libro de calificaciones")
+        for problema in problemas:
+            print(f"   - {problema}")
+        return 1
+    print("✅ Libro de calificaciones: fechas y notas con el tipo y formato correctos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Verificación de planes de ejecución de las consultas críticas
+GESJ - Plataforma de Gestión Educativa
+
+Ejecuta EXPLAIN sobre las sentencias SELECT del registro (server/sentencias.py),
+con el mismo texto que usan las operaciones de server/calificaciones, y falla
+si alguna deja de usar un índice o recorre una tabla o un índice completo.
+Debe correrse sobre una base con datos cargados (con pocas filas el
+optimizador prefiere recorrer la tabla y el resultado no es representativo).
+
+Uso:
+    cd server
+    python verificar_indices.py [--min-filas 1000]
+
+Código de salida: 0 si todas las consultas usan índices, 1 si alguna no,
+2 si no se pudo verificar (sin conexión o con pocos datos).
+"""
+
+import argparse
+import os
+import sys
+from typing import Dict, List
+
+from mysql.connector import Error
+
+try:
+    from .database import crear_conexion
+    from .sentencias import obtener_registro_sentencias
+    from . import calificaciones  # noqa: F401 - registra las sentencias de las operaciones
+except ImportError:
+    # Ejecutado como script desde server/: importar el paquete desde la raíz
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from server.database import crear_conexion
+    from server.sentencias import obtener_registro_sentencias
+    from server import calificaciones  # noqa: F401
+
+# Para cada sentencia registrada: parámetros de muestra en el orden de sus
+# marcadores (ver obtener_muestra) y alias que deben resolverse con un índice.
+# Una sentencia SELECT nueva sin entrada aquí hace fallar la verificación.
+VERIFICACIONES = {
+    'alumnos.curso': {'parametros': ('curso', 'division'), 'alias': ('alumnos',)},
+    'alumnos.por_id': {'parametros': ('alumno_id',), 'alias': ('a',)},
+    'calificaciones.alumno_periodo': {'parametros': ('alumno_id', 'periodo_id'), 'alias': ('c', 'a')},
+    'calificaciones.alumno': {'parametros': ('alumno_id',), 'alias': ('c', 'a')},
+    'calificaciones.materia_periodo': {'parametros': ('materia_id', 'periodo_id'), 'alias': ('c', 'a')},
+    'promedios.alumno_periodo': {'parametros': ('alumno_id', 'periodo_id'), 'alias': ('c', 'a')},
+    'promedios.alumno': {'parametros': ('alumno_id',), 'alias': ('c', 'a')},
+    'promedios.curso_materia': {'parametros': ('materia_id', 'periodo_id', 'curso', 'division'),
+                                'alias': ('a', 'c')},
+    'estadisticas.curso': {'parametros': ('curso', 'division', 'periodo_id'), 'alias': ('a', 'c')},
+    'estadisticas.alumnos_en_riesgo': {'parametros': ('periodo_id', 'promedio_minimo'), 'alias': ('pa',)},
+    'reportes.datos_curso': {'parametros': ('periodo_id', 'curso', 'division'), 'alias': ('a', 'c')},
+    'reportes.alumno_materias': {'parametros': ('alumno_id', 'periodo_id'), 'alias': ('c',)},
+}
+
+# Recorridos completos: de la tabla (ALL) o de todo un índice (index)
+TIPOS_RECORRIDO_COMPLETO = ('ALL', 'index')
+
+
+def consultas_criticas() -> List[Dict]:
+    """Sentencias SELECT del registro con su verificación (None si no tiene entrada)"""
+    return [dict(sentencia, verificacion=VERIFICACIONES.get(sentencia['nombre']))
+            for sentencia in obtener_registro_sentencias().listar()
+            if sentencia['sql'].lstrip().upper().startswith('SELECT')]
+
+
+def obtener_muestra(cursor) -> Dict:
+    """Valores reales de la base para completar los parámetros de las consultas"""
+    cursor.execute("""
+        SELECT c.materia_id, c.periodo_id, c.alumno_id, a.curso, a.division
+        FROM calificaciones c
+        JOIN alumnos a ON c.alumno_id = a.id
+        ORDER BY c.id
+        LIMIT 1
+    """)
+    muestra = cursor.fetchone() or {}
+    if muestra:
+        muestra['promedio_minimo'] = 6.0
+    return muestra
+
+
+def verificar_plan(cursor, consulta: Dict, muestra: Dict) -> List[str]:
+    """Ejecutar EXPLAIN y devolver los problemas encontrados (lista vacía si está bien)"""
+    verificacion = consulta['verificacion']
+    parametros = tuple(muestra[nombre] for nombre in verificacion['parametros'])
+    cursor.execute("EXPLAIN " + consulta['sql'], parametros)
+    plan = cursor.fetchall()
+
+    problemas = []
+    for fila in plan:
+        alias = fila.get('table')
+        if alias not in verificacion['alias']:
+            continue
+        if fila.get('type') == 'ALL':
+            problemas.append(f"{alias}: recorrido completo de la tabla ({fila.get('rows')} filas estimadas)")
+        elif fila.get('type') in TIPOS_RECORRIDO_COMPLETO:
+            problemas.append(f"{alias}: recorrido completo del índice {fila.get('key')} "
+                             f"({fila.get('rows')} filas estimadas)")
+        elif not fila.get('key'):
+            problemas.append(f"{alias}: no usa ningún índice (type={fila.get('type')})")
+    return problemas
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Verificar que las consultas críticas usen índices")
+    parser.add_argument("--min-filas", type=int, default=1000,
+                        help="Filas mínimas en calificaciones para que la verificación sea válida")
+    args = parser.parse_args()
+
+    print("🔍 Verificando planes de ejecución de consultas críticas...")
+    print("=" * 60)
+
+    connection = crear_conexion()
+    if not connection:
+        print("❌ No se pudo conectar a la base de datos")
+        return 2
+
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("SELECT COUNT(*) AS total FROM calificaciones")
+        total = cursor.fetchone()['total']
+        if total < args.min_filas:
+            print(f"⚠️  calificaciones tiene {total} filas (mínimo {args.min_filas}).")
+            print("   Cargue un conjunto de datos antes de verificar los índices.")
+            return 2
+
+        muestra = obtener_muestra(cursor)
+        consultas = consultas_criticas()
+        fallas = 0
+        for consulta in consultas:
+            if consulta['verificacion'] is None:
+                problemas = ["sin parámetros de muestra: agréguela a VERIFICACIONES"]
+            else:
+                problemas = verificar_plan(cursor, consulta, muestra)
+            if problemas:
+                fallas += 1
+                print(f"❌ {consulta['nombre']} ({consulta['descripcion']})")
+                for problema in problemas:
+                    print(f"   - {problema}")
+            else:
+                print(f"✅ {consulta['nombre']}")
+        cursor.close()
+
+        print("=" * 60)
+        if fallas:
+            print(f"❌ {fallas} de {len(consultas)} consultas no usan índices")
+            return 1
+        print(f"✅ Las {len(consultas)} consultas usan índices")
+        return 0
+
+    except Error as e:
+        print(f"❌ Error al verificar índices: {e}")
+        return 2
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+-- =====================================================
+-- MANTENIMIENTO INCREMENTAL DE PROMEDIOS_ALUMNOS
+-- GESJ - Sistema de Gestión Educativa
+-- =====================================================
+-- Registra en promedios_pendientes las claves (alumno, materia, período)
+-- cuyas calificaciones cambiaron. PromediosOperations.actualizar_pendientes()
+-- recalcula solo esas claves en bloque, sin vaciar promedios_alumnos.
+
+USE gestion_escolar;
+
+-- =====================================================
+-- 1. TABLA DE CLAVES PENDIENTES DE RECÁLCULO
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS promedios_pendientes (
+    alumno_id INT NOT NULL,
+    materia_id INT NOT NULL,
+    periodo_id INT NOT NULL,
+    fecha_marcado TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (alumno_id, materia_id, periodo_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- =====================================================
+-- 2. TRIGGERS OPCIONALES QUE MARCAN CLAVES MODIFICADAS
+-- =====================================================
+-- Cubren también las modificaciones hechas fuera de la aplicación
+-- (phpMyAdmin, scripts de carga). Pueden omitirse: la aplicación marca
+-- las claves que escribe por su cuenta. La aplicación sigue recalculando
+-- sus propias escrituras en la misma transacción (y borra esas marcas);
+-- lo marcado desde afuera se recalcula con
+-- PromediosOperations.actualizar_pendientes().
+
+DROP TRIGGER IF EXISTS marcar_promedio_pendiente_insert;
+DROP TRIGGER IF EXISTS marcar_promedio_pendiente_update;
+DROP TRIGGER IF EXISTS marcar_promedio_pendiente_delete;
+
+DELIMITER //
+CREATE TRIGGER marcar_promedio_pendiente_insert
+AFTER INSERT ON calificaciones
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO promedios_pendientes (alumno_id, materia_id, periodo_id)
+    VALUES (NEW.alumno_id, NEW.materia_id, NEW.periodo_id);
+END //
+
+CREATE TRIGGER marcar_promedio_pendiente_update
+AFTER UPDATE ON calificaciones
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO promedios_pendientes (alumno_id, materia_id, periodo_id)
+    VALUES (NEW.alumno_id, NEW.materia_id, NEW.periodo_id);
+
+    IF OLD.alumno_id <> NEW.alumno_id OR OLD.materia_id <> NEW.materia_id
+       OR OLD.periodo_id <> NEW.periodo_id THEN
+        INSERT IGNORE INTO promedios_pendientes (alumno_id, materia_id, periodo_id)
+        VALUES (OLD.alumno_id, OLD.materia_id, OLD.periodo_id);
+    END IF;
+END //
+
+CREATE TRIGGER marcar_promedio_pendiente_delete
+AFTER DELETE ON calificaciones
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO promedios_pendientes (alumno_id, materia_id, periodo_id)
+    VALUES (OLD.alumno_id, OLD.materia_id, OLD.periodo_id);
+END //
+DELIMITER ;
+
+-- =====================================================
+-- 3. MENSAJE DE CONFIRMACIÓN
+-- =====================================================
+
+SELECT 'Mantenimiento incremental de promedios instalado' AS mensaje;
@@ -0,0 +1,106 @@
+-- =====================================================
+-- RESUMEN INCREMENTAL DE ASISTENCIA
+-- GESJ - Sistema de Gestión Educativa
+-- =====================================================
+-- Conteos de presentes, ausentes, tardes y justificados por alumno y mes
+-- y por alumno y período de evaluación. AsistenciaManager los actualiza al
+-- registrar asistencia, de modo que los porcentajes y las alertas no
+-- necesitan recorrer asistencia_diaria.
+
+USE gestion_escolar;
+
+-- =====================================================
+-- 1. TABLA DE ASISTENCIA DIARIA
+-- =====================================================
+-- Algunas instalaciones no la tienen creada; es la que usa AsistenciaManager.
+
+CREATE TABLE IF NOT EXISTS asistencia_diaria (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    alumno_id INT NOT NULL,
+    fecha DATE NOT NULL,
+    estado ENUM('Presente', 'Ausente', 'Tarde', 'Justificado') NOT NULL,
+    observaciones TEXT,
+    registrado_por INT,
+    fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_modificacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (alumno_id) REFERENCES alumnos(id) ON DELETE CASCADE,
+    UNIQUE KEY unique_asistencia (alumno_id, fecha),
+    INDEX idx_fecha (fecha)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- =====================================================
+-- 2. TABLAS DE RESUMEN
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS asistencia_resumen_mensual (
+    alumno_id INT NOT NULL,
+    anio SMALLINT NOT NULL,
+    mes TINYINT NOT NULL,
+    presentes INT NOT NULL DEFAULT 0,
+    ausentes INT NOT NULL DEFAULT 0,
+    tardes INT NOT NULL DEFAULT 0,
+    justificados INT NOT NULL DEFAULT 0,
+    total_registros INT NOT NULL DEFAULT 0,
+    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (alumno_id, anio, mes),
+    FOREIGN KEY (alumno_id) REFERENCES alumnos(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+CREATE TABLE IF NOT EXISTS asistencia_resumen_periodo (
+    alumno_id INT NOT NULL,
+    periodo_id INT NOT NULL,
+    presentes INT NOT NULL DEFAULT 0,
+    ausentes INT NOT NULL DEFAULT 0,
+    tardes INT NOT NULL DEFAULT 0,
+    justificados INT NOT NULL DEFAULT 0,
+    total_registros INT NOT NULL DEFAULT 0,
+    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (alumno_id, periodo_id),
+    FOREIGN KEY (alumno_id) REFERENCES alumnos(id) ON DELETE CASCADE,
+    FOREIGN KEY (periodo_id) REFERENCES periodos_evaluacion(id) ON DELETE CASCADE,
+    INDEX idx_periodo (periodo_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- =====================================================
+-- 3. CARGA INICIAL DESDE ASISTENCIA_DIARIA
+-- =====================================================
+-- Equivale a AsistenciaManager.reconstruir_resumen_asistencia()
+
+INSERT INTO asistencia_resumen_mensual
+(alumno_id, anio, mes, presentes, ausentes, tardes, justificados, total_registros)
+SELECT
+    alumno_id, YEAR(fecha), MONTH(fecha),
+    SUM(estado = 'Presente'), SUM(estado = 'Ausente'),
+    SUM(estado = 'Tarde'), SUM(estado = 'Justificado'),
+    COUNT(*)
+FROM asistencia_diaria
+GROUP BY alumno_id, YEAR(fecha), MONTH(fecha)
+ON DUPLICATE KEY UPDATE
+presentes = VALUES(presentes),
+ausentes = VALUES(ausentes),
+tardes = VALUES(tardes),
+justificados = VALUES(justificados),
+total_registros = VALUES(total_registros);
+
+INSERT INTO asistencia_resumen_periodo
+(alumno_id, periodo_id, presentes, ausentes, tardes, justificados, total_registros)
+SELECT
+    ad.alumno_id, p.id,
+    SUM(ad.estado = 'Presente'), SUM(ad.estado = 'Ausente'),
+    SUM(ad.estado = 'Tarde'), SUM(ad.estado = 'Justificado'),
+    COUNT(*)
+FROM asistencia_diaria ad
+JOIN periodos_evaluacion p ON ad.fecha BETWEEN p.fecha_inicio AND p.fecha_fin
+GROUP BY ad.alumno_id, p.id
+ON DUPLICATE KEY UPDATE
+presentes = VALUES(presentes),
+ausentes = VALUES(ausentes),
+tardes = VALUES(tardes),
+justificados = VALUES(justificados),
+total_registros = VALUES(total_registros);
+
+-- =====================================================
+-- 4. MENSAJE DE CONFIRMACIÓN
+-- =====================================================
+
+SELECT 'Resumen incremental de asistencia instalado' AS mensaje;
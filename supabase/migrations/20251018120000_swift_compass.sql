@@ -0,0 +1,83 @@
+-- =====================================================
+-- ÍNDICES COMPUESTOS PARA LAS CONSULTAS DE CALIFICACIONES
+-- GESJ - Sistema de Gestión Educativa
+-- =====================================================
+-- Ajustados a los accesos de server/calificaciones:
+--   - calificaciones por (materia_id, periodo_id): estadísticas por materia,
+--     planilla del docente, promedios del curso por materia
+--   - calificaciones por (alumno_id, periodo_id): boletines, reportes y
+--     el join desde alumnos filtrado por período
+--   - alumnos por (curso, division, activo): listados y reportes de curso
+--   - promedios_alumnos por período: alumnos en riesgo
+-- Las columnas finales (nota, apellido, nombre, ...) hacen que esos
+-- índices cubran la consulta y no haga falta leer la fila completa.
+-- server/verificar_indices.py comprueba con EXPLAIN que se sigan usando.
+
+USE gestion_escolar;
+
+-- =====================================================
+-- 1. PROCEDIMIENTO AUXILIAR
+-- =====================================================
+-- MySQL no admite CREATE INDEX IF NOT EXISTS; el procedimiento consulta
+-- information_schema para que la migración pueda ejecutarse más de una vez.
+
+DROP PROCEDURE IF EXISTS CrearIndiceSiNoExiste;
+
+DELIMITER //
+CREATE PROCEDURE CrearIndiceSiNoExiste(
+    IN p_tabla VARCHAR(64),
+    IN p_indice VARCHAR(64),
+    IN p_columnas VARCHAR(255)
+)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        AND TABLE_NAME = p_tabla
+        AND INDEX_NAME = p_indice
+    ) THEN
+        SET @sql_indice = CONCAT('CREATE INDEX ', p_indice, ' ON ', p_tabla, ' (', p_columnas, ')');
+        PREPARE sentencia FROM @sql_indice;
+        EXECUTE sentencia;
+        DEALLOCATE PREPARE sentencia;
+    END IF;
+END //
+DELIMITER ;
+
+-- =====================================================
+-- 2. ÍNDICES DE CALIFICACIONES
+-- =====================================================
+
+CALL CrearIndiceSiNoExiste('calificaciones', 'idx_materia_periodo_alumno',
+                           'materia_id, periodo_id, alumno_id, nota');
+
+CALL CrearIndiceSiNoExiste('calificaciones', 'idx_alumno_periodo_materia',
+                           'alumno_id, periodo_id, materia_id, nota');
+
+-- =====================================================
+-- 3. ÍNDICES DE ALUMNOS
+-- =====================================================
+
+CALL CrearIndiceSiNoExiste('alumnos', 'idx_curso_division_activo',
+                           'curso, division, activo, apellido, nombre');
+
+-- =====================================================
+-- 4. ÍNDICES DE PROMEDIOS
+-- =====================================================
+
+CALL CrearIndiceSiNoExiste('promedios_alumnos', 'idx_periodo_alumno_promedio',
+                           'periodo_id, alumno_id, promedio');
+
+DROP PROCEDURE IF EXISTS CrearIndiceSiNoExiste;
+
+-- =====================================================
+-- 5. ESTADÍSTICAS ACTUALIZADAS PARA EL OPTIMIZADOR
+-- =====================================================
+
+ANALYZE TABLE calificaciones, alumnos, promedios_alumnos;
+
+-- =====================================================
+-- 6. MENSAJE DE CONFIRMACIÓN
+-- =====================================================
+
+SELECT 'Índices de calificaciones instalados' AS mensaje;
@@ -0,0 +1,55 @@
+-- =====================================================
+-- ÍNDICES DE MODIFICACIÓN PARA LA REEVALUACIÓN DE RIESGO
+-- GESJ - Sistema de Gestión Educativa
+-- =====================================================
+-- RiesgoOperations.reevaluar() busca los alumnos con calificaciones o
+-- asistencia modificadas desde la última evaluación filtrando por
+-- fecha_modificacion; sin estos índices esa búsqueda recorre las tablas
+-- completas en cada reevaluación.
+
+USE gestion_escolar;
+
+-- =====================================================
+-- 1. PROCEDIMIENTO AUXILIAR
+-- =====================================================
+
+DROP PROCEDURE IF EXISTS CrearIndiceSiNoExiste;
+
+DELIMITER //
+CREATE PROCEDURE CrearIndiceSiNoExiste(
+    IN p_tabla VARCHAR(64),
+    IN p_indice VARCHAR(64),
+    IN p_columnas VARCHAR(255)
+)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        AND TABLE_NAME = p_tabla
+        AND INDEX_NAME = p_indice
+    ) THEN
+        SET @sql_indice = CONCAT('CREATE INDEX ', p_indice, ' ON ', p_tabla, ' (', p_columnas, ')');
+        PREPARE sentencia FROM @sql_indice;
+        EXECUTE sentencia;
+        DEALLOCATE PREPARE sentencia;
+    END IF;
+END //
+DELIMITER ;
+
+-- =====================================================
+-- 2. ÍNDICES
+-- =====================================================
+
+CALL CrearIndiceSiNoExiste('calificaciones', 'idx_fecha_modificacion',
+                           'fecha_modificacion, alumno_id');
+
+CALL CrearIndiceSiNoExiste('asistencia_diaria', 'idx_fecha_modificacion',
+                           'fecha_modificacion, alumno_id');
+
+DROP PROCEDURE IF EXISTS CrearIndiceSiNoExiste;
+
+-- =====================================================
+-- 3. MENSAJE DE CONFIRMACIÓN
+-- =====================================================
+
+SELECT 'Índices de modificación instalados' AS mensaje;
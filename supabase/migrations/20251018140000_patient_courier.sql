@@ -0,0 +1,38 @@
+-- =====================================================
+-- COLA PERSISTENTE DE EMAILS SALIENTES
+-- GESJ - Sistema de Gestión Educativa
+-- =====================================================
+-- server/notifications/mail_queue.py guarda aquí cada mensaje MIME antes
+-- de enviarlo. El hilo de envío reserva lotes (lote + reservado_hasta),
+-- los entrega reutilizando la sesión SMTP y registra el resultado; si el
+-- proceso se cae, los mensajes reservados se retoman al vencer la reserva.
+
+USE gestion_escolar;
+
+-- =====================================================
+-- 1. TABLA DE LA COLA
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS cola_emails (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    destinatario VARCHAR(255) NOT NULL,
+    asunto VARCHAR(255) NOT NULL DEFAULT '',
+    mensaje MEDIUMBLOB NOT NULL,
+    estado ENUM('pendiente', 'enviado', 'fallido') NOT NULL DEFAULT 'pendiente',
+    intentos INT NOT NULL DEFAULT 0,
+    ultimo_error VARCHAR(500),
+    proximo_intento DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    lote CHAR(32) NULL,
+    reservado_hasta DATETIME NULL,
+    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_envio DATETIME NULL,
+    INDEX idx_estado_proximo (estado, proximo_intento, id),
+    INDEX idx_lote (lote),
+    INDEX idx_estado_envio (estado, fecha_envio)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- =====================================================
+-- 2. MENSAJE DE CONFIRMACIÓN
+-- =====================================================
+
+SELECT 'Cola de emails instalada' AS mensaje;
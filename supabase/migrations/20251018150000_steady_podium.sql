@@ -0,0 +1,52 @@
+-- =====================================================
+-- ÍNDICE DE MODIFICACIÓN POR MATERIA PARA EL RANKING
+-- GESJ - Sistema de Gestión Educativa
+-- =====================================================
+-- RankingOperations (server/calificaciones/ranking.py) busca
+-- periódicamente los alumnos de una materia y período con calificaciones
+-- modificadas desde la última verificación. Con este índice la búsqueda
+-- lee sólo las filas recientes de esa materia.
+
+USE gestion_escolar;
+
+-- =====================================================
+-- 1. PROCEDIMIENTO AUXILIAR
+-- =====================================================
+
+DROP PROCEDURE IF EXISTS CrearIndiceSiNoExiste;
+
+DELIMITER //
+CREATE PROCEDURE CrearIndiceSiNoExiste(
+    IN p_tabla VARCHAR(64),
+    IN p_indice VARCHAR(64),
+    IN p_columnas VARCHAR(255)
+)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        AND TABLE_NAME = p_tabla
+        AND INDEX_NAME = p_indice
+    ) THEN
+        SET @sql_indice = CONCAT('CREATE INDEX ', p_indice, ' ON ', p_tabla, ' (', p_columnas, ')');
+        PREPARE sentencia FROM @sql_indice;
+        EXECUTE sentencia;
+        DEALLOCATE PREPARE sentencia;
+    END IF;
+END //
+DELIMITER ;
+
+-- =====================================================
+-- 2. ÍNDICES
+-- =====================================================
+
+CALL CrearIndiceSiNoExiste('calificaciones', 'idx_materia_periodo_modificacion',
+                           'materia_id, periodo_id, fecha_modificacion');
+
+DROP PROCEDURE IF EXISTS CrearIndiceSiNoExiste;
+
+-- =====================================================
+-- 3. MENSAJE DE CONFIRMACIÓN
+-- =====================================================
+
+SELECT 'Índice del ranking por materia instalado' AS mensaje;
@@ -8,31 +8,15 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 sys.path.insert(0, project_root)
 
-from .sections.padres import PadresSection
-from .sections.docentes.main import DocentesSection
-from .sections.preceptores.main import PreceptoresSection
-from .sections.administradores.main import AdministradoresSection
+from .carga_diferida import importar_clase, obtener_base_datos
 
-try:
-    from server.database import verificar_usuario, inicializar_base_datos
-    DATABASE_CONNECTED = inicializar_base_datos()
-    print(f"✅ Base de datos conectada exitosamente en auth.py: {DATABASE_CONNECTED}")
-except ImportError as e:
-    DATABASE_CONNECTED = False
-    print(f"❌ Error al importar módulo de base de datos en auth.py: {e}")
-    print(f"   Directorio actual: {current_dir}")
-    print(f"   Directorio raíz: {project_root}")
-    def verificar_usuario(usuario, contrasena):
-        if usuario == "test" and contrasena == "test":
-            return ("Padre",)
-        return None
-except Exception as e:
-    DATABASE_CONNECTED = False
-    print(f"❌ Error de conexión a base de datos en auth.py: {e}")
-    def verificar_usuario(usuario, contrasena):
-        if usuario == "test" and contrasena == "test":
-            return ("Padre",)
-        return None
+# Sección de cada rol; se importa recién cuando alguien inicia sesión con ese rol
+SECCIONES = {
+    "Padre": ("ui.sections.padres", "PadresSection"),
+    "Docente": ("ui.sections.docentes.main", "DocentesSection"),
+    "Preceptor": ("ui.sections.preceptores.main", "PreceptoresSection"),
+    "Administrativo": ("ui.sections.administradores.main", "AdministradoresSection"),
+}
 
 # Diccionario para almacenar usuarios localmente (fallback)
 usuarios = {}
@@ -69,8 +53,9 @@ class AuthManager:
             usuario = user_entry.get()
             contrasena = pass_entry.get()
 
-            if DATABASE_CONNECTED:
-                resultado = verificar_usuario(usuario, contrasena)
+            base_datos = obtener_base_datos()
+            if base_datos is not None:
+                resultado = base_datos.verificar_usuario(usuario, contrasena)
                 if resultado and resultado[0] == role:
                     messagebox.showinfo("Login Exitoso", f"Bienvenido a la gestión de {title}")
                     login_window.destroy()
@@ -96,14 +81,17 @@ class AuthManager:
     
     def open_section(self, role, usuario=None):
         """Abrir la sección correspondiente según el rol"""
+        if role not in SECCIONES:
+            return
+        try:
+            seccion = importar_clase(*SECCIONES[role])
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al cargar la sección {role}: {e}")
+            return
         if role == "Padre":
-            PadresSection(self.root, usuario)
-        elif role == "Docente":
-            DocentesSection(self.root)
-        elif role == "Preceptor":
-            PreceptoresSection(self.root)
-        elif role == "Administrativo":
-            AdministradoresSection(self.root)
+            seccion(self.root, usuario)
+        else:
+            seccion(self.root)
     
     def login_padres(self):
         self.create_login_window("Padres", "Padre")
@@ -0,0 +1,200 @@
+"""
+Carga diferida y medición del arranque
+GESJ - Plataforma de Gestión Educativa
+
+La ventana principal sólo necesita tkinter. Las secciones de cada rol, el
+acceso a MySQL y los exportadores (openpyxl, ReportLab) se importan la
+primera vez que se usan, así el login aparece sin esperar a que carguen.
+
+Con `python main.py --medir-arranque` (o GESJ_MEDIR_ARRANQUE=1) se mide
+cuánto cuesta importar cada módulo y cada etapa del arranque; el informe
+se imprime cuando la ventana ya está dibujada y después de cada sección
+que se carga por primera vez.
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+from typing import List, Optional
+
+# Configuración del informe de arranque
+ARRANQUE_CONFIG = {
+    'variable_entorno': 'GESJ_MEDIR_ARRANQUE',
+    'argumento': '--medir-arranque',
+    'modulos_informe': 25,   # Módulos más costosos que se listan
+    'minimo_ms': 1.0,        # No listar módulos más baratos que esto
+}
+
+
+class _CargadorMedido:
+    """Envuelve el loader de un módulo para cronometrar su ejecución"""
+
+    def __init__(self, cargador, nombre: str, medicion: 'MedicionArranque'):
+        self._cargador = cargador
+        self._nombre = nombre
+        self._medicion = medicion
+
+    def create_module(self, spec):
+        return self._cargador.create_module(spec)
+
+    def exec_module(self, modulo):
+        if threading.current_thread() is not threading.main_thread():
+            return self._cargador.exec_module(modulo)
+        self._medicion._entrar()
+        inicio = time.perf_counter()
+        try:
+            self._cargador.exec_module(modulo)
+        finally:
+            self._medicion._salir(self._nombre, time.perf_counter() - inicio)
+
+    def __getattr__(self, nombre):
+        # get_data, get_resource_reader, is_package... del loader original
+        return getattr(self._cargador, nombre)
+
+
+class _BuscadorMedido:
+    """Primer buscador de sys.meta_path: delega en los demás y envuelve el loader"""
+
+    def __init__(self, medicion: 'MedicionArranque'):
+        self._medicion = medicion
+
+    def find_spec(self, nombre, path, target=None):
+        for buscador in sys.meta_path:
+            if buscador is self or not hasattr(buscador, 'find_spec'):
+                continue
+            spec = buscador.find_spec(nombre, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _CargadorMedido(spec.loader, nombre, self._medicion)
+        return spec
+
+
+class MedicionArranque:
+    """Tiempos de importación por módulo y de cada etapa del arranque"""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.modulos = []   # (nombre, propio_s, acumulado_s) en orden de finalización
+        self.etapas = []    # (nombre, segundos, modulos_hasta_aqui)
+        self._ultima_etapa = self.inicio
+        self._pila: List[float] = []
+        self._buscador = _BuscadorMedido(self)
+
+    def instalar(self):
+        if self._buscador not in sys.meta_path:
+            sys.meta_path.insert(0, self._buscador)
+
+    def desinstalar(self):
+        if self._buscador in sys.meta_path:
+            sys.meta_path.remove(self._buscador)
+
+    def _entrar(self):
+        self._pila.append(0.0)
+
+    def _salir(self, nombre: str, duracion: float):
+        # Tiempo propio = total menos lo que tardaron los módulos que importó
+        hijos = self._pila.pop()
+        if self._pila:
+            self._pila[-1] += duracion
+        self.modulos.append((nombre, duracion - hijos, duracion))
+
+    def etapa(self, nombre: str) -> float:
+        """Cerrar una etapa del arranque y devolver su duración en segundos"""
+        ahora = time.perf_counter()
+        duracion = ahora - self._ultima_etapa
+        self._ultima_etapa = ahora
+        self.etapas.append((nombre, duracion, len(self.modulos)))
+        return duracion
+
+    def informe(self, desde_modulo: int = 0, titulo: str = "Arranque de GESJ") -> str:
+        """Etapas y módulos más costosos (desde_modulo: sólo los importados después de ese índice)"""
+        limite = ARRANQUE_CONFIG['modulos_informe']
+        minimo = ARRANQUE_CONFIG['minimo_ms'] / 1000
+        modulos = self.modulos[desde_modulo:]
+        lineas = [f"⏱️ {titulo}"]
+        if desde_modulo == 0:
+            lineas.append(f"   Total: {(self._ultima_etapa - self.inicio) * 1000:.1f} ms")
+            for nombre, duracion, _ in self.etapas:
+                lineas.append(f"   {duracion * 1000:9.1f} ms  {nombre}")
+        total = sum(propio for _, propio, _ in modulos)
+        lineas.append(f"   {len(modulos)} módulos importados en {total * 1000:.1f} ms")
+        lineas.append(f"   {'propio':>9}  {'acumulado':>10}  módulo")
+        costosos = sorted((m for m in modulos if m[2] >= minimo), key=lambda m: m[2], reverse=True)
+        for nombre, propio, acumulado in costosos[:limite]:
+            lineas.append(f"   {propio * 1000:6.1f} ms  {acumulado * 1000:7.1f} ms  {nombre}")
+        return "\n".join(lineas)
+
+
+_medicion: Optional[MedicionArranque] = None
+
+
+def medicion_solicitada(argv: List[str] = None) -> bool:
+    """True si se pidió el informe por argumento o variable de entorno"""
+    argv = sys.argv if argv is None else argv
+    return (ARRANQUE_CONFIG['argumento'] in argv
+            or os.environ.get(ARRANQUE_CONFIG['variable_entorno'], '') not in ('', '0'))
+
+
+def iniciar_medicion() -> MedicionArranque:
+    """Empezar a medir las importaciones del proceso"""
+    global _medicion
+    if _medicion is None:
+        _medicion = MedicionArranque()
+        _medicion.instalar()
+    return _medicion
+
+
+def obtener_medicion() -> Optional[MedicionArranque]:
+    """Medición en curso, o None si no se pidió"""
+    return _medicion
+
+
+def importar_clase(modulo: str, nombre: str):
+    """
+    Importar una clase en su primer uso
+
+    Si se está midiendo el arranque, imprime lo que costó cargar el módulo
+    la primera vez.
+    """
+    if _medicion is None or modulo in sys.modules:
+        return getattr(importlib.import_module(modulo), nombre)
+    desde = len(_medicion.modulos)
+    inicio = time.perf_counter()
+    clase = getattr(importlib.import_module(modulo), nombre)
+    duracion = time.perf_counter() - inicio
+    print(_medicion.informe(desde, f"Carga de {modulo} ({duracion * 1000:.1f} ms)"), file=sys.stderr)
+    return clase
+
+
+_base_datos = None
+_base_datos_resuelta = False
+_base_datos_lock = threading.Lock()
+
+
+def obtener_base_datos():
+    """
+    Módulo server.database ya inicializado, o None si no hay conexión
+
+    Se importa e inicializa la primera vez que se necesita (login, gestión
+    de usuarios) y el resultado queda para el resto de la sesión.
+    """
+    global _base_datos, _base_datos_resuelta
+    if not _base_datos_resuelta:
+        with _base_datos_lock:
+            if not _base_datos_resuelta:
+                try:
+                    from server import database
+                    if database.inicializar_base_datos():
+                        _base_datos = database
+                    print(f"✅ Base de datos conectada: {_base_datos is not None}")
+                except ImportError as e:
+                    print(f"❌ Error al importar módulo de base de datos: {e}")
+                except Exception as e:
+                    print(f"❌ Error de conexión a base de datos: {e}")
+                _base_datos_resuelta = True
+    return _base_datos
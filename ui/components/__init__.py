@@ -2,14 +2,20 @@
 # Plataforma de Gestión Educativa
 # Provincia de San Juan, República Argentina
 
-from .data_table import DataTable
+from .data_table import DataTable, ColumnStore
 from .metrics_panel import MetricsPanel
 from .filter_panel import FilterPanel
 from .progress_dialog import ProgressDialog
+from .scroll_pager import ScrollPager
+from .query_executor import QueryExecutor, obtener_executor
 
 __all__ = [
     'DataTable',
+    'ColumnStore',
     'MetricsPanel', 
     'FilterPanel',
-    'ProgressDialog'
+    'ProgressDialog',
+    'ScrollPager',
+    'QueryExecutor',
+    'obtener_executor'
 ]
\ No newline at end of file
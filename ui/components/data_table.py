@@ -3,85 +3,353 @@ Componente de Tabla de Datos Reutilizable
 GESJ - Plataforma de Gestión Educativa
 """
 
+import numbers
 import tkinter as tk
 from tkinter import ttk
-from typing import List, Dict, Optional, Callable
+from typing import List, Dict, Optional, Callable, Any
+
+
+class ColumnStore:
+    """Almacén por columnas de las filas de una tabla, con vista ordenada/filtrada"""
+
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        self.data = {col: [] for col in self.columns}
+        self.view = []  # Índices de fila visibles, en el orden actual
+        self.sort_column = None
+        self.sort_descending = False
+        self.filter_text = ""
+        self.filter_columns = None
+
+    def __len__(self):
+        return len(self.view)
+
+    @property
+    def total_rows(self) -> int:
+        return len(self.data[self.columns[0]]) if self.columns else 0
+
+    def clear(self):
+        for col in self.columns:
+            self.data[col] = []
+        self.view = []
+
+    def append_rows(self, rows: List[Dict]):
+        """Agregar filas; respetan el filtro activo y se insertan al final de la vista"""
+        inicio = self.total_rows
+        for col in self.columns:
+            self.data[col].extend(row.get(col, '') for row in rows)
+        nuevos = [i for i in range(inicio, self.total_rows) if self._pasa_filtro(i)]
+        self.view.extend(nuevos)
+        if self.sort_column is not None and nuevos:
+            self._ordenar()
+
+    def row_values(self, view_index: int) -> List[Any]:
+        fila = self.view[view_index]
+        return [self.data[col][fila] for col in self.columns]
+
+    def row_dict(self, row_index: int) -> Dict:
+        return {col: self.data[col][row_index] for col in self.columns}
+
+    def sort(self, column: str, descending: bool = False):
+        self.sort_column = column
+        self.sort_descending = descending
+        self._ordenar()
+
+    def filter(self, text: str = "", columns: List[str] = None):
+        """Dejar en la vista solo las filas cuyo texto contiene 'text' en alguna columna"""
+        self.filter_text = (text or "").lower()
+        self.filter_columns = columns
+        self.view = [i for i in range(self.total_rows) if self._pasa_filtro(i)]
+        if self.sort_column is not None:
+            self._ordenar()
+
+    def _pasa_filtro(self, fila: int) -> bool:
+        if not self.filter_text:
+            return True
+        for col in self.filter_columns or self.columns:
+            if self.filter_text in str(self.data[col][fila]).lower():
+                return True
+        return False
+
+    def _ordenar(self):
+        valores = self.data[self.sort_column]
+
+        def clave(fila):
+            valor = valores[fila]
+            # Los números (incluido Decimal de MySQL) van antes que el texto,
+            # sin comparar tipos mezclados
+            if isinstance(valor, numbers.Number) and not isinstance(valor, bool):
+                return (0, valor)
+            return (1, str(valor).lower())
+
+        # Las celdas vacías quedan al final en ambos sentidos
+        llenas = [i for i in self.view if valores[i] is not None and valores[i] != '']
+        vacias = [i for i in self.view if valores[i] is None or valores[i] == '']
+        llenas.sort(key=clave, reverse=self.sort_descending)
+        self.view = llenas + vacias
+
 
 class DataTable:
     """Componente reutilizable para mostrar datos en tabla"""
-    
-    def __init__(self, parent, columns: List[str], data: List[Dict] = None):
+
+    def __init__(self, parent, columns: List[str], data: List[Dict] = None,
+                 virtual: bool = False, page_provider: Callable[[Optional[str]], Dict] = None,
+                 buffer_rows: int = 50, batch_size: int = 100):
+        """
+        Args:
+            parent: Widget contenedor
+            columns: Columnas (claves de los dict de cada fila)
+            data: Filas iniciales
+            virtual: Si es True, solo se crean en el Treeview las filas visibles
+                más un margen; el resto vive en un ColumnStore
+            page_provider: Opcional (modo virtual). Recibe un cursor y devuelve
+                {'filas', 'siguiente_cursor'}, como los métodos *_pagina del servidor
+            buffer_rows: Filas extra materializadas arriba y abajo de las visibles
+            batch_size: Filas insertadas por cada tramo de after_idle
+        """
         self.parent = parent
         self.columns = columns
         self.data = data or []
         self.tree = None
+        self.virtual = virtual
+        self.page_provider = page_provider
+        self.buffer_rows = buffer_rows
+        self.batch_size = batch_size
+
+        self.store = ColumnStore(columns)
+        self.offset = 0              # Primera fila visible de la vista
+        self.window = (0, 0)         # Rango de la vista materializado en el Treeview
+        self._render_generation = 0
+        self._next_cursor = None
+        self._loading_page = False
+        self._provider_done = True
+
         self.create_table()
-    
+
     def create_table(self):
         """Crear la tabla con scrollbars"""
         # Frame contenedor
         self.table_frame = tk.Frame(self.parent)
         self.table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
+
         # Treeview con scrollbars
         self.tree = ttk.Treeview(self.table_frame, columns=self.columns, show="headings")
-        
+
         # Scrollbars
-        v_scrollbar = ttk.Scrollbar(self.table_frame, orient="vertical", command=self.tree.yview)
         h_scrollbar = ttk.Scrollbar(self.table_frame, orient="horizontal", command=self.tree.xview)
-        
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
-        
+        if self.virtual:
+            # El scrollbar vertical representa toda la vista, no solo las filas materializadas
+            self.v_scrollbar = ttk.Scrollbar(self.table_frame, orient="vertical",
+                                             command=self._on_scrollbar)
+            self.tree.configure(xscrollcommand=h_scrollbar.set)
+            self.tree.bind("<MouseWheel>", self._on_mousewheel)
+            self.tree.bind("<Button-4>", lambda e: self.scroll_rows(-3))
+            self.tree.bind("<Button-5>", lambda e: self.scroll_rows(3))
+            self.tree.bind("<Configure>", lambda e: self._render())
+        else:
+            self.v_scrollbar = ttk.Scrollbar(self.table_frame, orient="vertical", command=self.tree.yview)
+            self.tree.configure(yscrollcommand=self.v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+
         # Configurar columnas
         for col in self.columns:
-            self.tree.heading(col, text=col)
+            if self.virtual:
+                self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            else:
+                self.tree.heading(col, text=col)
             self.tree.column(col, width=120, anchor="center")
-        
+
         # Empaquetar
         self.tree.pack(side="left", fill="both", expand=True)
-        v_scrollbar.pack(side="right", fill="y")
+        self.v_scrollbar.pack(side="right", fill="y")
         h_scrollbar.pack(side="bottom", fill="x")
-        
+
         # Cargar datos si existen
         if self.data:
             self.load_data(self.data)
-    
+        elif self.virtual and self.page_provider:
+            self.reload_pages()
+
     def load_data(self, data: List[Dict]):
         """Cargar datos en la tabla"""
+        if self.virtual:
+            self.store.clear()
+            self.store.append_rows(data)
+            self.offset = 0
+            self._render(force=True)
+            return
+
         # Limpiar tabla
         for item in self.tree.get_children():
             self.tree.delete(item)
-        
+
         # Insertar nuevos datos
         for row_data in data:
             values = [row_data.get(col, '') for col in self.columns]
             self.tree.insert("", tk.END, values=values)
-    
+
     def add_row(self, row_data: Dict):
         """Agregar una fila a la tabla"""
+        if self.virtual:
+            self.store.append_rows([row_data])
+            self._render(force=True)
+            return
+
         values = [row_data.get(col, '') for col in self.columns]
         self.tree.insert("", tk.END, values=values)
-    
+
     def get_selected_item(self) -> Optional[Dict]:
         """Obtener el item seleccionado"""
         selection = self.tree.selection()
         if selection:
+            if self.virtual:
+                # En modo virtual el iid es el índice de la fila en el ColumnStore
+                return self.store.row_dict(int(selection[0]))
             item = self.tree.item(selection[0])
             values = item['values']
             return {col: values[i] for i, col in enumerate(self.columns)}
         return None
-    
+
     def configure_column(self, column: str, width: int = None, anchor: str = None):
         """Configurar una columna específica"""
         if width:
             self.tree.column(column, width=width)
         if anchor:
             self.tree.column(column, anchor=anchor)
-    
+
     def add_tag_config(self, tag: str, **kwargs):
         """Agregar configuración de tag para colorear filas"""
         self.tree.tag_configure(tag, **kwargs)
-    
+
     def bind_double_click(self, callback: Callable):
         """Vincular evento de doble click"""
-        self.tree.bind("<Double-1>", callback)
\ No newline at end of file
+        self.tree.bind("<Double-1>", callback)
+
+    # ==================== MODO VIRTUAL ====================
+
+    def reload_pages(self):
+        """Vaciar la tabla y volver a pedir páginas al proveedor desde el principio"""
+        self.store.clear()
+        self.offset = 0
+        self._next_cursor = None
+        self._provider_done = self.page_provider is None
+        self._render(force=True)
+        self._request_page()
+
+    def sort_by(self, column: str):
+        """Ordenar por una columna; un segundo clic invierte el orden"""
+        descending = self.store.sort_column == column and not self.store.sort_descending
+        self.store.sort(column, descending)
+        self.offset = 0
+        self._render(force=True)
+
+    def filter_rows(self, text: str, columns: List[str] = None):
+        """Mostrar solo las filas que contienen el texto (sobre los datos ya cargados)"""
+        self.store.filter(text, columns)
+        self.offset = 0
+        self._render(force=True)
+
+    def scroll_rows(self, delta: int):
+        """Desplazar la vista 'delta' filas"""
+        self._scroll_to(self.offset + delta)
+
+    def _on_mousewheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        visible = self._visible_rows()
+        if action == "moveto":
+            self._scroll_to(int(float(amount) * len(self.store)))
+        elif action == "scroll":
+            paso = visible if unit == "pages" else 1
+            self._scroll_to(self.offset + int(amount) * paso)
+
+    def _scroll_to(self, offset: int):
+        maximo = max(0, len(self.store) - self._visible_rows())
+        self.offset = max(0, min(offset, maximo))
+        self._render()
+
+        # Cerca del final de lo cargado: pedir otra página al proveedor
+        if self.offset + self._visible_rows() + self.buffer_rows >= len(self.store):
+            self._request_page()
+
+    def _visible_rows(self) -> int:
+        altura_fila = ttk.Style().lookup("Treeview", "rowheight") or 20
+        try:
+            altura_fila = int(altura_fila)
+        except (TypeError, ValueError):
+            altura_fila = 20
+        # Se descuenta una fila por el encabezado
+        return max(1, self.tree.winfo_height() // altura_fila - 1)
+
+    def _render(self, force: bool = False):
+        """Materializar en el Treeview solo la ventana alrededor de la posición actual"""
+        visible = self._visible_rows()
+        total = len(self.store)
+        inicio_actual, fin_actual = self.window
+
+        necesita = force or self.offset < inicio_actual or \
+            min(total, self.offset + visible) > fin_actual
+        if necesita:
+            inicio = max(0, self.offset - self.buffer_rows)
+            fin = min(total, self.offset + visible + self.buffer_rows)
+            self.window = (inicio, fin)
+            self._render_generation += 1
+            for item in self.tree.get_children():
+                self.tree.delete(item)
+            self._insert_batch(inicio, fin, self._render_generation)
+        else:
+            self._position_window()
+
+        self._update_scrollbar()
+
+    def _insert_batch(self, desde: int, fin: int, generacion: int):
+        """Insertar filas [desde, fin) en tramos, cediendo el loop de Tk entre tramos"""
+        if generacion != self._render_generation:
+            return  # Se pidió otra ventana mientras tanto
+
+        hasta = min(fin, desde + self.batch_size)
+        for posicion in range(desde, hasta):
+            fila = self.store.view[posicion]
+            self.tree.insert("", tk.END, iid=str(fila), values=self.store.row_values(posicion))
+
+        if hasta < fin:
+            self.tree.after_idle(self._insert_batch, hasta, fin, generacion)
+        else:
+            self._position_window()
+
+    def _position_window(self):
+        """Desplazar el Treeview para que la fila 'offset' quede arriba"""
+        inicio, fin = self.window
+        if fin > inicio:
+            self.tree.yview_moveto((self.offset - inicio) / (fin - inicio))
+
+    def _update_scrollbar(self):
+        total = len(self.store)
+        if total == 0:
+            self.v_scrollbar.set(0.0, 1.0)
+            return
+        visible = self._visible_rows()
+        self.v_scrollbar.set(self.offset / total, min(1.0, (self.offset + visible) / total))
+
+    def _request_page(self):
+        """Pedir la siguiente página al proveedor, en un tramo de after_idle"""
+        if self._provider_done or self._loading_page or not self.page_provider:
+            return
+        self._loading_page = True
+        self.tree.after_idle(self._load_page)
+
+    def _load_page(self):
+        try:
+            pagina = self.page_provider(self._next_cursor) or {}
+        finally:
+            self._loading_page = False
+
+        self.store.append_rows(pagina.get('filas', []))
+        self._next_cursor = pagina.get('siguiente_cursor')
+        self._provider_done = self._next_cursor is None
+        self._render(force=True)
+
+        # Si lo cargado todavía no llena la vista más el margen, seguir pidiendo
+        if len(self.store) < self.offset + self._visible_rows() + self.buffer_rows:
+            self._request_page()
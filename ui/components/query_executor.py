@@ -0,0 +1,211 @@
+"""
+Ejecución de consultas en segundo plano para las ventanas Tk
+GESJ - Plataforma de Gestión Educativa
+
+Las llamadas a los managers (MySQL) se ejecutan en un pool de hilos y los
+resultados vuelven al hilo de Tk a través de una cola que se revisa con
+after(), de modo que la interfaz no se congela mientras la base responde.
+Tk no es thread-safe: los callbacks on_success/on_error siempre se ejecutan
+en el hilo principal.
+"""
+
+import queue
+import threading
+import tkinter as tk
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class _Suscripcion:
+    """Callbacks de una ventana interesada en el resultado de una tarea"""
+
+    def __init__(self, on_success, on_error, owner):
+        self.on_success = on_success
+        self.on_error = on_error
+        self.owner = owner
+        self.cancelada = False
+
+
+class QueryExecutor:
+    """Pool de hilos compartido para llamadas a los managers, con entrega en el hilo de Tk"""
+
+    def __init__(self, max_workers: int = 4, intervalo_ms: int = 50):
+        self.max_workers = max_workers
+        self.intervalo_ms = intervalo_ms
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gesj-consulta")
+        self._resultados = queue.Queue()
+        self._lock = threading.Lock()
+        self._en_curso = {}  # clave -> (Future, [_Suscripcion])
+        self._suscripciones = {}  # Future -> [_Suscripcion]
+        self._owners = weakref.WeakSet()
+        # Los managers guardan la conexión en self.connection: dos llamadas
+        # simultáneas sobre el mismo manager se ejecutan de a una
+        self._locks_objeto = weakref.WeakKeyDictionary()
+        self._widget = None
+        self._estadisticas = {'enviadas': 0, 'coalescidas': 0, 'canceladas': 0,
+                              'completadas': 0, 'errores': 0}
+
+    def submit(self, func: Callable, *args, key: Hashable = None,
+               on_success: Callable[[Any], None] = None,
+               on_error: Callable[[Exception], None] = None,
+               owner: tk.Misc = None, **kwargs) -> Future:
+        """
+        Ejecutar func(*args, **kwargs) en segundo plano
+
+        Args:
+            func: Función o método de un manager
+            key: Si ya hay una tarea en curso con la misma clave, no se lanza
+                otra: se devuelve el mismo Future y los callbacks se suman
+            on_success: Recibe el resultado, en el hilo de Tk
+            on_error: Recibe la excepción, en el hilo de Tk
+            owner: Ventana dueña; al destruirse se cancelan sus tareas
+
+        Returns:
+            Future de la tarea
+        """
+        if owner is not None:
+            self._vigilar_owner(owner)
+        suscripcion = _Suscripcion(on_success, on_error, owner)
+
+        with self._lock:
+            if key is not None and key in self._en_curso:
+                future, suscripciones = self._en_curso[key]
+                suscripciones.append(suscripcion)
+                self._estadisticas['coalescidas'] += 1
+                return future
+
+            future = self._pool.submit(self._ejecutar, func, args, kwargs)
+            suscripciones = [suscripcion]
+            self._suscripciones[future] = suscripciones
+            if key is not None:
+                self._en_curso[key] = (future, suscripciones)
+            self._estadisticas['enviadas'] += 1
+
+        future.add_done_callback(lambda f, k=key: self._terminada(f, k))
+        return future
+
+    def cancel_owner(self, owner: tk.Misc):
+        """Cancelar las tareas de una ventana; las que ya corren terminan pero su resultado se descarta"""
+        sin_interesados = []
+        with self._lock:
+            for future, suscripciones in self._suscripciones.items():
+                for suscripcion in suscripciones:
+                    if suscripcion.owner is owner and not suscripcion.cancelada:
+                        suscripcion.cancelada = True
+                        self._estadisticas['canceladas'] += 1
+                # Nadie más espera el resultado: no tiene sentido ejecutarla
+                if all(s.cancelada for s in suscripciones):
+                    sin_interesados.append(future)
+
+        # Fuera del lock: cancel() ejecuta en este hilo el callback _terminada
+        for future in sin_interesados:
+            future.cancel()
+
+    def shutdown(self, wait: bool = False):
+        """Detener el pool (al cerrar la aplicación)"""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def obtener_estadisticas(self) -> Dict:
+        with self._lock:
+            estadisticas = dict(self._estadisticas)
+            estadisticas['en_curso'] = len(self._suscripciones)
+        estadisticas['max_workers'] = self.max_workers
+        return estadisticas
+
+    def _ejecutar(self, func, args, kwargs):
+        objeto = getattr(func, "__self__", None)
+        lock = None
+        if objeto is not None:
+            with self._lock:
+                try:
+                    lock = self._locks_objeto.setdefault(objeto, threading.Lock())
+                except TypeError:
+                    lock = None  # Objeto sin soporte de weakref
+        if lock is None:
+            return func(*args, **kwargs)
+        with lock:
+            return func(*args, **kwargs)
+
+    def _terminada(self, future: Future, key):
+        """Se ejecuta en el hilo del worker: solo encola, nunca toca Tk"""
+        with self._lock:
+            if key is not None and self._en_curso.get(key, (None,))[0] is future:
+                del self._en_curso[key]
+            suscripciones = self._suscripciones.pop(future, [])
+        self._resultados.put((future, suscripciones))
+
+    def _vigilar_owner(self, owner: tk.Misc):
+        if self._widget is None:
+            # El sondeo se programa sobre la raíz, que vive mientras dure la aplicación
+            self._widget = owner.nametowidget(".")
+            self._widget.after(self.intervalo_ms, self._sondear)
+        if owner in self._owners:
+            return
+        self._owners.add(owner)
+        owner.bind("<Destroy>",
+                   lambda e, o=owner: self.cancel_owner(o) if e.widget is o else None,
+                   add="+")
+
+    def attach(self, widget: tk.Misc):
+        """Empezar a entregar resultados aunque ninguna tarea tenga owner"""
+        if self._widget is None:
+            self._widget = widget.nametowidget(".")
+            self._widget.after(self.intervalo_ms, self._sondear)
+
+    def _sondear(self):
+        """Entregar en el hilo de Tk los resultados encolados por los workers"""
+        while True:
+            try:
+                future, suscripciones = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._entregar(future, suscripciones)
+
+        try:
+            self._widget.after(self.intervalo_ms, self._sondear)
+        except tk.TclError:
+            self._widget = None  # Se cerró la aplicación
+
+    def _entregar(self, future: Future, suscripciones: List[_Suscripcion]):
+        if future.cancelled():
+            return
+        error = future.exception()
+        with self._lock:
+            self._estadisticas['completadas' if error is None else 'errores'] += 1
+
+        for suscripcion in suscripciones:
+            if suscripcion.cancelada:
+                continue
+            if suscripcion.owner is not None and not _existe(suscripcion.owner):
+                continue
+            try:
+                if error is None:
+                    if suscripcion.on_success:
+                        suscripcion.on_success(future.result())
+                elif suscripcion.on_error:
+                    suscripcion.on_error(error)
+                else:
+                    print(f"Error en consulta en segundo plano: {error}")
+            except Exception as e:
+                print(f"Error al entregar resultado de consulta: {e}")
+
+
+def _existe(widget: tk.Misc) -> bool:
+    try:
+        return bool(widget.winfo_exists())
+    except tk.TclError:
+        return False
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def obtener_executor() -> QueryExecutor:
+    """Executor compartido por todas las ventanas (se crea al primer uso)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = QueryExecutor()
+        return _executor
@@ -0,0 +1,94 @@
+"""
+Carga por páginas al desplazarse en un Treeview
+GESJ - Plataforma de Gestión Educativa
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, Optional, Sequence
+
+
+class ScrollPager:
+    """Llena un Treeview página a página a medida que el usuario llega al final"""
+
+    def __init__(self, tree: ttk.Treeview, scrollbar: Optional[ttk.Scrollbar],
+                 fetch_page: Callable[[Optional[str]], Dict],
+                 row_values: Callable[[Dict], Sequence],
+                 row_tags: Callable[[Dict], Sequence] = None,
+                 umbral: float = 0.9):
+        """
+        Args:
+            tree: Treeview a llenar
+            scrollbar: Scrollbar vertical del Treeview (puede ser None)
+            fetch_page: Recibe el cursor (None para la primera página) y devuelve
+                un dict con 'filas' y 'siguiente_cursor', como los métodos *_pagina
+            row_values: Convierte una fila en los valores de las columnas
+            row_tags: Opcional, tags para colorear cada fila
+            umbral: Fracción desplazada a partir de la cual se pide otra página
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.fetch_page = fetch_page
+        self.row_values = row_values
+        self.row_tags = row_tags
+        self.umbral = umbral
+
+        self.siguiente_cursor = None
+        self.hay_mas = False
+        self.cargando = False
+        self.filas_cargadas = 0
+        self._verificacion_pendiente = False
+
+        self.tree.configure(yscrollcommand=self._on_scroll)
+
+    def reload(self):
+        """Vaciar la tabla y volver a cargar desde la primera página"""
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        self.siguiente_cursor = None
+        self.hay_mas = False
+        self.filas_cargadas = 0
+        self._cargar_pagina(None)
+
+    def load_more(self):
+        """Pedir la página siguiente si la hay"""
+        if self.hay_mas and not self.cargando:
+            self._cargar_pagina(self.siguiente_cursor)
+
+    def _cargar_pagina(self, cursor: Optional[str]):
+        self.cargando = True
+        try:
+            pagina = self.fetch_page(cursor) or {}
+        finally:
+            self.cargando = False
+
+        for fila in pagina.get('filas', []):
+            tags = tuple(self.row_tags(fila)) if self.row_tags else ()
+            self.tree.insert("", tk.END, values=tuple(self.row_values(fila)), tags=tags)
+            self.filas_cargadas += 1
+
+        self.siguiente_cursor = pagina.get('siguiente_cursor')
+        self.hay_mas = self.siguiente_cursor is not None
+
+        # Si la página no alcanza a llenar la vista no habrá scroll: seguir cargando
+        self._programar_verificacion()
+
+    def _programar_verificacion(self):
+        if self.hay_mas and not self._verificacion_pendiente:
+            self._verificacion_pendiente = True
+            self.tree.after_idle(self._verificar_umbral)
+
+    def _verificar_umbral(self):
+        self._verificacion_pendiente = False
+        try:
+            _, fin = self.tree.yview()
+        except tk.TclError:
+            return  # La ventana se cerró
+        if fin >= self.umbral:
+            self.load_more()
+
+    def _on_scroll(self, primero, ultimo):
+        if self.scrollbar is not None:
+            self.scrollbar.set(primero, ultimo)
+        if float(ultimo) >= self.umbral:
+            self._programar_verificacion()
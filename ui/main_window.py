@@ -1,7 +1,8 @@
 import tkinter as tk
-from PIL import Image, ImageTk
+from tkinter import messagebox
 import os
 from .auth import AuthManager
+from .carga_diferida import importar_clase
 from .user_management import UserManager
 
 class MainWindow:
@@ -24,9 +25,20 @@ class MainWindow:
         self.root.configure(bg="DarkSeaGreen")
     
     def load_images(self):
-        """Cargar las imágenes con manejo de errores"""
+        """Cargar las imágenes con manejo de errores (PIL sólo se importa si existen)"""
+        self.photo = None
+        self.arg_photo = None
+        image_path = r'C:\TFG\TFG-EnzoMerenda-20250627T210914Z-1-001\TFG-EnzoMerenda\GESJ\WhatsApp Image 2024-09-09 at 22.59.55.jpeg'
+        arg_img_path = r'C:\TFG\TFG-EnzoMerenda-20250627T210914Z-1-001\TFG-EnzoMerenda\GESJ\argentina.jpg'
+        if not (os.path.exists(image_path) or os.path.exists(arg_img_path)):
+            return
+        try:
+            from PIL import Image, ImageTk
+        except ImportError as e:
+            print(f"Error cargando imágenes: {e}")
+            return
+
         try:
-            image_path = r'C:\TFG\TFG-EnzoMerenda-20250627T210914Z-1-001\TFG-EnzoMerenda\GESJ\WhatsApp Image 2024-09-09 at 22.59.55.jpeg'
             if os.path.exists(image_path):
                 img = Image.open(image_path)
                 img = img.resize((200, 200), Image.Resampling.LANCZOS)
@@ -38,7 +50,6 @@ class MainWindow:
             self.photo = None
 
         try:
-            arg_img_path = r'C:\TFG\TFG-EnzoMerenda-20250627T210914Z-1-001\TFG-EnzoMerenda\GESJ\argentina.jpg'
             if os.path.exists(arg_img_path):
                 arg_img = Image.open(arg_img_path)
                 arg_img = arg_img.resize((150, 280), Image.Resampling.LANCZOS)
@@ -178,55 +189,48 @@ class MainWindow:
     
     def salir_aplicacion(self):
         """Salir de la aplicación con confirmación"""
-        from tkinter import messagebox
         if messagebox.askokcancel("Salir", "¿Está seguro que desea salir de la aplicación?"):
             self.root.quit()
     
     def abrir_asistencia(self):
         """Abrir módulo de asistencia"""
         try:
-            from .sections.asistencia import AsistenciaSection
-            AsistenciaSection(self.root)
+            importar_clase("ui.sections.asistencia", "AsistenciaSection")(self.root)
         except ImportError as e:
             messagebox.showerror("Error", f"Error al cargar módulo de asistencia: {e}")
     
     def abrir_biblioteca(self):
         """Abrir módulo de biblioteca"""
         try:
-            from .sections.biblioteca import BibliotecaSection
-            BibliotecaSection(self.root)
+            importar_clase("ui.sections.biblioteca", "BibliotecaSection")(self.root)
         except ImportError as e:
             messagebox.showerror("Error", f"Error al cargar módulo de biblioteca: {e}")
     
     def abrir_eventos(self):
         """Abrir módulo de eventos"""
         try:
-            from .sections.eventos import EventosSection
-            EventosSection(self.root)
+            importar_clase("ui.sections.eventos", "EventosSection")(self.root)
         except ImportError as e:
             messagebox.showerror("Error", f"Error al cargar módulo de eventos: {e}")
     
     def abrir_comunicacion(self):
         """Abrir módulo de comunicación"""
         try:
-            from .sections.comunicacion import ComunicacionSection
-            ComunicacionSection(self.root)
+            importar_clase("ui.sections.comunicacion", "ComunicacionSection")(self.root)
         except ImportError as e:
             messagebox.showerror("Error", f"Error al cargar módulo de comunicación: {e}")
     
     def abrir_evaluaciones(self):
         """Abrir módulo de evaluaciones"""
         try:
-            from .sections.evaluaciones import EvaluacionesSection
-            EvaluacionesSection(self.root)
+            importar_clase("ui.sections.evaluaciones", "EvaluacionesSection")(self.root)
         except ImportError as e:
             messagebox.showerror("Error", f"Error al cargar módulo de evaluaciones: {e}")
     
     def abrir_calificaciones(self):
         """Abrir módulo de calificaciones"""
         try:
-            from .sections.calificaciones import CalificacionesSection
-            CalificacionesSection(self.root)
+            importar_clase("ui.sections.calificaciones", "CalificacionesSection")(self.root)
         except ImportError as e:
             messagebox.showerror("Error", f"Error al cargar módulo de calificaciones: {e}")
     
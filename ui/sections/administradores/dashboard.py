@@ -5,6 +5,7 @@ GESJ - Plataforma de Gestión Educativa
 
 import tkinter as tk
 from tkinter import messagebox, ttk
+from datetime import datetime
 import sys
 import os
 
@@ -18,6 +19,8 @@ try:
 except ImportError:
     DATABASE_AVAILABLE = False
 
+from ui.components.query_executor import obtener_executor
+
 class DashboardEjecutivoWindow:
     """Dashboard ejecutivo integral con métricas clave"""
     
@@ -89,32 +92,41 @@ class DashboardEjecutivoWindow:
             print(f"Error actualizando datos: {e}")
 
     def cargar_metricas_actualizadas(self):
-        """Cargar métricas actualizadas desde la base de datos"""
+        """Pedir las métricas en segundo plano; se aplican al llegar el resultado"""
+        obtener_executor().submit(self.consultar_metricas, key='dashboard_metricas',
+                                  on_success=self.aplicar_metricas,
+                                  on_error=lambda e: print(f"Error cargando métricas actualizadas: {e}"),
+                                  owner=self.window)
+
+    @staticmethod
+    def consultar_metricas():
+        """Consultar las métricas en la base de datos (se ejecuta fuera del hilo de Tk)"""
+        connection = crear_conexion()
+        if not connection:
+            return None
         try:
-            connection = crear_conexion()
-            if connection:
-                cursor = connection.cursor(dictionary=True)
-                
-                # Actualizar estadísticas en tiempo real
-                cursor.execute("SELECT COUNT(*) as total FROM alumnos WHERE activo = TRUE")
-                total_alumnos = cursor.fetchone()['total']
-                
-                cursor.execute("SELECT ROUND(AVG(nota), 2) as promedio FROM calificaciones")
-                promedio_result = cursor.fetchone()
-                promedio_general = promedio_result['promedio'] if promedio_result['promedio'] else 0.0
-                
-                # Actualizar estadísticas_data
-                self.estadisticas_data.update({
-                    'total_alumnos': total_alumnos,
-                    'promedio_general': promedio_general,
-                    'ultima_actualizacion': datetime.now().strftime("%H:%M:%S")
-                })
-                
-                cursor.close()
-                connection.close()
-                
-        except Exception as e:
-            print(f"Error cargando métricas actualizadas: {e}")
+            cursor = connection.cursor(dictionary=True)
+
+            cursor.execute("SELECT COUNT(*) as total FROM alumnos WHERE activo = TRUE")
+            total_alumnos = cursor.fetchone()['total']
+
+            cursor.execute("SELECT ROUND(AVG(nota), 2) as promedio FROM calificaciones")
+            promedio_result = cursor.fetchone()
+            promedio_general = promedio_result['promedio'] if promedio_result['promedio'] else 0.0
+
+            cursor.close()
+            return {
+                'total_alumnos': total_alumnos,
+                'promedio_general': promedio_general,
+                'ultima_actualizacion': datetime.now().strftime("%H:%M:%S")
+            }
+        finally:
+            connection.close()
+
+    def aplicar_metricas(self, metricas):
+        """Actualizar estadísticas_data con las métricas recibidas"""
+        if metricas:
+            self.estadisticas_data.update(metricas)
 
     def exportar_dashboard_pdf(self):
         """Exportar dashboard completo a PDF"""
@@ -12,12 +12,15 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
 
 try:
-    from server.database import crear_usuario, obtener_todos_usuarios, crear_conexion
+    from server.database import (crear_usuario, obtener_todos_usuarios, crear_conexion,
+                                 obtener_instantanea_consultas, obtener_instrumentacion)
     from server.user_management import UserManager
     DATABASE_AVAILABLE = True
 except ImportError:
     DATABASE_AVAILABLE = False
 
+from ui.components.scroll_pager import ScrollPager
+
 class SistemaWindow:
     """Ventana para configuración del sistema"""
     
@@ -49,6 +52,9 @@ class SistemaWindow:
         # Pestaña 2: Configuración General
         self.create_config_tab(notebook)
 
+        # Pestaña 3: Rendimiento de consultas
+        self.create_rendimiento_tab(notebook)
+
     def create_usuarios_tab(self, notebook):
         """Crear pestaña de gestión de usuarios"""
         frame = tk.Frame(notebook, bg="lightblue")
@@ -74,9 +80,25 @@ class SistemaWindow:
             else:
                 self.tree_usuarios.column(col, width=120, anchor="center")
 
+        scrollbar_usuarios = ttk.Scrollbar(usuarios_frame, orient="vertical",
+                                           command=self.tree_usuarios.yview)
+
+        # Con base de datos, los usuarios se traen por páginas al desplazarse
+        self.pager_usuarios = None
+        if DATABASE_AVAILABLE and self.user_manager:
+            self.pager_usuarios = ScrollPager(
+                self.tree_usuarios, scrollbar_usuarios,
+                fetch_page=lambda cursor: self.user_manager.obtener_usuarios_pagina(cursor),
+                row_values=lambda u: (u['nombre_usuario'], u['tipo_usuario'],
+                                      'No especificado', 'Activo')
+            )
+        else:
+            self.tree_usuarios.configure(yscrollcommand=scrollbar_usuarios.set)
+
         # Cargar usuarios
         self.cargar_usuarios()
 
+        scrollbar_usuarios.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
         self.tree_usuarios.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
 
         # Botones de gestión
@@ -94,6 +116,10 @@ class SistemaWindow:
 
     def cargar_usuarios(self):
         """Cargar usuarios en la tabla"""
+        if self.pager_usuarios:
+            self.pager_usuarios.reload()
+            return
+
         # Limpiar tabla
         for item in self.tree_usuarios.get_children():
             self.tree_usuarios.delete(item)
@@ -139,7 +165,7 @@ class SistemaWindow:
 
     def actualizar_lista_usuarios(self):
         """Actualizar lista de usuarios"""
-        if DATABASE_AVAILABLE:
+        if DATABASE_AVAILABLE and not self.pager_usuarios:
             self.usuarios_data = obtener_todos_usuarios()
         self.cargar_usuarios()
     
@@ -229,6 +255,126 @@ class SistemaWindow:
                 fill=tk.BOTH, expand=True, padx=20, pady=10)
 
 
+    def create_rendimiento_tab(self, notebook):
+        """Crear pestaña con las latencias de las consultas a la base de datos"""
+        frame = tk.Frame(notebook, bg="lavender")
+        notebook.add(frame, text="📈 Rendimiento")
+
+        tk.Label(frame, text="📈 Rendimiento de Consultas a la Base de Datos",
+                font=("Arial", 14, "bold"), bg="lavender", fg="darkblue").pack(pady=10)
+
+        self.rendimiento_resumen = tk.Label(frame, text="", font=("Courier", 9), bg="white",
+                                            justify=tk.LEFT, anchor="w", relief=tk.SUNKEN, bd=2)
+        self.rendimiento_resumen.pack(fill=tk.X, padx=20, pady=5)
+
+        detalle = ttk.Notebook(frame)
+        detalle.pack(fill=tk.BOTH, expand=True, padx=20, pady=5)
+
+        self.tree_consultas = self.crear_tabla_rendimiento(
+            detalle, "🔎 Consultas",
+            ("Consulta", "Llamador", "Ejec.", "Prom. ms", "p95 ms", "p99 ms", "Máx. ms", "Filas prom."))
+        self.tree_llamadores = self.crear_tabla_rendimiento(
+            detalle, "🧭 Métodos y pantallas",
+            ("Origen", "Tipo", "Ejec.", "Prom. ms", "p95 ms", "p99 ms", "Total ms", "Espera ms"))
+        self.tree_lentas = self.crear_tabla_rendimiento(
+            detalle, "🐢 Consultas lentas",
+            ("Fecha", "Duración ms", "Filas", "Llamador", "Pantalla", "Consulta"))
+
+        buttons_frame = tk.Frame(frame, bg="lavender")
+        buttons_frame.pack(fill=tk.X, padx=20, pady=5)
+        tk.Button(buttons_frame, text="🔄 Actualizar", bg="#2196F3", fg="white",
+                 font=("Arial", 10), width=15, command=self.actualizar_rendimiento).pack(side=tk.LEFT, padx=5)
+        tk.Button(buttons_frame, text="🧹 Reiniciar Métricas", bg="#FF9800", fg="white",
+                 font=("Arial", 10), width=18, command=self.reiniciar_rendimiento).pack(side=tk.LEFT, padx=5)
+
+        self.actualizar_rendimiento()
+
+    def crear_tabla_rendimiento(self, notebook, titulo, columnas):
+        """Crear una subpestaña con una tabla de métricas"""
+        frame = tk.Frame(notebook, bg="white")
+        notebook.add(frame, text=titulo)
+
+        tree = ttk.Treeview(frame, columns=columnas, show="headings", height=10)
+        for col in columnas:
+            tree.heading(col, text=col)
+            if col in ("Consulta", "Origen"):
+                tree.column(col, width=420, anchor="w")
+            elif col in ("Llamador", "Pantalla"):
+                tree.column(col, width=220, anchor="w")
+            else:
+                tree.column(col, width=80, anchor="center")
+
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(fill=tk.BOTH, expand=True)
+        return tree
+
+    def actualizar_rendimiento(self):
+        """Mostrar la instantánea actual y reprogramar la próxima actualización"""
+        if not self.window.winfo_exists():
+            return
+
+        for tree in (self.tree_consultas, self.tree_llamadores, self.tree_lentas):
+            tree.delete(*tree.get_children())
+
+        if not DATABASE_AVAILABLE:
+            self.rendimiento_resumen.config(text="  Sin conexión a la base de datos: no hay mediciones.")
+            return
+
+        instantanea = obtener_instantanea_consultas()
+        pool = instantanea['pool']
+        espera = instantanea['espera_conexion']
+        self.rendimiento_resumen.config(text=(
+            f"  Mediciones desde: {instantanea['desde']}    "
+            f"Umbral de consulta lenta: {instantanea['umbral_lento_ms']:.0f} ms\n"
+            f"  Pool: {pool['prestadas']} prestadas / {pool['abiertas']} abiertas "
+            f"(máx. {pool['tamano_maximo']}), tasa de reuso {pool['tasa_hits']:.0%}, "
+            f"{pool['timeouts']} timeouts\n"
+            f"  Espera de conexión: p50 {espera['p50_ms']} ms, p95 {espera['p95_ms']} ms, "
+            f"máx. {espera['max_ms']} ms en {espera['ejecuciones']} préstamos"
+        ))
+
+        for consulta in instantanea['consultas']:
+            self.tree_consultas.insert("", tk.END, values=(
+                consulta['huella'][:200],
+                ", ".join(consulta['llamadores']),
+                consulta['ejecuciones'],
+                consulta['promedio_ms'],
+                consulta['p95_ms'],
+                consulta['p99_ms'],
+                consulta['max_ms'],
+                consulta['filas_promedio']
+            ))
+
+        for pantalla in instantanea['pantallas']:
+            self.tree_llamadores.insert("", tk.END, values=(
+                pantalla['pantalla'], "Pantalla", pantalla['ejecuciones'], pantalla['promedio_ms'],
+                pantalla['p95_ms'], pantalla['p99_ms'], pantalla['total_ms'], "-"
+            ))
+        for llamador in instantanea['llamadores']:
+            self.tree_llamadores.insert("", tk.END, values=(
+                llamador['llamador'], "Método", llamador['ejecuciones'], llamador['promedio_ms'],
+                llamador['p95_ms'], llamador['p99_ms'], llamador['total_ms'], llamador['espera_ms']
+            ))
+
+        for lenta in instantanea['lentas']:
+            self.tree_lentas.insert("", tk.END, values=(
+                lenta['fecha'], lenta['duracion_ms'], lenta['filas'],
+                lenta['llamador'], lenta['pantalla'] or "-", lenta['huella'][:200]
+            ))
+
+        # Refrescar mientras la ventana siga abierta
+        if getattr(self, 'rendimiento_after', None):
+            self.window.after_cancel(self.rendimiento_after)
+        self.rendimiento_after = self.window.after(5000, self.actualizar_rendimiento)
+
+    def reiniciar_rendimiento(self):
+        """Descartar las mediciones acumuladas"""
+        if DATABASE_AVAILABLE:
+            obtener_instrumentacion().reiniciar()
+        self.actualizar_rendimiento()
+
 class CrearUsuarioWindow:
     """Ventana para crear nuevo usuario"""
     
@@ -19,6 +19,8 @@ try:
 except ImportError:
     DATABASE_AVAILABLE = False
 
+from ui.components.scroll_pager import ScrollPager
+
 class BibliotecaSection:
     """Sección principal de gestión de biblioteca"""
     
@@ -152,7 +154,8 @@ class BibliotecaSection:
         categoria_combo.set("Todas")
         categoria_combo.pack(side=tk.LEFT, padx=5, pady=5)
 
-        tk.Button(search_frame, text="Buscar", bg="#2196F3", fg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=10, pady=5)
+        buscar_button = tk.Button(search_frame, text="Buscar", bg="#2196F3", fg="white", font=("Arial", 9))
+        buscar_button.pack(side=tk.LEFT, padx=10, pady=5)
 
         # Catálogo de libros
         catalogo_frame = tk.LabelFrame(frame, text="📚 Libros Disponibles", 
@@ -171,6 +174,38 @@ class BibliotecaSection:
             else:
                 tree.column(col, width=100, anchor="center")
 
+        scrollbar = ttk.Scrollbar(catalogo_frame, orient="vertical", command=tree.yview)
+        tree.tag_configure("agotado", background="#FFCDD2")
+
+        if DATABASE_AVAILABLE and self.biblioteca_manager:
+            # Catálogo real, traído por páginas al desplazarse
+            def valores_libro(libro):
+                disponibles = libro['cantidad_disponible'] or 0
+                return (libro['titulo'], libro['autor'], libro['categoria'], libro['editorial'],
+                        f"{disponibles}/{libro['cantidad_total']}",
+                        "Prestar" if disponibles > 0 else "Agotado")
+
+            def cargar_catalogo():
+                categoria = categoria_combo.get()
+                categoria = None if categoria == "Todas" else categoria
+                self.pager_catalogo.fetch_page = lambda cursor: \
+                    self.biblioteca_manager.obtener_libros_disponibles_pagina(categoria, cursor)
+                self.pager_catalogo.reload()
+
+            self.pager_catalogo = ScrollPager(
+                tree, scrollbar, fetch_page=None, row_values=valores_libro,
+                row_tags=lambda libro: ("agotado",) if not libro['cantidad_disponible'] else ()
+            )
+            buscar_button.configure(command=cargar_catalogo)
+            categoria_combo.bind("<<ComboboxSelected>>", lambda e: cargar_catalogo())
+            cargar_catalogo()
+
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
+            tree.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+            return
+
+        tree.configure(yscrollcommand=scrollbar.set)
+
         # Datos de libros
         libros_data = [
             ("Matemáticas 1º Año", "Santillana", "Matemáticas", "Santillana", "15/20", "Prestar"),
@@ -188,8 +223,7 @@ class BibliotecaSection:
             
             tree.insert("", tk.END, values=libro, tags=tags)
 
-        tree.tag_configure("agotado", background="#FFCDD2")
-
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
         tree.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
 
     def create_prestamos_tab(self, notebook):
@@ -217,6 +251,33 @@ class BibliotecaSection:
             else:
                 tree.column(col, width=100, anchor="center")
 
+        scrollbar = ttk.Scrollbar(prestamos_frame, orient="vertical", command=tree.yview)
+        tree.tag_configure("vencido", background="#FFCDD2")
+
+        if DATABASE_AVAILABLE and self.biblioteca_manager:
+            # Préstamos activos reales, traídos por páginas al desplazarse
+            def valores_prestamo(p):
+                vencido = p['dias_restantes'] is not None and p['dias_restantes'] < 0
+                return (p['alumno'], p['titulo'],
+                        p['fecha_prestamo'].strftime("%d/%m/%Y"),
+                        p['fecha_devolucion_esperada'].strftime("%d/%m/%Y"),
+                        "Vencido" if vencido else "Vigente",
+                        "Contactar" if vencido else "Devolver")
+
+            self.pager_prestamos = ScrollPager(
+                tree, scrollbar,
+                fetch_page=lambda cursor: self.biblioteca_manager.obtener_prestamos_activos_pagina(cursor=cursor),
+                row_values=valores_prestamo,
+                row_tags=lambda p: ("vencido",) if valores_prestamo(p)[4] == "Vencido" else ()
+            )
+            self.pager_prestamos.reload()
+
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
+            tree.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+            return
+
+        tree.configure(yscrollcommand=scrollbar.set)
+
         # Datos de préstamos
         prestamos_data = [
             ("Pérez, Juan", "Matemáticas 1º Año", "10/01/2025", "17/01/2025", "Vigente", "Devolver"),
@@ -233,8 +294,7 @@ class BibliotecaSection:
             
             tree.insert("", tk.END, values=prestamo, tags=tags)
 
-        tree.tag_configure("vencido", background="#FFCDD2")
-
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
         tree.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
 
     def create_inventario_tab(self, notebook):
@@ -7,6 +7,7 @@ import tkinter as tk
 from tkinter import messagebox, ttk, filedialog
 import sys
 import os
+from datetime import datetime
 
 # Agregar el directorio padre al path para importar módulos
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
@@ -19,6 +20,16 @@ try:
 except ImportError:
     DATABASE_AVAILABLE = False
 
+from ui.components.progress_dialog import ProgressDialog
+from ui.components.query_executor import obtener_executor
+
+
+def generar_boletines(*args, **kwargs):
+    """GeneradorBoletines().generar, importando ReportLab en el hilo de fondo y no al abrir la ventana"""
+    from server.exports.boletines import GeneradorBoletines
+    return GeneradorBoletines().generar(*args, **kwargs)
+
+
 class ExportacionWindow:
     """Ventana para exportación de calificaciones"""
     
@@ -27,6 +38,7 @@ class ExportacionWindow:
         self.cal_manager = cal_manager
         self.excel_exporter = ExcelExporter() if DATABASE_AVAILABLE else None
         self.pdf_exporter = PDFExporter() if DATABASE_AVAILABLE else None
+        self.destino_masivo = "exportaciones_pdf"
         self.create_window()
 
     def create_window(self):
@@ -131,7 +143,7 @@ class ExportacionWindow:
 
         # Opciones de Excel
         tk.Label(excel_frame, text="Tipo de Exportación:", font=("Arial", 10, "bold"), bg="lightblue").grid(row=0, column=0, padx=10, pady=5, sticky="w")
-        excel_tipo_combo = ttk.Combobox(excel_frame, values=[
+        self.excel_tipo_combo = excel_tipo_combo = ttk.Combobox(excel_frame, values=[
             "Calificaciones por Materia", "Promedios por Curso", "Reporte Completo", 
             "Alumnos en Riesgo", "Estadísticas Generales"
         ], state="readonly", width=30)
@@ -297,7 +309,7 @@ class ExportacionWindow:
 
         # Formato de exportación masiva
         tk.Label(masiva_frame, text="Formato:", font=("Arial", 10, "bold"), bg="lightyellow").grid(row=1, column=0, padx=10, pady=5, sticky="w")
-        formato_masivo_combo = ttk.Combobox(masiva_frame, values=["ZIP con Excel", "ZIP con PDF", "Base de datos SQL"], state="readonly", width=30)
+        self.formato_masivo_combo = formato_masivo_combo = ttk.Combobox(masiva_frame, values=["ZIP con Excel", "ZIP con PDF", "Carpeta con PDF", "Base de datos SQL"], state="readonly", width=30)
         formato_masivo_combo.set("ZIP con Excel")
         formato_masivo_combo.grid(row=1, column=1, padx=10, pady=5)
 
@@ -393,6 +405,29 @@ class ExportacionWindow:
             messagebox.showerror("Error", "Funcionalidad de exportación Excel no disponible")
             return
 
+        # Libros completos de la escuela: se generan en streaming, una hoja por curso
+        libros = {
+            "Reporte Completo": self.excel_exporter.exportar_libro_calificaciones,
+            "Promedios por Curso": self.excel_exporter.exportar_libro_promedios,
+        }
+        tipo = self.excel_tipo_combo.get()
+        exportar_libro = libros.get(tipo)
+        if exportar_libro:
+            def finalizar(archivo):
+                self.progress_label.config(text="✅ Exportación completada")
+                messagebox.showinfo("Excel Generado", 
+                                   f"📊 Archivo Excel generado exitosamente:\n📁 {archivo}")
+
+            def fallar(error):
+                self.progress_label.config(text="❌ Error en la exportación")
+                messagebox.showerror("Error", f"Error al generar Excel: {error}")
+
+            # El libro recorre toda la escuela: se arma en el hilo de fondo
+            self.progress_label.config(text=f"Generando {tipo}...")
+            obtener_executor().submit(exportar_libro, key=('libro_excel', tipo),
+                                      on_success=finalizar, on_error=fallar, owner=self.window)
+            return
+
         try:
             # Simular progreso
             self.simular_progreso("Generando archivo Excel...")
@@ -427,8 +462,69 @@ class ExportacionWindow:
 
     def exportacion_masiva(self):
         """Realizar exportación masiva"""
-        # Simular exportación masiva
-        self.simular_progreso_masivo()
+        formato = {"ZIP con PDF": "zip", "Carpeta con PDF": "carpeta"}.get(self.formato_masivo_combo.get())
+        if not formato or not DATABASE_AVAILABLE:
+            # Simular exportación masiva
+            self.simular_progreso_masivo()
+            return
+
+        periodo = self.obtener_periodo_actual()
+        if not periodo:
+            messagebox.showerror("Error", "No hay períodos activos para generar boletines")
+            return
+
+        # Boletines de toda la escuela: se generan en procesos aparte y el
+        # progreso real llega desde el hilo de fondo a través de 'estado'
+        dialogo = ProgressDialog(self.window, "Generando boletines", f"Boletines de {periodo['nombre']}...")
+        estado = {'hechos': 0, 'total': 0, 'mensaje': "Preparando datos..."}
+
+        def progreso(hechos, total, mensaje):
+            estado.update(hechos=hechos, total=total, mensaje=mensaje)
+
+        def mostrar_progreso():
+            if not dialogo.window or not dialogo.window.winfo_exists():
+                return
+            if estado['total']:
+                if str(dialogo.progress_bar['mode']) != 'determinate':
+                    dialogo.set_determinate(estado['total'])
+                dialogo.update_progress(estado['hechos'])
+                self.progress_var.set(100 * estado['hechos'] / estado['total'])
+            dialogo.update_message(f"{estado['hechos']}/{estado['total']} - {estado['mensaje']}")
+            self.progress_label.config(text=f"Generando boletines: {estado['hechos']}/{estado['total']}")
+            self._progreso_masivo = self.window.after(200, mostrar_progreso)
+
+        def finalizar(resumen):
+            self.window.after_cancel(self._progreso_masivo)
+            dialogo.close()
+            self.progress_var.set(100)
+            self.progress_label.config(text="✅ Exportación completada")
+            velocidad = resumen['generados'] / resumen['segundos'] if resumen['segundos'] else 0
+            messagebox.showinfo("Exportación Masiva Completada",
+                               f"📋 Boletines generados: {resumen['generados']} de {resumen['total']}\n"
+                               f"⚠️ Errores: {len(resumen['errores'])}\n"
+                               f"⏱️ Tiempo: {resumen['segundos']} s ({velocidad:.1f} boletines/s)\n"
+                               f"📁 {resumen['ruta']}")
+
+        def fallar(error):
+            self.window.after_cancel(self._progreso_masivo)
+            dialogo.close()
+            self.progress_label.config(text="❌ Error en la exportación")
+            messagebox.showerror("Error", f"Error al generar boletines: {error}")
+
+        self._progreso_masivo = self.window.after(200, mostrar_progreso)
+        obtener_executor().submit(generar_boletines, periodo['id'], self.destino_masivo, formato,
+                                  progreso=progreso, on_success=finalizar, on_error=fallar,
+                                  owner=self.window)
+
+    def obtener_periodo_actual(self):
+        """Período activo que incluye la fecha de hoy, o el último activo"""
+        periodos = self.cal_manager.obtener_periodos_activos() if self.cal_manager else []
+        hoy = datetime.now().date()
+        for periodo in periodos:
+            if periodo.get('fecha_inicio') and periodo.get('fecha_fin') and \
+                    periodo['fecha_inicio'] <= hoy <= periodo['fecha_fin']:
+                return periodo
+        return periodos[-1] if periodos else None
 
     def simular_progreso(self, mensaje):
         """Simular progreso de exportación"""
@@ -503,6 +599,7 @@ class ExportacionWindow:
         """Seleccionar carpeta de destino"""
         carpeta = filedialog.askdirectory(title="Seleccionar carpeta de destino")
         if carpeta:
+            self.destino_masivo = carpeta
             messagebox.showinfo("Destino Seleccionado", 
                                f"📁 Carpeta de destino configurada:\n{carpeta}")
 
@@ -21,6 +21,8 @@ except ImportError:
     DATABASE_AVAILABLE = False
     print("Módulo de base de datos no disponible. Usando datos de ejemplo.")
 
+from ui.components.query_executor import obtener_executor
+
 class CalificacionesDocenteWindow:
     """Ventana para gestión de calificaciones por docentes"""
     
@@ -28,6 +30,9 @@ class CalificacionesDocenteWindow:
         self.parent = parent
         self.docente_id = docente_id
         self.cal_manager = CalificacionesManager() if DATABASE_AVAILABLE else None
+        # consultar_lista corre fuera del hilo de Tk: usa su propio manager para no
+        # compartir self.connection con los guardados del hilo principal
+        self.cal_manager_lista = CalificacionesManager() if DATABASE_AVAILABLE else None
         self.excel_exporter = ExcelExporter() if DATABASE_AVAILABLE else None
         self.pdf_exporter = PDFExporter() if DATABASE_AVAILABLE else None
         
@@ -51,6 +56,8 @@ class CalificacionesDocenteWindow:
             {"id": 3, "nombre": "Evaluación Cuatrimestral", "peso_porcentual": 30.0}
         ]
         
+        self.lista_solicitada = None  # Última consulta de lista enviada al executor
+        
         self.create_window()
     
     def create_window(self):
@@ -154,8 +161,9 @@ class CalificacionesDocenteWindow:
     
     def create_buttons(self, parent):
         """Crear botones de acción"""
-        tk.Button(parent, text="Guardar Calificaciones", command=self.guardar_calificaciones,
-                 bg="#2196F3", fg="white", font=("Arial", 12), width=20).pack(side=tk.LEFT, padx=5)
+        self.guardar_btn = tk.Button(parent, text="Guardar Calificaciones", command=self.guardar_calificaciones,
+                                     bg="#2196F3", fg="white", font=("Arial", 12), width=20)
+        self.guardar_btn.pack(side=tk.LEFT, padx=5)
         
         tk.Button(parent, text="Ver Promedios", command=self.ver_promedios,
                  bg="#FF9800", fg="white", font=("Arial", 12), width=15).pack(side=tk.LEFT, padx=5)
@@ -223,19 +231,58 @@ class CalificacionesDocenteWindow:
         
         materia_seleccionada = self.materias_data[materia_index]
         
-        # Obtener alumnos del curso
-        if DATABASE_AVAILABLE and self.cal_manager:
-            alumnos = self.cal_manager.obtener_alumnos_por_curso(
-                materia_seleccionada['curso'], 
-                materia_seleccionada['division']
-            )
-        else:
-            alumnos = self.alumnos_ejemplo
-        
-        self.crear_tabla_calificaciones(alumnos, materia_seleccionada)
+        if not (DATABASE_AVAILABLE and self.cal_manager):
+            self.crear_tabla_calificaciones(self.alumnos_ejemplo, materia_seleccionada)
+            return
         
-        # Cargar calificaciones existentes después de crear la tabla
-        self.cargar_calificaciones_existentes(materia_seleccionada['id'])
+        periodo_index = self.periodo_combo.current()
+        if periodo_index < 0:
+            return
+        periodo_id = self.periodos_data[periodo_index]['id']
+        tipo_eval_index = self.tipo_eval_combo.current()
+        tipo_eval_id = self.tipos_eval_data[tipo_eval_index]['id'] if tipo_eval_index >= 0 else None
+        
+        # Alumnos y calificaciones se consultan en segundo plano; si mientras tanto
+        # se elige otra materia o período, el resultado viejo se descarta
+        clave = ('lista_calificaciones', materia_seleccionada['id'], periodo_id, tipo_eval_id)
+        self.lista_solicitada = clave
+        # No se guarda mientras la planilla que se ve no es la que se está cargando
+        self.guardar_btn.config(state=tk.DISABLED)
+        obtener_executor().submit(
+            self.consultar_lista, materia_seleccionada, periodo_id, tipo_eval_id, key=clave,
+            on_success=lambda resultado: self.mostrar_lista(clave, materia_seleccionada, *resultado),
+            on_error=lambda e: self.fallar_lista(clave, e),
+            owner=self.window)
+    
+    def consultar_lista(self, materia, periodo_id, tipo_eval_id):
+        """Consultar alumnos y calificaciones existentes (se ejecuta fuera del hilo de Tk)"""
+        alumnos = self.cal_manager_lista.obtener_alumnos_por_curso(materia['curso'], materia['division'])
+        calificaciones = self.cal_manager_lista.obtener_calificaciones_materia(materia['id'], periodo_id)
+        
+        # Una calificación por alumno: la del tipo seleccionado o, sin tipo, la más antigua
+        existentes = {}
+        for cal in calificaciones:
+            if tipo_eval_id is not None and cal.get('tipo_evaluacion_id') != tipo_eval_id:
+                continue
+            actual = existentes.get(cal['alumno_id'])
+            if actual is None or (tipo_eval_id is None and
+                                  cal['fecha_evaluacion'] < actual['fecha_evaluacion']):
+                existentes[cal['alumno_id']] = cal
+        return alumnos, existentes
+    
+    def mostrar_lista(self, clave, materia, alumnos, existentes):
+        """Dibujar la lista recibida si sigue siendo la última solicitada"""
+        if clave != self.lista_solicitada:
+            return
+        self.crear_tabla_calificaciones(alumnos, materia, existentes)
+        self.guardar_btn.config(state=tk.NORMAL)
+    
+    def fallar_lista(self, clave, error):
+        """Informar el error de la última lista solicitada y volver a permitir guardar"""
+        if clave != self.lista_solicitada:
+            return
+        self.guardar_btn.config(state=tk.NORMAL)
+        messagebox.showerror("Error", f"Error al cargar la lista: {error}")
     
     def cargar_calificaciones_existentes(self, materia_id):
         """Cargar todas las calificaciones existentes para la materia y configuración actual"""
@@ -250,8 +297,13 @@ class CalificacionesDocenteWindow:
         for alumno_id in self.entries_notas.keys():
             self.cargar_calificacion_existente(alumno_id, materia_id)
     
-    def crear_tabla_calificaciones(self, alumnos, materia):
-        """Crear la tabla de calificaciones para los alumnos"""
+    def crear_tabla_calificaciones(self, alumnos, materia, existentes=None):
+        """Crear la tabla de calificaciones para los alumnos
+
+        Args:
+            existentes: Calificaciones ya consultadas por alumno_id; si es None
+                se buscan alumno por alumno
+        """
         # Limpiar frame
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
@@ -300,7 +352,10 @@ class CalificacionesDocenteWindow:
             promedio_label.grid(row=row, column=4, sticky="ew", padx=1, pady=1)
             
             # Cargar calificación existente si existe
-            self.cargar_calificacion_existente(alumno_id, materia['id'])
+            if existentes is not None:
+                self.mostrar_calificacion(alumno_id, existentes.get(alumno_id))
+            else:
+                self.cargar_calificacion_existente(alumno_id, materia['id'])
     
     def cargar_calificacion_existente(self, alumno_id, materia_id):
         """Cargar calificación existente si ya fue registrada"""
@@ -327,12 +382,7 @@ class CalificacionesDocenteWindow:
                 if (cal.get('alumno_id') == alumno_id and 
                     cal.get('tipo_evaluacion_id') == tipo_eval_id):
                     # Cargar la calificación encontrada
-                    if alumno_id in self.entries_notas:
-                        self.entries_notas[alumno_id].delete(0, tk.END)
-                        self.entries_notas[alumno_id].insert(0, str(cal['nota']))
-                    if alumno_id in self.entries_observaciones:
-                        self.entries_observaciones[alumno_id].delete(0, tk.END)
-                        self.entries_observaciones[alumno_id].insert(0, cal.get('observaciones', ''))
+                    self.mostrar_calificacion(alumno_id, cal)
                     return
         
         # Si no hay tipo específico, cargar la última calificación de la materia
@@ -343,14 +393,20 @@ class CalificacionesDocenteWindow:
             for cal in calificaciones:
                 if cal.get('materia_id') == materia_id:
                     # Cargar la primera calificación encontrada
-                    if alumno_id in self.entries_notas:
-                        self.entries_notas[alumno_id].delete(0, tk.END)
-                        self.entries_notas[alumno_id].insert(0, str(cal['nota']))
-                    if alumno_id in self.entries_observaciones:
-                        self.entries_observaciones[alumno_id].delete(0, tk.END)
-                        self.entries_observaciones[alumno_id].insert(0, cal.get('observaciones', ''))
+                    self.mostrar_calificacion(alumno_id, cal)
                     break
     
+    def mostrar_calificacion(self, alumno_id, cal):
+        """Completar los campos de un alumno con una calificación existente"""
+        if not cal:
+            return
+        if alumno_id in self.entries_notas:
+            self.entries_notas[alumno_id].delete(0, tk.END)
+            self.entries_notas[alumno_id].insert(0, str(cal['nota']))
+        if alumno_id in self.entries_observaciones:
+            self.entries_observaciones[alumno_id].delete(0, tk.END)
+            self.entries_observaciones[alumno_id].insert(0, cal.get('observaciones') or '')
+    
     def guardar_calificaciones(self):
         """Guardar todas las calificaciones ingresadas"""
         if not self.materia_var.get() or not self.periodo_var.get() or not self.tipo_eval_var.get():
@@ -377,10 +433,11 @@ class CalificacionesDocenteWindow:
             messagebox.showerror("Error", "Formato de fecha inválido (YYYY-MM-DD)")
             return
         
-        # Guardar calificaciones
+        # Reunir la planilla completa antes de guardar
         calificaciones_guardadas = 0
         errores = 0
         calificaciones_guardadas_exitosamente = []
+        planilla = []
         
         for alumno_id, nota_entry in self.entries_notas.items():
             nota_text = nota_entry.get().strip()
@@ -394,35 +451,40 @@ class CalificacionesDocenteWindow:
                     continue
                 
                 observaciones = self.entries_observaciones[alumno_id].get().strip()
-                
-                if DATABASE_AVAILABLE and self.cal_manager:
-                    success = self.cal_manager.registrar_calificacion(
-                        alumno_id, materia_id, self.docente_id, periodo_id,
-                        tipo_eval_id, nota, fecha_eval, observaciones
-                    )
-                    if success:
-                        calificaciones_guardadas += 1
-                        calificaciones_guardadas_exitosamente.append({
-                            'alumno_id': alumno_id,
-                            'nota': nota,
-                            'observaciones': observaciones
-                        })
-                    else:
-                        errores += 1
-                else:
-                    # Simulación para testing
-                    print(f"Guardando: Alumno {alumno_id}, Nota {nota}, Obs: {observaciones}")
-                    calificaciones_guardadas += 1
-                    calificaciones_guardadas_exitosamente.append({
-                        'alumno_id': alumno_id,
-                        'nota': nota,
-                        'observaciones': observaciones
-                    })
+                planilla.append({
+                    'alumno_id': alumno_id,
+                    'nota': nota,
+                    'observaciones': observaciones
+                })
                 
             except ValueError:
                 messagebox.showerror("Error", f"Nota inválida para alumno ID {alumno_id}")
                 errores += 1
         
+        # Guardar toda la planilla en una sola transacción
+        if planilla:
+            if DATABASE_AVAILABLE and self.cal_manager:
+                resultados = self.cal_manager.registrar_calificaciones_lote(
+                    materia_id, self.docente_id, periodo_id, tipo_eval_id, fecha_eval, planilla
+                )
+            else:
+                # Simulación para testing
+                resultados = []
+                for cal in planilla:
+                    print(f"Guardando: Alumno {cal['alumno_id']}, Nota {cal['nota']}, Obs: {cal['observaciones']}")
+                    resultados.append(dict(cal, exito=True, error=None))
+            
+            for resultado in resultados:
+                if resultado['exito']:
+                    calificaciones_guardadas += 1
+                    calificaciones_guardadas_exitosamente.append({
+                        'alumno_id': resultado['alumno_id'],
+                        'nota': resultado['nota'],
+                        'observaciones': resultado['observaciones']
+                    })
+                else:
+                    errores += 1
+        
         # Mostrar resultado
         if calificaciones_guardadas > 0:
             mensaje = f"Se guardaron {calificaciones_guardadas} calificaciones"
@@ -728,34 +790,24 @@ class PromediosWindow:
     def cargar_promedios(self):
         """Cargar promedios en la tabla"""
         if DATABASE_AVAILABLE and self.cal_manager:
-            # Obtener alumnos del curso
-            alumnos = self.cal_manager.obtener_alumnos_por_curso(
+            # Promedios de todo el curso en una sola consulta
+            promedios = self.cal_manager.obtener_promedios_curso_materia(
+                self.materia['id'], self.periodo['id'],
                 self.materia['curso'], self.materia['division']
             )
             
-            for alumno in alumnos:
-                promedios = self.cal_manager.obtener_promedios_alumno(
-                    alumno['id'], self.periodo['id']
-                )
-                
-                # Buscar promedio para esta materia
-                promedio_materia = None
-                for p in promedios:
-                    if p['materia_id'] == self.materia['id']:
-                        promedio_materia = p
-                        break
-                
-                if promedio_materia:
+            for promedio in promedios:
+                if promedio['cantidad_notas']:
                     self.tree.insert("", tk.END, values=(
-                        f"{alumno['apellido']}, {alumno['nombre']}",
-                        promedio_materia['promedio'],
-                        promedio_materia['cantidad_notas'],
-                        promedio_materia.get('nota_min', '--'),
-                        promedio_materia.get('nota_max', '--')
+                        promedio['alumno'],
+                        promedio['promedio'],
+                        promedio['cantidad_notas'],
+                        promedio['nota_min'],
+                        promedio['nota_max']
                     ))
                 else:
                     self.tree.insert("", tk.END, values=(
-                        f"{alumno['apellido']}, {alumno['nombre']}",
+                        promedio['alumno'],
                         "Sin notas", "0", "--", "--"
                     ))
         else:
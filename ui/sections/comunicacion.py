@@ -19,6 +19,8 @@ try:
 except ImportError:
     DATABASE_AVAILABLE = False
 
+from ui.components.scroll_pager import ScrollPager
+
 class ComunicacionSection:
     """Sección principal de comunicación avanzada"""
     
@@ -201,6 +203,29 @@ class ComunicacionSection:
             else:
                 tree.column(col, width=80, anchor="center")
 
+        scrollbar = ttk.Scrollbar(bandeja_frame, orient="vertical", command=tree.yview)
+        tree.tag_configure("urgente", background="#FFCDD2")
+        tree.tag_configure("alta", background="#FFF3E0")
+
+        if DATABASE_AVAILABLE and self.comunicacion_manager:
+            # Bandeja real, traída por páginas al desplazarse
+            self.pager_bandeja = ScrollPager(
+                tree, scrollbar,
+                fetch_page=lambda cursor: self.comunicacion_manager.obtener_mensajes_usuario_pagina(
+                    self.usuario_id, "recibidos", cursor),
+                row_values=lambda m: ("📖 Leído" if m['leido'] else "📧 Nuevo",
+                                      m['remitente'], m['asunto'],
+                                      m['fecha_envio'].strftime("%d/%m/%Y"),
+                                      m['tipo_mensaje'])
+            )
+            self.pager_bandeja.reload()
+
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
+            tree.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+            return
+
+        tree.configure(yscrollcommand=scrollbar.set)
+
         # Datos de mensajes
         mensajes_data = [
             ("📧 Nuevo", "Prof. González", "Consulta sobre calificaciones", "16/01/2025", "Normal"),
@@ -220,9 +245,7 @@ class ComunicacionSection:
             
             tree.insert("", tk.END, values=mensaje, tags=tags)
 
-        tree.tag_configure("urgente", background="#FFCDD2")
-        tree.tag_configure("alta", background="#FFF3E0")
-
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
         tree.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
 
     def create_anuncios_tab(self, notebook):
@@ -21,6 +21,8 @@ except ImportError as e:
     DATABASE_AVAILABLE = False
     print(f"❌ Error al importar base de datos en padres.py: {e}")
 
+from ui.components.query_executor import obtener_executor
+
 class PadresSection:
     def __init__(self, root, usuario_padre=None):
         self.root = root
@@ -28,48 +30,70 @@ class PadresSection:
         self.cal_manager = CalificacionesManager() if DATABASE_AVAILABLE else None
         self.padre_id = None
         self.hijos_data = []
-        
-        # Obtener información del padre desde la base de datos
-        self.cargar_informacion_padre()
+        self.cargando_hijos = DATABASE_AVAILABLE
         
         self.create_padres_window()
+        
+        # Obtener información del padre desde la base de datos sin bloquear la ventana
+        self.cargar_informacion_padre()
     
     def cargar_informacion_padre(self):
         """Cargar información del padre desde la base de datos"""
         if DATABASE_AVAILABLE:
+            obtener_executor().submit(self.consultar_informacion_padre, self.usuario_padre,
+                                      key=('informacion_padre', self.usuario_padre),
+                                      on_success=self.aplicar_informacion_padre,
+                                      on_error=self.error_informacion_padre,
+                                      owner=self.padres_window)
+        else:
+            self.usar_datos_ejemplo()
+            self.mostrar_hijos()
+    
+    @staticmethod
+    def consultar_informacion_padre(usuario_padre):
+        """Consultar el id del padre y sus hijos (se ejecuta fuera del hilo de Tk)"""
+        padre_id = None
+        hijos = []
+        connection = crear_conexion()
+        if connection:
             try:
-                connection = crear_conexion()
-                if connection:
-                    cursor = connection.cursor(dictionary=True)
-                    
-                    # Obtener información del padre
-                    cursor.execute("SELECT id FROM usuarios WHERE nombre_usuario = %s AND tipo_usuario = 'Padre'", 
-                                 (self.usuario_padre,))
-                    padre_info = cursor.fetchone()
-                    
-                    if padre_info:
-                        self.padre_id = padre_info['id']
-                        
-                        # Obtener hijos del padre
-                        cursor.execute("""
-                            SELECT id, nombre, apellido, dni, curso, division, fecha_nacimiento
-                            FROM alumnos 
-                            WHERE padre_id = %s AND activo = TRUE
-                            ORDER BY curso, apellido, nombre
-                        """, (self.padre_id,))
-                        
-                        self.hijos_data = cursor.fetchall()
-                    
-                    cursor.close()
-                    connection.close()
+                cursor = connection.cursor(dictionary=True)
+                
+                # Obtener información del padre
+                cursor.execute("SELECT id FROM usuarios WHERE nombre_usuario = %s AND tipo_usuario = 'Padre'", 
+                             (usuario_padre,))
+                padre_info = cursor.fetchone()
+                
+                if padre_info:
+                    padre_id = padre_info['id']
                     
-                    print(f"✅ Padre {self.usuario_padre} cargado. Hijos encontrados: {len(self.hijos_data)}")
+                    # Obtener hijos del padre
+                    cursor.execute("""
+                        SELECT id, nombre, apellido, dni, curso, division, fecha_nacimiento
+                        FROM alumnos 
+                        WHERE padre_id = %s AND activo = TRUE
+                        ORDER BY curso, apellido, nombre
+                    """, (padre_id,))
                     
-            except Exception as e:
-                print(f"❌ Error cargando información del padre: {e}")
-                self.usar_datos_ejemplo()
-        else:
-            self.usar_datos_ejemplo()
+                    hijos = cursor.fetchall()
+                
+                cursor.close()
+            finally:
+                connection.close()
+        return padre_id, hijos
+    
+    def aplicar_informacion_padre(self, resultado):
+        """Mostrar los hijos recibidos de la consulta"""
+        self.padre_id, self.hijos_data = resultado
+        self.cargando_hijos = False
+        print(f"✅ Padre {self.usuario_padre} cargado. Hijos encontrados: {len(self.hijos_data)}")
+        self.mostrar_hijos()
+    
+    def error_informacion_padre(self, error):
+        print(f"❌ Error cargando información del padre: {error}")
+        self.cargando_hijos = False
+        self.usar_datos_ejemplo()
+        self.mostrar_hijos()
     
     def usar_datos_ejemplo(self):
         """Usar datos de ejemplo si no hay base de datos"""
@@ -142,10 +166,17 @@ class PadresSection:
 
     def create_hijos_panel(self, parent):
         """Panel de información de hijos"""
-        hijos_frame = tk.LabelFrame(parent, text="👨‍👩‍👧‍👦 Mis Hijos", 
-                                   font=("Arial", 12, "bold"), bg="lightgreen", 
-                                   fg="darkgreen", padx=10, pady=8)
-        hijos_frame.pack(fill=tk.X, pady=(0, 15))
+        self.hijos_frame = tk.LabelFrame(parent, text="👨‍👩‍👧‍👦 Mis Hijos", 
+                                        font=("Arial", 12, "bold"), bg="lightgreen", 
+                                        fg="darkgreen", padx=10, pady=8)
+        self.hijos_frame.pack(fill=tk.X, pady=(0, 15))
+        self.mostrar_hijos()
+
+    def mostrar_hijos(self):
+        """Dibujar las tarjetas de los hijos (se vuelve a llamar al llegar los datos)"""
+        hijos_frame = self.hijos_frame
+        for widget in hijos_frame.winfo_children():
+            widget.destroy()
 
         if self.hijos_data:
             for i, hijo in enumerate(self.hijos_data):
@@ -166,6 +197,9 @@ class PadresSection:
             # Configurar columnas
             for i in range(len(self.hijos_data)):
                 hijos_frame.grid_columnconfigure(i, weight=1)
+        elif self.cargando_hijos:
+            tk.Label(hijos_frame, text="Cargando información de los hijos...", 
+                    font=("Arial", 12), bg="lightgreen", fg="darkgreen").pack(pady=20)
         else:
             tk.Label(hijos_frame, text="No se encontraron hijos registrados", 
                     font=("Arial", 12), bg="lightgreen", fg="red").pack(pady=20)
@@ -482,6 +516,9 @@ class RendimientoGeneralWindow:
                 tk.Label(prom_frame, text=f"{promedio['promedio']:.2f}", font=("Arial", 12, "bold"), 
                         bg="white", fg=color).pack(side=tk.RIGHT, padx=10)
         else:
+            tk.Label(frame, text="No hay calificaciones disponibles", 
+                    font=("Arial", 12), bg="lightblue", fg="red").pack(pady=20)
+
 class AnalisisDetalladoHijoWindow:
     """Ventana para análisis detallado del rendimiento de un hijo"""
     
@@ -829,8 +866,7 @@ class AnalisisDetalladoHijoWindow:
                            f"📊 Reporte académico completo exportado:\n"
                            f"📁 Archivo: Reporte_{self.hijo['apellido']}_{self.hijo['nombre']}.pdf\n"
                            "📋 Incluye: Calificaciones, promedios, análisis y recomendaciones")
-            tk.Label(frame, text="No hay calificaciones disponibles", 
-                    font=("Arial", 12), bg="lightblue", fg="red").pack(pady=20)
+
 class ConsultaDocenteWindow:
     """Ventana para consultar con docente específico"""
     
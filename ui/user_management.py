@@ -8,20 +8,8 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 sys.path.insert(0, project_root)
 
-try:
-    from server.database import crear_usuario as db_crear_usuario, obtener_todos_usuarios, inicializar_base_datos
-    DATABASE_CONNECTED = inicializar_base_datos()
-    print(f"✅ Base de datos conectada en user_management.py: {DATABASE_CONNECTED}")
-except ImportError as e:
-    DATABASE_CONNECTED = False
-    print(f"❌ Error al importar base de datos en user_management.py: {e}")
-    print(f"   Directorio actual: {current_dir}")
-    print(f"   Directorio raíz: {project_root}")
-    def db_crear_usuario(nombre, contrasena, rol):
-        print(f"Mock: Creando usuario {nombre} con rol {rol}")
-    def obtener_todos_usuarios():
-        return []
-        return []
+from .carga_diferida import obtener_base_datos
+
 # Diccionario para almacenar usuarios localmente (fallback)
 usuarios = {}
 
@@ -48,10 +36,11 @@ class UserManager:
 
             if nombre and rol and contrasena and confirmar_contrasena == contrasena and email:
                 try:
-                    if DATABASE_CONNECTED:
+                    base_datos = obtener_base_datos()
+                    if base_datos is not None:
                         # Guardar en base de datos (solo un rol por usuario en tu esquema)
                         primer_rol = rol[0] if rol else "Padre"
-                        db_crear_usuario(nombre, contrasena, primer_rol)
+                        base_datos.crear_usuario(nombre, contrasena, primer_rol)
                     else:
                         # Guardar en diccionario local como fallback
                         usuarios[nombre] = {
@@ -134,8 +123,9 @@ class UserManager:
             close_button.pack(pady=10)
         
         # Mostrar usuarios de la base de datos si está conectada
-        if DATABASE_CONNECTED:
-            usuarios_db = obtener_todos_usuarios()
+        base_datos = obtener_base_datos()
+        if base_datos is not None:
+            usuarios_db = base_datos.obtener_todos_usuarios()
             if usuarios_db:
                 info = "\n".join([f"Usuario: {nombre}, Rol: {rol}, Email: {email}" 
                                  for nombre, rol, email in usuarios_db])